@@ -67,6 +67,17 @@ export function analyzeProgram(
         const diagnosticFileCount = diagnostics.length;
         const elapsedTime = duration.getDurationInSeconds();
 
+        if (!moreToAnalyze) {
+            const importCacheStats = program.importResolver.persistCache();
+            if (importCacheStats && configOptions.verboseOutput) {
+                console.info(
+                    `Import cache: ${importCacheStats.hits} directory listings reused, ` +
+                        `${importCacheStats.misses} read, ${importCacheStats.statCalls} validation stat calls, ` +
+                        `${importCacheStats.netCallsSaved} file system calls saved`
+                );
+            }
+        }
+
         // Report any diagnostics or completion.
         if (diagnosticFileCount > 0 || !moreToAnalyze) {
             callback({
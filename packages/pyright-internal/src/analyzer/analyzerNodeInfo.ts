@@ -109,14 +109,43 @@ export interface AnalyzerNodeInfoWriter extends AnalyzerNodeInfoReader {
     setFileInfo(root: ModuleNode, fileInfo: AnalyzerFileInfo): void;
 }
 
+// Binds analyzer information on demand for a parse tree whose binding
+// was partially deferred (e.g. function bodies in library files that
+// were bound in declaration-only mode).
+export interface DeferredNodeInfoBinder {
+    hasPendingBindings(): boolean;
+
+    // Performs any deferred binding required to provide analyzer
+    // information for the node. Returns true if binding was performed.
+    bindNodeIfDeferred(node: ParseNode, info: AnalyzerNodeInfo | undefined): boolean;
+}
+
 export class AnalyzerNodeInfoStore implements AnalyzerNodeInfoWriter {
     private readonly _infoByTree = new WeakMap<object, WeakMap<ParseNode, AnalyzerNodeInfo>>();
     private readonly _fileInfoByTree = new WeakMap<object, AnalyzerFileInfo>();
+    private _deferredBinder: DeferredNodeInfoBinder | undefined;
 
     get(node: ParseNode): AnalyzerNodeInfo | undefined {
+        const info = this._infoByTree.get(node.a)?.get(node);
+        if (!this._deferredBinder) {
+            return info;
+        }
+
+        if (!this._deferredBinder.bindNodeIfDeferred(node, info)) {
+            return info;
+        }
+
+        if (!this._deferredBinder.hasPendingBindings()) {
+            this._deferredBinder = undefined;
+        }
+
         return this._infoByTree.get(node.a)?.get(node);
     }
 
+    setDeferredBinder(binder: DeferredNodeInfoBinder | undefined) {
+        this._deferredBinder = binder?.hasPendingBindings() ? binder : undefined;
+    }
+
     getFileInfo(node: ParseNode): AnalyzerFileInfo | undefined {
         return this._fileInfoByTree.get(node.a);
     }
@@ -35,6 +35,11 @@ export class BackgroundAnalysisProgram {
     private _onAnalysisCompletion: AnalysisCompleteCallback | undefined;
     private _preEditAnalysis: IBackgroundAnalysis | undefined;
 
+    // The file last recorded as active. Hovers and completions record the
+    // same file many times in a row, and the background analysis is told
+    // only when it changes.
+    private _activeFileUri: Uri | undefined;
+
     constructor(
         protected readonly serviceId: string,
         private readonly _serviceProvider: ServiceProvider,
@@ -131,7 +136,21 @@ export class BackgroundAnalysisProgram {
         this.markFilesDirty([uri], /* evenIfContentsAreSame */ true);
     }
 
+    setActiveFile(fileUri: Uri) {
+        if (this._activeFileUri?.equals(fileUri)) {
+            return;
+        }
+
+        this._activeFileUri = fileUri;
+        this._backgroundAnalysis?.setActiveFile(fileUri);
+        this._program.setActiveFile(fileUri);
+    }
+
     setFileClosed(fileUri: Uri) {
+        if (this._activeFileUri?.equals(fileUri)) {
+            this._activeFileUri = undefined;
+        }
+
         this._backgroundAnalysis?.setFileClosed(fileUri);
         const diagnostics = this._program.setFileClosed(fileUri);
         this._reportDiagnosticsForRemovedFiles(diagnostics);
@@ -222,22 +241,19 @@ export class BackgroundAnalysisProgram {
     }
 
     invalidateAndForceReanalysis(reason: InvalidatedReason, refreshOptions?: RefreshOptions) {
-        this._backgroundAnalysis?.invalidateAndForceReanalysis(reason);
+        this._backgroundAnalysis?.invalidateAndForceReanalysis(reason, refreshOptions);
 
         // Make sure the import resolver doesn't have invalid
         // cached entries.
         this._importResolver.invalidateCache();
 
-        // If we have specific changed file URIs and it's a content-only change, mark only those files dirty.
-        // Otherwise, mark all files with one or more errors dirty.
-        if (
-            refreshOptions?.changedFileUris &&
-            refreshOptions.changedFileUris.size > 0 &&
-            reason === InvalidatedReason.LibraryWatcherContentOnlyChanged
-        ) {
-            // Convert UriMap keys to array for markFilesDirty
-            const changedFileUris = Array.from(refreshOptions.changedFileUris.keys());
-            this.markFilesDirty(changedFileUris, /* evenIfContentsAreSame */ true);
+        // If we know which library files or folders changed, mark only the files
+        // affected by them dirty. Otherwise, mark all files with one or more errors dirty.
+        if (refreshOptions?.changedFileUris && refreshOptions.changedFileUris.size > 0) {
+            this._program.markLibraryFilesDirty(
+                Array.from(refreshOptions.changedFileUris.keys()),
+                Array.from(refreshOptions.changedModuleNames ?? [])
+            );
         } else {
             // Mark all files with one or more errors dirty.
             this._program.markAllFilesDirty(/* evenIfContentsAreSame */ true);
@@ -271,6 +287,10 @@ export class BackgroundAnalysisProgram {
     exitEditMode() {
         this._backgroundAnalysis = this._preEditAnalysis;
         this._preEditAnalysis = undefined;
+
+        // The background analysis wasn't told about files that became
+        // active during edit mode.
+        this._activeFileUri = undefined;
         return this._program.exitEditMode();
     }
 
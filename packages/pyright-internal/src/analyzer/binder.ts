@@ -24,6 +24,7 @@ import { DiagnosticRule } from '../common/diagnosticRules';
 import { stripFileExtension } from '../common/pathUtils';
 import { convertTextRangeToRange } from '../common/positionUtils';
 import { TextRange, getEmptyRange } from '../common/textRange';
+import { timingStats } from '../common/timing';
 import { Uri } from '../common/uri/uri';
 import { LocMessage } from '../localization/localize';
 import {
@@ -148,6 +149,28 @@ interface DeferredBindingTask {
     callback: () => void;
 }
 
+// Determines whether a function body contains a "global" statement. Such
+// a statement adds a symbol to the module scope, so the body's binding
+// cannot be deferred in declaration-only mode.
+class GlobalStatementFinder extends ParseTreeWalker {
+    private _foundGlobal = false;
+
+    static containsGlobalStatement(node: ParseNode) {
+        const finder = new GlobalStatementFinder();
+        finder.walk(node);
+        return finder._foundGlobal;
+    }
+
+    override visitNode(node: ParseNode) {
+        return this._foundGlobal ? [] : super.visitNode(node);
+    }
+
+    override visitGlobal(node: GlobalNode): boolean {
+        this._foundGlobal = true;
+        return false;
+    }
+}
+
 interface FinalInfo {
     isFinal: boolean;
     finalTypeNode: ExpressionNode | undefined;
@@ -251,13 +274,21 @@ function doesCallExposeClassNamespace(scope: Scope, node: CallNode): boolean {
 // flow nodes. This number is somewhat arbitrary and is tuned empirically.
 const flowNodeComplexityContribution = 0.025;
 
-export class Binder extends ParseTreeWalker {
+export class Binder extends ParseTreeWalker implements AnalyzerNodeInfo.DeferredNodeInfoBinder {
     private readonly _fileInfo: AnalyzerFileInfo;
-    private readonly _nodeInfo: AnalyzerNodeInfo.AnalyzerNodeInfoAccessor;
+    private _nodeInfo: AnalyzerNodeInfo.AnalyzerNodeInfoAccessor;
 
     // A queue of deferred analysis operations.
     private _deferredBindingTasks: DeferredBindingTask[] = [];
 
+    // In declaration-only mode, function bodies are not bound until
+    // analyzer information within them is requested. These maps track
+    // the functions whose bodies are still pending and, for methods,
+    // the class that contains them.
+    private _pendingFunctionTasks = new Map<FunctionNode, DeferredBindingTask>();
+    private _pendingMethodsByClass = new Map<ClassNode, FunctionNode[]>();
+    private _isBindingPendingFunction = false;
+
     // The current scope in effect.
     private _currentScope!: Scope;
 
@@ -364,7 +395,8 @@ export class Binder extends ParseTreeWalker {
         fileInfo: AnalyzerFileInfo,
         private _moduleSymbolOnly: boolean | undefined,
         private readonly _cellChainIndex: CellChainIndexProvider | undefined,
-        nodeInfo: AnalyzerNodeInfo.AnalyzerNodeInfoAccessor
+        nodeInfo: AnalyzerNodeInfo.AnalyzerNodeInfoAccessor,
+        private readonly _declarationsOnly = false
     ) {
         super();
 
@@ -476,6 +508,17 @@ export class Binder extends ParseTreeWalker {
                 scope.symbolTable.get(name)?.setIsInDunderAll();
             }
         }
+
+        // In declaration-only mode, the binder is retained until its pending
+        // function bodies are bound, so release the state that is used only
+        // while binding the module scope.
+        if (this.hasPendingBindings()) {
+            this._dunderAllNames = undefined;
+            this._dunderAllStringNodes = [];
+            this._potentialHiddenSymbols = new Map();
+            this._potentialWildcardReexportSymbols = new Map();
+            this._potentialPrivateSymbols = new Map();
+        }
     }
 
     override visitModule(node: ModuleNode): boolean {
@@ -708,7 +751,7 @@ export class Binder extends ParseTreeWalker {
                     this._addImplicitSymbolToCurrentScope('__class__', node, '__class__');
                 }
 
-                this._deferBinding(() => {
+                this._deferFunctionBinding(node, containingClassNode, () => {
                     // Create a start node for the function.
                     this._currentFlowNode = this._createStartFlowNode();
                     this._codeFlowComplexity = 0;
@@ -4757,6 +4800,132 @@ export class Binder extends ParseTreeWalker {
         });
     }
 
+    // Called once the module has been bound in declaration-only mode and its
+    // analyzer information has been published. Deferred function bodies are
+    // subsequently bound through the specified accessor.
+    setDeferredNodeInfoAccessor(nodeInfo: AnalyzerNodeInfo.AnalyzerNodeInfoAccessor) {
+        this._nodeInfo = nodeInfo;
+    }
+
+    hasPendingBindings(): boolean {
+        return this._pendingFunctionTasks.size > 0;
+    }
+
+    bindNodeIfDeferred(node: ParseNode, info: AnalyzerNodeInfo.AnalyzerNodeInfo | undefined): boolean {
+        if (this._isBindingPendingFunction || this._pendingFunctionTasks.size === 0) {
+            return false;
+        }
+
+        // Only nodes without analyzer information can live within a function
+        // body that hasn't been bound yet, so skip the ancestor search otherwise.
+        let functionNode = this._getPendingFunctionForNode(node, /* searchAncestors */ info === undefined);
+        if (!functionNode) {
+            return false;
+        }
+
+        while (functionNode) {
+            this._bindPendingFunction(functionNode);
+
+            // Binding the outer function may have introduced additional
+            // pending (nested) functions that contain the node.
+            functionNode = this._getPendingFunctionForNode(node, /* searchAncestors */ true);
+        }
+
+        return true;
+    }
+
+    private _deferFunctionBinding(node: FunctionNode, containingClassNode: ClassNode | undefined, callback: () => void) {
+        if (
+            !this._declarationsOnly ||
+            this._moduleSymbolOnly ||
+            GlobalStatementFinder.containsGlobalStatement(node.d.suite)
+        ) {
+            this._deferBinding(callback);
+            return;
+        }
+
+        this._pendingFunctionTasks.set(node, {
+            scope: this._currentScope,
+            codeFlowExpressions: this._currentScopeCodeFlowExpressions!,
+            callback,
+        });
+
+        // Methods must be bound before the class's symbol table is used
+        // because they can declare instance variables (e.g. "self.x = 1").
+        if (containingClassNode) {
+            const methods = this._pendingMethodsByClass.get(containingClassNode);
+            if (methods) {
+                methods.push(node);
+            } else {
+                this._pendingMethodsByClass.set(containingClassNode, [node]);
+            }
+        }
+
+        timingStats.deferredFunctionBindCount++;
+    }
+
+    private _getPendingFunctionForNode(node: ParseNode, searchAncestors: boolean): FunctionNode | undefined {
+        if (node.nodeType === ParseNodeType.Function && this._pendingFunctionTasks.has(node)) {
+            return node;
+        }
+
+        if (node.nodeType === ParseNodeType.Class) {
+            const methods = this._pendingMethodsByClass.get(node);
+            if (methods && methods.length > 0) {
+                return methods[0];
+            }
+        }
+
+        if (!searchAncestors) {
+            return undefined;
+        }
+
+        // Find the outermost pending function that contains the node. Nested
+        // functions are registered only after their parent has been bound.
+        let pendingFunction: FunctionNode | undefined;
+        let curNode = node.parent;
+        while (curNode) {
+            if (curNode.nodeType === ParseNodeType.Function && this._pendingFunctionTasks.has(curNode)) {
+                pendingFunction = curNode;
+            }
+            curNode = curNode.parent;
+        }
+
+        return pendingFunction;
+    }
+
+    private _bindPendingFunction(node: FunctionNode) {
+        const task = this._pendingFunctionTasks.get(node)!;
+        this._pendingFunctionTasks.delete(node);
+
+        const containingClassNode = ParseTreeUtils.getEnclosingClass(node, /* stopAtFunction */ true);
+        if (containingClassNode) {
+            const methods = this._pendingMethodsByClass.get(containingClassNode);
+            if (methods) {
+                const remaining = methods.filter((method) => method !== node);
+                if (remaining.length > 0) {
+                    this._pendingMethodsByClass.set(containingClassNode, remaining);
+                } else {
+                    this._pendingMethodsByClass.delete(containingClassNode);
+                }
+            }
+        }
+
+        this._isBindingPendingFunction = true;
+        try {
+            timingStats.deferredBindTime.timeOperation(() => {
+                this._deferredBindingTasks.push(task);
+                this._bindDeferred();
+
+                // Diagnostics aren't reported for files bound in declaration-only
+                // mode, so discard any generated while binding the body.
+                this._fileInfo.diagnosticSink.fetchAndClear();
+            });
+        } finally {
+            this._isBindingPendingFunction = false;
+        }
+    }
+
     private _bindDeferred() {
         while (this._deferredBindingTasks.length > 0) {
             const nextItem = this._deferredBindingTasks.shift()!;
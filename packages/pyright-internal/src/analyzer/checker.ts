@@ -98,6 +98,7 @@ import { Declaration, DeclarationType, isAliasDeclaration, isVariableDeclaration
 import { getNameNodeForDeclaration } from './declarationUtils';
 import { deprecatedAliases, deprecatedSpecialForms } from './deprecatedSymbols';
 import { getEnumDeclaredValueType, isEnumClassWithMembers, transformTypeForEnumMember } from './enums';
+import { FunctionCheckSession, isOutermostFunction } from './functionCheckCache';
 import { ImportResolver, createImportedModuleDescriptor } from './importResolver';
 import { ImportResult, ImportType } from './importResult';
 import { getRelativeModuleName, getTopLevelImports } from './importStatementUtils';
@@ -236,7 +237,8 @@ export class Checker extends ParseTreeWalker {
         private _evaluator: TypeEvaluator,
         parseResults: ParserOutput,
         private _dependentFiles: ParserOutput[] | undefined,
-        nodeInfoReader: AnalyzerNodeInfo.AnalyzerNodeInfoReader
+        nodeInfoReader: AnalyzerNodeInfo.AnalyzerNodeInfoReader,
+        private _functionCheckSession?: FunctionCheckSession
     ) {
         // Forward the reader to the base walker so the structural walk expands both tier-1
         // (parser-derived) and tier-2 (evaluator-discovered, e.g. `cast("Foo", v)`) string
@@ -282,6 +284,8 @@ export class Checker extends ParseTreeWalker {
             this._reportUnusedDunderAllSymbols(dunderAllInfo.stringNodes);
         }
 
+        this._markNamesAccessedByReusedFunctions();
+
         // Perform a one-time validation of symbols in all scopes
         // defined in this module for things like unaccessed variables.
         this._validateSymbolTables();
@@ -409,6 +413,16 @@ export class Checker extends ParseTreeWalker {
     }
 
     override visitFunction(node: FunctionNode): boolean {
+        // Functions that weren't affected by the last edit of the file aren't
+        // checked again. The diagnostics of their previous check are reused.
+        if (this._functionCheckSession && isOutermostFunction(node) && this._evaluator.isNodeReachable(node)) {
+            const diagnostics = this._functionCheckSession.visitFunction(node);
+            if (diagnostics) {
+                diagnostics.forEach((diag) => this._fileInfo.diagnosticSink.addDiagnostic(diag));
+                return false;
+            }
+        }
+
         if (node.d.typeParams) {
             this.walk(node.d.typeParams);
         }
@@ -1806,6 +1820,10 @@ export class Checker extends ParseTreeWalker {
             return false;
         }
 
+        if (this._functionCheckSession?.isNameUsedByReusedFunction(lastPartName)) {
+            return false;
+        }
+
         return !this._fileInfo.accessedSymbolSet.has(symbol.id);
     }
 
@@ -3112,6 +3130,41 @@ export class Checker extends ParseTreeWalker {
         });
     }
 
+    // The symbols accessed by functions that weren't checked again aren't
+    // marked as accessed by the evaluator. Symbols of the module and class
+    // scopes whose names appear in these functions are marked instead.
+    private _markNamesAccessedByReusedFunctions() {
+        const session = this._functionCheckSession;
+        if (!session || session.reusedFunctionCount === 0) {
+            return;
+        }
+
+        const scopes: (Scope | undefined)[] = this._scopedNodes.map((node) => this._nodeInfo.getScope(node));
+        appendArray(
+            scopes,
+            this._typeParamLists
+                .filter((node) => node.parent?.nodeType !== ParseNodeType.Function)
+                .map((node) => this._nodeInfo.getScope(node))
+        );
+
+        scopes.forEach((scope) => {
+            if (
+                !scope ||
+                (scope.type !== ScopeType.Module &&
+                    scope.type !== ScopeType.Class &&
+                    scope.type !== ScopeType.TypeParameter)
+            ) {
+                return;
+            }
+
+            scope.symbolTable.forEach((symbol, name) => {
+                if (session.isNameUsedByReusedFunction(name)) {
+                    this._fileInfo.accessedSymbolSet.add(symbol.id);
+                }
+            });
+        });
+    }
+
     private _validateSymbolTables() {
         const dependentFileInfo = this._dependentFiles?.map((p) => this._nodeInfo.getFileInfo(p.parseTree));
         for (const scopedNode of this._scopedNodes) {
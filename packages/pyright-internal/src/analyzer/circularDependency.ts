@@ -28,7 +28,7 @@ export class CircularDependency {
         // based on that.
         let firstIndex = 0;
         this._paths.forEach((path, index) => {
-            if (path < this._paths[firstIndex]) {
+            if (path.key < this._paths[firstIndex].key) {
                 firstIndex = index;
             }
         });
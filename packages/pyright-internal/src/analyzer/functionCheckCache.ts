@@ -0,0 +1,510 @@
+/*
+ * functionCheckCache.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Keeps the diagnostics that checking produced for each function of an
+ * open file. When the next edit is confined to the body of one function,
+ * the functions that the edit can't affect aren't checked again. Their
+ * diagnostics are moved to the new positions of the functions and reused.
+ */
+
+import { DiagnosticRuleSet } from '../common/configOptions';
+import { Diagnostic, DiagnosticCategory } from '../common/diagnostic';
+import { DiagnosticRule } from '../common/diagnosticRules';
+import { convertOffsetToPosition, convertPositionToOffset } from '../common/positionUtils';
+import { Range, rangesAreEqual, TextRange } from '../common/textRange';
+import { TextRangeCollection } from '../common/textRangeCollection';
+import { Uri } from '../common/uri/uri';
+import {
+    ClassNode,
+    FunctionNode,
+    LambdaNode,
+    ModuleNode,
+    ParseNode,
+    ParseNodeType,
+    SuiteNode,
+} from '../parser/parseNodes';
+import * as AnalyzerNodeInfo from './analyzerNodeInfo';
+import { IdentifierOffsets } from './identifierIndex';
+import { ImportResult } from './importResult';
+import { ParseTreeWalker } from './parseTreeWalker';
+import { isDunderName } from './symbolNameUtils';
+
+// The state of a file that the results of checking its functions depend on.
+export interface FunctionCheckContext {
+    readonly fileUri: Uri;
+    readonly parseTree: ModuleNode;
+    readonly fileContents: string;
+    readonly lines: TextRangeCollection<TextRange>;
+    readonly identifierOffsets: IdentifierOffsets;
+    readonly diagnosticRuleSet: DiagnosticRuleSet;
+    readonly imports: readonly ImportResult[];
+    readonly nodeInfo: AnalyzerNodeInfo.AnalyzerNodeInfoReader;
+}
+
+interface CheckedFunction {
+    readonly start: number;
+    readonly length: number;
+    readonly bodyStart: number;
+    readonly containerName: string;
+    readonly hasTrivialBody: boolean;
+
+    // Does the function declare symbols in the module or class scope,
+    // for example through "global" statements or "self.x = ..."?
+    declaresOuterSymbols: boolean;
+
+    readonly diagnostics: Diagnostic[];
+}
+
+// The results of checking the outermost functions of a file, that is,
+// the functions and methods that aren't nested within other functions.
+export class FunctionCheckResults {
+    private constructor(
+        private readonly _fileContents: string,
+        private readonly _lines: TextRangeCollection<TextRange>,
+        private readonly _dependencyKey: string,
+        private readonly _functions: CheckedFunction[]
+    ) {}
+
+    static create(
+        context: FunctionCheckContext,
+        checkedFunctions: readonly FunctionNode[],
+        diagnostics: readonly Diagnostic[]
+    ): FunctionCheckResults {
+        const nodes = [...checkedFunctions].sort((a, b) => a.start - b.start);
+        const functions: CheckedFunction[] = nodes.map((node) => ({
+            start: node.start,
+            length: node.length,
+            bodyStart: getBodyStart(node),
+            containerName: getContainerName(node),
+            hasTrivialBody: hasTrivialBody(node.d.suite),
+            declaresOuterSymbols: false,
+            diagnostics: [],
+        }));
+
+        forEachOuterDeclaration(context, nodes, (node) => {
+            const index = findContainingFunction(nodes, node.start, TextRange.getEnd(node));
+            if (index !== undefined && nodes[index] !== node) {
+                functions[index].declaresOuterSymbols = true;
+            }
+        });
+
+        diagnostics.forEach((diag) => {
+            const start = convertPositionToOffset(diag.range.start, context.lines);
+            const end = convertPositionToOffset(diag.range.end, context.lines);
+            if (start === undefined || end === undefined) {
+                return;
+            }
+
+            const index = findContainingFunction(nodes, start, end);
+            if (index === undefined) {
+                return;
+            }
+
+            // Whether a function is accessed is determined by the code outside
+            // of it, so the report of an unaccessed function is never reused.
+            const nameNode = nodes[index].d.name;
+            if (
+                start === nameNode.start &&
+                end === TextRange.getEnd(nameNode) &&
+                (diag.category === DiagnosticCategory.UnusedCode ||
+                    diag.getRule() === DiagnosticRule.reportUnusedFunction)
+            ) {
+                return;
+            }
+
+            functions[index].diagnostics.push(diag);
+        });
+
+        return new FunctionCheckResults(context.fileContents, context.lines, getDependencyKey(context), functions);
+    }
+
+    // Returns the functions of the new parse results that don't need to be
+    // checked again, along with their diagnostics moved to the new positions.
+    // Returns undefined if the edit isn't confined to the body of one function,
+    // or if the types the edited function provides to the others can change
+    // through module or class symbols.
+    getReusableFunctions(context: FunctionCheckContext): Map<FunctionNode, Diagnostic[]> | undefined {
+        const oldContents = this._fileContents;
+        const newContents = context.fileContents;
+
+        // If the contents didn't change, the file is checked again because
+        // something it depends on changed.
+        if (oldContents === newContents || getDependencyKey(context) !== this._dependencyKey) {
+            return undefined;
+        }
+
+        let changeStart = 0;
+        const minLength = Math.min(oldContents.length, newContents.length);
+        while (changeStart < minLength && oldContents.charCodeAt(changeStart) === newContents.charCodeAt(changeStart)) {
+            changeStart++;
+        }
+
+        let oldChangeEnd = oldContents.length;
+        let newChangeEnd = newContents.length;
+        while (
+            oldChangeEnd > changeStart &&
+            newChangeEnd > changeStart &&
+            oldContents.charCodeAt(oldChangeEnd - 1) === newContents.charCodeAt(newChangeEnd - 1)
+        ) {
+            oldChangeEnd--;
+            newChangeEnd--;
+        }
+
+        const oldEditedIndex = findContainingFunction(this._functions, changeStart, oldChangeEnd);
+        const oldEdited = oldEditedIndex !== undefined ? this._functions[oldEditedIndex] : undefined;
+        if (!oldEdited || changeStart < oldEdited.bodyStart || oldEdited.declaresOuterSymbols) {
+            return undefined;
+        }
+
+        const nodes = collectOutermostFunctions(context.parseTree);
+        const editedIndex = findContainingFunction(nodes, changeStart, newChangeEnd);
+        const edited = editedIndex !== undefined ? nodes[editedIndex] : undefined;
+        if (
+            !edited ||
+            edited.start !== oldEdited.start ||
+            changeStart < getBodyStart(edited) ||
+            getContainerName(edited) !== oldEdited.containerName
+        ) {
+            return undefined;
+        }
+
+        // Find the functions whose types can change along with the edited one,
+        // that is, the functions that refer to a function whose inferred return
+        // type or trivial body can change. Other functions are affected by the
+        // edit only through the names of these functions.
+        const affectedFunctions = new Set<FunctionNode>([edited]);
+        const affectedNames: string[] = [];
+        if (
+            (!edited.d.returnAnnotation && !edited.d.funcAnnotationComment) ||
+            oldEdited.hasTrivialBody ||
+            hasTrivialBody(edited.d.suite)
+        ) {
+            affectedNames.push(edited.d.name.d.value);
+        }
+
+        const visitedNames = new Set<string>(affectedNames);
+        while (affectedNames.length > 0) {
+            const name = affectedNames.pop()!;
+
+            // Dunder methods are called implicitly, without their names.
+            if (isDunderName(name)) {
+                return undefined;
+            }
+
+            for (const offset of context.identifierOffsets.get(name) ?? []) {
+                const index = findContainingFunction(nodes, offset, offset);
+
+                // Uses outside of functions can change the types of module and
+                // class variables, which any of the functions can refer to.
+                if (index === undefined) {
+                    return undefined;
+                }
+
+                const node = nodes[index];
+                if (!affectedFunctions.has(node)) {
+                    affectedFunctions.add(node);
+
+                    const affectedName = node.d.name.d.value;
+                    if (!visitedNames.has(affectedName)) {
+                        visitedNames.add(affectedName);
+                        affectedNames.push(affectedName);
+                    }
+                }
+            }
+        }
+
+        // The types of module and class symbols that the affected functions
+        // declare can change as well, for example "self.x = f()" in a method
+        // that calls the edited function, and any function can refer to them.
+        const affectedNodes = nodes.filter((node) => affectedFunctions.has(node));
+        let declaresOuterSymbols = false;
+        forEachOuterDeclaration(context, affectedNodes, (node) => {
+            const index = findContainingFunction(affectedNodes, node.start, TextRange.getEnd(node));
+            if (index !== undefined && affectedNodes[index] !== node) {
+                declaresOuterSymbols = true;
+            }
+        });
+
+        if (declaresOuterSymbols) {
+            return undefined;
+        }
+
+        const oldFunctions = new Map<number, CheckedFunction>();
+        this._functions.forEach((func) => oldFunctions.set(func.start, func));
+
+        const delta = newChangeEnd - oldChangeEnd;
+        const mapOffset = (offset: number) => {
+            if (offset <= changeStart) {
+                return offset;
+            }
+
+            return offset >= oldChangeEnd ? offset + delta : undefined;
+        };
+
+        const reusableFunctions = new Map<FunctionNode, Diagnostic[]>();
+        nodes.forEach((node) => {
+            if (affectedFunctions.has(node)) {
+                return;
+            }
+
+            let oldStart: number;
+            if (TextRange.getEnd(node) <= changeStart) {
+                oldStart = node.start;
+            } else if (node.start >= newChangeEnd) {
+                oldStart = node.start - delta;
+            } else {
+                return;
+            }
+
+            const oldFunction = oldFunctions.get(oldStart);
+            if (
+                !oldFunction ||
+                oldFunction.length !== node.length ||
+                oldFunction.containerName !== getContainerName(node)
+            ) {
+                return;
+            }
+
+            const diagnostics = this._moveDiagnostics(oldFunction.diagnostics, context, mapOffset);
+            if (diagnostics) {
+                reusableFunctions.set(node, diagnostics);
+            }
+        });
+
+        return reusableFunctions;
+    }
+
+    private _moveDiagnostics(
+        diagnostics: Diagnostic[],
+        context: FunctionCheckContext,
+        mapOffset: (offset: number) => number | undefined
+    ): Diagnostic[] | undefined {
+        const moveRange = (range: Range): Range | undefined => {
+            const start = convertPositionToOffset(range.start, this._lines);
+            const end = convertPositionToOffset(range.end, this._lines);
+            const newStart = start !== undefined ? mapOffset(start) : undefined;
+            const newEnd = end !== undefined ? mapOffset(end) : undefined;
+            if (newStart === undefined || newEnd === undefined) {
+                return undefined;
+            }
+
+            return {
+                start: convertOffsetToPosition(newStart, context.lines),
+                end: convertOffsetToPosition(newEnd, context.lines),
+            };
+        };
+
+        const movedDiagnostics: Diagnostic[] = [];
+        for (const diag of diagnostics) {
+            const range = moveRange(diag.range);
+            if (!range) {
+                return undefined;
+            }
+
+            const relatedInfo = [];
+            let isMoved = !rangesAreEqual(range, diag.range);
+            for (const info of diag.getRelatedInfo()) {
+                const infoRange = info.uri.equals(context.fileUri) ? moveRange(info.range) : info.range;
+                if (!infoRange) {
+                    return undefined;
+                }
+
+                isMoved ||= !rangesAreEqual(infoRange, info.range);
+                relatedInfo.push({ ...info, range: infoRange });
+            }
+
+            if (!isMoved) {
+                movedDiagnostics.push(diag);
+                continue;
+            }
+
+            const movedDiag = new Diagnostic(diag.category, diag.message, range, diag.priority);
+            diag.getActions()?.forEach((action) => movedDiag.addAction(action));
+            const rule = diag.getRule();
+            if (rule) {
+                movedDiag.setRule(rule);
+            }
+            movedDiag.setData(diag.getData());
+            relatedInfo.forEach((info) => movedDiag.addRelatedInfo(info.message, info.uri, info.range, info.priority));
+            movedDiagnostics.push(movedDiag);
+        }
+
+        return movedDiagnostics;
+    }
+}
+
+// Tracks the outermost functions visited by one run of the checker and
+// provides the diagnostics of the functions that don't need to be checked.
+export class FunctionCheckSession {
+    private readonly _checkedFunctions: FunctionNode[] = [];
+    private readonly _reusedFunctions: FunctionNode[] = [];
+
+    constructor(
+        private readonly _reusableFunctions: Map<FunctionNode, Diagnostic[]> | undefined,
+        private readonly _identifierOffsets: IdentifierOffsets
+    ) {}
+
+    get checkedFunctions(): readonly FunctionNode[] {
+        return this._checkedFunctions;
+    }
+
+    get reusedFunctionCount() {
+        return this._reusedFunctions.length;
+    }
+
+    // Records a reachable outermost function visited by the checker. Returns
+    // the diagnostics of the function if it doesn't need to be checked.
+    visitFunction(node: FunctionNode): Diagnostic[] | undefined {
+        this._checkedFunctions.push(node);
+
+        const diagnostics = this._reusableFunctions?.get(node);
+        if (diagnostics) {
+            this._reusedFunctions.push(node);
+        }
+
+        return diagnostics;
+    }
+
+    // Determines whether a name appears in a function that wasn't checked,
+    // other than as the name of the function itself. Symbols with such names
+    // are treated as accessed, since the functions may access them.
+    isNameUsedByReusedFunction(name: string) {
+        const offsets = this._identifierOffsets.get(name);
+        if (!offsets || this._reusedFunctions.length === 0) {
+            return false;
+        }
+
+        return offsets.some((offset) => {
+            const index = findContainingFunction(this._reusedFunctions, offset, offset);
+            return index !== undefined && this._reusedFunctions[index].d.name.start !== offset;
+        });
+    }
+}
+
+// Determines whether a function isn't nested within another function or lambda.
+export function isOutermostFunction(node: FunctionNode) {
+    let curNode: ParseNode | undefined = node.parent;
+    while (curNode) {
+        if (curNode.nodeType === ParseNodeType.Function || curNode.nodeType === ParseNodeType.Lambda) {
+            return false;
+        }
+
+        curNode = curNode.parent;
+    }
+
+    return true;
+}
+
+class OutermostFunctionCollector extends ParseTreeWalker {
+    readonly functions: FunctionNode[] = [];
+
+    override visitFunction(node: FunctionNode) {
+        this.functions.push(node);
+        return false;
+    }
+
+    override visitLambda(node: LambdaNode) {
+        return false;
+    }
+}
+
+function collectOutermostFunctions(parseTree: ModuleNode) {
+    const collector = new OutermostFunctionCollector();
+    collector.walk(parseTree);
+    return collector.functions;
+}
+
+// Finds the function that contains the given range in a list of
+// non-overlapping functions or checked functions sorted by start.
+function findContainingFunction(functions: readonly TextRange[], start: number, end: number) {
+    let low = 0;
+    let high = functions.length - 1;
+    while (low <= high) {
+        const mid = (low + high) >> 1;
+        if (functions[mid].start <= start) {
+            low = mid + 1;
+        } else {
+            high = mid - 1;
+        }
+    }
+
+    if (high >= 0 && end <= TextRange.getEnd(functions[high])) {
+        return high;
+    }
+
+    return undefined;
+}
+
+// Calls the callback with the nodes of the declarations in the module scope
+// and in the scopes of the classes that contain the given functions.
+function forEachOuterDeclaration(
+    context: FunctionCheckContext,
+    functions: readonly FunctionNode[],
+    callback: (node: ParseNode) => void
+) {
+    const scopeNodes = new Set<ModuleNode | ClassNode>([context.parseTree]);
+    functions.forEach((node) => {
+        let curNode: ParseNode | undefined = node.parent;
+        while (curNode) {
+            if (curNode.nodeType === ParseNodeType.Class) {
+                scopeNodes.add(curNode);
+            }
+            curNode = curNode.parent;
+        }
+    });
+
+    scopeNodes.forEach((scopeNode) => {
+        AnalyzerNodeInfo.getScope(scopeNode, context.nodeInfo)?.symbolTable.forEach((symbol) => {
+            symbol.getDeclarations().forEach((decl) => {
+                if (decl.uri.equals(context.fileUri)) {
+                    callback(decl.node);
+                }
+            });
+        });
+    });
+}
+
+function getBodyStart(node: FunctionNode) {
+    const statements = node.d.suite.d.statements;
+    return statements.length > 0 ? statements[0].start : TextRange.getEnd(node.d.suite);
+}
+
+function getContainerName(node: FunctionNode) {
+    const names: string[] = [];
+    let curNode: ParseNode | undefined = node.parent;
+    while (curNode) {
+        if (curNode.nodeType === ParseNodeType.Class) {
+            names.push(curNode.d.name.d.value);
+        }
+        curNode = curNode.parent;
+    }
+
+    return names.reverse().join('.');
+}
+
+// Determines whether a function body consists only of docstrings, "...",
+// "pass" and "raise" statements. Such bodies are treated as unimplemented
+// in protocol and abstract classes.
+function hasTrivialBody(suite: SuiteNode) {
+    return suite.d.statements.every(
+        (statement) =>
+            statement.nodeType === ParseNodeType.StatementList &&
+            statement.d.statements.every(
+                (substatement) =>
+                    substatement.nodeType === ParseNodeType.Ellipsis ||
+                    substatement.nodeType === ParseNodeType.StringList ||
+                    substatement.nodeType === ParseNodeType.Pass ||
+                    substatement.nodeType === ParseNodeType.Raise
+            )
+    );
+}
+
+function getDependencyKey(context: FunctionCheckContext) {
+    const imports = context.imports.map(
+        (importResult) => `${importResult.importName}:${importResult.resolvedUris.map((uri) => uri.key).join(',')}`
+    );
+
+    return `${JSON.stringify(context.diagnosticRuleSet)}\n${imports.join('\n')}`;
+}
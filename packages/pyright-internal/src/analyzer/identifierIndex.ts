@@ -0,0 +1,162 @@
+/*
+ * identifierIndex.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * An inverted index from identifier names to the files in which they
+ * appear. Language features that search for a symbol by name use it to
+ * skip files that can't contain a reference.
+ */
+
+import { TextRangeCollection } from '../common/textRangeCollection';
+import { IdentifierToken, StringToken, Token, TokenType } from '../parser/tokenizerTypes';
+
+// Maps each identifier name in a file to the start offsets of its occurrences.
+export type IdentifierOffsets = ReadonlyMap<string, readonly number[]>;
+
+// The identifier names in a file.
+export type IdentifierNames = ReadonlySet<string>;
+
+// Strings longer than this are assumed not to be forward references
+// or __all__ entries, so the words within them aren't indexed.
+const maxIndexedStringLength = 256;
+
+const wordRegEx = /[\p{L}\p{Nl}_][\p{L}\p{Nl}\p{Mn}\p{Mc}\p{Nd}\p{Pc}]*/gu;
+
+// Collects the identifiers in a token stream with their offsets.
+export function collectIdentifierOffsets(tokens: TextRangeCollection<Token>, fileContents: string): IdentifierOffsets {
+    const offsets = new Map<string, number[]>();
+
+    forEachIdentifier(tokens, fileContents, (name, offset) => {
+        const existing = offsets.get(name);
+        if (existing) {
+            existing.push(offset);
+        } else {
+            offsets.set(name, [offset]);
+        }
+    });
+
+    return offsets;
+}
+
+// Collects the names of the identifiers in a token stream.
+export function collectIdentifierNames(tokens: TextRangeCollection<Token>, fileContents: string): IdentifierNames {
+    const names = new Set<string>();
+    forEachIdentifier(tokens, fileContents, (name) => names.add(name));
+    return names;
+}
+
+// Visits the identifiers in a token stream. Keywords are included because
+// soft keywords can be used as names. Words within short strings and type
+// comments are included as well, since they can refer to symbols through
+// forward references, __all__ entries and type annotation comments.
+function forEachIdentifier(
+    tokens: TextRangeCollection<Token>,
+    fileContents: string,
+    add: (name: string, offset: number) => void
+) {
+    const addWords = (text: string, offset: number) => {
+        for (const match of text.matchAll(wordRegEx)) {
+            add(match[0], offset + match.index!);
+        }
+    };
+
+    for (let i = 0; i < tokens.count; i++) {
+        const token = tokens.getItemAt(i);
+
+        switch (token.type) {
+            case TokenType.Identifier:
+                add((token as IdentifierToken).value, token.start);
+                break;
+
+            case TokenType.Keyword:
+                add(fileContents.substring(token.start, token.start + token.length), token.start);
+                break;
+
+            case TokenType.String: {
+                const stringToken = token as StringToken;
+                if (stringToken.escapedValue.length <= maxIndexedStringLength) {
+                    addWords(
+                        stringToken.escapedValue,
+                        stringToken.start + stringToken.prefixLength + stringToken.quoteMarkLength
+                    );
+                }
+                break;
+            }
+        }
+
+        token.comments?.forEach((comment) => {
+            const value = comment.value.trimStart();
+            if (value.startsWith('type:')) {
+                addWords(value, comment.start + comment.value.length - value.length);
+            }
+        });
+    }
+}
+
+export class IdentifierIndex {
+    // Identifiers of each indexed file, keyed by the file's URI key.
+    private readonly _files = new Map<string, IdentifierNames>();
+
+    // Keys of the files that contain each identifier.
+    private readonly _filesByName = new Map<string, Set<string>>();
+
+    get fileCount() {
+        return this._files.size;
+    }
+
+    // Records the identifiers of a file, replacing any previously recorded
+    // for it. This is a no-op if the same identifiers are already recorded.
+    setFile(fileKey: string, names: IdentifierNames) {
+        const existing = this._files.get(fileKey);
+        if (existing === names) {
+            return;
+        }
+
+        if (existing) {
+            this.removeFile(fileKey);
+        }
+
+        this._files.set(fileKey, names);
+        names.forEach((name) => {
+            let fileKeys = this._filesByName.get(name);
+            if (!fileKeys) {
+                fileKeys = new Set<string>();
+                this._filesByName.set(name, fileKeys);
+            }
+
+            fileKeys.add(fileKey);
+        });
+    }
+
+    removeFile(fileKey: string) {
+        const existing = this._files.get(fileKey);
+        if (!existing) {
+            return;
+        }
+
+        this._files.delete(fileKey);
+        existing.forEach((name) => {
+            const fileKeys = this._filesByName.get(name);
+            fileKeys?.delete(fileKey);
+            if (fileKeys?.size === 0) {
+                this._filesByName.delete(name);
+            }
+        });
+    }
+
+    // Returns the identifiers recorded for the file, if any.
+    getFile(fileKey: string): IdentifierNames | undefined {
+        return this._files.get(fileKey);
+    }
+
+    // Returns the keys of the indexed files that contain any of the names.
+    getFilesContaining(names: readonly string[]): Set<string> {
+        const fileKeys = new Set<string>();
+        for (const name of names) {
+            this._filesByName.get(name)?.forEach((fileKey) => fileKeys.add(fileKey));
+        }
+
+        return fileKeys;
+    }
+}
@@ -0,0 +1,335 @@
+/*
+ * importCycleDetector.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Finds the import cycles of a program. The files that import each other
+ * directly or indirectly form strongly connected components of the import
+ * graph, which are found with Tarjan's algorithm in time linear in the size
+ * of the graph. Components are computed on demand and kept up to date as
+ * the imports of files change, so only the parts of the graph affected by a
+ * change are walked again.
+ */
+
+export interface ImportGraph<T> {
+    // Returns the files imported by a file.
+    getImports(node: T): readonly T[];
+
+    // Determines whether a file takes part in cycle detection.
+    isIncluded(node: T): boolean;
+
+    // Returns a key that orders the files of a cycle.
+    getKey(node: T): string;
+}
+
+interface Component<T> {
+    readonly nodes: T[];
+
+    // Cycles that together cover all of the nodes, computed on demand.
+    cycles?: T[][];
+}
+
+export class ImportCycleDetector<T> {
+    // Components of the nodes whose components are known. The set of nodes
+    // with known components is closed under imports, so the components of
+    // other nodes never merge with them unless imports are added.
+    private _components = new Map<T, Component<T>>();
+
+    constructor(private readonly _graph: ImportGraph<T>) {}
+
+    // Forgets all components, for example after changes to the graph that
+    // weren't reported.
+    reset() {
+        this._components = new Map<T, Component<T>>();
+    }
+
+    // Returns the files of the import cycles that the file is part of, or
+    // undefined if it isn't part of any cycle.
+    getComponent(node: T): readonly T[] | undefined {
+        const component = this._getComponent(node);
+        return component && component.nodes.length > 1 ? component.nodes : undefined;
+    }
+
+    // Returns import cycles that cover all of the files of the component
+    // the file is part of. Each cycle starts with its first file in key
+    // order, and the same arrays are returned for all files of a component.
+    getCycles(node: T): readonly (readonly T[])[] {
+        const component = this._getComponent(node);
+        if (!component || component.nodes.length < 2) {
+            return [];
+        }
+
+        if (!component.cycles) {
+            component.cycles = this._findCycles(component);
+        }
+
+        return component.cycles;
+    }
+
+    // Updates the components after the imports of a file changed.
+    updateImports(node: T, oldImports: readonly T[]) {
+        const component = this._components.get(node);
+        if (!component) {
+            return;
+        }
+
+        const newImports = new Set(this._graph.getImports(node));
+        const oldImportSet = new Set(oldImports);
+
+        // Removing an import can split the component of the file.
+        if (oldImports.some((imported) => !newImports.has(imported) && this._components.get(imported) === component)) {
+            this._splitComponent(component.nodes);
+        }
+
+        // Adding an import can merge the components on paths from the
+        // imported file back to the file. The components of all newly
+        // imported files are computed first, so that the nodes reachable
+        // from the file have known components.
+        const addedImports = [...newImports].filter(
+            (imported) => !oldImportSet.has(imported) && this._getComponent(imported) !== undefined
+        );
+        addedImports.forEach((imported) => this._addImport(node, imported));
+    }
+
+    // Updates the components after a file was removed from the graph.
+    removeNode(node: T) {
+        const component = this._components.get(node);
+        if (!component) {
+            return;
+        }
+
+        this._components.delete(node);
+        if (component.nodes.length > 1) {
+            this._splitComponent(component.nodes.filter((n) => n !== node));
+        }
+    }
+
+    private _getComponent(node: T) {
+        if (!this._graph.isIncluded(node)) {
+            return undefined;
+        }
+
+        let component = this._components.get(node);
+        if (!component) {
+            this._computeComponents(node, (n) => !this._components.has(n));
+            component = this._components.get(node)!;
+        }
+
+        return component;
+    }
+
+    private _getIncludedImports(node: T) {
+        return this._graph.getImports(node).filter((imported) => imported !== node && this._graph.isIncluded(imported));
+    }
+
+    // Runs Tarjan's algorithm from the root over the nodes accepted by the
+    // filter and records the components it finds.
+    private _computeComponents(root: T, isAccepted: (node: T) => boolean) {
+        interface Frame {
+            node: T;
+            imports: T[];
+            nextImport: number;
+        }
+
+        const indices = new Map<T, number>();
+        const lowLinks = new Map<T, number>();
+        const stack: T[] = [];
+        const onStack = new Set<T>();
+        const frames: Frame[] = [];
+
+        const visit = (node: T) => {
+            indices.set(node, indices.size);
+            lowLinks.set(node, indices.get(node)!);
+            stack.push(node);
+            onStack.add(node);
+            frames.push({ node, imports: this._getIncludedImports(node).filter(isAccepted), nextImport: 0 });
+        };
+
+        // The walk is iterative, since import chains can be longer than the
+        // call stack allows.
+        visit(root);
+        while (frames.length > 0) {
+            const frame = frames[frames.length - 1];
+
+            if (frame.nextImport < frame.imports.length) {
+                const imported = frame.imports[frame.nextImport++];
+                if (!indices.has(imported)) {
+                    visit(imported);
+                } else if (onStack.has(imported)) {
+                    lowLinks.set(frame.node, Math.min(lowLinks.get(frame.node)!, indices.get(imported)!));
+                }
+                continue;
+            }
+
+            frames.pop();
+            if (frames.length > 0) {
+                const parent = frames[frames.length - 1].node;
+                lowLinks.set(parent, Math.min(lowLinks.get(parent)!, lowLinks.get(frame.node)!));
+            }
+
+            if (lowLinks.get(frame.node) === indices.get(frame.node)) {
+                const nodes: T[] = [];
+                let node: T;
+                do {
+                    node = stack.pop()!;
+                    onStack.delete(node);
+                    nodes.push(node);
+                } while (node !== frame.node);
+
+                const component: Component<T> = { nodes };
+                nodes.forEach((n) => this._components.set(n, component));
+            }
+        }
+    }
+
+    // Computes the components of the nodes of a component again, after
+    // imports between them were removed.
+    private _splitComponent(nodes: readonly T[]) {
+        const nodeSet = new Set(nodes);
+
+        nodes.forEach((node) => this._components.delete(node));
+        nodes.forEach((node) => {
+            if (!this._components.has(node)) {
+                this._computeComponents(node, (n) => nodeSet.has(n) && !this._components.has(n));
+            }
+        });
+    }
+
+    private _addImport(node: T, imported: T) {
+        const importedComponent = this._getComponent(imported);
+        const component = this._components.get(node);
+        if (!importedComponent || !component) {
+            return;
+        }
+
+        // An import within a component doesn't change its files, but it can
+        // make for shorter cycles.
+        if (importedComponent === component) {
+            component.cycles = undefined;
+            return;
+        }
+
+        // Find the nodes reachable from the imported file. All of them have
+        // known components, since that set is closed under imports.
+        const reachable = new Set<T>([imported]);
+        const importedBy = new Map<T, T[]>();
+        const queue: T[] = [imported];
+        while (queue.length > 0) {
+            const current = queue.pop()!;
+            this._getIncludedImports(current).forEach((next) => {
+                let importers = importedBy.get(next);
+                if (!importers) {
+                    importers = [];
+                    importedBy.set(next, importers);
+                }
+                importers.push(current);
+
+                if (!reachable.has(next)) {
+                    reachable.add(next);
+                    queue.push(next);
+                }
+            });
+        }
+
+        if (!reachable.has(node)) {
+            return;
+        }
+
+        // The nodes on paths from the imported file back to the file form
+        // a new component together with the file.
+        const merged = new Set<T>([node]);
+        queue.push(node);
+        while (queue.length > 0) {
+            const current = queue.pop()!;
+            importedBy.get(current)?.forEach((previous) => {
+                if (!merged.has(previous)) {
+                    merged.add(previous);
+                    queue.push(previous);
+                }
+            });
+        }
+
+        const mergedComponent: Component<T> = { nodes: [...merged] };
+        merged.forEach((n) => this._components.set(n, mergedComponent));
+    }
+
+    // Finds cycles that cover the nodes of a component. Starting with the
+    // first node in key order that no cycle covers yet, the shortest cycle
+    // through the node is added, until all nodes are covered.
+    private _findCycles(component: Component<T>): T[][] {
+        const nodes = new Set(component.nodes);
+        const sortedNodes = [...component.nodes].sort((a, b) =>
+            compareKeys(this._graph.getKey(a), this._graph.getKey(b))
+        );
+
+        const covered = new Set<T>();
+        const cycles: T[][] = [];
+        const cycleKeys = new Set<string>();
+
+        for (const start of sortedNodes) {
+            if (covered.has(start)) {
+                continue;
+            }
+
+            const cycle = this._findShortestCycle(start, nodes);
+            if (!cycle) {
+                continue;
+            }
+
+            cycle.forEach((node) => covered.add(node));
+
+            const normalized = this._normalizeCycle(cycle);
+            const key = normalized.map((node) => this._graph.getKey(node)).join('\n');
+            if (!cycleKeys.has(key)) {
+                cycleKeys.add(key);
+                cycles.push(normalized);
+            }
+        }
+
+        return cycles;
+    }
+
+    private _findShortestCycle(start: T, nodes: Set<T>): T[] | undefined {
+        const previous = new Map<T, T>();
+        const queue: T[] = [start];
+
+        for (let i = 0; i < queue.length; i++) {
+            const current = queue[i];
+            for (const next of this._getIncludedImports(current)) {
+                if (!nodes.has(next)) {
+                    continue;
+                }
+
+                if (next === start) {
+                    const cycle: T[] = [];
+                    for (let node: T | undefined = current; node !== undefined; node = previous.get(node)) {
+                        cycle.push(node);
+                    }
+                    return cycle.reverse();
+                }
+
+                if (!previous.has(next)) {
+                    previous.set(next, current);
+                    queue.push(next);
+                }
+            }
+        }
+
+        return undefined;
+    }
+
+    private _normalizeCycle(cycle: T[]) {
+        let firstIndex = 0;
+        cycle.forEach((node, index) => {
+            if (compareKeys(this._graph.getKey(node), this._graph.getKey(cycle[firstIndex])) < 0) {
+                firstIndex = index;
+            }
+        });
+
+        return cycle.slice(firstIndex).concat(cycle.slice(0, firstIndex));
+    }
+}
+
+function compareKeys(a: string, b: string) {
+    return a < b ? -1 : a > b ? 1 : 0;
+}
@@ -27,6 +27,7 @@ import { createImportResolverFileSystem } from './importResolverFileSystem';
 import { getDirectoryLeadingDotsPointsTo } from './importStatementUtils';
 import type { ImportResolverFileSystem, TypeshedInfoProvider } from './importResolverTypes';
 import { ImportPath, ParentDirectoryCache } from './parentDirectoryCache';
+import { PersistentDirectoryCache, PersistentDirectoryCacheStats } from './persistentDirectoryCache';
 import { PyTypedInfo, getPyTypedInfoForPyTypedFile } from './pyTypedUtils';
 import { createDefaultTypeshedInfoProvider } from './typeshedInfoProvider';
 import * as PythonPathUtils from './pythonPathUtils';
@@ -99,6 +100,7 @@ export class ImportResolver {
 
     private readonly _fileSystemCache: ImportResolverFileSystem;
     private readonly _typeshedInfoProvider: TypeshedInfoProvider;
+    private readonly _persistentDirectoryCache: PersistentDirectoryCache | undefined;
 
     protected readonly cachedParentImportResults: ParentDirectoryCache;
 
@@ -108,9 +110,22 @@ export class ImportResolver {
         // These are optionally provided via the ServiceProvider so callers/tests can share
         // caching across ImportResolver/Typeshed operations and avoid re-walking the same
         // filesystem paths when multiple resolvers are created.
-        this._fileSystemCache =
-            serviceProvider.tryGet(ServiceKeys.importResolverFileSystem) ??
-            createImportResolverFileSystem(this.fileSystem);
+        let fileSystemCache = serviceProvider.tryGet(ServiceKeys.importResolverFileSystem);
+        if (!fileSystemCache) {
+            if (_configOptions.importCacheDirectory) {
+                this._persistentDirectoryCache = new PersistentDirectoryCache(
+                    this.fileSystem,
+                    PersistentDirectoryCache.getCacheFileUri(
+                        _configOptions.importCacheDirectory,
+                        _configOptions.projectRoot
+                    )
+                );
+            }
+
+            fileSystemCache = createImportResolverFileSystem(this.fileSystem, this._persistentDirectoryCache);
+        }
+
+        this._fileSystemCache = fileSystemCache;
         this._typeshedInfoProvider =
             serviceProvider.tryGet(ServiceKeys.typeshedInfoProvider) ??
             createDefaultTypeshedInfoProvider(this._fileSystemCache);
@@ -149,6 +164,45 @@ export class ImportResolver {
         this.partialStubs?.clearPartialStubs();
     }
 
+    // Writes the persisted directory listings to disk (if persistence is
+    // enabled) and returns statistics about the file system calls avoided.
+    persistCache(): PersistentDirectoryCacheStats | undefined {
+        if (!this._persistentDirectoryCache) {
+            return undefined;
+        }
+
+        this._persistentDirectoryCache.save();
+        return this._persistentDirectoryCache.getStats();
+    }
+
+    // Reads the import roots of the given execution environments concurrently
+    // so the first import resolutions are served from the directory cache.
+    // The stdlib typeshed directory is read in full because building the
+    // stdlib module cache walks all of it.
+    async prefetchSearchPaths(execEnvs: ExecutionEnvironment[]): Promise<void> {
+        const roots: Uri[] = [];
+        const stdlibRoots: Uri[] = [];
+
+        execEnvs.forEach((execEnv) => {
+            appendArray(roots, this.getImportRoots(execEnv));
+
+            const stdlibRoot = this.getTypeshedStdLibPath(execEnv);
+            if (stdlibRoot) {
+                stdlibRoots.push(stdlibRoot);
+            }
+        });
+
+        await this._fileSystemCache.prefetchDirectories(roots, {
+            getSubdirectoriesToScan: (dirUri, entries) => {
+                if (!stdlibRoots.some((root) => dirUri.equals(root) || dirUri.isChild(root))) {
+                    return [];
+                }
+
+                return entries.filter((entry) => entry.isDirectory()).map((entry) => dirUri.combinePaths(entry.name));
+            },
+        });
+    }
+
     // Resolves the import and returns the path if it exists, otherwise
     // returns undefined.
     resolveImport(
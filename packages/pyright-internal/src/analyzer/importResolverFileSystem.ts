@@ -4,6 +4,7 @@
  * Licensed under the MIT license.
  */
 
+import { DirectoryScanOptions, scanDirectories } from '../common/directoryScanner';
 import type { FileSystem, Stats } from '../common/fileSystem';
 import { stubsSuffix } from '../common/pathConsts';
 import { stripFileExtension } from '../common/pathUtils';
@@ -11,6 +12,11 @@ import { Uri } from '../common/uri/uri';
 import { isDirectory, isFile, tryRealpath, tryStat } from '../common/uri/uriUtils';
 
 import { ImportResolverFileSystem } from './importResolverTypes';
+import {
+    createDirentFromPersistedEntry,
+    getPersistedEntryFlags,
+    PersistentDirectoryCache,
+} from './persistentDirectoryCache';
 
 type Dirent = ReturnType<FileSystem['readdirEntriesSync']>[number];
 
@@ -20,21 +26,40 @@ interface CachedDir {
     resolvableNames: ReadonlySet<string>;
 }
 
-export function createImportResolverFileSystem(fileSystem: FileSystem): ImportResolverFileSystem {
-    return new ImportResolverFileSystemImpl(fileSystem);
+export function createImportResolverFileSystem(
+    fileSystem: FileSystem,
+    persistentCache?: PersistentDirectoryCache
+): ImportResolverFileSystem {
+    return new ImportResolverFileSystemImpl(fileSystem, persistentCache);
 }
 
 class ImportResolverFileSystemImpl implements ImportResolverFileSystem {
     private readonly _cachedDirInfoForPath = new Map<string, CachedDir>();
     private readonly _cachedFilesForPath = new Map<string, Uri[]>();
     private readonly _cachedDirExistenceForRoot = new Map<string, boolean>();
+    private readonly _prefetchedEntries = new Map<string, { entries: Dirent[]; listedAtMs: number }>();
 
-    constructor(private readonly _fileSystem: FileSystem) {}
+    constructor(private readonly _fileSystem: FileSystem, private readonly _persistentCache?: PersistentDirectoryCache) {}
 
     invalidateCache(): void {
         this._cachedDirInfoForPath.clear();
         this._cachedFilesForPath.clear();
         this._cachedDirExistenceForRoot.clear();
+        this._prefetchedEntries.clear();
+    }
+
+    async prefetchDirectories(dirPaths: Uri[], options?: DirectoryScanOptions): Promise<void> {
+        const dirsToRead = dirPaths.filter((dirPath) => !this._cachedDirInfoForPath.has(dirPath.key));
+        const listedAtMs = Date.now();
+        const listings = await scanDirectories(this._fileSystem, dirsToRead, options);
+
+        // The cache may have been populated (or invalidated) while the reads
+        // were outstanding. Listings for directories already cached are dropped.
+        listings.forEach((entries, key) => {
+            if (!this._cachedDirInfoForPath.has(key)) {
+                this._prefetchedEntries.set(key, { entries, listedAtMs });
+            }
+        });
     }
 
     readdirEntriesSync(uri: Uri): Dirent[] {
@@ -162,13 +187,44 @@ class ImportResolverFileSystemImpl implements ImportResolverFileSystem {
         const resolvableNames = new Set<string>();
         let entriesArray: Dirent[] = [];
 
+        const addResolvableName = (entry: Dirent, isFile: boolean, isDirectory: boolean) => {
+            const resolvableName = isFile ? stripFileExtension(entry.name, /* multiDotExtension */ true) : entry.name;
+            resolvableNames.add(resolvableName);
+
+            if (isDirectory && entry.name.endsWith(stubsSuffix)) {
+                resolvableNames.add(resolvableName.substring(0, resolvableName.length - stubsSuffix.length));
+            }
+        };
+
+        const prefetchedEntries = this._prefetchedEntries.get(dirPath.key);
+        this._prefetchedEntries.delete(dirPath.key);
+
         try {
-            const entries = this._fileSystem.readdirEntriesSync(dirPath);
+            // If the listing was persisted by an earlier run and the directory
+            // hasn't been modified since, use it rather than reading the directory.
+            const persistedEntries = this._persistentCache?.getEntries(dirPath);
+
+            let entries: Dirent[];
+            if (persistedEntries) {
+                entries = persistedEntries.map((entry) => createDirentFromPersistedEntry(entry, dirPath));
+            } else {
+                const listedAtMs = prefetchedEntries?.listedAtMs ?? Date.now();
+                entries = prefetchedEntries?.entries ?? this._fileSystem.readdirEntriesSync(dirPath);
+
+                this._persistentCache?.setEntries(
+                    dirPath,
+                    listedAtMs,
+                    entries.map((entry) => ({ name: entry.name, flags: getPersistedEntryFlags(entry) }))
+                );
+            }
+
             entriesArray = entries;
 
             entries.forEach((entry) => {
                 entriesByName.set(entry.name, entry);
 
+                // Symbolic links are resolved even for persisted listings, since
+                // their targets can change without modifying the directory.
                 let isFile = entry.isFile();
                 let isDirectory = entry.isDirectory();
                 if (entry.isSymbolicLink()) {
@@ -177,14 +233,7 @@ class ImportResolverFileSystemImpl implements ImportResolverFileSystem {
                     isDirectory = !!stat?.isDirectory();
                 }
 
-                const resolvableName = isFile
-                    ? stripFileExtension(entry.name, /* multiDotExtension */ true)
-                    : entry.name;
-                resolvableNames.add(resolvableName);
-
-                if (isDirectory && entry.name.endsWith(stubsSuffix)) {
-                    resolvableNames.add(resolvableName.substring(0, resolvableName.length - stubsSuffix.length));
-                }
+                addResolvableName(entry, isFile, isDirectory);
             });
         } catch {
             // Swallow error.
@@ -4,6 +4,7 @@
  * Licensed under the MIT license.
  */
 
+import type { DirectoryScanOptions } from '../common/directoryScanner';
 import type { FileSystem } from '../common/fileSystem';
 import type { PythonVersion } from '../common/pythonVersion';
 import type { Uri } from '../common/uri/uri';
@@ -58,4 +59,8 @@ export interface ImportResolverFileSystem
     getFilesInDirectory(dirPath: Uri): readonly Uri[];
     getResolvableNamesInDirectory(dirPath: Uri): ReadonlySet<string>;
     invalidateCache(): void;
+
+    // Reads the given directories concurrently ahead of the synchronous
+    // lookups that will need them.
+    prefetchDirectories(dirPaths: Uri[], options?: DirectoryScanOptions): Promise<void>;
 }
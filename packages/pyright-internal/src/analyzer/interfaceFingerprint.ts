@@ -0,0 +1,170 @@
+/*
+ * interfaceFingerprint.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Computes a fingerprint of the interface a module presents to the
+ * modules that import it: the names of its symbols, their declared or
+ * inferred types, the members of the classes it declares and the modules
+ * it imports. The locations of declarations are included as well, since
+ * diagnostics in other modules can refer to them. If an edit leaves the
+ * fingerprint unchanged, the results of checking the modules that depend
+ * on it are unchanged as well.
+ *
+ * The return type of a call to a function with unannotated parameters and
+ * no return annotation is inferred from the arguments at each call site, so
+ * it depends on the function's body in ways its printed type doesn't show.
+ * Modules that declare such functions have no fingerprint.
+ */
+
+import { Uri } from '../common/uri/uri';
+import { ImportResult } from './importResult';
+import { Symbol, SymbolTable } from './symbol';
+import { TypeEvaluator } from './typeEvaluatorTypes';
+import {
+    ClassType,
+    FunctionType,
+    isClass,
+    isFunction,
+    isInstantiableClass,
+    isOverloaded,
+    OverloadedType,
+    Type,
+} from './types';
+
+export interface ModuleInterface {
+    readonly fileUri: Uri;
+    readonly symbolTable: SymbolTable;
+    readonly imports: readonly ImportResult[];
+    readonly dunderAllNames: readonly string[] | undefined;
+}
+
+// Returns the fingerprint of the module's interface, or undefined if it
+// can't be captured by one.
+export function getModuleInterfaceFingerprint(
+    evaluator: TypeEvaluator,
+    moduleInterface: ModuleInterface
+): string | undefined {
+    const parts: string[] = [];
+    let hasCallSiteInference = false;
+
+    moduleInterface.imports.forEach((importResult) => {
+        parts.push(`import ${importResult.importName}:${importResult.resolvedUris.map((uri) => uri.key).join(',')}`);
+    });
+
+    if (moduleInterface.dunderAllNames) {
+        parts.push(`__all__ ${moduleInterface.dunderAllNames.join(',')}`);
+    }
+
+    const visitedClasses = new Set<ClassType>();
+    const addSymbols = (symbolTable: SymbolTable, indent: string) => {
+        symbolTable.forEach((symbol, name) => {
+            if (hasCallSiteInference) {
+                return;
+            }
+
+            const type = evaluator.getEffectiveTypeOfSymbol(symbol);
+            if (usesCallSiteInference(type, moduleInterface.fileUri)) {
+                hasCallSiteInference = true;
+                return;
+            }
+
+            parts.push(
+                `${indent}${name}:${getSymbolFlags(symbol)}:${evaluator.printType(type)}` +
+                    `:${getDeprecatedMessages(type)}:${getDeclarationLocations(symbol, moduleInterface.fileUri)}`
+            );
+
+            // Dependents see the members of classes declared in the module, so
+            // they are part of its interface. Classes declared in other modules
+            // are covered by the fingerprints of those modules.
+            const classType = getDeclaredClass(type, moduleInterface.fileUri);
+            if (classType && !visitedClasses.has(classType)) {
+                visitedClasses.add(classType);
+                parts.push(`${indent}  ${getClassHeader(evaluator, classType)}`);
+                addSymbols(ClassType.getSymbolTable(classType), indent + '  ');
+            }
+        });
+    };
+
+    addSymbols(moduleInterface.symbolTable, '');
+
+    return hasCallSiteInference ? undefined : parts.join('\n');
+}
+
+// Returns true if calls to the function, or to any of its overloads, can
+// have their return types inferred from the arguments at each call site.
+// Only functions declared in the module are considered. The fingerprints
+// of other modules cover the functions they declare.
+function usesCallSiteInference(type: Type, fileUri: Uri): boolean {
+    if (isOverloaded(type)) {
+        const implementation = OverloadedType.getImplementation(type);
+        return [...OverloadedType.getOverloads(type), ...(implementation ? [implementation] : [])].some((overload) =>
+            usesCallSiteInference(overload, fileUri)
+        );
+    }
+
+    return (
+        isFunction(type) &&
+        !type.shared.declaredReturnType &&
+        FunctionType.hasUnannotatedParams(type) &&
+        !FunctionType.isStubDefinition(type) &&
+        !!type.shared.declaration?.uri.equals(fileUri)
+    );
+}
+
+function getSymbolFlags(symbol: Symbol) {
+    return [
+        symbol.isExternallyHidden(),
+        symbol.isPrivatePyTypedImport(),
+        symbol.isInDunderAll(),
+        symbol.isClassVar(),
+        symbol.isFinalVarInClassBody(),
+        symbol.isInstanceMember(),
+        symbol.isIgnoredForProtocolMatch(),
+    ]
+        .map((flag) => (flag ? '1' : '0'))
+        .join('');
+}
+
+function getDeclarationLocations(symbol: Symbol, fileUri: Uri) {
+    return symbol
+        .getDeclarations()
+        .filter((decl) => decl.uri.equals(fileUri))
+        .map((decl) => {
+            const { start, end } = decl.range;
+            return `${start.line}.${start.character}-${end.line}.${end.character}`;
+        })
+        .join(',');
+}
+
+function getDeprecatedMessages(type: Type): string {
+    if (isFunction(type) || isClass(type)) {
+        return type.shared.deprecatedMessage ?? '';
+    }
+
+    if (isOverloaded(type)) {
+        const implementation = OverloadedType.getImplementation(type);
+        return [...OverloadedType.getOverloads(type), ...(implementation ? [implementation] : [])]
+            .map((overload) => getDeprecatedMessages(overload))
+            .join(',');
+    }
+
+    return '';
+}
+
+function getDeclaredClass(type: Type, fileUri: Uri) {
+    if (!isInstantiableClass(type) || !type.shared.fileUri.equals(fileUri)) {
+        return undefined;
+    }
+
+    return type;
+}
+
+function getClassHeader(evaluator: TypeEvaluator, classType: ClassType) {
+    const baseClasses = classType.shared.baseClasses.map((baseClass) => evaluator.printType(baseClass)).join(',');
+    const metaclass = classType.shared.effectiveMetaclass
+        ? evaluator.printType(classType.shared.effectiveMetaclass)
+        : '';
+
+    return `class flags=${classType.shared.flags} bases=${baseClasses} metaclass=${metaclass}`;
+}
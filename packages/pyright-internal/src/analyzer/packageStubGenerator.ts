@@ -0,0 +1,223 @@
+/*
+ * packageStubGenerator.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Generates type stubs for every module of a package, one module at a
+ * time, so the modules of one or more packages can be distributed across
+ * processes that each keep their own program, and stubs that are up to
+ * date can be skipped.
+ */
+
+import { CancellationToken } from 'vscode-languageserver';
+
+import { ReadOnlyFileSystem } from '../common/fileSystem';
+import { defaultStubsDirectory } from '../common/pathConsts';
+import { PythonVersion } from '../common/pythonVersion';
+import { Uri } from '../common/uri/uri';
+import { getFileSystemEntries, isDirectory, isFile } from '../common/uri/uriUtils';
+import { createImportedModuleDescriptor } from './importResolver';
+import { ImportResult } from './importResult';
+import { hashContents } from './packageTypeReportCache';
+import { Program } from './program';
+import { getTypeStubUri, TypeStubWriter, TypeStubWriteRequest } from './typeStubWriter';
+
+export interface TypeStubTarget extends TypeStubWriteRequest {
+    importName: string;
+    stubPath: Uri;
+
+    // Source files of all modules of the package.
+    moduleUris: Uri[];
+}
+
+export namespace TypeStubTarget {
+    export function toJsonObj(target: TypeStubTarget): object {
+        return {
+            importName: target.importName,
+            targetImportPath: target.targetImportPath.toJsonObj(),
+            targetIsSingleFile: target.targetIsSingleFile,
+            outputPath: target.outputPath.toJsonObj(),
+            stubPath: target.stubPath.toJsonObj(),
+            moduleUris: target.moduleUris.map((uri) => uri.toJsonObj()),
+        };
+    }
+
+    export function fromJsonObj(targetObj: any): TypeStubTarget {
+        return {
+            importName: targetObj.importName,
+            targetImportPath: Uri.fromJsonObj(targetObj.targetImportPath),
+            targetIsSingleFile: targetObj.targetIsSingleFile,
+            outputPath: Uri.fromJsonObj(targetObj.outputPath),
+            stubPath: Uri.fromJsonObj(targetObj.stubPath),
+            moduleUris: targetObj.moduleUris.map((uriObj: any) => Uri.fromJsonObj(uriObj)),
+        };
+    }
+}
+
+export interface ModuleTypeStub {
+    stubUri: Uri;
+
+    // Files that the stub was generated from, including the module itself.
+    dependencies: Uri[];
+}
+
+export namespace ModuleTypeStub {
+    export function toJsonObj(stub: ModuleTypeStub): object {
+        return {
+            stubUri: stub.stubUri.toJsonObj(),
+            dependencies: stub.dependencies.map((uri) => uri.toJsonObj()),
+        };
+    }
+
+    export function fromJsonObj(stubObj: any): ModuleTypeStub {
+        return {
+            stubUri: Uri.fromJsonObj(stubObj.stubUri),
+            dependencies: stubObj.dependencies.map((uriObj: any) => Uri.fromJsonObj(uriObj)),
+        };
+    }
+}
+
+// Determines the directory that contains the root package of a resolved
+// import, which is where the stubs are generated from, and whether the
+// import is a module in a single file.
+export function getTypeStubTargetRoot(fs: ReadOnlyFileSystem, importResult: ImportResult) {
+    const finalResolvedPath = importResult.resolvedUris[importResult.resolvedUris.length - 1];
+    const isFinalPathFile = isFile(fs, finalResolvedPath);
+    const isFinalPathInitFile = isFinalPathFile && finalResolvedPath.stripAllExtensions().fileName === '__init__';
+
+    let rootPackagePath = finalResolvedPath;
+
+    if (isFinalPathFile) {
+        // If the module is a __init__.pyi? file, use its parent directory instead.
+        rootPackagePath = rootPackagePath.getDirectory();
+    }
+
+    for (let i = importResult.resolvedUris.length - 2; i >= 0; i--) {
+        if (!importResult.resolvedUris[i].isEmpty()) {
+            rootPackagePath = importResult.resolvedUris[i];
+        } else {
+            // If there was no file corresponding to this portion
+            // of the name path, assume that it's contained
+            // within its parent directory.
+            rootPackagePath = rootPackagePath.getDirectory();
+        }
+    }
+
+    let targetImportPath: Uri | undefined;
+    if (isDirectory(fs, rootPackagePath)) {
+        targetImportPath = rootPackagePath;
+    } else if (isFile(fs, rootPackagePath)) {
+        // This can occur if there is a "dir/__init__.py" at the same level as a
+        // module "dir/module.py" that is specifically targeted for stub generation.
+        targetImportPath = rootPackagePath.getDirectory();
+    }
+
+    return {
+        targetImportPath,
+        targetIsSingleFile:
+            !finalResolvedPath.isEmpty() && importResult.resolvedUris.length === 1 && !isFinalPathInitFile,
+    };
+}
+
+export class PackageStubGenerator {
+    // The program's files are kept between modules, so the typeshed stubs
+    // and the modules that many of the package's modules import are parsed
+    // and bound only once.
+    constructor(private readonly _program: Program, importNames: string[]) {
+        this._program.setAllowedThirdPartyImports(importNames);
+    }
+
+    // Resolves a package and lists the source files of all of its modules.
+    getTarget(importName: string): TypeStubTarget {
+        const configOptions = this._program.configOptions;
+        const fs = this._program.fileSystem;
+        const execEnv = configOptions.findExecEnvironment(configOptions.projectRoot);
+
+        let importResult = this._program.importResolver.resolveImport(
+            Uri.empty(),
+            execEnv,
+            createImportedModuleDescriptor(importName)
+        );
+
+        // Generate the stubs from the package's sources rather than from
+        // stubs that were generated earlier.
+        if (importResult.isLocalTypingsFile && importResult.nonStubImportResult?.isImportFound) {
+            importResult = importResult.nonStubImportResult;
+        }
+
+        const importNameParts = importName.split('.');
+        if (!importResult.isImportFound || importNameParts[0].length === 0) {
+            throw new Error(`Import '${importName}' could not be resolved`);
+        }
+
+        const { targetImportPath, targetIsSingleFile } = getTypeStubTargetRoot(fs, importResult);
+        if (!targetImportPath) {
+            throw new Error(`Import '${importName}' could not be resolved`);
+        }
+
+        const stubPath = configOptions.stubPath ?? configOptions.projectRoot.resolvePaths(defaultStubsDirectory);
+        const moduleUris: Uri[] = [];
+
+        if (targetIsSingleFile) {
+            moduleUris.push(importResult.resolvedUris[importResult.resolvedUris.length - 1]);
+        } else {
+            this._addModuleUrisRecursive(targetImportPath, moduleUris);
+        }
+
+        return {
+            importName,
+            targetImportPath,
+            targetIsSingleFile,
+            outputPath: stubPath.resolvePaths(importNameParts[0]),
+            stubPath,
+            moduleUris,
+        };
+    }
+
+    getStubUri(target: TypeStubTarget, moduleUri: Uri) {
+        return getTypeStubUri(target, target.targetImportPath.getRelativePath(moduleUri) ?? moduleUri.fileName);
+    }
+
+    // Returns a key of the settings that affect the contents of the stubs.
+    getSettingsKey() {
+        const configOptions = this._program.configOptions;
+        const defaultPythonVersion = configOptions.defaultPythonVersion;
+        const settings = [
+            defaultPythonVersion ? PythonVersion.toString(defaultPythonVersion) : '',
+            configOptions.defaultPythonPlatform ?? '',
+            configOptions.useLibraryCodeForTypes ? 'useLibraryCodeForTypes' : '',
+        ];
+
+        return hashContents(settings.join('\n'));
+    }
+
+    writeModuleStub(target: TypeStubTarget, moduleUri: Uri, token: CancellationToken): ModuleTypeStub {
+        this._program.addTrackedFile(moduleUri);
+
+        const stubUri = new TypeStubWriter(this._program).writeTypeStubForFile(moduleUri, target, token);
+        return { stubUri, dependencies: this._program.getImportClosure([moduleUri]) };
+    }
+
+    private _addModuleUrisRecursive(directory: Uri, moduleUris: Uri[]) {
+        const { files, directories } = getFileSystemEntries(this._program.fileSystem, directory);
+
+        files
+            .filter((file) => file.lastExtension === '.py' && isModuleName(file.stripExtension().fileName))
+            .sort((a, b) => (a.key < b.key ? -1 : a.key > b.key ? 1 : 0))
+            .forEach((file) => {
+                moduleUris.push(file);
+            });
+
+        directories
+            .filter((subdirectory) => isModuleName(subdirectory.fileName))
+            .sort((a, b) => (a.key < b.key ? -1 : a.key > b.key ? 1 : 0))
+            .forEach((subdirectory) => {
+                this._addModuleUrisRecursive(subdirectory, moduleUris);
+            });
+    }
+}
+
+// Files and directories whose names aren't identifiers can't be imported.
+function isModuleName(name: string) {
+    return /^[A-Za-z_][A-Za-z0-9_]*$/.test(name);
+}
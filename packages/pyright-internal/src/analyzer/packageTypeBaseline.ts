@@ -0,0 +1,131 @@
+/*
+ * packageTypeBaseline.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * A baseline of how completely the types of a package's symbols are
+ * known, as reported by the package type verifier. Later reports are
+ * compared with the baseline so that only the symbols whose types became
+ * less or more complete are reported. The baseline is meant to be
+ * committed with the package, so it stores only symbol names and no paths.
+ */
+
+import { FileSystem } from '../common/fileSystem';
+import { Uri } from '../common/uri/uri';
+import { PackageTypeReport, SymbolCategory, SymbolInfo, TypeKnownStatus } from './packageTypeReport';
+
+// Bump this when the on-disk format changes.
+const baselineFormatVersion = 1;
+
+// The category, whether the symbol is exported and its type known status.
+type BaselineSymbol = [SymbolCategory, boolean, TypeKnownStatus];
+
+interface BaselineFile {
+    version: number;
+    packageName: string;
+    symbols: { [fullName: string]: BaselineSymbol };
+}
+
+export interface FixedTypeCompletenessFinding {
+    fullName: string;
+    category: SymbolCategory;
+    isExported: boolean;
+    baselineStatus: TypeKnownStatus;
+
+    // Undefined if the symbol is no longer part of the package's interface.
+    currentStatus: TypeKnownStatus | undefined;
+}
+
+export interface PackageTypeBaselineDiff {
+    // Symbols whose types are less known than in the baseline, including
+    // symbols that are new since the baseline and whose types aren't known.
+    newFindings: SymbolInfo[];
+
+    // Symbols whose types were not known in the baseline and are now
+    // better known, or which were removed.
+    fixedFindings: FixedTypeCompletenessFinding[];
+}
+
+export class PackageTypeBaseline {
+    private constructor(readonly packageName: string, private readonly _symbols: Map<string, BaselineSymbol>) {}
+
+    // Creates a baseline from a report.
+    static create(report: PackageTypeReport) {
+        const symbols = new Map<string, BaselineSymbol>();
+        report.symbols.forEach((symbolInfo) => {
+            symbols.set(symbolInfo.fullName, [symbolInfo.category, symbolInfo.isExported, symbolInfo.typeKnownStatus]);
+        });
+
+        return new PackageTypeBaseline(report.moduleName, symbols);
+    }
+
+    // Reads a baseline file. Returns undefined if the file doesn't exist,
+    // and throws if it isn't a baseline.
+    static read(fs: FileSystem, baselineUri: Uri): PackageTypeBaseline | undefined {
+        if (!fs.existsSync(baselineUri)) {
+            return undefined;
+        }
+
+        let baselineFile: BaselineFile;
+        try {
+            baselineFile = JSON.parse(fs.readFileSync(baselineUri, 'utf8'));
+        } catch {
+            throw new Error(`Baseline file "${baselineUri.toUserVisibleString()}" could not be read`);
+        }
+
+        if (baselineFile?.version !== baselineFormatVersion || typeof baselineFile.symbols !== 'object') {
+            throw new Error(`Baseline file "${baselineUri.toUserVisibleString()}" has an unsupported format`);
+        }
+
+        return new PackageTypeBaseline(
+            baselineFile.packageName,
+            new Map<string, BaselineSymbol>(Object.entries(baselineFile.symbols))
+        );
+    }
+
+    write(fs: FileSystem, baselineUri: Uri) {
+        const baselineFile: BaselineFile = {
+            version: baselineFormatVersion,
+            packageName: this.packageName,
+            symbols: {},
+        };
+
+        this._symbols.forEach((value, key) => {
+            baselineFile.symbols[key] = value;
+        });
+
+        fs.writeFileSync(baselineUri, JSON.stringify(baselineFile), 'utf8');
+    }
+
+    // Compares the type known status of each symbol in the report with its
+    // status in the baseline. Symbols that are missing from the report or
+    // the baseline are treated as having known types there.
+    diff(report: PackageTypeReport): PackageTypeBaselineDiff {
+        const newFindings: SymbolInfo[] = [];
+        const fixedFindings: FixedTypeCompletenessFinding[] = [];
+
+        report.symbols.forEach((symbolInfo) => {
+            const baselineStatus = this._symbols.get(symbolInfo.fullName)?.[2] ?? TypeKnownStatus.Known;
+
+            if (symbolInfo.typeKnownStatus > baselineStatus) {
+                newFindings.push(symbolInfo);
+            } else if (symbolInfo.typeKnownStatus < baselineStatus) {
+                fixedFindings.push({
+                    fullName: symbolInfo.fullName,
+                    category: symbolInfo.category,
+                    isExported: symbolInfo.isExported,
+                    baselineStatus,
+                    currentStatus: symbolInfo.typeKnownStatus,
+                });
+            }
+        });
+
+        this._symbols.forEach(([category, isExported, baselineStatus], fullName) => {
+            if (baselineStatus !== TypeKnownStatus.Known && !report.symbols.has(fullName)) {
+                fixedFindings.push({ fullName, category, isExported, baselineStatus, currentStatus: undefined });
+            }
+        });
+
+        return { newFindings, fixedFindings };
+    }
+}
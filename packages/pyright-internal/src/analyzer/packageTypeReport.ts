@@ -84,6 +84,64 @@ export interface PackageTypeReport {
     symbols: Map<string, SymbolInfo>;
 }
 
+// The part of a package type report that comes from verifying a single
+// public module. The modules of a package can be verified separately,
+// for example in several processes, and their reports combined.
+export interface ModuleTypeReport {
+    moduleName: string;
+    modules: ModuleInfo[];
+    generalDiagnostics: Diagnostic[];
+    symbols: SymbolInfo[];
+
+    // The full names of the symbols reached while verifying the module, once
+    // per time each was reached, paired with the full name of the symbol
+    // being verified at the time (or an empty string if none was). These
+    // determine the reference counts when module reports are combined.
+    references: [string, string][];
+
+    // Files that the types of the module depend on, which are the
+    // files it imports directly or indirectly.
+    dependencies: Uri[];
+}
+
+export namespace ModuleTypeReport {
+    export function toJsonObj(report: ModuleTypeReport): any {
+        return {
+            moduleName: report.moduleName,
+            modules: report.modules.map((module) => ({ ...module, uri: module.uri.toJsonObj() })),
+            generalDiagnostics: report.generalDiagnostics.map((diag) => diag.toJsonObj()),
+            symbols: report.symbols.map((symbol) => ({
+                ...symbol,
+                fileUri: symbol.fileUri.toJsonObj(),
+                diagnostics: symbol.diagnostics.map((diag) => ({
+                    uri: diag.uri.toJsonObj(),
+                    diagnostic: diag.diagnostic.toJsonObj(),
+                })),
+            })),
+            references: report.references,
+            dependencies: report.dependencies.map((uri) => uri.toJsonObj()),
+        };
+    }
+
+    export function fromJsonObj(obj: any): ModuleTypeReport {
+        return {
+            moduleName: obj.moduleName,
+            modules: obj.modules.map((module: any) => ({ ...module, uri: Uri.fromJsonObj(module.uri) })),
+            generalDiagnostics: obj.generalDiagnostics.map((diag: any) => Diagnostic.fromJsonObj(diag)),
+            symbols: obj.symbols.map((symbol: any) => ({
+                ...symbol,
+                fileUri: Uri.fromJsonObj(symbol.fileUri),
+                diagnostics: symbol.diagnostics.map((diag: any) => ({
+                    uri: Uri.fromJsonObj(diag.uri),
+                    diagnostic: Diagnostic.fromJsonObj(diag.diagnostic),
+                })),
+            })),
+            references: obj.references,
+            dependencies: obj.dependencies.map((uri: any) => Uri.fromJsonObj(uri)),
+        };
+    }
+}
+
 export function getEmptyReport(
     packageName: string,
     packageRootUri: Uri,
@@ -0,0 +1,202 @@
+/*
+ * packageTypeReportCache.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * An on-disk cache of the reports produced by the package type verifier
+ * for each public module of a package. A module's report is reused when
+ * the contents of the module and of every file it depends on are
+ * unchanged, so only modified modules are verified again. The reports
+ * refer to files by their absolute paths, so the cache is specific to the
+ * machine it was written on.
+ */
+
+import { FileSystem } from '../common/fileSystem';
+import { getStringFingerprint, hashString } from '../common/stringUtils';
+import { JsonObjType } from '../common/uri/baseUri';
+import { Uri } from '../common/uri/uri';
+import { ModuleTypeReport } from './packageTypeReport';
+
+// Bump this when the on-disk format changes.
+const cacheFormatVersion = 1;
+
+export interface PackageTypeReportCacheStats {
+    // Module reports served from the cache.
+    hits: number;
+
+    // Module reports that were missing or stale.
+    misses: number;
+}
+
+interface CachedModuleReport {
+    // Key of the settings that the module was verified with.
+    s: string;
+
+    // Files that the module depends on and the hashes of their contents.
+    d: [JsonObjType, string][];
+
+    // The module's report.
+    r: any;
+}
+
+export interface PackageTypeReportCacheJson {
+    version: number;
+    toolVersion: string;
+    modules: { [moduleName: string]: CachedModuleReport };
+}
+
+export class PackageTypeReportCache {
+    private _modules = new Map<string, CachedModuleReport>();
+    private _contentHashes = new Map<string, string | undefined>();
+    private _isDirty = false;
+    private _stats: PackageTypeReportCacheStats = { hits: 0, misses: 0 };
+
+    // If no cache file is given, the cache starts empty and is saved only
+    // as part of another file, through toJsonObj.
+    constructor(
+        private readonly _fs: FileSystem,
+        private readonly _cacheFileUri: Uri | undefined,
+        private readonly _toolVersion: string
+    ) {
+        this._load();
+    }
+
+    static getCacheFileUri(cacheDirectory: Uri, packageName: string) {
+        const packageHash = (hashString(packageName) >>> 0).toString(16);
+        return cacheDirectory.combinePaths(`verifyTypesCache-${packageHash}.json`);
+    }
+
+    // Returns the cached report of a module if it was produced with the same
+    // settings and none of the files it depends on have changed since.
+    getModuleReport(moduleName: string, settingsKey: string): ModuleTypeReport | undefined {
+        const cached = this._modules.get(moduleName);
+        if (
+            !cached ||
+            cached.s !== settingsKey ||
+            !cached.d.every(([uri, hash]) => this._getContentHash(Uri.fromJsonObj(uri)) === hash)
+        ) {
+            this._stats.misses++;
+            return undefined;
+        }
+
+        this._stats.hits++;
+        return ModuleTypeReport.fromJsonObj(cached.r);
+    }
+
+    setModuleReport(report: ModuleTypeReport, settingsKey: string) {
+        const dependencies: [JsonObjType, string][] = [];
+        for (const uri of report.dependencies) {
+            // A report whose dependencies can't be read can't be validated later.
+            const hash = this._getContentHash(uri);
+            if (hash === undefined) {
+                return;
+            }
+
+            dependencies.push([uri.toJsonObj(), hash]);
+        }
+
+        this._modules.set(report.moduleName, {
+            s: settingsKey,
+            d: dependencies,
+            r: ModuleTypeReport.toJsonObj(report),
+        });
+        this._isDirty = true;
+    }
+
+    getStats(): PackageTypeReportCacheStats {
+        return { ...this._stats };
+    }
+
+    toJsonObj(): PackageTypeReportCacheJson {
+        const cacheJson: PackageTypeReportCacheJson = {
+            version: cacheFormatVersion,
+            toolVersion: this._toolVersion,
+            modules: {},
+        };
+
+        this._modules.forEach((value, key) => {
+            cacheJson.modules[key] = value;
+        });
+
+        return cacheJson;
+    }
+
+    // Replaces the cached reports with ones saved by toJsonObj. Reports
+    // saved in another format or by another version are ignored.
+    loadJsonObj(cacheJson: PackageTypeReportCacheJson | undefined) {
+        this._modules.clear();
+
+        if (
+            cacheJson?.version !== cacheFormatVersion ||
+            cacheJson.toolVersion !== this._toolVersion ||
+            typeof cacheJson.modules !== 'object'
+        ) {
+            return;
+        }
+
+        Object.keys(cacheJson.modules).forEach((key) => {
+            const value = cacheJson.modules[key];
+            if (typeof value?.s === 'string' && Array.isArray(value.d) && value.r) {
+                this._modules.set(key, value);
+            }
+        });
+    }
+
+    // Writes the cache to disk if it changed. Returns true if it was written.
+    save(): boolean {
+        if (!this._isDirty || !this._cacheFileUri) {
+            return false;
+        }
+
+        try {
+            const cacheDirectory = this._cacheFileUri.getDirectory();
+            if (!this._fs.existsSync(cacheDirectory)) {
+                this._fs.mkdirSync(cacheDirectory, { recursive: true });
+            }
+
+            this._fs.writeFileSync(this._cacheFileUri, JSON.stringify(this.toJsonObj()), 'utf8');
+            this._isDirty = false;
+            return true;
+        } catch {
+            // The cache is an optimization only, so ignore write failures.
+            return false;
+        }
+    }
+
+    // Hashes the contents of a file once per run, since most modules of
+    // a package share many of their dependencies.
+    private _getContentHash(uri: Uri): string | undefined {
+        if (this._contentHashes.has(uri.key)) {
+            return this._contentHashes.get(uri.key);
+        }
+
+        let hash: string | undefined;
+        try {
+            hash = hashContents(this._fs.readFileSync(uri, 'utf8'));
+        } catch {
+            hash = undefined;
+        }
+
+        this._contentHashes.set(uri.key, hash);
+        return hash;
+    }
+
+    private _load() {
+        try {
+            if (!this._cacheFileUri || !this._fs.existsSync(this._cacheFileUri)) {
+                return;
+            }
+
+            this.loadJsonObj(JSON.parse(this._fs.readFileSync(this._cacheFileUri, 'utf8')));
+        } catch {
+            // A corrupt or unreadable cache file is treated as empty.
+            this._modules.clear();
+        }
+    }
+}
+
+// Returns a 64-bit, non-cryptographic hash of text as a hex string.
+export function hashContents(contents: string) {
+    const fingerprint = getStringFingerprint(contents);
+    return `${(fingerprint.primary >>> 0).toString(16)}${(fingerprint.secondary >>> 0).toString(16).padStart(8, '0')}`;
+}
@@ -16,6 +16,7 @@ import { Diagnostic, DiagnosticAddendum, DiagnosticCategory } from '../common/di
 import { FullAccessHost } from '../common/fullAccessHost';
 import { Host } from '../common/host';
 import { getFileExtension, stripFileExtension } from '../common/pathUtils';
+import { PythonVersion } from '../common/pythonVersion';
 import { ServiceProvider } from '../common/serviceProvider';
 import { getEmptyRange, Range } from '../common/textRange';
 import { Uri } from '../common/uri/uri';
@@ -26,13 +27,15 @@ import {
     AlternateSymbolNameMap,
     getEmptyReport,
     ModuleInfo,
+    ModuleTypeReport,
     PackageTypeReport,
     SymbolCategory,
     SymbolInfo,
     TypeKnownStatus,
 } from './packageTypeReport';
+import { hashContents, PackageTypeReportCache } from './packageTypeReportCache';
 import { Program } from './program';
-import { getPyTypedInfo, PyTypedInfo } from './pyTypedUtils';
+import { getPyTypedInfo } from './pyTypedUtils';
 import { ScopeType } from './scope';
 import { getScopeForNode } from './scopeUtils';
 import { Symbol, SymbolTable } from './symbol';
@@ -72,12 +75,93 @@ interface ModuleDirectoryInfo {
     isModuleSingleFile: boolean;
 }
 
+// Adds the report of a module to the report of its package, producing the
+// same result as verifying the module after the earlier modules with a
+// single report. Symbols that are already in the package report because
+// an earlier module reached them are kept, and a reference is counted only
+// if verifying the module with a single report would also have made it,
+// which is when it comes from the module itself or from a symbol that is
+// new to the package report.
+//
+// Returns false if the result may differ from verifying the module with a
+// single report. That's the case when the module report gives a symbol that
+// is already in the package report a different known status, which can
+// happen when symbols reference each other: a symbol that is still being
+// verified contributes only the status it has so far to the symbols it
+// reaches, so their status depends on where verification entered the cycle.
+export function addModuleTypeReport(report: PackageTypeReport, moduleReport: ModuleTypeReport): boolean {
+    moduleReport.modules.forEach((module) => {
+        report.modules.set(module.uri.key, module);
+    });
+
+    report.generalDiagnostics.push(...moduleReport.generalDiagnostics);
+
+    const newSymbolNames = new Set<string>();
+    let isCombinedExactly = true;
+
+    moduleReport.symbols.forEach((symbolInfo) => {
+        const existingSymbolInfo = report.symbols.get(symbolInfo.fullName);
+        if (existingSymbolInfo) {
+            if (existingSymbolInfo.typeKnownStatus !== symbolInfo.typeKnownStatus) {
+                isCombinedExactly = false;
+            }
+            return;
+        }
+
+        report.symbols.set(symbolInfo.fullName, { ...symbolInfo, referenceCount: 0 });
+        newSymbolNames.add(symbolInfo.fullName);
+
+        // The missing docstring and default value counts are derived from the
+        // symbols so that symbols shared by several modules are counted once.
+        symbolInfo.diagnostics.forEach((diag) => {
+            switch (diag.diagnostic.message) {
+                case getMissingClassDocStringMessage(symbolInfo.fullName):
+                    report.missingClassDocStringCount++;
+                    break;
+
+                case getMissingFunctionDocStringMessage(symbolInfo.fullName):
+                    report.missingFunctionDocStringCount++;
+                    break;
+
+                case getMissingDefaultParamMessage(symbolInfo.fullName):
+                    report.missingDefaultParamCount++;
+                    break;
+            }
+        });
+    });
+
+    moduleReport.references.forEach(([fullName, referencingName]) => {
+        if (!referencingName || newSymbolNames.has(referencingName)) {
+            report.symbols.get(fullName)!.referenceCount++;
+        }
+    });
+
+    return isCombinedExactly;
+}
+
+function getMissingClassDocStringMessage(fullName: string) {
+    return `No docstring found for class "${fullName}"`;
+}
+
+function getMissingFunctionDocStringMessage(fullName: string) {
+    return `No docstring found for function "${fullName}"`;
+}
+
+function getMissingDefaultParamMessage(fullName: string) {
+    return `One or more default values in function "${fullName}" is specified as "..."`;
+}
+
 export class PackageTypeVerifier {
     private _configOptions: ConfigOptions;
     private _execEnv: ExecutionEnvironment;
     private _importResolver: ImportResolver;
     private _program: Program;
 
+    // Full names of the symbols whose verification is in progress, innermost
+    // last, and the references recorded while verifying a single module.
+    private _symbolsBeingVerified: string[] = [];
+    private _references: [string, string][] | undefined;
+
     constructor(
         private _serviceProvider: ServiceProvider,
         private _host: Host,
@@ -113,105 +197,125 @@ export class PackageTypeVerifier {
     }
 
     verify(): PackageTypeReport {
-        const trimmedModuleName = this._packageName.trim();
-        const moduleNameParts = trimmedModuleName.split('.');
+        const report = this._createReport();
 
-        const packageDirectoryInfo = this._getDirectoryInfoForModule(moduleNameParts[0]);
-        const moduleDirectoryInfo = this._getDirectoryInfoForModule(trimmedModuleName);
+        try {
+            const publicModules = this._getPublicModules(report);
+            const publicSymbols = this._getPublicSymbols(publicModules, report);
 
-        const report = getEmptyReport(
-            moduleNameParts[0],
-            packageDirectoryInfo?.moduleDirectory ?? Uri.empty(),
-            trimmedModuleName,
-            moduleDirectoryInfo?.moduleDirectory ?? Uri.empty(),
-            moduleDirectoryInfo?.isModuleSingleFile ?? false,
-            this._ignoreExternal
-        );
-        const commonDiagnostics = report.generalDiagnostics;
+            publicModules.forEach((moduleName) => {
+                this._verifyTypesOfModule(moduleName, publicSymbols, report);
+            });
+        } catch (e: any) {
+            this._addInternalError(report, e);
+        }
+
+        return report;
+    }
+
+    // Verifies the package like verify, but verifies each public module into
+    // a report of its own and then combines the reports in module order.
+    // Reports of unchanged modules are read from the cache. The others are
+    // produced by verifyModules if it's provided (for example, to verify
+    // them in several processes) and by verifyModule otherwise.
+    async verifyByModule(
+        cache?: PackageTypeReportCache,
+        verifyModules?: (moduleNames: string[], publicSymbols: string[]) => Promise<ModuleTypeReport[]>
+    ): Promise<PackageTypeReport> {
+        const report = this._createReport();
 
         try {
-            if (!trimmedModuleName) {
-                commonDiagnostics.push(
-                    new Diagnostic(
-                        DiagnosticCategory.Error,
-                        `Module name "${trimmedModuleName}" is invalid`,
-                        getEmptyRange()
-                    )
-                );
-            } else if (!report.moduleRootDirectoryUri) {
-                commonDiagnostics.push(
-                    new Diagnostic(
-                        DiagnosticCategory.Error,
-                        `Module "${trimmedModuleName}" cannot be resolved`,
-                        getEmptyRange()
-                    )
-                );
-            } else {
-                let pyTypedInfo: PyTypedInfo | undefined;
-                if (report.moduleRootDirectoryUri) {
-                    pyTypedInfo = this._getDeepestPyTypedInfo(report.moduleRootDirectoryUri, moduleNameParts);
-                }
+            const publicModules = this._getPublicModules(report);
+            const publicSymbols = this._getPublicSymbols(publicModules, report);
+            const settingsKey = this._getSettingsKey();
+
+            const moduleReports = new Map<string, ModuleTypeReport>();
+            publicModules.forEach((moduleName) => {
+                const cachedReport = cache?.getModuleReport(moduleName, settingsKey);
+                if (cachedReport) {
+                    // The public symbols of the package only determine which symbols
+                    // are exported, so the report stays valid when they change.
+                    cachedReport.symbols.forEach((symbolInfo) => {
+                        symbolInfo.isExported = publicSymbols.has(symbolInfo.fullName);
+                    });
 
-                // If we couldn't find any "py.typed" info in the module path, search again
-                // starting at the package root.
-                if (!pyTypedInfo && report.packageRootDirectoryUri) {
-                    pyTypedInfo = this._getDeepestPyTypedInfo(report.packageRootDirectoryUri, moduleNameParts);
+                    moduleReports.set(moduleName, cachedReport);
                 }
+            });
 
-                if (!pyTypedInfo) {
-                    commonDiagnostics.push(
-                        new Diagnostic(DiagnosticCategory.Error, 'No py.typed file found', getEmptyRange())
-                    );
-                } else {
-                    report.pyTypedPathUri = pyTypedInfo.pyTypedPath;
+            const modulesToVerify = publicModules.filter((moduleName) => !moduleReports.has(moduleName));
+            if (modulesToVerify.length > 0) {
+                const newReports = verifyModules
+                    ? await verifyModules(modulesToVerify, Array.from(publicSymbols))
+                    : modulesToVerify.map((moduleName) => this.verifyModule(moduleName, publicSymbols));
 
-                    const publicModules = this._getListOfPublicModules(
-                        report.moduleRootDirectoryUri,
-                        report.isModuleSingleFile,
-                        trimmedModuleName
-                    );
+                newReports.forEach((moduleReport) => {
+                    moduleReports.set(moduleReport.moduleName, moduleReport);
+                    cache?.setModuleReport(moduleReport, settingsKey);
+                });
+            }
 
-                    // If the filter eliminated all modules, report an error.
-                    if (publicModules.length === 0) {
-                        commonDiagnostics.push(
-                            new Diagnostic(
-                                DiagnosticCategory.Error,
-                                `Module "${trimmedModuleName}" cannot be resolved`,
-                                getEmptyRange()
-                            )
-                        );
-                    }
+            let isCombinedExactly = true;
+            publicModules.forEach((moduleName) => {
+                const moduleReport = moduleReports.get(moduleName);
+                if (moduleReport && !addModuleTypeReport(report, moduleReport)) {
+                    isCombinedExactly = false;
+                }
+            });
 
-                    // Build a set of all public symbols exported by this package. We'll
-                    // use this map to determine which diagnostics to report. We don't want
-                    // to report diagnostics many times for types that include public types.
-                    const publicSymbols = new Set<string>();
-                    publicModules.forEach((moduleName) => {
-                        this._getPublicSymbolsForModule(moduleName, publicSymbols, report.alternateSymbolNames);
-                    });
+            cache?.save();
 
-                    publicModules.forEach((moduleName) => {
-                        this._verifyTypesOfModule(moduleName, publicSymbols, report);
-                    });
-                }
+            // The module reports are still valid for the modules by themselves,
+            // but combining them would produce a different report than verifying
+            // the package as a whole, so do that instead.
+            if (!isCombinedExactly) {
+                return this.verify();
             }
         } catch (e: any) {
-            const message: string =
-                (e.stack ? e.stack.toString() : undefined) ||
-                (typeof e.message === 'string' ? e.message : undefined) ||
-                JSON.stringify(e);
-            commonDiagnostics.push(
-                new Diagnostic(
-                    DiagnosticCategory.Error,
-                    `An internal error occurred while verifying types: "${message}"`,
-                    getEmptyRange()
-                )
-            );
+            this._addInternalError(report, e);
         }
 
         return report;
     }
 
+    // Verifies a single public module of the package. The public symbols
+    // are those of the whole package, as collected by verifyByModule.
+    verifyModule(moduleName: string, publicSymbols: Iterable<string>): ModuleTypeReport {
+        const trimmedModuleName = this._packageName.trim();
+        const report = getEmptyReport(
+            trimmedModuleName.split('.')[0],
+            Uri.empty(),
+            trimmedModuleName,
+            Uri.empty(),
+            /* isModuleSingleFile */ false,
+            this._ignoreExternal
+        );
+
+        const references: [string, string][] = [];
+        this._symbolsBeingVerified = [];
+        this._references = references;
+
+        try {
+            this._verifyTypesOfModule(
+                moduleName,
+                publicSymbols instanceof Set ? publicSymbols : new Set(publicSymbols),
+                report
+            );
+        } finally {
+            this._references = undefined;
+        }
+
+        const modules = Array.from(report.modules.values());
+        return {
+            moduleName,
+            modules,
+            generalDiagnostics: report.generalDiagnostics,
+            symbols: Array.from(report.symbols.values()),
+            references,
+            dependencies: this._program.getImportClosure(modules.map((module) => module.uri)),
+        };
+    }
+
     static getSymbolCategoryString(symbolType: SymbolCategory): string {
         switch (symbolType) {
             case SymbolCategory.Class:
@@ -243,6 +347,125 @@ export class PackageTypeVerifier {
         }
     }
 
+    private _createReport() {
+        const trimmedModuleName = this._packageName.trim();
+        const moduleNameParts = trimmedModuleName.split('.');
+
+        const packageDirectoryInfo = this._getDirectoryInfoForModule(moduleNameParts[0]);
+        const moduleDirectoryInfo = this._getDirectoryInfoForModule(trimmedModuleName);
+
+        return getEmptyReport(
+            moduleNameParts[0],
+            packageDirectoryInfo?.moduleDirectory ?? Uri.empty(),
+            trimmedModuleName,
+            moduleDirectoryInfo?.moduleDirectory ?? Uri.empty(),
+            moduleDirectoryInfo?.isModuleSingleFile ?? false,
+            this._ignoreExternal
+        );
+    }
+
+    // Returns the public modules of the package, or reports why there are none.
+    private _getPublicModules(report: PackageTypeReport): string[] {
+        const trimmedModuleName = report.moduleName;
+        const moduleNameParts = trimmedModuleName.split('.');
+        const commonDiagnostics = report.generalDiagnostics;
+
+        if (!trimmedModuleName) {
+            commonDiagnostics.push(
+                new Diagnostic(
+                    DiagnosticCategory.Error,
+                    `Module name "${trimmedModuleName}" is invalid`,
+                    getEmptyRange()
+                )
+            );
+            return [];
+        }
+
+        if (!report.moduleRootDirectoryUri) {
+            commonDiagnostics.push(
+                new Diagnostic(
+                    DiagnosticCategory.Error,
+                    `Module "${trimmedModuleName}" cannot be resolved`,
+                    getEmptyRange()
+                )
+            );
+            return [];
+        }
+
+        let pyTypedInfo = this._getDeepestPyTypedInfo(report.moduleRootDirectoryUri, moduleNameParts);
+
+        // If we couldn't find any "py.typed" info in the module path, search again
+        // starting at the package root.
+        if (!pyTypedInfo && report.packageRootDirectoryUri) {
+            pyTypedInfo = this._getDeepestPyTypedInfo(report.packageRootDirectoryUri, moduleNameParts);
+        }
+
+        if (!pyTypedInfo) {
+            commonDiagnostics.push(new Diagnostic(DiagnosticCategory.Error, 'No py.typed file found', getEmptyRange()));
+            return [];
+        }
+
+        report.pyTypedPathUri = pyTypedInfo.pyTypedPath;
+
+        const publicModules = this._getListOfPublicModules(
+            report.moduleRootDirectoryUri,
+            report.isModuleSingleFile,
+            trimmedModuleName
+        );
+
+        // If the filter eliminated all modules, report an error.
+        if (publicModules.length === 0) {
+            commonDiagnostics.push(
+                new Diagnostic(
+                    DiagnosticCategory.Error,
+                    `Module "${trimmedModuleName}" cannot be resolved`,
+                    getEmptyRange()
+                )
+            );
+        }
+
+        return publicModules;
+    }
+
+    // Builds a set of all public symbols exported by this package. We'll
+    // use this map to determine which diagnostics to report. We don't want
+    // to report diagnostics many times for types that include public types.
+    private _getPublicSymbols(publicModules: string[], report: PackageTypeReport): PublicSymbolSet {
+        const publicSymbols = new Set<string>();
+        publicModules.forEach((moduleName) => {
+            this._getPublicSymbolsForModule(moduleName, publicSymbols, report.alternateSymbolNames);
+        });
+
+        return publicSymbols;
+    }
+
+    private _addInternalError(report: PackageTypeReport, e: any) {
+        const message: string =
+            (e.stack ? e.stack.toString() : undefined) ||
+            (typeof e.message === 'string' ? e.message : undefined) ||
+            JSON.stringify(e);
+        report.generalDiagnostics.push(
+            new Diagnostic(
+                DiagnosticCategory.Error,
+                `An internal error occurred while verifying types: "${message}"`,
+                getEmptyRange()
+            )
+        );
+    }
+
+    // Returns a key for the settings that affect the reports of modules.
+    private _getSettingsKey() {
+        const defaultPythonVersion = this._configOptions.defaultPythonVersion;
+        const settings = [
+            this._packageName.trim(),
+            this._ignoreExternal ? 'ignoreExternal' : '',
+            defaultPythonVersion ? PythonVersion.toString(defaultPythonVersion) : '',
+            this._configOptions.defaultPythonPlatform ?? '',
+        ];
+
+        return hashContents(settings.join('\n'));
+    }
+
     private _getDeepestPyTypedInfo(rootDirectory: Uri, packageNameParts: string[]) {
         let subNameParts = Array.from(packageNameParts);
 
@@ -535,10 +758,15 @@ export class PackageTypeVerifier {
                 const fullName = `${scopeName}.${name}`;
 
                 // If the symbol was already cached, update its reference count
-                // and skip the rest.
+                // and known status and skip the rest. Its status must count even
+                // though it was cached so that the status of the scope doesn't
+                // depend on whether its symbols were reached first another way
+                // (for example, a module reached through an alias after the
+                // module itself was verified).
                 const cachedSymbolInfo = report.symbols.get(fullName);
                 if (cachedSymbolInfo) {
-                    cachedSymbolInfo.referenceCount++;
+                    this._addReference(cachedSymbolInfo);
+                    knownStatus = this._updateKnownStatusIfWorse(knownStatus, cachedSymbolInfo.typeKnownStatus);
                     return;
                 }
 
@@ -608,6 +836,7 @@ export class PackageTypeVerifier {
                     };
 
                     this._addSymbol(report, symbolInfo);
+                    this._symbolsBeingVerified.push(fullName);
 
                     if (primaryDecl) {
                         let resolvedDecl = primaryDecl;
@@ -638,6 +867,8 @@ export class PackageTypeVerifier {
                             publicSymbols
                         );
                     }
+
+                    this._symbolsBeingVerified.pop();
                 }
 
                 if (usesAmbiguousOverride) {
@@ -691,7 +922,7 @@ export class PackageTypeVerifier {
 
         this._addSymbolWarning(
             symbolInfo,
-            `No docstring found for class "${symbolInfo.fullName}"`,
+            getMissingClassDocStringMessage(symbolInfo.fullName),
             getEmptyRange(),
             Uri.empty()
         );
@@ -715,7 +946,7 @@ export class PackageTypeVerifier {
             if (symbolInfo) {
                 this._addSymbolWarning(
                     symbolInfo,
-                    `One or more default values in function "${symbolInfo.fullName}" is specified as "..."`,
+                    getMissingDefaultParamMessage(symbolInfo.fullName),
                     declRange ?? getEmptyRange(),
                     declFileUri ?? Uri.empty()
                 );
@@ -741,7 +972,7 @@ export class PackageTypeVerifier {
         if (symbolInfo) {
             this._addSymbolWarning(
                 symbolInfo,
-                `No docstring found for function "${symbolInfo.fullName}"`,
+                getMissingFunctionDocStringMessage(symbolInfo.fullName),
                 declRange ?? getEmptyRange(),
                 declFileUri ?? Uri.empty()
             );
@@ -1154,7 +1385,7 @@ export class PackageTypeVerifier {
         // See if this type is already analyzed.
         const cachedType = report.symbols.get(type.shared.fullName);
         if (cachedType) {
-            cachedType.referenceCount++;
+            this._addReference(cachedType);
             return cachedType;
         }
 
@@ -1171,6 +1402,7 @@ export class PackageTypeVerifier {
         };
 
         this._addSymbol(report, symbolInfo);
+        this._symbolsBeingVerified.push(symbolInfo.fullName);
 
         // Determine whether the class has a proper doc string.
         this._reportMissingClassDocstring(symbolInfo, type, report);
@@ -1277,6 +1509,7 @@ export class PackageTypeVerifier {
             }
         });
 
+        this._symbolsBeingVerified.pop();
         return symbolInfo;
     }
 
@@ -1288,7 +1521,7 @@ export class PackageTypeVerifier {
         // See if this type is already analyzed.
         const cachedType = report.symbols.get(type.priv.moduleName);
         if (cachedType) {
-            cachedType.referenceCount++;
+            this._addReference(cachedType);
             return cachedType;
         }
 
@@ -1305,8 +1538,10 @@ export class PackageTypeVerifier {
         };
 
         // Add the symbol for the module if the name isn't relative.
-        if (!type.priv.moduleName.startsWith('.')) {
+        const isAdded = !type.priv.moduleName.startsWith('.');
+        if (isAdded) {
             this._addSymbol(report, symbolInfo);
+            this._symbolsBeingVerified.push(symbolInfo.fullName);
         }
 
         const symbolTableTypeKnownStatus = this._getTypeKnownStatusForSymbolTable(
@@ -1322,6 +1557,10 @@ export class PackageTypeVerifier {
             symbolTableTypeKnownStatus
         );
 
+        if (isAdded) {
+            this._symbolsBeingVerified.pop();
+        }
+
         return symbolInfo;
     }
 
@@ -1570,6 +1809,22 @@ export class PackageTypeVerifier {
     private _addSymbol(report: PackageTypeReport, symbolInfo: SymbolInfo) {
         assert(!report.symbols.has(symbolInfo.fullName));
         report.symbols.set(symbolInfo.fullName, symbolInfo);
+        this._recordReference(symbolInfo);
+    }
+
+    private _addReference(symbolInfo: SymbolInfo) {
+        symbolInfo.referenceCount++;
+        this._recordReference(symbolInfo);
+    }
+
+    // Records which symbol's verification reached a symbol when verifying a
+    // module by itself, so reference counts can be combined across modules.
+    private _recordReference(symbolInfo: SymbolInfo) {
+        const referencingName =
+            this._symbolsBeingVerified.length > 0
+                ? this._symbolsBeingVerified[this._symbolsBeingVerified.length - 1]
+                : '';
+        this._references?.push([symbolInfo.fullName, referencingName]);
     }
 
     private _addSymbolError(symbolInfo: SymbolInfo, message: string, declRange: Range, declUri: Uri) {
@@ -0,0 +1,251 @@
+/*
+ * persistentDirectoryCache.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * An on-disk cache of the directory listings consulted during import
+ * resolution. Each listing is validated against the modification time
+ * and inode of its directory, so a warm run replaces a readdir with a
+ * single stat call. Symbolic links in a listing are still resolved on
+ * every run, since their targets can change without modifying the
+ * directory.
+ */
+
+import { FileSystem } from '../common/fileSystem';
+import { hashString } from '../common/stringUtils';
+import { Uri } from '../common/uri/uri';
+import { tryStat } from '../common/uri/uriUtils';
+
+type Dirent = ReturnType<FileSystem['readdirEntriesSync']>[number];
+
+// Bump this when the on-disk format changes.
+const cacheFormatVersion = 2;
+
+// Listings of directories that were modified very recently are not persisted
+// because a subsequent change within the file system's timestamp granularity
+// would go unnoticed.
+const racyIntervalMs = 2000;
+
+// Upper bound on the number of directories written to disk.
+const maxPersistedDirectories = 100000;
+
+export const enum PersistedEntryFlags {
+    None = 0,
+    File = 1 << 0,
+    Directory = 1 << 1,
+    SymbolicLink = 1 << 2,
+}
+
+export interface PersistedDirectoryEntry {
+    name: string;
+
+    // Describes the entry itself. The targets of symbolic links are not recorded.
+    flags: PersistedEntryFlags;
+}
+
+export interface PersistentDirectoryCacheStats {
+    // Directory listings served from the cache. Each one avoids a readdir.
+    hits: number;
+
+    // Directory listings that were missing or stale.
+    misses: number;
+
+    // Stat calls made by the cache, to validate cached listings and to
+    // record the modification times of new ones.
+    statCalls: number;
+
+    // File system calls saved overall: the readdir calls that were avoided
+    // less the stat calls made by the cache. This is negative for a cold run.
+    netCallsSaved: number;
+}
+
+interface PersistedDirectory {
+    // Modification time and inode of the directory when it was listed.
+    m: number;
+    i: number;
+
+    // Entry names and flags.
+    e: [string, PersistedEntryFlags][];
+}
+
+interface ListedDirectory {
+    uri: Uri;
+
+    // When the listing was read, to detect changes made while it was read.
+    listedAtMs: number;
+    entries: PersistedDirectoryEntry[];
+}
+
+interface PersistedCacheFile {
+    version: number;
+    directories: { [key: string]: PersistedDirectory };
+}
+
+export class PersistentDirectoryCache {
+    private _directories = new Map<string, PersistedDirectory>();
+
+    // Listings read in this run. Their modification times are recorded when
+    // the cache is saved, so directories that are never persisted don't pay
+    // for an extra stat during import resolution.
+    private _listedDirectories = new Map<string, ListedDirectory>();
+    private _isDirty = false;
+    private _hits = 0;
+    private _misses = 0;
+    private _statCalls = 0;
+
+    constructor(private readonly _fs: FileSystem, private readonly _cacheFileUri: Uri) {
+        this._load();
+    }
+
+    static getCacheFileUri(cacheDirectory: Uri, projectRoot: Uri) {
+        const projectHash = (hashString(projectRoot.key) >>> 0).toString(16);
+        return cacheDirectory.combinePaths(`importCache-${projectHash}.json`);
+    }
+
+    get cacheFileUri() {
+        return this._cacheFileUri;
+    }
+
+    // Returns the cached entries for the directory if the directory hasn't
+    // changed since they were recorded. Directories that aren't in the cache
+    // are not stat'ed.
+    getEntries(dirUri: Uri): PersistedDirectoryEntry[] | undefined {
+        const cached = this._directories.get(dirUri.key);
+        if (!cached) {
+            this._misses++;
+            return undefined;
+        }
+
+        const stat = this._stat(dirUri);
+        if (!stat?.isDirectory() || stat.mtimeMs !== cached.m || stat.ino !== cached.i) {
+            this._misses++;
+            return undefined;
+        }
+
+        this._hits++;
+        return cached.e.map(([name, flags]) => ({ name, flags }));
+    }
+
+    // Records a listing that was just read. It is persisted when the cache is saved.
+    setEntries(dirUri: Uri, listedAtMs: number, entries: PersistedDirectoryEntry[]) {
+        if (
+            !this._directories.has(dirUri.key) &&
+            this._directories.size + this._listedDirectories.size >= maxPersistedDirectories
+        ) {
+            return;
+        }
+
+        this._listedDirectories.set(dirUri.key, { uri: dirUri, listedAtMs, entries });
+    }
+
+    getStats(): PersistentDirectoryCacheStats {
+        return {
+            hits: this._hits,
+            misses: this._misses,
+            statCalls: this._statCalls,
+            netCallsSaved: this._hits - this._statCalls,
+        };
+    }
+
+    // Writes the cache to disk if it changed. Returns true if it was written.
+    save(): boolean {
+        this._listedDirectories.forEach((listed, key) => {
+            // Listings of directories that were modified around the time they
+            // were read are not persisted, because a change within the file
+            // system's timestamp granularity would go unnoticed.
+            const stat = this._stat(listed.uri);
+            if (stat?.isDirectory() && listed.listedAtMs - stat.mtimeMs >= racyIntervalMs) {
+                this._directories.set(key, {
+                    m: stat.mtimeMs,
+                    i: stat.ino,
+                    e: listed.entries.map((entry) => [entry.name, entry.flags]),
+                });
+            } else {
+                this._directories.delete(key);
+            }
+            this._isDirty = true;
+        });
+        this._listedDirectories.clear();
+
+        if (!this._isDirty) {
+            return false;
+        }
+
+        const cacheFile: PersistedCacheFile = { version: cacheFormatVersion, directories: {} };
+        this._directories.forEach((value, key) => {
+            cacheFile.directories[key] = value;
+        });
+
+        try {
+            const cacheDirectory = this._cacheFileUri.getDirectory();
+            if (!this._fs.existsSync(cacheDirectory)) {
+                this._fs.mkdirSync(cacheDirectory, { recursive: true });
+            }
+
+            this._fs.writeFileSync(this._cacheFileUri, JSON.stringify(cacheFile), 'utf8');
+            this._isDirty = false;
+            return true;
+        } catch {
+            // The cache is an optimization only, so ignore write failures.
+            return false;
+        }
+    }
+
+    private _load() {
+        try {
+            if (!this._fs.existsSync(this._cacheFileUri)) {
+                return;
+            }
+
+            const cacheFile = JSON.parse(this._fs.readFileSync(this._cacheFileUri, 'utf8')) as PersistedCacheFile;
+            if (cacheFile?.version !== cacheFormatVersion || typeof cacheFile.directories !== 'object') {
+                return;
+            }
+
+            Object.keys(cacheFile.directories).forEach((key) => {
+                const value = cacheFile.directories[key];
+                if (typeof value?.m === 'number' && typeof value.i === 'number' && Array.isArray(value.e)) {
+                    this._directories.set(key, value);
+                }
+            });
+        } catch {
+            // A corrupt or unreadable cache file is treated as empty.
+            this._directories.clear();
+        }
+    }
+
+    private _stat(dirUri: Uri) {
+        this._statCalls++;
+        return tryStat(this._fs, dirUri);
+    }
+}
+
+export function getPersistedEntryFlags(entry: Dirent): PersistedEntryFlags {
+    let flags = PersistedEntryFlags.None;
+    if (entry.isFile()) {
+        flags |= PersistedEntryFlags.File;
+    }
+    if (entry.isDirectory()) {
+        flags |= PersistedEntryFlags.Directory;
+    }
+    if (entry.isSymbolicLink()) {
+        flags |= PersistedEntryFlags.SymbolicLink;
+    }
+    return flags;
+}
+
+export function createDirentFromPersistedEntry(entry: PersistedDirectoryEntry, dirUri: Uri): Dirent {
+    const isSymbolicLink = (entry.flags & PersistedEntryFlags.SymbolicLink) !== 0;
+    const dirent: Dirent = {
+        isFile: () => (entry.flags & PersistedEntryFlags.File) !== 0,
+        isDirectory: () => (entry.flags & PersistedEntryFlags.Directory) !== 0,
+        isBlockDevice: () => false,
+        isCharacterDevice: () => false,
+        isFIFO: () => false,
+        isSocket: () => false,
+        isSymbolicLink: () => isSymbolicLink,
+        name: entry.name,
+        parentPath: dirUri.getFilePath(),
+    } as Dirent;
+    return dirent;
+}
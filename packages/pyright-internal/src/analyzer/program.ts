@@ -12,6 +12,7 @@ import { CancellationToken, LSPErrorCodes } from 'vscode-languageserver';
 
 import { TextDocument } from 'vscode-languageserver-textdocument';
 import { OperationCanceledException, throwIfCancellationRequested } from '../common/cancellationUtils';
+import { appendArray } from '../common/collectionUtils';
 import { ConfigOptions, ExecutionEnvironment, matchFileSpecs } from '../common/configOptions';
 import { ConsoleInterface, StandardConsole } from '../common/console';
 import { isThenable } from '../common/core';
@@ -37,8 +38,11 @@ import { CellChainIndex, CellChainIndexProvider } from './cellChainIndex';
 import * as AnalyzerNodeInfo from './analyzerNodeInfo';
 import { CacheManager } from './cacheManager';
 import { CircularDependency } from './circularDependency';
+import { IdentifierIndex } from './identifierIndex';
+import { ImportCycleDetector } from './importCycleDetector';
 import { ImportResolver } from './importResolver';
 import { ImportResult, ImportType } from './importResult';
+import { getModuleInterfaceFingerprint } from './interfaceFingerprint';
 import { getDocString } from './parseTreeUtils';
 import { ISourceFileFactory } from './programTypes';
 import { Scope } from './scope';
@@ -96,6 +100,21 @@ export interface OpenFileOptions {
     chainedFileUri: Uri | undefined;
     changedRange?: ChangedRange;
     isVirtual?: boolean;
+
+    // Another program checks the file. Its contents are used by the files
+    // that import it, but it is checked here only if it is tracked.
+    isCheckedElsewhere?: boolean;
+}
+
+// The edited files that a dependent file was marked for re-checking for. If
+// none of their interfaces changed, the dependent doesn't need re-checking.
+interface RecheckTriggers {
+    // Semantic version of the dependent after it was marked for re-checking. If
+    // the version changes, the file was marked for another reason as well.
+    semanticVersion: number;
+
+    // Edited files and their interface fingerprints before they were edited.
+    triggers: Map<string, { sourceFileInfo: SourceFileInfo; fingerprint: string }>;
 }
 
 // Track edit mode related information.
@@ -160,6 +179,17 @@ export class Program {
     private readonly _realpathAliasMap = new Map<string, Set<string>>();
     private readonly _realpathByUriKey = new Map<string, string>();
     private readonly _analyzerNodeInfoContext = new AnalyzerNodeInfo.AnalyzerNodeInfoContextImpl();
+    private readonly _identifierIndex = new IdentifierIndex();
+    private readonly _importCycleDetector = new ImportCycleDetector<SourceFileInfo>({
+        getImports: (sourceFileInfo) => sourceFileInfo.imports,
+
+        // Typestub files and third-party files aren't checked for cycles.
+        isIncluded: (sourceFileInfo) =>
+            this._sourceFileMap.get(sourceFileInfo.uri.key) === sourceFileInfo &&
+            !sourceFileInfo.sourceFile.isStubFile() &&
+            !sourceFileInfo.isThirdPartyImport,
+        getKey: (sourceFileInfo) => sourceFileInfo.uri.key,
+    });
     private readonly _cellChainIndex = new CellChainIndex(
         () => this._sourceFileList,
         (uri) => this.getSourceFileInfo(uri)
@@ -179,6 +209,19 @@ export class Program {
     private _editModeTracker = new EditModeTracker();
     private _sourceFileFactory: ISourceFileFactory;
 
+    // Interface fingerprints of modules, dropped when the modules are marked dirty.
+    private _interfaceFingerprints = new WeakMap<SourceFileInfo, string | undefined>();
+    private readonly _recheckTriggers = new Map<string, RecheckTriggers>();
+    private _avoidedRecheckCount = 0;
+    private _unreportedAvoidedRecheckCount = 0;
+
+    // Keys of the open files the user worked in, most recent first. The
+    // first one is the active file.
+    private _recentlyActiveFiles: string[] = [];
+
+    // Keys of the open files that another program checks.
+    private readonly _openFilesCheckedElsewhere = new Set<string>();
+
     constructor(
         initialImportResolver: ImportResolver,
         initialConfigOptions: ConfigOptions,
@@ -218,6 +261,12 @@ export class Program {
         return this._evaluator;
     }
 
+    // Number of times re-checking a dependent of an edited file was avoided
+    // because the interfaces of the edited files it imports didn't change.
+    get avoidedRecheckCount() {
+        return this._avoidedRecheckCount;
+    }
+
     get configOptions(): ConfigOptions {
         return this._configOptions;
     }
@@ -310,6 +359,9 @@ export class Program {
         if (mutatedFiles.length > 0) {
             // All cache is invalid now.
             this._createNewEvaluator();
+
+            // Restoring the files restored their imports as well.
+            this._importCycleDetector.reset();
         }
 
         // Keep overlay-produced bindings only for parse trees that survived source-file restoration.
@@ -406,6 +458,7 @@ export class Program {
             // search paths. Clear any cached module name so it is recomputed.
             sourceFileInfo.sourceFile.clearCachedModuleName();
             sourceFileInfo.isTracked = true;
+            this._rebindIfBoundDeclarationsOnly(sourceFileInfo);
 
             // The file may have first been added as an untracked referenced import
             // (skipped by the user-code-only realpath alias index). Now that it is
@@ -490,6 +543,7 @@ export class Program {
             this._addToSourceFileListAndMap(sourceFileInfo);
         } else {
             sourceFileInfo.isOpenByClient = true;
+            this._rebindIfBoundDeclarationsOnly(sourceFileInfo);
 
             // Reset the diagnostic version so we force an update to the
             // diagnostics, which can change based on whether the file is open.
@@ -498,6 +552,12 @@ export class Program {
             sourceFileInfo.diagnosticsVersion = 0;
         }
 
+        if (options?.isCheckedElsewhere) {
+            this._openFilesCheckedElsewhere.add(fileUri.key);
+        } else {
+            this._openFilesCheckedElsewhere.delete(fileUri.key);
+        }
+
         verifyNoCyclesInChainedFiles(this, sourceFileInfo);
         if (sourceFileInfo.ipythonMode === IPythonMode.CellDocs) {
             this._cellChainIndex.invalidate();
@@ -524,7 +584,17 @@ export class Program {
         verifyNoCyclesInChainedFiles(this, sourceFileInfo);
     }
 
+    // Records the open file the user is working in, for example the file
+    // that was last edited or hovered over. Analysis checks it before the
+    // other open files, which are checked in the order they were active.
+    setActiveFile(fileUri: Uri) {
+        this._recentlyActiveFiles = [fileUri.key, ...this._recentlyActiveFiles.filter((key) => key !== fileUri.key)];
+    }
+
     setFileClosed(fileUri: Uri): FileDiagnostics[] {
+        this._recentlyActiveFiles = this._recentlyActiveFiles.filter((key) => key !== fileUri.key);
+        this._openFilesCheckedElsewhere.delete(fileUri.key);
+
         const sourceFileInfo = this.getSourceFileInfo(fileUri);
         if (sourceFileInfo) {
             sourceFileInfo.isOpenByClient = false;
@@ -571,8 +641,12 @@ export class Program {
 
     markAllFilesDirty(evenIfContentsAreSame: boolean) {
         const markDirtySet = new Set<string>();
+        this._interfaceFingerprints = new WeakMap<SourceFileInfo, string | undefined>();
+        this._recheckTriggers.clear();
 
         this._sourceFileList.forEach((sourceFileInfo) => {
+            sourceFileInfo.sourceFile.markDependenciesChanged();
+
             if (evenIfContentsAreSame) {
                 sourceFileInfo.sourceFile.markDirty();
             } else if (sourceFileInfo.sourceFile.didContentsChangeOnDisk()) {
@@ -607,11 +681,13 @@ export class Program {
                 // changed. If the file is open, the on-disk contents don't matter
                 // because we'll receive updates directly from the client.
                 if (this._shouldContentInvalidate(sourceFileInfo, evenIfContentsAreSame)) {
+                    const dependents = this._addRecheckTriggers(sourceFileInfo);
                     sourceFileInfo.sourceFile.markDirty();
 
                     // Mark any files that depend on this file as dirty
                     // also. This will retrigger analysis of these other files.
                     this._markFileDirtyRecursive(sourceFileInfo, markDirtySet);
+                    this._updateRecheckTriggerVersions(dependents);
                 }
 
                 // A filesystem symlink and its target are tracked as separate
@@ -629,6 +705,59 @@ export class Program {
         }
     }
 
+    // Marks the files affected by changed, added or removed library files or
+    // directories dirty, along with the files that depend on them. A file is
+    // affected if it is one of the changed paths or lies under one of them, or
+    // if it imports a module with one of the given top-level names, since such
+    // an import may now resolve differently.
+    markLibraryFilesDirty(changedUris: Uri[], changedModuleNames: string[]) {
+        const changedKeys = new Set(changedUris.map((uri) => uri.key));
+        const moduleNames = new Set(changedModuleNames);
+
+        const isAffected = (sourceFileInfo: SourceFileInfo) => {
+            for (let uri = sourceFileInfo.uri; ; uri = uri.getDirectory()) {
+                if (changedKeys.has(uri.key)) {
+                    return true;
+                }
+
+                if (uri.isRoot() || uri.isEmpty()) {
+                    break;
+                }
+            }
+
+            return (
+                moduleNames.size > 0 &&
+                sourceFileInfo.sourceFile
+                    .getImports()
+                    .some(
+                        (importResult) =>
+                            !importResult.isRelative && moduleNames.has(importResult.importName.split('.')[0])
+                    )
+            );
+        };
+
+        const affectedFiles = this._sourceFileList.filter((sourceFileInfo) => isAffected(sourceFileInfo));
+
+        // Handle builtins and __builtins__ specially. They are implicitly
+        // included by all source files.
+        if (affectedFiles.some((f) => f.uri.fileName === 'builtins.pyi' || f.uri.fileName === '__builtins__.pyi')) {
+            this.markAllFilesDirty(/* evenIfContentsAreSame */ true);
+            return;
+        }
+
+        const markDirtySet = new Set<string>();
+        affectedFiles.forEach((sourceFileInfo) => {
+            // Re-parse the file even if it is open, so its imports are resolved again.
+            sourceFileInfo.sourceFile.markDirty();
+            this._markFileDirtyRecursive(sourceFileInfo, markDirtySet);
+            this._markRealpathAliasesDirty(sourceFileInfo, markDirtySet);
+        });
+
+        if (markDirtySet.size > 0) {
+            this._createNewEvaluator();
+        }
+    }
+
     getFileCount(userFileOnly = true) {
         if (userFileOnly) {
             return this._sourceFileList.filter((f) => isUserCode(f)).length;
@@ -732,6 +861,34 @@ export class Program {
         return this._sourceFileList;
     }
 
+    // Returns the files accepted by the filter that may contain any of the
+    // names as an identifier. Files whose identifiers haven't been indexed
+    // are included if any of the names appears anywhere in their contents.
+    getSourceFileInfoListForIdentifiers(
+        names: readonly string[],
+        filter: (sourceFileInfo: SourceFileInfo) => boolean
+    ): readonly SourceFileInfo[] {
+        const candidates = this._sourceFileList.filter(filter);
+
+        // Bring the index up to date with the files' current contents.
+        const unindexedFiles = new Set<SourceFileInfo>();
+        for (const sourceFileInfo of candidates) {
+            if (!this._updateIdentifierIndex(sourceFileInfo)) {
+                unindexedFiles.add(sourceFileInfo);
+            }
+        }
+
+        const indexedFileKeys = this._identifierIndex.getFilesContaining(names);
+        return candidates.filter((sourceFileInfo) => {
+            if (!unindexedFiles.has(sourceFileInfo)) {
+                return indexedFileKeys.has(sourceFileInfo.uri.key);
+            }
+
+            const contents = sourceFileInfo.contents;
+            return !contents || names.some((name) => contents.indexOf(name) >= 0);
+        });
+    }
+
     getSourceFileInfo(uri: Uri): SourceFileInfo | undefined {
         if (!uri.isEmpty()) {
             return this._sourceFileMap.get(uri.key);
@@ -739,6 +896,40 @@ export class Program {
         return undefined;
     }
 
+    // Returns the files that the given files import directly or indirectly,
+    // including the files themselves.
+    getImportClosure(fileUris: Uri[]): Uri[] {
+        const closure = new Map<string, Uri>();
+        const pending: SourceFileInfo[] = [];
+
+        fileUris.forEach((uri) => {
+            const sourceFileInfo = this.getSourceFileInfo(uri);
+            if (sourceFileInfo) {
+                pending.push(sourceFileInfo);
+            }
+        });
+
+        while (pending.length > 0) {
+            const sourceFileInfo = pending.pop()!;
+            if (closure.has(sourceFileInfo.uri.key)) {
+                continue;
+            }
+
+            closure.set(sourceFileInfo.uri.key, sourceFileInfo.uri);
+            pending.push(...sourceFileInfo.imports);
+
+            if (sourceFileInfo.builtinsImport) {
+                pending.push(sourceFileInfo.builtinsImport);
+            }
+
+            if (sourceFileInfo.chainedSourceFile) {
+                pending.push(sourceFileInfo.chainedSourceFile);
+            }
+        }
+
+        return Array.from(closure.values());
+    }
+
     getModuleSymbolTable(fileUri: Uri): SymbolTable | undefined {
         const sourceFileInfo = this.getSourceFileInfo(fileUri);
         if (sourceFileInfo) {
@@ -767,9 +958,7 @@ export class Program {
         return this._runEvaluatorWithCancellationToken(token, () => {
             const elapsedTime = new Duration();
 
-            const openFiles = this._sourceFileList.filter(
-                (sf) => sf.isOpenByClient && sf.sourceFile.isCheckingRequired()
-            );
+            const openFiles = this._getOpenFilesToCheck();
 
             if (openFiles.length > 0) {
                 const effectiveMaxTime = maxTime ? maxTime.openFilesTimeInMs : Number.MAX_VALUE;
@@ -780,6 +969,16 @@ export class Program {
                         if (elapsedTime.getDurationInMilliseconds() > effectiveMaxTime) {
                             return true;
                         }
+
+                        // Return the diagnostics of the file the user is working
+                        // in without waiting for the other open files.
+                        if (
+                            maxTime !== undefined &&
+                            openFiles.length > 1 &&
+                            sourceFileInfo.uri.key === this._recentlyActiveFiles[0]
+                        ) {
+                            return true;
+                        }
                     }
                 }
 
@@ -808,6 +1007,7 @@ export class Program {
                 }
             }
 
+            this._reportAvoidedRechecks();
             return false;
         });
     }
@@ -966,6 +1166,37 @@ export class Program {
                 this._console.info(`    ${fs.getOriginalUri(importFile.getUri())}`);
             });
         }
+
+        // Report the groups of files that import each other. The files of a
+        // group share one component array, so each group is reported once.
+        const importCycleGroups = new Set<readonly SourceFileInfo[]>();
+        sortedFiles.forEach((sfInfo) => {
+            const component = this._importCycleDetector.getComponent(sfInfo);
+            if (component) {
+                importCycleGroups.add(component);
+            }
+        });
+
+        if (importCycleGroups.size > 0) {
+            this._console.info('');
+            this._console.info(
+                `${importCycleGroups.size} group${importCycleGroups.size === 1 ? '' : 's'} of files in import cycles`
+            );
+            importCycleGroups.forEach((component) => {
+                this._console.info(` ${component.length} files`);
+                [...component]
+                    .map((sfInfo) => fs.getOriginalUri(sfInfo.uri).toString())
+                    .sort()
+                    .forEach((fileString) => this._console.info(`    ${fileString}`));
+
+                if (verbose) {
+                    this._importCycleDetector.getCycles(component[0]).forEach((cycle) => {
+                        const fileStrings = [...cycle, cycle[0]].map((sfInfo) => fs.getOriginalUri(sfInfo.uri));
+                        this._console.info(`    Cycle: ${fileStrings.join(' -> ')}`);
+                    });
+                }
+            });
+        }
     }
 
     getTypeOfSymbol(symbol: Symbol) {
@@ -1186,6 +1417,26 @@ export class Program {
         // Empty
     }
 
+    // Returns the open files that need to be checked, ordered by how
+    // recently the user worked in them. Files the user didn't work in
+    // yet follow in the order they were opened.
+    private _getOpenFilesToCheck() {
+        const openFiles = this._sourceFileList.filter(
+            (sf) => this._isCheckedOpenFile(sf) && sf.sourceFile.isCheckingRequired()
+        );
+        if (openFiles.length < 2 || this._recentlyActiveFiles.length === 0) {
+            return openFiles;
+        }
+
+        const ranks = new Map<string, number>();
+        this._recentlyActiveFiles.forEach((key, index) => ranks.set(key, index));
+        const getRank = (sourceFileInfo: SourceFileInfo) =>
+            ranks.get(sourceFileInfo.uri.key) ?? this._recentlyActiveFiles.length;
+
+        // The sort is stable, so files with the same rank keep their order.
+        return openFiles.sort((a, b) => getRank(a) - getRank(b));
+    }
+
     private _addClonedOpenFile(originalFileInfo: SourceFileInfo) {
         const version = originalFileInfo.sourceFile.getClientVersion();
         if (version === undefined) {
@@ -1724,7 +1975,9 @@ export class Program {
             newImports.length !== sourceFileInfo.imports.length ||
             !newImports.every((i) => sourceFileInfo.imports.includes(i))
         ) {
+            const oldImports = sourceFileInfo.imports;
             sourceFileInfo.mutate((s) => (s.imports = newImports));
+            this._importCycleDetector.updateImports(sourceFileInfo, oldImports);
         }
 
         // Resolve the builtins import for the file. This needs to be
@@ -1746,8 +1999,26 @@ export class Program {
         }
 
         this._unindexRealpathAlias(fileUri);
+        this._identifierIndex.removeFile(fileUri.key);
         this._sourceFileMap.delete(fileUri.key);
         this._sourceFileList.splice(indexToRemove, 1);
+
+        if (sourceFileInfo) {
+            this._importCycleDetector.removeNode(sourceFileInfo);
+        }
+    }
+
+    // Records the file's identifiers in the identifier index. Returns false
+    // if they aren't known for the file's current contents.
+    private _updateIdentifierIndex(sourceFileInfo: SourceFileInfo) {
+        const identifierNames = sourceFileInfo.sourceFile.getIdentifierNames();
+        if (!identifierNames) {
+            this._identifierIndex.removeFile(sourceFileInfo.uri.key);
+            return false;
+        }
+
+        this._identifierIndex.setFile(sourceFileInfo.uri.key, identifierNames);
+        return true;
     }
 
     private _dropParseAndBindInfo(sourceFile: SourceFile) {
@@ -2014,6 +2285,10 @@ export class Program {
         if (fileToParse.sourceFile.parse(this._configOptions, this._importResolver, content)) {
             this._parsedFileCount++;
             this._updateSourceFileImports(fileToParse, this._configOptions);
+
+            if (isUserCode(fileToParse) || fileToParse.isOpenByClient) {
+                this._updateIdentifierIndex(fileToParse);
+            }
         }
 
         if (fileToParse.sourceFile.isFileDeleted()) {
@@ -2151,10 +2426,32 @@ export class Program {
             builtinsScope,
             futureImports,
             fileToBind.ipythonMode === IPythonMode.CellDocs ? this._cellChainIndex : undefined,
-            this._analyzerNodeInfoContext
+            this._analyzerNodeInfoContext,
+            this._shouldBindDeclarationsOnly(fileToBind)
         );
     }
 
+    // Library files that are never checked only need module- and class-level
+    // declarations up front. Their function bodies are bound on demand.
+    private _shouldBindDeclarationsOnly(fileInfo: SourceFileInfo) {
+        return (
+            !!this._configOptions.deferLibraryFunctionBinding &&
+            fileInfo.isThirdPartyImport &&
+            !fileInfo.isTracked &&
+            !fileInfo.isOpenByClient &&
+            !fileInfo.chainedSourceFile &&
+            !fileInfo.sourceFile.isStubFile()
+        );
+    }
+
+    // A file that was bound in declaration-only mode must be fully rebound
+    // once its diagnostics are needed.
+    private _rebindIfBoundDeclarationsOnly(fileInfo: SourceFileInfo) {
+        if (fileInfo.sourceFile.isBoundDeclarationsOnly() && !fileInfo.sourceFile.isBindingRequired()) {
+            fileInfo.sourceFile.markReanalysisRequired(/* forceRebinding */ true, this._analyzerNodeInfoContext);
+        }
+    }
+
     private _getEffectiveFutureImports(futureImports: Set<string>, chainedSourceFile: SourceFileInfo): Set<string> {
         const effectiveFutureImports = new Set<string>(futureImports);
 
@@ -2252,9 +2549,14 @@ export class Program {
         };
     };
 
+    private _isCheckedOpenFile(fileInfo: SourceFileInfo) {
+        return fileInfo.isOpenByClient && !this._openFilesCheckedElsewhere.has(fileInfo.uri.key);
+    }
+
     private _shouldCheckFile(fileInfo: SourceFileInfo) {
-        // Always do a full checking for a file that's open in the editor.
-        if (fileInfo.isOpenByClient) {
+        // Always do a full checking for a file that's open in the editor,
+        // unless another program checks it.
+        if (this._isCheckedOpenFile(fileInfo)) {
             return true;
         }
 
@@ -2267,6 +2569,139 @@ export class Program {
         return false;
     }
 
+    // Records the edited file as the reason its dependents need re-checking,
+    // along with its interface fingerprint before the edit. Returns the
+    // dependents for which it was recorded. Dependents that already needed
+    // re-checking for another reason, or that depend on a file whose interface
+    // before its edit isn't known, are always re-checked.
+    private _addRecheckTriggers(editedFile: SourceFileInfo): SourceFileInfo[] {
+        // The edited file may already have been marked dirty when its new
+        // contents were set, so the fingerprint isn't tied to its parse results.
+        const fingerprint = editedFile.chainedSourceFile ? undefined : this._interfaceFingerprints.get(editedFile);
+
+        const dependents: SourceFileInfo[] = [];
+        const visited = new Set<string>([editedFile.uri.key]);
+        const stack = [...editedFile.importedBy];
+
+        while (stack.length > 0) {
+            const dependent = stack.pop()!;
+            const key = dependent.uri.key;
+            if (visited.has(key)) {
+                continue;
+            }
+
+            visited.add(key);
+            appendArray(stack, dependent.importedBy);
+
+            let entry = this._recheckTriggers.get(key);
+            if (entry && entry.semanticVersion !== dependent.semanticVersion) {
+                entry = undefined;
+            }
+
+            if (
+                fingerprint === undefined ||
+                dependent.chainedSourceFile ||
+                (!entry && dependent.sourceFile.isCheckingRequired())
+            ) {
+                this._recheckTriggers.delete(key);
+                continue;
+            }
+
+            if (!entry) {
+                entry = { semanticVersion: dependent.semanticVersion, triggers: new Map() };
+                this._recheckTriggers.set(key, entry);
+            }
+
+            // Keep the fingerprint from before the first edit, since that's the
+            // interface the dependent was last checked against.
+            if (!entry.triggers.has(editedFile.uri.key)) {
+                entry.triggers.set(editedFile.uri.key, { sourceFileInfo: editedFile, fingerprint });
+            }
+
+            dependents.push(dependent);
+        }
+
+        return dependents;
+    }
+
+    private _updateRecheckTriggerVersions(dependents: SourceFileInfo[]) {
+        dependents.forEach((dependent) => {
+            const entry = this._recheckTriggers.get(dependent.uri.key);
+            if (entry) {
+                entry.semanticVersion = dependent.semanticVersion;
+            }
+        });
+    }
+
+    private _canSkipRecheck(fileToCheck: SourceFileInfo) {
+        const entry = this._recheckTriggers.get(fileToCheck.uri.key);
+        if (!entry) {
+            return false;
+        }
+
+        this._recheckTriggers.delete(fileToCheck.uri.key);
+
+        if (
+            entry.semanticVersion !== fileToCheck.semanticVersion ||
+            fileToCheck.sourceFile.isParseRequired() ||
+            fileToCheck.sourceFile.isBindingRequired()
+        ) {
+            return false;
+        }
+
+        for (const trigger of entry.triggers.values()) {
+            if (this.getSourceFileInfo(trigger.sourceFileInfo.uri) !== trigger.sourceFileInfo) {
+                return false;
+            }
+
+            if (this._getInterfaceFingerprint(trigger.sourceFileInfo) !== trigger.fingerprint) {
+                return false;
+            }
+        }
+
+        return true;
+    }
+
+    private _getInterfaceFingerprint(sourceFileInfo: SourceFileInfo): string | undefined {
+        this._bindFile(sourceFileInfo, /* content */ undefined, /* skipFileNeededCheck */ true);
+
+        const parserOutput = sourceFileInfo.sourceFile.getParserOutput();
+        const symbolTable = sourceFileInfo.sourceFile.getModuleSymbolTable();
+        if (!parserOutput || !symbolTable || !this._evaluator || sourceFileInfo.sourceFile.isBindingRequired()) {
+            return undefined;
+        }
+
+        // Modules without a fingerprint are recorded as well, so it isn't
+        // computed again.
+        if (this._interfaceFingerprints.has(sourceFileInfo)) {
+            return this._interfaceFingerprints.get(sourceFileInfo);
+        }
+
+        const evaluator = this._evaluator;
+        const fingerprint = timingStats.interfaceFingerprintTime.timeOperation(() =>
+            getModuleInterfaceFingerprint(evaluator, {
+                fileUri: sourceFileInfo.uri,
+                symbolTable,
+                imports: sourceFileInfo.sourceFile.getImports(),
+                dunderAllNames: AnalyzerNodeInfo.getDunderAllInfo(parserOutput.parseTree, this._analyzerNodeInfoContext)
+                    ?.names,
+            })
+        );
+        this._interfaceFingerprints.set(sourceFileInfo, fingerprint);
+
+        return fingerprint;
+    }
+
+    private _reportAvoidedRechecks() {
+        if (this._unreportedAvoidedRecheckCount > 0) {
+            this._console.log(
+                `Skipped re-checking ${this._unreportedAvoidedRecheckCount} dependent file(s) ` +
+                    `because the interfaces of the edited files they import are unchanged`
+            );
+            this._unreportedAvoidedRecheckCount = 0;
+        }
+    }
+
     private _checkTypes(
         fileToCheck: SourceFileInfo,
         options?: { chainedByList?: SourceFileInfo[]; skipFileNeededCheck?: boolean }
@@ -2294,6 +2729,16 @@ export class Program {
                 return false;
             }
 
+            if (this._canSkipRecheck(fileToCheck)) {
+                // The file was marked only because files it depends on were edited,
+                // and their interfaces didn't change, so its last results are valid.
+                fileToCheck.sourceFile.markCheckingUpToDate(this.configOptions);
+                this._avoidedRecheckCount++;
+                this._unreportedAvoidedRecheckCount++;
+                logState.suppress();
+                return true;
+            }
+
             // Bind the file if necessary even if we're not going to run the checker.
             // disableChecker means disable semantic errors, not syntax errors. We need to bind again
             // in order to generate syntax errors.
@@ -2326,6 +2771,14 @@ export class Program {
                         dependentFiles,
                         this._analyzerNodeInfoContext
                     );
+
+                    // Open files are the ones being edited. Compute the fingerprint of
+                    // their interface while the types are cached, so that the next edit
+                    // can tell whether the files that depend on them need re-checking.
+                    // Files that no other file imports don't need one.
+                    if (fileToCheck.isOpenByClient && fileToCheck.importedBy.length > 0) {
+                        this._getInterfaceFingerprint(fileToCheck);
+                    }
                 }
             }
 
@@ -2340,17 +2793,15 @@ export class Program {
                     const closureMap = new Map<string, SourceFileInfo>();
                     this._getImportsRecursive(fileToCheck, closureMap, 0);
 
-                    closureMap.forEach((file) => {
-                        timingStats.cycleDetectionTime.timeOperation(() => {
-                            const filesVisitedMap = new Map<string, SourceFileInfo>();
-
-                            if (!this._detectAndReportImportCycles(file, filesVisitedMap)) {
-                                // If no cycles were found in any of the files we visited,
-                                // set a flag to indicates that we don't need to visit them again
-                                // on subsequent cycle checks.
-                                filesVisitedMap.forEach((sourceFileInfo) => {
-                                    sourceFileInfo.sourceFile.setNoCircularDependencyConfirmed();
-                                });
+                    timingStats.cycleDetectionTime.timeOperation(() => {
+                        // Files of the same component share their cycles, so
+                        // each cycle is reported once.
+                        const reportedCycles = new Set<readonly (readonly SourceFileInfo[])[]>();
+                        closureMap.forEach((file) => {
+                            const cycles = this._importCycleDetector.getCycles(file);
+                            if (cycles.length > 0 && !reportedCycles.has(cycles)) {
+                                reportedCycles.add(cycles);
+                                cycles.forEach((cycle) => this._logImportCycle(cycle));
                             }
                         });
                     });
@@ -2461,73 +2912,7 @@ export class Program {
         }
     }
 
-    private _detectAndReportImportCycles(
-        sourceFileInfo: SourceFileInfo,
-        filesVisited: Map<string, SourceFileInfo>,
-        dependencyChain: SourceFileInfo[] = [],
-        dependencyMap = new Map<string, boolean>()
-    ): boolean {
-        // Don't bother checking for typestub files or third-party files.
-        if (sourceFileInfo.sourceFile.isStubFile() || sourceFileInfo.isThirdPartyImport) {
-            return false;
-        }
-
-        // If we've already confirmed that this source file isn't part of a
-        // cycle, we can skip it entirely.
-        if (sourceFileInfo.sourceFile.isNoCircularDependencyConfirmed()) {
-            return false;
-        }
-
-        const fileUri = sourceFileInfo.uri;
-
-        filesVisited.set(fileUri.key, sourceFileInfo);
-
-        let detectedCycle = false;
-
-        if (dependencyMap.has(fileUri.key)) {
-            // We detect a cycle (partial or full). A full cycle is one that is
-            // rooted in the file at the start of our dependency chain. A partial
-            // cycle loops back on some other file in the dependency chain. We
-            // will report only full cycles here and leave the reporting of
-            // partial cycles to other passes.
-            detectedCycle = true;
-
-            // Look for chains at least two in length. A file that contains
-            // an "import . from X" will technically create a cycle with
-            // itself, but those are not interesting to report.
-            if (dependencyChain.length > 1 && sourceFileInfo === dependencyChain[0]) {
-                this._logImportCycle(dependencyChain);
-            }
-        } else {
-            // If we've already checked this dependency along
-            // some other path, we can skip it.
-            if (dependencyMap.has(fileUri.key)) {
-                return false;
-            }
-
-            // We use both a map (for fast lookups) and a list
-            // (for ordering information). Set the dependency map
-            // entry to true to indicate that we're actively exploring
-            // that dependency.
-            dependencyMap.set(fileUri.key, true);
-            dependencyChain.push(sourceFileInfo);
-
-            for (const imp of sourceFileInfo.imports) {
-                if (this._detectAndReportImportCycles(imp, filesVisited, dependencyChain, dependencyMap)) {
-                    detectedCycle = true;
-                }
-            }
-
-            // Set the dependencyMap entry to false to indicate that we have
-            // already explored this file and don't need to explore it again.
-            dependencyMap.set(fileUri.key, false);
-            dependencyChain.pop();
-        }
-
-        return detectedCycle;
-    }
-
-    private _logImportCycle(dependencyChain: SourceFileInfo[]) {
+    private _logImportCycle(dependencyChain: readonly SourceFileInfo[]) {
         const circDep = new CircularDependency();
         dependencyChain.forEach((sourceFileInfo) => {
             circDep.appendPath(sourceFileInfo.uri);
@@ -2551,10 +2936,15 @@ export class Program {
         sourceFileInfo.sourceFile.markReanalysisRequired(forceRebinding, this._analyzerNodeInfoContext);
         markSet.add(fileUri.key);
 
+        // The interface of the file can depend on the interfaces of the files
+        // it imports, so its fingerprint has to be computed again.
+        this._interfaceFingerprints.delete(sourceFileInfo);
+
         sourceFileInfo.importedBy.forEach((dep) => {
             // Changes on chained source file can change symbols in the symbol table and
             // dependencies on the dependent file. Force rebinding.
             const forceRebinding = dep.chainedSourceFile === sourceFileInfo;
+            dep.sourceFile.markDependenciesChanged();
             this._markFileDirtyRecursive(dep, markSet, forceRebinding);
         });
 
@@ -18,6 +18,7 @@ import {
     CommandLineLanguageServerOptions,
     CommandLineOptions,
 } from '../common/commandLineOptions';
+import { appendArray } from '../common/collectionUtils';
 import { ConfigOptions, matchFileSpecs } from '../common/configOptions';
 import { ConsoleInterface, LogLevel, StandardConsole, log } from '../common/console';
 import { isPromise, isString } from '../common/core';
@@ -27,24 +28,23 @@ import { EditableProgram, ProgramView } from '../common/extensibility';
 import { FileSystem } from '../common/fileSystem';
 import { FileWatcher, FileWatcherEventType, ignoredWatchEventFunction } from '../common/fileWatcher';
 import { Host, HostFactory, NoAccessHost } from '../common/host';
-import { configFileName, defaultExcludes, defaultStubsDirectory, pyprojectTomlName } from '../common/pathConsts';
+import {
+    configFileName,
+    defaultExcludes,
+    defaultStubsDirectory,
+    pyprojectTomlName,
+    stubsSuffix,
+} from '../common/pathConsts';
 import { getFileName, isRootedDiskPath, normalizeSlashes } from '../common/pathUtils';
 import { PythonVersion } from '../common/pythonVersion';
 import { ServiceKeys } from '../common/serviceKeys';
 import { ServiceProvider } from '../common/serviceProvider';
 import { Range } from '../common/textRange';
 import { timingStats } from '../common/timing';
+import { FileSpecMatcher } from '../common/uri/fileSpecMatcher';
 import { Uri } from '../common/uri/uri';
 import { UriMap } from '../common/uri/uriMap';
-import {
-    FileSpec,
-    deduplicateFolders,
-    getFileSpec,
-    hasPythonExtension,
-    isDirectory,
-    isFile,
-    tryStat,
-} from '../common/uri/uriUtils';
+import { deduplicateFolders, getFileSpec, hasPythonExtension, isDirectory, tryStat } from '../common/uri/uriUtils';
 import { AnalysisCompleteCallback } from './analysis';
 import {
     BackgroundAnalysisProgram,
@@ -53,6 +53,7 @@ import {
 } from './backgroundAnalysisProgram';
 import { ImportLogger } from './importLogger';
 import { ImportResolver, ImportResolverFactory, createImportedModuleDescriptor } from './importResolver';
+import { getTypeStubTargetRoot } from './packageStubGenerator';
 import { ChangedRange, MaxAnalysisTime, Program } from './program';
 import { findPythonSearchPaths } from './pythonPathUtils';
 import {
@@ -99,6 +100,9 @@ export interface AnalyzerServiceOptions {
     onInvalidated?: (reason: InvalidatedReason) => void;
     // Optional callback fired once when initial source file enumeration completes.
     onSourceEnumerationComplete?: (enumerator: SourceEnumerator) => void;
+    // Read the source and import search paths concurrently before the first
+    // source enumeration.
+    prefetchSearchPaths?: boolean;
     shouldRunAnalysis: () => boolean;
 }
 
@@ -109,6 +113,12 @@ export interface TypeStubTargetInfo {
     targetIsSingleFile: boolean;
 }
 
+interface SearchPathPrefetch {
+    enumerator: SourceEnumerator;
+    promise: Promise<void>;
+    isPending: boolean;
+}
+
 interface ConfigFileContents {
     configFileDirUri: Uri;
     configFileJsonObj: object;
@@ -145,9 +155,11 @@ export class AnalyzerService {
     private _lastUserInteractionTime = 0;
     private _backgroundAnalysisCancellationSource: AbstractCancellationTokenSource | undefined;
     private _sourceEnumerator: SourceEnumerator | undefined;
+    private _searchPathPrefetch: SearchPathPrefetch | undefined;
 
     private _disposed = false;
     private _pendingLibraryChanges: RefreshOptions = { changesOnly: true };
+    private _pendingLibraryChangesUntargeted = false;
 
     constructor(instanceName: string, serviceProvider: ServiceProvider, options: AnalyzerServiceOptions) {
         this._instanceName = instanceName;
@@ -399,6 +411,12 @@ export class AnalyzerService {
         this.scheduleReanalysis(/* requireTrackedFileUpdate */ false);
     }
 
+    // Records the open file the user is working in. It is analyzed
+    // before the other open files.
+    setActiveFile(uri: Uri) {
+        this._backgroundAnalysisProgram.setActiveFile(uri);
+    }
+
     setFileClosed(uri: Uri) {
         this._backgroundAnalysisProgram.setFileClosed(uri);
         this.scheduleReanalysis(/* requireTrackedFileUpdate */ false);
@@ -439,6 +457,26 @@ export class AnalyzerService {
         this._console.info('Total files checked: ' + checkedFileCount.toString());
     }
 
+    // Prints the file system statistics (if the file system is instrumented),
+    // attributing the calls to the import roots of each execution environment.
+    // The background analysis threads print their own statistics to the log.
+    printFileSystemStats(verbose: boolean, console: ConsoleInterface = this._console) {
+        const stats = this._serviceProvider.tryGet(ServiceKeys.fileSystemStats);
+        if (!stats) {
+            return;
+        }
+
+        this._backgroundAnalysisProgram.backgroundAnalysis?.printFileSystemStats(verbose);
+
+        const importResolver = this.getImportResolver();
+        const prefixes = [this._configOptions.projectRoot];
+        this._configOptions.getExecutionEnvironments().forEach((execEnv) => {
+            appendArray(prefixes, importResolver.getImportRoots(execEnv));
+        });
+
+        stats.print(console, prefixes, verbose);
+    }
+
     printDetailedAnalysisTimes() {
         this._program.printDetailedAnalysisTimes();
     }
@@ -506,6 +544,10 @@ export class AnalyzerService {
         return this._shouldHandleLibraryFileWatchChanges(uri, libSearchUris);
     }
 
+    test_getLibraryModuleName(uri: Uri, libSearchUris: Uri[]) {
+        return this._getLibraryModuleName(uri, libSearchUris);
+    }
+
     getTypeStubTargetInfo(): TypeStubTargetInfo {
         const stubPath =
             this._configOptions.stubPath ??
@@ -553,6 +595,44 @@ export class AnalyzerService {
         this._backgroundAnalysisProgram.restart();
     }
 
+    // Reads the source include roots and the import search paths concurrently
+    // using asynchronous file system calls. Source enumeration waits for this
+    // to complete and then consumes the listings instead of reading each
+    // directory synchronously.
+    prefetchSearchPaths(): Promise<void> {
+        const enumerator = this._sourceEnumerator;
+        if (!enumerator) {
+            return Promise.resolve();
+        }
+
+        if (this._searchPathPrefetch?.enumerator === enumerator) {
+            return this._searchPathPrefetch.promise;
+        }
+
+        const importResolver = this.getImportResolver();
+        const execEnvs = this._configOptions.getExecutionEnvironments();
+        const startTime = Date.now();
+
+        const prefetch: SearchPathPrefetch = { enumerator, promise: Promise.resolve(), isPending: true };
+        prefetch.promise = Promise.all([enumerator.prefetch(), importResolver.prefetchSearchPaths(execEnvs)])
+            .then(
+                () => {
+                    this._console.log(`Search paths prefetched in ${Date.now() - startTime}ms`);
+                },
+                (e) => {
+                    // The prefetch is an optimization only. Enumeration falls back
+                    // to reading the directories synchronously.
+                    this._console.error(`Failed to prefetch search paths: ${(e as Error)?.message ?? String(e)}`);
+                }
+            )
+            .finally(() => {
+                prefetch.isPending = false;
+            });
+
+        this._searchPathPrefetch = prefetch;
+        return prefetch.promise;
+    }
+
     // Attempts to make progress on source file enumeration if there is an active
     // source enumerator associated with the service. Returns true if complete.
     enumerateSourceFiles(maxSourceEnumeratorTime: number): boolean {
@@ -561,6 +641,11 @@ export class AnalyzerService {
             return true;
         }
 
+        // Wait for any outstanding prefetch of this enumerator's directories.
+        if (this._searchPathPrefetch?.enumerator === this._sourceEnumerator && this._searchPathPrefetch.isPending) {
+            return false;
+        }
+
         let fileMap: Map<string, Uri>;
 
         if (this._executionRootUri.isEmpty()) {
@@ -580,7 +665,7 @@ export class AnalyzerService {
             const excludes = this.options.configOptions?.exclude;
             if (enumResults.autoExcludedDirs && excludes) {
                 enumResults.autoExcludedDirs.forEach((excludedDir) => {
-                    if (!FileSpec.isInPath(excludedDir, excludes)) {
+                    if (!FileSpecMatcher.get(excludes).matches(excludedDir)) {
                         excludes.push(getFileSpec(this._configOptions.projectRoot, `${excludedDir}/**`));
                     }
                 });
@@ -593,6 +678,7 @@ export class AnalyzerService {
 
             // Source file enumeration is complete. Proceed with analysis.
             this._sourceEnumerator = undefined;
+            this._searchPathPrefetch = undefined;
 
             if (this.options.onSourceEnumerationComplete) {
                 try {
@@ -663,6 +749,18 @@ export class AnalyzerService {
                 this._updateTrackedFileList(/* markFilesDirtyUnconditionally */ false);
             }
 
+            // Wait for an outstanding prefetch of the search paths rather than
+            // polling until it settles.
+            const prefetch = this._searchPathPrefetch;
+            if (prefetch?.isPending && prefetch.enumerator === this._sourceEnumerator) {
+                prefetch.promise.then(() => {
+                    if (!this._disposed && !this._analyzeTimer) {
+                        this.scheduleReanalysis(/* requireTrackedFileUpdate */ false);
+                    }
+                });
+                return;
+            }
+
             // Continue to enumerate sources if we haven't finished doing so.
             // Use the "noOpenFilesTimeInMs" limit if it's provided. Otherwise
             // do all enumeration in one shot. The latter is used for the CLI
@@ -1427,41 +1525,16 @@ export class AnalyzerService {
 
                 // Determine the directory that contains the root package.
                 const finalResolvedPath = importResult.resolvedUris[importResult.resolvedUris.length - 1];
-                const isFinalPathFile = isFile(this.fs, finalResolvedPath);
-                const isFinalPathInitFile =
-                    isFinalPathFile && finalResolvedPath.stripAllExtensions().fileName === '__init__';
-
-                let rootPackagePath = finalResolvedPath;
-
-                if (isFinalPathFile) {
-                    // If the module is a __init__.pyi? file, use its parent directory instead.
-                    rootPackagePath = rootPackagePath.getDirectory();
-                }
-
-                for (let i = importResult.resolvedUris.length - 2; i >= 0; i--) {
-                    if (!importResult.resolvedUris[i].isEmpty()) {
-                        rootPackagePath = importResult.resolvedUris[i];
-                    } else {
-                        // If there was no file corresponding to this portion
-                        // of the name path, assume that it's contained
-                        // within its parent directory.
-                        rootPackagePath = rootPackagePath.getDirectory();
-                    }
-                }
-
-                if (isDirectory(this.fs, rootPackagePath)) {
-                    this._typeStubTargetUri = rootPackagePath;
-                } else if (isFile(this.fs, rootPackagePath)) {
-                    // This can occur if there is a "dir/__init__.py" at the same level as a
-                    // module "dir/module.py" that is specifically targeted for stub generation.
-                    this._typeStubTargetUri = rootPackagePath.getDirectory();
+                const { targetImportPath, targetIsSingleFile } = getTypeStubTargetRoot(this.fs, importResult);
+                if (targetImportPath) {
+                    this._typeStubTargetUri = targetImportPath;
                 }
 
                 if (finalResolvedPath.isEmpty()) {
                     this._typeStubTargetIsSingleFile = false;
                 } else {
                     filesToImport.push(finalResolvedPath);
-                    this._typeStubTargetIsSingleFile = importResult.resolvedUris.length === 1 && !isFinalPathInitFile;
+                    this._typeStubTargetIsSingleFile = targetIsSingleFile;
                 }
 
                 // Add the implicit import paths.
@@ -1489,6 +1562,10 @@ export class AnalyzerService {
                 this._console
             );
 
+            if (this.options.prefetchSearchPaths) {
+                void this.prefetchSearchPaths();
+            }
+
             this._backgroundAnalysisProgram.markAllFilesDirty(markFilesDirtyUnconditionally);
             this._requireTrackedFileUpdate = false;
         }
@@ -1777,7 +1854,8 @@ export class AnalyzerService {
 
                     // If file doesn't exist, it is delete.
                     const isChange = event === 'change' && this.fs.existsSync(uri);
-                    this._scheduleLibraryAnalysis(isChange, uri);
+                    const moduleName = isChange ? undefined : this._getLibraryModuleName(uri, watchList);
+                    this._scheduleLibraryAnalysis(isChange, uri, moduleName);
                 });
             } catch {
                 this._console.error(
@@ -1794,17 +1872,7 @@ export class AnalyzerService {
             return true;
         }
 
-        // find the innermost matching search path
-        let matchingSearchPath;
-        for (const libSearchPath of libSearchPaths) {
-            if (
-                path.isChild(libSearchPath) &&
-                (!matchingSearchPath || matchingSearchPath.getPathLength() < libSearchPath.getPathLength())
-            ) {
-                matchingSearchPath = libSearchPath;
-            }
-        }
-
+        const matchingSearchPath = this._getInnermostSearchPath(path, libSearchPaths);
         if (!matchingSearchPath) {
             return true;
         }
@@ -1821,6 +1889,42 @@ export class AnalyzerService {
         return true;
     }
 
+    // Returns the name of the top-level module that contains the given library
+    // file or folder. It is undefined if the path isn't inside a module of one
+    // of the search paths or if it can affect imports of any module, like a .pth
+    // file that adds search paths.
+    private _getLibraryModuleName(path: Uri, libSearchPaths: Uri[]) {
+        const matchingSearchPath = this._getInnermostSearchPath(path, libSearchPaths);
+        if (!matchingSearchPath) {
+            return undefined;
+        }
+
+        const name = path.getPathComponents()[matchingSearchPath.getPathComponents().length];
+        if (!name || name.endsWith('.pth')) {
+            return undefined;
+        }
+
+        // Strip the file extension and the suffix of stub packages.
+        const moduleName = name.split('.')[0];
+        return moduleName.endsWith(stubsSuffix)
+            ? moduleName.substring(0, moduleName.length - stubsSuffix.length)
+            : moduleName;
+    }
+
+    private _getInnermostSearchPath(path: Uri, libSearchPaths: Uri[]) {
+        let matchingSearchPath: Uri | undefined;
+        for (const libSearchPath of libSearchPaths) {
+            if (
+                path.isChild(libSearchPath) &&
+                (!matchingSearchPath || matchingSearchPath.getPathLength() < libSearchPath.getPathLength())
+            ) {
+                matchingSearchPath = libSearchPath;
+            }
+        }
+
+        return matchingSearchPath;
+    }
+
     private _clearLibraryReanalysisTimer() {
         if (this._libraryReanalysisTimer) {
             clearTimeout(this._libraryReanalysisTimer);
@@ -1831,7 +1935,7 @@ export class AnalyzerService {
         }
     }
 
-    private _scheduleLibraryAnalysis(isChange: boolean, changedFileUri?: Uri) {
+    private _scheduleLibraryAnalysis(isChange: boolean, changedFileUri?: Uri, changedModuleName?: string) {
         if (this._disposed) {
             // Already disposed.
             return;
@@ -1849,17 +1953,30 @@ export class AnalyzerService {
         // Add pending library files/folders changes.
         this._pendingLibraryChanges.changesOnly = this._pendingLibraryChanges.changesOnly && isChange;
 
-        // Track the specific file that changed only if all accumulated changes are content-only.
-        // If any change is structural (add/delete), clear the map since all files need updating.
-        if (this._pendingLibraryChanges.changesOnly && changedFileUri) {
+        // Track the specific files and folders that changed, so only the files affected by
+        // them need updating. A file or folder that is added or removed can also change how
+        // imports of its top-level module resolve, so track the module name as well. If that
+        // isn't known, or the changed path isn't known, all files need updating.
+        if (!changedFileUri || (!isChange && !changedModuleName)) {
+            this._pendingLibraryChangesUntargeted = true;
+        }
+
+        if (this._pendingLibraryChangesUntargeted) {
+            this._pendingLibraryChanges.changedFileUris = undefined;
+            this._pendingLibraryChanges.changedModuleNames = undefined;
+        } else if (changedFileUri) {
             if (!this._pendingLibraryChanges.changedFileUris) {
                 this._pendingLibraryChanges.changedFileUris = new UriMap<boolean>();
             }
             // Add to map (automatically handles duplicates via O(1) lookup)
             this._pendingLibraryChanges.changedFileUris.set(changedFileUri, true);
-        } else if (!this._pendingLibraryChanges.changesOnly) {
-            // Clear the map if we've encountered a structural change
-            this._pendingLibraryChanges.changedFileUris = undefined;
+
+            if (changedModuleName) {
+                if (!this._pendingLibraryChanges.changedModuleNames) {
+                    this._pendingLibraryChanges.changedModuleNames = new Set<string>();
+                }
+                this._pendingLibraryChanges.changedModuleNames.add(changedModuleName);
+            }
         }
 
         // Wait for a little while, since library changes
@@ -1880,8 +1997,8 @@ export class AnalyzerService {
 
             // No more pending changes.
             reanalysisTimeProvider!.libraryReanalysisStarted?.();
-            this._pendingLibraryChanges.changesOnly = true;
-            this._pendingLibraryChanges.changedFileUris = undefined;
+            this._pendingLibraryChanges = { changesOnly: true };
+            this._pendingLibraryChangesUntargeted = false;
         }, backOffTimeInMS);
     }
 
@@ -8,7 +8,9 @@
  */
 
 import { ConsoleInterface } from '../common/console';
+import { scanDirectories } from '../common/directoryScanner';
 import { FileSystem } from '../common/fileSystem';
+import { FileSpecMatcher } from '../common/uri/fileSpecMatcher';
 import { Uri } from '../common/uri/uri';
 import { FileSpec, getFileSystemEntriesWithSymlinkedDirectories, tryRealpath, tryStat } from '../common/uri/uriUtils';
 
@@ -20,6 +22,11 @@ export interface SourceEnumerateResult {
 
 const envMarkers = [['bin', 'activate'], ['Scripts', 'activate'], ['pyvenv.cfg'], ['conda-meta']];
 
+// Top-level entries that identify a virtual environment from a directory
+// listing alone. Used to avoid prefetching the contents of environments
+// that will be auto-excluded.
+const envListingMarkers = new Set(['pyvenv.cfg', 'conda-meta']);
+
 // Thresholds that define a "slow" enumeration. Kept at module scope so both the
 // long-operation console warning and the `wasSlowEnumeration` getter derive
 // "slow" from the same condition rather than from whether the warning was logged.
@@ -34,6 +41,8 @@ const nFilesToSuggestSubfolder = 50;
 const pyrightConfigFileName = 'pyrightconfig.json';
 const pyprojectTomlFileName = 'pyproject.toml';
 
+type Dirent = ReturnType<FileSystem['readdirEntriesSync']>[number];
+
 interface DirToExplore {
     uri: Uri;
     includeRegExp: RegExp;
@@ -65,6 +74,9 @@ export class SourceEnumerator {
     // auto-excluded (venvs) or excluded by config are never read, so configs under
     // them are naturally skipped.
     private readonly _discoveredConfigFiles = new Map<string, Uri>();
+    // Directory listings read ahead of time by `prefetch`. Each listing is
+    // consumed (and dropped) the first time the walk reaches its directory.
+    private _prefetchedEntries = new Map<string, Dirent[]>();
 
     constructor(
         include: FileSpec[],
@@ -103,6 +115,67 @@ export class SourceEnumerator {
         return Array.from(this._discoveredConfigFiles.values());
     }
 
+    // Reads the directories under all include roots concurrently using the
+    // asynchronous file system APIs. The subsequent calls to `enumerate` use
+    // these listings rather than reading each directory synchronously, so the
+    // enumeration result is the same whether or not this is called.
+    async prefetch(): Promise<void> {
+        const includeForRoot = new Map<string, FileSpec>();
+        const roots: Uri[] = [];
+
+        for (const includeSpec of this._includesToExplore) {
+            const root = includeSpec.wildcardRoot;
+            if (
+                (root.scheme !== 'file' && root.scheme !== '') ||
+                this._isExcluded(root) ||
+                includeForRoot.has(root.key)
+            ) {
+                continue;
+            }
+
+            includeForRoot.set(root.key, includeSpec);
+            roots.push(root);
+        }
+
+        const getSubdirectoriesToScan = (dirUri: Uri, entries: Dirent[]) => {
+            const includeSpec = includeForRoot.get(dirUri.key);
+            if (!includeSpec) {
+                return [];
+            }
+
+            if (this._autoExcludeVenv && entries.some((entry) => envListingMarkers.has(entry.name))) {
+                return [];
+            }
+
+            // Symbolic links are not followed here. The walk handles them
+            // (and detects cycles) when it reaches them.
+            const subdirs: Uri[] = [];
+            for (const entry of entries) {
+                if (!entry.isDirectory()) {
+                    continue;
+                }
+
+                const subdir = dirUri.combinePaths(entry.name);
+                if (
+                    (subdir.matchesRegex(includeSpec.regExp) || includeSpec.hasDirectoryWildcard) &&
+                    !this._isExcluded(subdir)
+                ) {
+                    includeForRoot.set(subdir.key, includeSpec);
+                    subdirs.push(subdir);
+                }
+            }
+
+            return subdirs;
+        };
+
+        const listings = await scanDirectories(this._fs, roots, { getSubdirectoriesToScan });
+        listings.forEach((entries, key) => {
+            if (!this._prefetchedEntries.has(key)) {
+                this._prefetchedEntries.set(key, entries);
+            }
+        });
+    }
+
     // Enumerates as many files as possible within the specified
     // time limit and returns all matching files.
     enumerate(timeLimitInMs: number): SourceEnumerateResult {
@@ -157,6 +230,12 @@ export class SourceEnumerator {
         return this._elapsedTimeInMs >= longOperationLimitInMs && this._numFilesVisited >= nFilesToSuggestSubfolder;
     }
 
+    // Excluded directories are checked before they are explored, so
+    // nothing below them is visited.
+    private _isExcluded(uri: Uri) {
+        return FileSpecMatcher.get(this._excludes).matches(uri);
+    }
+
     private _recordSymlinkedDirectoryRoot(root: Uri): void {
         for (const existingRoot of this._symlinkedDirectoryRoots.values()) {
             if (root.isChild(existingRoot)) {
@@ -224,9 +303,13 @@ export class SourceEnumerator {
             }
         }
 
+        const prefetchedEntries = this._prefetchedEntries.get(dir.uri.key);
+        this._prefetchedEntries.delete(dir.uri.key);
+
         const { files, directories, symlinkedDirectories } = getFileSystemEntriesWithSymlinkedDirectories(
             this._fs,
-            dir.uri
+            dir.uri,
+            prefetchedEntries
         );
 
         for (const symlinkedDir of symlinkedDirectories) {
@@ -234,7 +317,11 @@ export class SourceEnumerator {
         }
 
         for (const file of files) {
-            if (FileSpec.matchIncludeFileSpec(dir.includeRegExp, this._excludes, file)) {
+            if (
+                file.matchesRegex(dir.includeRegExp) &&
+                FileSpec.matchesIncludeFileRegex(file) &&
+                !this._isExcluded(file)
+            ) {
                 this._numFilesVisited++;
                 this._matches.set(file.key, file);
             }
@@ -246,7 +333,7 @@ export class SourceEnumerator {
             const fileName = file.fileName;
             if (
                 (fileName === pyrightConfigFileName || fileName === pyprojectTomlFileName) &&
-                !FileSpec.isInPath(file, this._excludes)
+                !this._isExcluded(file)
             ) {
                 this._discoveredConfigFiles.set(file.key, file);
             }
@@ -254,7 +341,7 @@ export class SourceEnumerator {
 
         for (const subDir of directories.slice().reverse()) {
             if (subDir.matchesRegex(dir.includeRegExp) || dir.hasDirectoryWildcard) {
-                if (!FileSpec.isInPath(subDir, this._excludes)) {
+                if (!this._isExcluded(subDir)) {
                     this._dirsToExplore.push({
                         uri: subDir,
                         includeRegExp: dir.includeRegExp,
@@ -266,7 +353,7 @@ export class SourceEnumerator {
     }
 
     private _exploreInclude(includeSpec: FileSpec) {
-        if (FileSpec.isInPath(includeSpec.wildcardRoot, this._excludes)) {
+        if (this._isExcluded(includeSpec.wildcardRoot)) {
             return;
         }
 
@@ -299,6 +386,7 @@ export class SourceEnumerator {
 
     private _finish() {
         this._isComplete = true;
+        this._prefetchedEntries.clear();
 
         const fileCount = this._matches.size;
         if (fileCount === 0) {
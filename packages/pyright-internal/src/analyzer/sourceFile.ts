@@ -33,6 +33,7 @@ import * as StringUtils from '../common/stringUtils';
 import { Range, TextRange, getEmptyRange } from '../common/textRange';
 import { TextRangeCollection } from '../common/textRangeCollection';
 import { Duration, timingStats } from '../common/timing';
+import { FileSpecMatcher } from '../common/uri/fileSpecMatcher';
 import { Uri } from '../common/uri/uri';
 import { LocMessage } from '../localization/localize';
 import { getParserStringAnnotationInfo, ModuleNode, ParseNode } from '../parser/parseNodes';
@@ -46,6 +47,13 @@ import { CellChainIndexProvider } from './cellChainIndex';
 import { Checker } from './checker';
 import { CircularDependency } from './circularDependency';
 import * as CommentUtils from './commentUtils';
+import { FunctionCheckContext, FunctionCheckResults, FunctionCheckSession } from './functionCheckCache';
+import {
+    collectIdentifierNames,
+    collectIdentifierOffsets,
+    IdentifierNames,
+    IdentifierOffsets,
+} from './identifierIndex';
 import { ImportResolver } from './importResolver';
 import { ImportResult } from './importResult';
 import { Scope } from './scope';
@@ -115,6 +123,12 @@ class WriteableData {
     tokenizerOutput: TokenizerOutput | undefined;
     lineCount: number | undefined;
 
+    // Identifiers collected from the tokens of the parsed contents. Unlike
+    // the parse results, the names are kept when parse info is dropped.
+    // Their offsets are only needed to recheck functions in open files.
+    identifierNames: IdentifierNames | undefined;
+    identifierOffsets: IdentifierOffsets | undefined;
+
     moduleSymbolTable: SymbolTable | undefined;
 
     // Reentrancy check for binding and checking.
@@ -139,7 +153,6 @@ class WriteableData {
 
     // Circular dependencies that have been reported in this file.
     circularDependencies: CircularDependency[] = [];
-    noCircularDependencyConfirmed = false;
 
     // Did we hit the maximum import depth?
     hitMaxImportDepth: number | undefined;
@@ -147,12 +160,23 @@ class WriteableData {
     // Do we need to perform a binding step?
     isBindingNeeded = true;
 
+    // Was the last binding performed in declaration-only mode? If so,
+    // function bodies are bound on demand.
+    isBoundDeclarationsOnly = false;
+
     // Do we have valid diagnostic results from a checking pass?
     isCheckingNeeded = true;
 
     // Time (in ms) that the last check() call required for this file.
     checkTime: number | undefined;
 
+    // Diagnostics of the functions of an open file from the last check, and
+    // whether the files it depends on changed since then. Functions that an
+    // edit doesn't affect reuse these diagnostics rather than being checked.
+    functionCheckResults: FunctionCheckResults | undefined;
+    dependenciesChanged = false;
+    reusedFunctionCount = 0;
+
     // Information about implicit and explicit imports from this file.
     imports: ImportResult[] | undefined;
     builtinsImport: ImportResult | undefined;
@@ -169,7 +193,6 @@ class WriteableData {
     debugPrint() {
         return `WritableData: 
  diagnosticVersion=${this.diagnosticVersion}, 
- noCircularDependencyConfirmed=${this.noCircularDependencyConfirmed}, 
  isBindingNeeded=${this.isBindingNeeded},
  isBindingInProgress=${this.isBindingInProgress},
  isCheckingInProgress=${this.isCheckingInProgress},
@@ -498,11 +521,12 @@ export class SourceFile {
     markDirty(): void {
         this._writableData.fileContentsVersion++;
         this._writableData.semanticVersion++;
-        this._writableData.noCircularDependencyConfirmed = false;
         this._writableData.isCheckingNeeded = true;
         this._writableData.isBindingNeeded = true;
         this._writableData.moduleSymbolTable = undefined;
         this._writableData.lineCount = undefined;
+        this._writableData.identifierNames = undefined;
+        this._writableData.identifierOffsets = undefined;
 
         this._fireFileDirtyEvent();
     }
@@ -511,7 +535,6 @@ export class SourceFile {
         // Keep the parse info, but reset the analysis to the beginning.
         this._writableData.semanticVersion++;
         this._writableData.isCheckingNeeded = true;
-        this._writableData.noCircularDependencyConfirmed = false;
 
         // If the file contains a wildcard import or __all__ symbols,
         // we need to rebind because a dependent import may have changed.
@@ -531,6 +554,30 @@ export class SourceFile {
         }
     }
 
+    // Marks the results of the last check as still valid, for files that were
+    // marked for re-analysis only because of changes that don't affect them.
+    markCheckingUpToDate(configOptions: ConfigOptions) {
+        assert(!this.isParseRequired(), 'File marked up to date before parsing');
+        assert(!this.isBindingRequired(), 'File marked up to date before binding');
+
+        this._writableData.isCheckingNeeded = false;
+        this._writableData.dependenciesChanged = false;
+        this._recomputeDiagnostics(configOptions);
+    }
+
+    // Marks the file for re-analysis because a file it depends on changed.
+    // Unlike edits of the file itself, such changes can affect any of its
+    // functions, so none of them reuse the results of the last check.
+    markDependenciesChanged() {
+        this._writableData.dependenciesChanged = true;
+    }
+
+    // Returns the number of functions that the last check didn't check
+    // again because they weren't affected by the edits since the prior check.
+    getReusedFunctionCount() {
+        return this._writableData.reusedFunctionCount;
+    }
+
     getFileContentsVersion() {
         return this._writableData.fileContentsVersion;
     }
@@ -539,6 +586,12 @@ export class SourceFile {
         return this._writableData.clientDocumentVersion;
     }
 
+    // Returns the identifier names in the file if they are known for the
+    // current contents.
+    getIdentifierNames(): IdentifierNames | undefined {
+        return this._writableData.identifierNames;
+    }
+
     getSemanticVersion() {
         return this._writableData.semanticVersion;
     }
@@ -628,6 +681,10 @@ export class SourceFile {
         );
     }
 
+    isBoundDeclarationsOnly() {
+        return this._writableData.isBoundDeclarationsOnly;
+    }
+
     isBindingRequired() {
         if (this._writableData.isBindingInProgress) {
             return false;
@@ -702,14 +759,6 @@ export class SourceFile {
         }
     }
 
-    setNoCircularDependencyConfirmed() {
-        this._writableData.noCircularDependencyConfirmed = true;
-    }
-
-    isNoCircularDependencyConfirmed() {
-        return !this.isParseRequired() && this._writableData.noCircularDependencyConfirmed;
-    }
-
     setHitMaxImportDepth(maxImportDepth: number) {
         this._writableData.hitMaxImportDepth = maxImportDepth;
     }
@@ -782,6 +831,21 @@ export class SourceFile {
                     this._writableData.tokenizerOutput = parseFileResults.tokenizerOutput;
                 }
 
+                // Library files are never searched by name, so only index
+                // the identifiers of other files.
+                this._writableData.identifierNames = undefined;
+                this._writableData.identifierOffsets = undefined;
+                if (!this._isThirdPartyImport && !this._isTypeshedStubFile) {
+                    const tokens = parseFileResults.tokenizerOutput.tokens;
+                    if (this._writableData.clientDocumentContents !== undefined) {
+                        const identifierOffsets = collectIdentifierOffsets(tokens, fileContents!);
+                        this._writableData.identifierOffsets = identifierOffsets;
+                        this._writableData.identifierNames = new Set(identifierOffsets.keys());
+                    } else {
+                        this._writableData.identifierNames = collectIdentifierNames(tokens, fileContents!);
+                    }
+                }
+
                 // Resolve imports.
                 const execEnvironment = configOptions.findExecEnvironment(this._uri);
                 timingStats.resolveImportsTime.timeOperation(() => {
@@ -806,9 +870,7 @@ export class SourceFile {
                 });
 
                 // Is this file in a "strict" path?
-                const useStrict =
-                    configOptions.strict.find((strictFileSpec) => this._uri.matchesRegex(strictFileSpec.regExp)) !==
-                    undefined;
+                const useStrict = FileSpecMatcher.get(configOptions.strict).matches(this._uri);
 
                 const commentDiags: CommentUtils.CommentDiagnostic[] = [];
                 this._diagnosticRuleSet = CommentUtils.getFileLevelDirectives(
@@ -874,6 +936,8 @@ export class SourceFile {
                 this._writableData.imports = undefined;
                 this._writableData.builtinsImport = undefined;
                 this._writableData.importInfo = [];
+                this._writableData.identifierNames = undefined;
+                this._writableData.identifierOffsets = undefined;
 
                 const diagSink = this.createDiagnosticSink();
                 diagSink.addError(
@@ -907,7 +971,8 @@ export class SourceFile {
         builtinsScope: Scope | undefined,
         futureImports: Set<string>,
         cellChainIndex: CellChainIndexProvider | undefined,
-        nodeInfoContext: AnalyzerNodeInfo.AnalyzerNodeInfoContext
+        nodeInfoContext: AnalyzerNodeInfo.AnalyzerNodeInfoContext,
+        declarationsOnly = false
     ) {
         assert(!this.isParseRequired(), 'Bind called before parsing');
         assert(this.isBindingRequired(), 'Bind called unnecessarily');
@@ -929,7 +994,13 @@ export class SourceFile {
                     const fileInfo = this._buildFileInfo(configOptions, importLookup, builtinsScope, futureImports);
                     nodeInfo.setFileInfo(parseTree, fileInfo);
 
-                    const binder = new Binder(fileInfo, configOptions.indexGenerationMode, cellChainIndex, nodeInfo);
+                    const binder = new Binder(
+                        fileInfo,
+                        configOptions.indexGenerationMode,
+                        cellChainIndex,
+                        nodeInfo,
+                        declarationsOnly
+                    );
                     this._writableData.isBindingInProgress = true;
                     binder.bindModule(parseTree);
 
@@ -937,7 +1008,16 @@ export class SourceFile {
                     const moduleScope = nodeInfo.getScope(parseTree);
                     assert(moduleScope !== undefined, 'Module scope not returned by binder');
 
-                    nodeInfoContext.publish(bindingSession);
+                    const store = nodeInfoContext.publish(bindingSession);
+                    if (binder.hasPendingBindings()) {
+                        // Deferred function bodies are bound directly into the published store.
+                        binder.setDeferredNodeInfoAccessor(
+                            AnalyzerNodeInfo.createAnalyzerNodeInfoAccessor(nodeInfoContext, store)
+                        );
+                        store.setDeferredBinder(binder);
+                    }
+
+                    this._writableData.isBoundDeclarationsOnly = declarationsOnly;
                     this._writableData.moduleSymbolTable = moduleScope.symbolTable;
                     this._writableData.bindDiagnostics = bindDiagnostics;
 
@@ -1006,12 +1086,27 @@ export class SourceFile {
                 timingStats.typeCheckerTime.timeOperation(() => {
                     const checkDuration = new Duration();
                     const nodeInfo = AnalyzerNodeInfo.createAnalyzerNodeInfoAccessor(nodeInfoReader);
+                    const functionCheckContext = this._getFunctionCheckContext(dependentFiles, nodeInfo);
+                    const functionCheckSession = functionCheckContext
+                        ? new FunctionCheckSession(
+                              this._writableData.dependenciesChanged
+                                  ? undefined
+                                  : this._writableData.functionCheckResults?.getReusableFunctions(
+                                        functionCheckContext
+                                    ),
+                              functionCheckContext.identifierOffsets
+                          )
+                        : undefined;
+
+                    this._writableData.functionCheckResults = undefined;
+
                     const checker = new Checker(
                         importResolver,
                         evaluator,
                         this._writableData.parserOutput!,
                         dependentFiles,
-                        nodeInfo
+                        nodeInfo,
+                        functionCheckSession
                     );
                     this._writableData.isCheckingInProgress = true;
                     checker.check();
@@ -1020,6 +1115,16 @@ export class SourceFile {
                     const fileInfo = nodeInfo.getFileInfo(this._writableData.parserOutput!.parseTree)!;
                     this._writableData.checkerDiagnostics = fileInfo.diagnosticSink.fetchAndClear();
                     this._writableData.checkTime = checkDuration.getDurationInMilliseconds();
+
+                    if (functionCheckContext && functionCheckSession) {
+                        this._writableData.functionCheckResults = FunctionCheckResults.create(
+                            functionCheckContext,
+                            functionCheckSession.checkedFunctions,
+                            this._writableData.checkerDiagnostics
+                        );
+                    }
+                    this._writableData.reusedFunctionCount = functionCheckSession?.reusedFunctionCount ?? 0;
+                    this._writableData.dependenciesChanged = false;
                 });
             } catch (e: any) {
                 const isCancellation = OperationCanceledException.is(e);
@@ -1109,6 +1214,38 @@ export class SourceFile {
         return `${fileName}/${uniqueNumber.toString()}`;
     }
 
+    // Returns the state that the results of checking the functions of the
+    // file depend on. Only open files keep these results, since they are
+    // the files that are edited and checked again.
+    private _getFunctionCheckContext(
+        dependentFiles: ParserOutput[] | undefined,
+        nodeInfo: AnalyzerNodeInfo.AnalyzerNodeInfoReader
+    ): FunctionCheckContext | undefined {
+        const data = this._writableData;
+        if (
+            data.clientDocumentContents === undefined ||
+            this._ipythonMode !== IPythonMode.None ||
+            dependentFiles ||
+            !data.parserOutput ||
+            data.parsedFileContents === undefined ||
+            !data.tokenizerLines ||
+            !data.identifierOffsets
+        ) {
+            return undefined;
+        }
+
+        return {
+            fileUri: this._uri,
+            parseTree: data.parserOutput.parseTree,
+            fileContents: data.parsedFileContents,
+            lines: data.tokenizerLines,
+            identifierOffsets: data.identifierOffsets,
+            diagnosticRuleSet: this._diagnosticRuleSet,
+            imports: data.imports ?? [],
+            nodeInfo,
+        };
+    }
+
     // Computes an updated set of accumulated diagnostics for the file
     // based on the partial diagnostics from various analysis stages.
     private _recomputeDiagnostics(configOptions: ConfigOptions) {
@@ -1366,7 +1503,7 @@ export class SourceFile {
         this._writableData.diagnosticsWithoutFileIgnore = diagList;
 
         // If the file is in the ignore list, clear the diagnostic list.
-        if (configOptions.ignore.find((ignoreFileSpec) => this._uri.matchesRegex(ignoreFileSpec.regExp))) {
+        if (FileSpecMatcher.get(configOptions.ignore).matches(this._uri)) {
             diagList = [];
         }
 
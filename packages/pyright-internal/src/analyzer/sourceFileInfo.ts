@@ -119,6 +119,10 @@ export class SourceFileInfo implements extensibility.SourceFileInfo {
         return this.sourceFile.getSemanticVersion();
     }
 
+    get contentsVersion() {
+        return this.sourceFile.getFileContentsVersion();
+    }
+
     set diagnosticsVersion(value: number | undefined) {
         this._cachePreEditState();
         this._writableData.diagnosticsVersion = value;
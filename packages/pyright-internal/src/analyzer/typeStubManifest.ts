@@ -0,0 +1,191 @@
+/*
+ * typeStubManifest.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * A manifest of the type stubs generated for the modules of packages,
+ * stored in the stubs directory. For each stub, it records the hashes of
+ * the files the stub was generated from and of the stub itself, so a stub
+ * is generated again only if one of those files or the stub changed.
+ */
+
+import { FileSystem } from '../common/fileSystem';
+import { JsonObjType } from '../common/uri/baseUri';
+import { Uri } from '../common/uri/uri';
+import { hashContents } from './packageTypeReportCache';
+
+// Bump this when the on-disk format changes.
+const manifestFormatVersion = 1;
+
+const manifestFileName = '.createstub-manifest.json';
+
+export interface TypeStubManifestStats {
+    // Stubs that were up to date.
+    hits: number;
+
+    // Stubs that were missing or stale.
+    misses: number;
+}
+
+interface ManifestEntry {
+    // Key of the settings that the stub was generated with.
+    s: string;
+
+    // Files that the stub was generated from and the hashes of their contents.
+    d: [JsonObjType, string][];
+
+    // Hash of the contents of the stub.
+    o: string;
+}
+
+interface ManifestFile {
+    version: number;
+    toolVersion: string;
+    stubs: { [relativePath: string]: ManifestEntry };
+}
+
+export class TypeStubManifest {
+    private readonly _manifestUri: Uri;
+    private _stubs = new Map<string, ManifestEntry>();
+    private _contentHashes = new Map<string, string | undefined>();
+    private _isDirty = false;
+    private _stats: TypeStubManifestStats = { hits: 0, misses: 0 };
+
+    constructor(
+        private readonly _fs: FileSystem,
+        private readonly _stubPath: Uri,
+        private readonly _toolVersion: string
+    ) {
+        this._manifestUri = _stubPath.combinePaths(manifestFileName);
+        this._load();
+    }
+
+    // Determines whether a stub was generated with the same settings from
+    // files that haven't changed since, and hasn't been modified itself.
+    isUpToDate(stubUri: Uri, settingsKey: string): boolean {
+        const entry = this._stubs.get(this._getKey(stubUri));
+        if (
+            !entry ||
+            entry.s !== settingsKey ||
+            this._hashFile(stubUri) !== entry.o ||
+            !entry.d.every(([uri, hash]) => this._getContentHash(Uri.fromJsonObj(uri)) === hash)
+        ) {
+            this._stats.misses++;
+            return false;
+        }
+
+        this._stats.hits++;
+        return true;
+    }
+
+    // Records a stub that was just written and the files it was generated from.
+    setStub(stubUri: Uri, dependencies: Uri[], settingsKey: string) {
+        const key = this._getKey(stubUri);
+        const stubHash = this._hashFile(stubUri);
+        const dependencyHashes: [JsonObjType, string][] = [];
+
+        for (const uri of dependencies) {
+            // A stub whose inputs can't be read can't be validated later.
+            const hash = this._getContentHash(uri);
+            if (hash === undefined) {
+                this._stubs.delete(key);
+                this._isDirty = true;
+                return;
+            }
+
+            dependencyHashes.push([uri.toJsonObj(), hash]);
+        }
+
+        if (stubHash === undefined) {
+            this._stubs.delete(key);
+        } else {
+            this._stubs.set(key, { s: settingsKey, d: dependencyHashes, o: stubHash });
+        }
+        this._isDirty = true;
+    }
+
+    getStats(): TypeStubManifestStats {
+        return { ...this._stats };
+    }
+
+    // Writes the manifest to disk if it changed. Returns true if it was written.
+    save(): boolean {
+        if (!this._isDirty) {
+            return false;
+        }
+
+        const manifestFile: ManifestFile = {
+            version: manifestFormatVersion,
+            toolVersion: this._toolVersion,
+            stubs: {},
+        };
+
+        this._stubs.forEach((value, key) => {
+            manifestFile.stubs[key] = value;
+        });
+
+        try {
+            if (!this._fs.existsSync(this._stubPath)) {
+                this._fs.mkdirSync(this._stubPath, { recursive: true });
+            }
+
+            this._fs.writeFileSync(this._manifestUri, JSON.stringify(manifestFile), 'utf8');
+            this._isDirty = false;
+            return true;
+        } catch {
+            // The manifest is an optimization only, so ignore write failures.
+            return false;
+        }
+    }
+
+    private _getKey(stubUri: Uri) {
+        return this._stubPath.getRelativePath(stubUri) ?? stubUri.key;
+    }
+
+    private _hashFile(uri: Uri): string | undefined {
+        try {
+            return hashContents(this._fs.readFileSync(uri, 'utf8'));
+        } catch {
+            return undefined;
+        }
+    }
+
+    // Hashes the contents of a source file once per run, since the modules
+    // of a package share many of the files they are generated from.
+    private _getContentHash(uri: Uri): string | undefined {
+        if (this._contentHashes.has(uri.key)) {
+            return this._contentHashes.get(uri.key);
+        }
+
+        const hash = this._hashFile(uri);
+        this._contentHashes.set(uri.key, hash);
+        return hash;
+    }
+
+    private _load() {
+        try {
+            if (!this._fs.existsSync(this._manifestUri)) {
+                return;
+            }
+
+            const manifestFile: ManifestFile = JSON.parse(this._fs.readFileSync(this._manifestUri, 'utf8'));
+            if (
+                manifestFile?.version !== manifestFormatVersion ||
+                manifestFile.toolVersion !== this._toolVersion ||
+                typeof manifestFile.stubs !== 'object'
+            ) {
+                return;
+            }
+
+            Object.keys(manifestFile.stubs).forEach((key) => {
+                const value = manifestFile.stubs[key];
+                if (typeof value?.s === 'string' && Array.isArray(value.d) && typeof value.o === 'string') {
+                    this._stubs.set(key, value);
+                }
+            });
+        } catch {
+            // A corrupt or unreadable manifest is treated as empty.
+            this._stubs.clear();
+        }
+    }
+}
@@ -194,24 +194,35 @@ export class TypeStubWriter {
         }
     }
 
+    // Writes the stub for one source file of the target, which must already
+    // be in the program, and returns the path of the stub.
+    writeTypeStubForFile(fileUri: Uri, request: TypeStubWriteRequest, token: CancellationToken): Uri {
+        const fileSystem = this._program.serviceProvider.fs();
+        const stubPath = request.stubPath ?? request.outputPath;
+
+        this._ensureTypeStubOutputPath(fileSystem, request.outputPath, stubPath);
+
+        const sourceFileInfo = this._program.getSourceFileInfo(fileUri);
+        if (!sourceFileInfo) {
+            throw new Error(`Could not find source file '${fileUri.toUserVisibleString()}'`);
+        }
+
+        const relativePath = request.targetImportPath.getRelativePath(fileUri) ?? fileUri.fileName;
+        return this._writeTypeStubForSourceFile(sourceFileInfo, relativePath, request, fileSystem, token);
+    }
+
     private _writeTypeStubForSourceFile(
         sourceFileInfo: SourceFileInfo,
         relativePath: string,
         request: TypeStubWriteRequest,
         fileSystem: FileSystem,
         token: CancellationToken
-    ) {
+    ): Uri {
         throwIfCancellationRequested(token);
 
         this._program.analyzeFile(sourceFileInfo.uri, token);
 
-        let typeStubPath = request.outputPath.resolvePaths(relativePath);
-        if (request.targetIsSingleFile) {
-            typeStubPath = typeStubPath.getDirectory().initPyiUri;
-        } else {
-            typeStubPath = typeStubPath.replaceExtension('.pyi');
-        }
-
+        const typeStubPath = getTypeStubUri(request, relativePath);
         const typeStubDir = typeStubPath.getDirectory();
 
         try {
@@ -240,6 +251,8 @@ export class TypeStubWriter {
         treeWalker.write();
 
         this._program.handleMemoryHighUsage();
+
+        return typeStubPath;
     }
 
     private _ensureTypeStubOutputPath(fileSystem: FileSystem, outputPath: Uri, stubPath: Uri) {
@@ -268,13 +281,24 @@ export class TypeStubWriter {
     }
 }
 
-interface TypeStubWriteRequest {
+export interface TypeStubWriteRequest {
     targetImportPath: Uri;
     targetIsSingleFile: boolean;
     outputPath: Uri;
     stubPath?: Uri;
 }
 
+// Returns the path of the stub for a source file, given its path relative
+// to the target.
+export function getTypeStubUri(request: TypeStubWriteRequest, relativePath: string): Uri {
+    const typeStubPath = request.outputPath.resolvePaths(relativePath);
+    if (request.targetIsSingleFile) {
+        return typeStubPath.getDirectory().initPyiUri;
+    }
+
+    return typeStubPath.replaceExtension('.pyi');
+}
+
 class TypeStubTreeWalker extends ParseTreeWalker {
     private _indentAmount = 0;
     private _includeAllImports = false;
@@ -935,6 +959,23 @@ class TypeStubTreeWalker extends ParseTreeWalker {
         finalText += this._printTrackedImports();
         finalText += this._typeStubText;
 
-        this._fileSystem.writeFileSync(this._stubPath, finalText, 'utf8');
+        // Write to a temporary file first and rename it over the stub, so a
+        // stub is never left partially written and readers see either the old
+        // or the new contents.
+        const tempStubPath = this._stubPath.addExtension(`.${process.pid}.tmp`);
+        try {
+            this._fileSystem.writeFileSync(tempStubPath, finalText, 'utf8');
+            this._fileSystem.renameSync(tempStubPath, this._stubPath);
+        } catch (e: any) {
+            try {
+                if (this._fileSystem.existsSync(tempStubPath)) {
+                    this._fileSystem.unlinkSync(tempStubPath);
+                }
+            } catch {
+                // Ignore failures to clean up.
+            }
+
+            throw e;
+        }
     }
 }
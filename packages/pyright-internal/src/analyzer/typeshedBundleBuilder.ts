@@ -0,0 +1,63 @@
+/*
+ * typeshedBundleBuilder.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Creates the packed typeshed bundle that ships alongside the loose
+ * typeshed-fallback directory. Run after building:
+ *   node ./out/packages/pyright-internal/src/analyzer/typeshedBundleBuilder.js <typeshed-dir> <bundle-file>
+ */
+
+import { NullConsole } from '../common/console';
+import { FileSystem } from '../common/fileSystem';
+import { nullFileWatcherProvider } from '../common/fileWatcher';
+import { stdlibVersionsJsonFileName } from '../common/pathConsts';
+import { RealFileSystem, RealTempFile } from '../common/realFileSystem';
+import { collectTypeshedFiles, TypeshedBundle, typeshedCommitFileName } from '../common/typeshedBundle';
+import { Uri } from '../common/uri/uri';
+import { getTypeshedSubdirectory, stdLibFolderName } from './pythonPathUtils';
+import { parseStdlibVersions, serializeStdlibVersions } from './typeshedInfoProvider';
+
+// Returns the bundle for the given typeshed directory. The stdlib VERSIONS
+// table is included in pre-parsed form.
+export function buildTypeshedBundle(fs: FileSystem, typeshedRoot: Uri): Buffer {
+    const additionalFiles = new Map<string, Buffer>();
+
+    const versionsFile = getTypeshedSubdirectory(typeshedRoot, /* isStdLib */ true).combinePaths('VERSIONS');
+    if (fs.existsSync(versionsFile)) {
+        const versions = parseStdlibVersions(fs.readFileSync(versionsFile, 'utf8'));
+        additionalFiles.set(
+            `${stdLibFolderName}/${stdlibVersionsJsonFileName}`,
+            Buffer.from(serializeStdlibVersions(versions), 'utf8')
+        );
+    }
+
+    const commitFile = typeshedRoot.combinePaths(typeshedCommitFileName);
+    const commit = fs.existsSync(commitFile) ? fs.readFileSync(commitFile, 'utf8').trim() : undefined;
+
+    return TypeshedBundle.pack(collectTypeshedFiles(fs, typeshedRoot, additionalFiles), commit);
+}
+
+function main(args: string[]) {
+    if (args.length !== 2) {
+        console.error('Usage: typeshedBundleBuilder <typeshed-dir> <bundle-file>');
+        process.exitCode = 1;
+        return;
+    }
+
+    const tempFile = new RealTempFile();
+    try {
+        // Use the plain file system so an existing bundle isn't read back in
+        // place of the loose stubs.
+        const fs = new RealFileSystem(tempFile, new NullConsole(), nullFileWatcherProvider);
+        const bundle = buildTypeshedBundle(fs, Uri.file(args[0], tempFile));
+        fs.writeFileSync(Uri.file(args[1], tempFile), bundle, null);
+        console.info(`Wrote ${bundle.length} bytes to ${args[1]}`);
+    } finally {
+        tempFile.dispose();
+    }
+}
+
+if (require.main === module) {
+    main(process.argv.slice(2));
+}
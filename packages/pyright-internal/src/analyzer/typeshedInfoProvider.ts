@@ -4,6 +4,7 @@
  * Licensed under the MIT license.
  */
 
+import { stdlibVersionsJsonFileName } from '../common/pathConsts';
 import { stripFileExtension } from '../common/pathUtils';
 import { pythonVersion3_0, PythonVersion } from '../common/pythonVersion';
 import { Uri } from '../common/uri/uri';
@@ -140,94 +141,25 @@ class DefaultTypeshedInfoProvider implements TypeshedInfoProvider {
             return cached;
         }
 
-        const versionRangeMap = new Map<string, SupportedVersionInfo>();
+        let versionRangeMap = new Map<string, SupportedVersionInfo>();
 
-        // Read the VERSIONS file from typeshed.
+        // Read the VERSIONS file from typeshed. A packed typeshed bundle also
+        // contains the table in pre-parsed form, which is used if present.
         const typeshedStdLibPath = this.getTypeshedSubdirectory(/* isStdLib */ true, customTypeshedPath, importLogger);
         if (typeshedStdLibPath) {
+            const preParsedFilePath = typeshedStdLibPath.combinePaths(stdlibVersionsJsonFileName);
             const versionsFilePath = typeshedStdLibPath.combinePaths('VERSIONS');
             try {
-                const fileStats = this._fileSystem.statSync(versionsFilePath);
-                if (fileStats.size > 0 && fileStats.size < 256 * 1024) {
-                    const fileContents = this._fileSystem.readFileSync(versionsFilePath, 'utf8');
-                    fileContents.split(/\r?\n/).forEach((line) => {
-                        const commentSplit = line.split('#');
-
-                        // Platform-specific information can be specified after a semicolon.
-                        const semicolonSplit = commentSplit[0].split(';').map((s) => s.trim());
-
-                        // Version information is found after a colon.
-                        const colonSplit = semicolonSplit[0].split(':');
-                        if (colonSplit.length !== 2) {
-                            return;
-                        }
-
-                        const versionSplit = colonSplit[1].split('-');
-                        if (versionSplit.length > 2) {
-                            return;
-                        }
-
-                        const moduleName = colonSplit[0].trim();
-                        if (!moduleName) {
-                            return;
-                        }
-
-                        let minVersionString = versionSplit[0].trim();
-                        if (minVersionString.endsWith('+')) {
-                            // If the version ends in "+", strip it off.
-                            minVersionString = minVersionString.substr(0, minVersionString.length - 1);
-                        }
-
-                        let minVersion = PythonVersion.fromString(minVersionString);
-                        if (!minVersion) {
-                            minVersion = pythonVersion3_0;
-                        }
-
-                        let maxVersion: PythonVersion | undefined;
-                        if (versionSplit.length > 1) {
-                            maxVersion = PythonVersion.fromString(versionSplit[1].trim());
-                        }
-
-                        // A semicolon can be followed by a semicolon-delimited list of other
-                        // exclusions. The "platform" exclusion is a comma delimited list platforms
-                        // that are supported or not supported.
-                        let supportedPlatforms: string[] | undefined;
-                        let unsupportedPlatforms: string[] | undefined;
-                        const platformsHeader = 'platforms=';
-                        let platformExclusions = semicolonSplit.slice(1).find((s) => s.startsWith(platformsHeader));
-
-                        if (platformExclusions) {
-                            platformExclusions = platformExclusions.trim().substring(platformsHeader.length);
-                            const commaSplit = platformExclusions.split(',');
-                            for (let platform of commaSplit) {
-                                platform = platform.trim();
-                                let isUnsupported = false;
-
-                                // Remove the '!' from the start if it's an exclusion.
-                                if (platform.startsWith('!')) {
-                                    isUnsupported = true;
-                                    platform = platform.substring(1);
-                                }
-
-                                if (isUnsupported) {
-                                    unsupportedPlatforms = unsupportedPlatforms ?? [];
-                                    unsupportedPlatforms.push(platform);
-                                } else {
-                                    supportedPlatforms = supportedPlatforms ?? [];
-                                    supportedPlatforms.push(platform);
-                                }
-                            }
-                        }
-
-                        versionRangeMap.set(moduleName, {
-                            min: minVersion,
-                            max: maxVersion,
-                            supportedPlatforms,
-                            unsupportedPlatforms,
-                        });
-                    });
+                if (this._fileSystem.fileExists(preParsedFilePath)) {
+                    const contents = this._fileSystem.readFileSync(preParsedFilePath, 'utf8');
+                    versionRangeMap = deserializeStdlibVersions(contents);
                 } else {
-                    importLogger?.log(`Typeshed stdlib VERSIONS file is unexpectedly large`);
+                    const fileStats = this._fileSystem.statSync(versionsFilePath);
+                    if (fileStats.size > 0 && fileStats.size < 256 * 1024) {
+                        versionRangeMap = parseStdlibVersions(this._fileSystem.readFileSync(versionsFilePath, 'utf8'));
+                    } else {
+                        importLogger?.log(`Typeshed stdlib VERSIONS file is unexpectedly large`);
+                    }
                 }
             } catch (e: any) {
                 importLogger?.log(`Could not read typeshed stdlib VERSIONS file: '${JSON.stringify(e)}'`);
@@ -250,3 +182,96 @@ class DefaultTypeshedInfoProvider implements TypeshedInfoProvider {
         return fallback.isEmpty() ? undefined : fallback;
     }
 }
+
+// Parses the contents of typeshed's stdlib/VERSIONS file.
+export function parseStdlibVersions(contents: string): Map<string, SupportedVersionInfo> {
+    const versionRangeMap = new Map<string, SupportedVersionInfo>();
+
+    contents.split(/\r?\n/).forEach((line) => {
+        const commentSplit = line.split('#');
+
+        // Platform-specific information can be specified after a semicolon.
+        const semicolonSplit = commentSplit[0].split(';').map((s) => s.trim());
+
+        // Version information is found after a colon.
+        const colonSplit = semicolonSplit[0].split(':');
+        if (colonSplit.length !== 2) {
+            return;
+        }
+
+        const versionSplit = colonSplit[1].split('-');
+        if (versionSplit.length > 2) {
+            return;
+        }
+
+        const moduleName = colonSplit[0].trim();
+        if (!moduleName) {
+            return;
+        }
+
+        let minVersionString = versionSplit[0].trim();
+        if (minVersionString.endsWith('+')) {
+            // If the version ends in "+", strip it off.
+            minVersionString = minVersionString.substr(0, minVersionString.length - 1);
+        }
+
+        let minVersion = PythonVersion.fromString(minVersionString);
+        if (!minVersion) {
+            minVersion = pythonVersion3_0;
+        }
+
+        let maxVersion: PythonVersion | undefined;
+        if (versionSplit.length > 1) {
+            maxVersion = PythonVersion.fromString(versionSplit[1].trim());
+        }
+
+        // A semicolon can be followed by a semicolon-delimited list of other
+        // exclusions. The "platform" exclusion is a comma delimited list platforms
+        // that are supported or not supported.
+        let supportedPlatforms: string[] | undefined;
+        let unsupportedPlatforms: string[] | undefined;
+        const platformsHeader = 'platforms=';
+        let platformExclusions = semicolonSplit.slice(1).find((s) => s.startsWith(platformsHeader));
+
+        if (platformExclusions) {
+            platformExclusions = platformExclusions.trim().substring(platformsHeader.length);
+            const commaSplit = platformExclusions.split(',');
+            for (let platform of commaSplit) {
+                platform = platform.trim();
+                let isUnsupported = false;
+
+                // Remove the '!' from the start if it's an exclusion.
+                if (platform.startsWith('!')) {
+                    isUnsupported = true;
+                    platform = platform.substring(1);
+                }
+
+                if (isUnsupported) {
+                    unsupportedPlatforms = unsupportedPlatforms ?? [];
+                    unsupportedPlatforms.push(platform);
+                } else {
+                    supportedPlatforms = supportedPlatforms ?? [];
+                    supportedPlatforms.push(platform);
+                }
+            }
+        }
+
+        versionRangeMap.set(moduleName, {
+            min: minVersion,
+            max: maxVersion,
+            supportedPlatforms,
+            unsupportedPlatforms,
+        });
+    });
+
+    return versionRangeMap;
+}
+
+// The pre-parsed VERSIONS table included in packed typeshed bundles.
+export function serializeStdlibVersions(versions: ReadonlyMap<string, SupportedVersionInfo>): string {
+    return JSON.stringify(Object.fromEntries(versions));
+}
+
+export function deserializeStdlibVersions(contents: string): Map<string, SupportedVersionInfo> {
+    return new Map(Object.entries(JSON.parse(contents) as { [moduleName: string]: SupportedVersionInfo }));
+}
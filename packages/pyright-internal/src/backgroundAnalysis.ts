@@ -35,6 +35,7 @@ export class BackgroundAnalysis extends BackgroundAnalysisBase {
             cancellationFolderName: getCancellationFolderName(),
             runner: undefined,
             workerIndex: index,
+            collectFileSystemStats: serviceProvider.tryGet(ServiceKeys.fileSystemStats) !== undefined,
         };
 
         // this will load this same file in BG thread and start listener
@@ -34,6 +34,7 @@ import {
     getCancellationTokenId,
     throwIfCancellationRequested,
 } from './common/cancellationUtils';
+import { appendArray } from './common/collectionUtils';
 import { ConfigOptions } from './common/configOptions';
 import { ConsoleInterface, LogLevel, log } from './common/console';
 import * as debug from './common/debug';
@@ -42,6 +43,7 @@ import { FileDiagnostics } from './common/diagnosticSink';
 import { disposeCancellationToken, getCancellationTokenFromId } from './common/fileBasedCancellationUtils';
 import { Host, HostKind } from './common/host';
 import { LogTracker } from './common/logTracker';
+import { ServiceKeys } from './common/serviceKeys';
 import { ServiceProvider } from './common/serviceProvider';
 import { Range } from './common/textRange';
 import { Uri } from './common/uri/uri';
@@ -58,6 +60,7 @@ export interface IBackgroundAnalysis extends Disposable {
     ensurePartialStubPackages(executionRoot: string | undefined): void;
     setFileOpened(fileUri: Uri, version: number | null, contents: string, options: OpenFileOptions): void;
     updateChainedUri(fileUri: Uri, chainedUri: Uri | undefined): void;
+    setActiveFile(fileUri: Uri): void;
     setFileClosed(fileUri: Uri): void;
     addInterimFile(fileUri: Uri): void;
     markAllFilesDirty(evenIfContentsAreSame: boolean): void;
@@ -72,7 +75,8 @@ export interface IBackgroundAnalysis extends Disposable {
         stubPath: Uri,
         token: CancellationToken
     ): Promise<any>;
-    invalidateAndForceReanalysis(reason: InvalidatedReason): void;
+    invalidateAndForceReanalysis(reason: InvalidatedReason, refreshOptions?: RefreshOptions): void;
+    printFileSystemStats(verbose: boolean): void;
     restart(): void;
     shutdown(): void;
 }
@@ -149,6 +153,10 @@ export class BackgroundAnalysisBase implements IBackgroundAnalysis {
         });
     }
 
+    setActiveFile(fileUri: Uri) {
+        this.enqueueRequest({ requestType: 'setActiveFile', data: serialize({ fileUri }) });
+    }
+
     setFileClosed(fileUri: Uri) {
         this.enqueueRequest({ requestType: 'setFileClosed', data: serialize({ fileUri }) });
     }
@@ -272,8 +280,22 @@ export class BackgroundAnalysisBase implements IBackgroundAnalysis {
         port1.close();
     }
 
-    invalidateAndForceReanalysis(reason: InvalidatedReason) {
-        this.enqueueRequest({ requestType: 'invalidateAndForceReanalysis', data: serialize({ reason }) });
+    invalidateAndForceReanalysis(reason: InvalidatedReason, refreshOptions?: RefreshOptions) {
+        const changedFileUris = refreshOptions?.changedFileUris
+            ? Array.from(refreshOptions.changedFileUris.keys())
+            : undefined;
+        const changedModuleNames = refreshOptions?.changedModuleNames
+            ? Array.from(refreshOptions.changedModuleNames)
+            : undefined;
+
+        this.enqueueRequest({
+            requestType: 'invalidateAndForceReanalysis',
+            data: serialize({ reason, changedFileUris, changedModuleNames }),
+        });
+    }
+
+    printFileSystemStats(verbose: boolean) {
+        this.enqueueRequest({ requestType: 'printFileSystemStats', data: serialize({ verbose }) });
     }
 
     restart() {
@@ -531,6 +553,12 @@ export abstract class BackgroundAnalysisRunnerBase extends BackgroundThreadBase
                 break;
             }
 
+            case 'setActiveFile': {
+                const { fileUri } = deserialize(msg.data);
+                this.handleSetActiveFile(fileUri);
+                break;
+            }
+
             case 'setFileClosed': {
                 const { fileUri } = deserialize(msg.data);
                 this.handleSetFileClosed(fileUri);
@@ -556,8 +584,14 @@ export abstract class BackgroundAnalysisRunnerBase extends BackgroundThreadBase
             }
 
             case 'invalidateAndForceReanalysis': {
-                const { reason } = deserialize(msg.data);
-                this.handleInvalidateAndForceReanalysis(reason);
+                const { reason, changedFileUris, changedModuleNames } = deserialize(msg.data);
+                this.handleInvalidateAndForceReanalysis(reason, changedFileUris, changedModuleNames);
+                break;
+            }
+
+            case 'printFileSystemStats': {
+                const { verbose } = deserialize(msg.data);
+                this.handlePrintFileSystemStats(verbose);
                 break;
             }
 
@@ -663,6 +697,7 @@ export abstract class BackgroundAnalysisRunnerBase extends BackgroundThreadBase
             this.createHost()
         );
         this.program.setImportResolver(this.importResolver);
+        this._prefetchSearchPaths();
     }
 
     protected handleSetConfigOptions(configOptions: ConfigOptions) {
@@ -675,6 +710,7 @@ export abstract class BackgroundAnalysisRunnerBase extends BackgroundThreadBase
         );
         this.program.setConfigOptions(this._configOptions);
         this.program.setImportResolver(this.importResolver);
+        this._prefetchSearchPaths();
     }
 
     protected handleSetTrackedFiles(fileUris: Uri[]) {
@@ -718,6 +754,10 @@ export abstract class BackgroundAnalysisRunnerBase extends BackgroundThreadBase
         this.program.updateChainedUri(fileUri, chainedFileUri);
     }
 
+    protected handleSetActiveFile(fileUri: Uri) {
+        this.program.setActiveFile(fileUri);
+    }
+
     protected handleSetFileClosed(fileUri: Uri) {
         const diagnostics = this.program.setFileClosed(fileUri);
         this._reportDiagnostics(diagnostics, this.program.getFilesToAnalyzeCount(), 0);
@@ -735,13 +775,37 @@ export abstract class BackgroundAnalysisRunnerBase extends BackgroundThreadBase
         this.program.markAllFilesDirty(evenIfContentsAreSame);
     }
 
-    protected handleInvalidateAndForceReanalysis(reason: InvalidatedReason) {
+    protected handleInvalidateAndForceReanalysis(
+        reason: InvalidatedReason,
+        changedFileUris?: Uri[],
+        changedModuleNames?: string[]
+    ) {
         // Make sure the import resolver doesn't have invalid
         // cached entries.
         this.importResolver.invalidateCache();
 
-        // Mark all files with one or more errors dirty.
-        this.program.markAllFilesDirty(/* evenIfContentsAreSame */ true);
+        if (changedFileUris && changedFileUris.length > 0) {
+            // Only the files affected by the library changes need to be checked again.
+            this.program.markLibraryFilesDirty(changedFileUris, changedModuleNames ?? []);
+        } else {
+            // Mark all files with one or more errors dirty.
+            this.program.markAllFilesDirty(/* evenIfContentsAreSame */ true);
+        }
+    }
+
+    protected handlePrintFileSystemStats(verbose: boolean) {
+        const stats = this.getServiceProvider().tryGet(ServiceKeys.fileSystemStats);
+        if (!stats) {
+            return;
+        }
+
+        const prefixes = [this._configOptions.projectRoot];
+        this._configOptions.getExecutionEnvironments().forEach((execEnv) => {
+            appendArray(prefixes, this.importResolver.getImportRoots(execEnv));
+        });
+
+        this.log(LogLevel.Info, `Background analysis(${threadId}) file system stats`);
+        stats.print(this.getConsole(), prefixes, verbose);
     }
 
     protected handleRestart() {
@@ -789,6 +853,17 @@ export abstract class BackgroundAnalysisRunnerBase extends BackgroundThreadBase
         }
     }
 
+    // The directory listings prefetched by the main thread aren't shared with
+    // this thread, so read the import roots of the new import resolver here.
+    // Analysis yields between chunks, so the reads overlap with it and any
+    // directory it lists first is simply read synchronously.
+    private _prefetchSearchPaths() {
+        const importResolver = this.importResolver;
+        importResolver.prefetchSearchPaths(this._configOptions.getExecutionEnvironments()).catch((e) => {
+            this.log(LogLevel.Error, `Failed to prefetch search paths: ${(e as Error)?.message ?? String(e)}`);
+        });
+    }
+
     private _reportDiagnostics(
         diagnostics: FileDiagnostics[],
         requiringAnalysisCount: RequiringAnalysisCount,
@@ -860,10 +935,12 @@ export type BackgroundRequestKind =
     | 'ensurePartialStubPackages'
     | 'setFileOpened'
     | 'updateChainedFileUri'
+    | 'setActiveFile'
     | 'setFileClosed'
     | 'markAllFilesDirty'
     | 'markFilesDirty'
     | 'invalidateAndForceReanalysis'
+    | 'printFileSystemStats'
     | 'restart'
     | 'getDiagnosticsForRange'
     | 'writeTypeStub'
@@ -891,7 +968,11 @@ export interface BackgroundResponse {
 export interface RefreshOptions {
     // No files/folders are added or removed. only changes.
     changesOnly: boolean;
-    // Specific files that changed (if known). When provided, only these files should be marked dirty.
+    // Specific files or folders that changed (if known). When provided, only these files,
+    // the files under these folders and the files that depend on them should be marked dirty.
     // Using UriMap for O(1) lookup instead of O(n) with array.
     changedFileUris?: UriMap<boolean>;
+    // Top-level names of the modules that were added or removed. Files that import
+    // these modules are marked dirty as well since their imports may resolve differently.
+    changedModuleNames?: Set<string>;
 }
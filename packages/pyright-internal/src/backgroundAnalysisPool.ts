@@ -0,0 +1,375 @@
+/*
+ * backgroundAnalysisPool.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Runs several background analysis workers that together check the
+ * tracked files of a workspace. Each tracked file and each open file is
+ * owned by one worker, which is the only worker that checks it. The other
+ * workers get the contents of open files only for the files that import
+ * them. Files that import each other are kept on the same worker so that
+ * each worker evaluates as few files outside its own set as possible. The
+ * diagnostics reported by the workers are merged into a single stream for
+ * the program they serve.
+ */
+
+import { CancellationToken } from 'vscode-languageserver';
+
+import { AnalysisCompleteCallback, AnalysisResults, nullCallback, RequiringAnalysisCount } from './analyzer/analysis';
+import { InvalidatedReason } from './analyzer/backgroundAnalysisProgram';
+import { ImportResolver } from './analyzer/importResolver';
+import { OpenFileOptions, Program } from './analyzer/program';
+import { IBackgroundAnalysis, RefreshOptions } from './backgroundAnalysisBase';
+import { CancelAfter } from './common/cancellationUtils';
+import { ConfigOptions } from './common/configOptions';
+import { Diagnostic } from './common/diagnostic';
+import { ServiceProvider } from './common/serviceProvider';
+import './common/serviceProviderExtensions';
+import { Range } from './common/textRange';
+import { Uri } from './common/uri/uri';
+import { UriMap } from './common/uri/uriMap';
+
+interface OpenFile {
+    version: number | null;
+    contents: string;
+    options: OpenFileOptions;
+}
+
+export class BackgroundAnalysisPool implements IBackgroundAnalysis {
+    private _program: Program | undefined;
+    private _onAnalysisCompletion: AnalysisCompleteCallback = nullCallback;
+
+    // Worker index for every tracked file and every open file.
+    private _owners = new UriMap<number>();
+
+    // Open files that aren't tracked. They are owned only while they are open.
+    private readonly _openUntrackedFiles = new UriMap<true>();
+
+    // Latest contents of each open file, so they can be sent again when the
+    // file's owner changes.
+    private readonly _openFiles = new UriMap<OpenFile>();
+
+    private readonly _requiringAnalysisCounts: RequiringAnalysisCount[];
+    private readonly _fileCounts: number[];
+
+    constructor(private readonly _workers: IBackgroundAnalysis[], private readonly _serviceProvider: ServiceProvider) {
+        this._requiringAnalysisCounts = _workers.map(() => ({ files: 0, cells: 0 }));
+        this._fileCounts = _workers.map(() => 0);
+
+        _workers.forEach((worker, index) => {
+            worker.setCompletionCallback((results) => this._onWorkerAnalysisCompletion(index, results));
+        });
+    }
+
+    dispose() {
+        this._workers.forEach((w) => w.dispose());
+    }
+
+    setProgramView(program: Program) {
+        this._program = program;
+        this._workers.forEach((w) => w.setProgramView(program));
+    }
+
+    setCompletionCallback(callback?: AnalysisCompleteCallback) {
+        this._onAnalysisCompletion = callback ?? nullCallback;
+    }
+
+    setImportResolver(importResolver: ImportResolver) {
+        this._workers.forEach((w) => w.setImportResolver(importResolver));
+    }
+
+    setConfigOptions(configOptions: ConfigOptions) {
+        this._workers.forEach((w) => w.setConfigOptions(configOptions));
+    }
+
+    setTrackedFiles(fileUris: Uri[]) {
+        const owners = assignFileOwners(
+            fileUris,
+            this._workers.length,
+            (fileUri) => this._program?.getSourceFileInfo(fileUri)?.imports.map((i) => i.uri),
+            this._owners
+        );
+
+        const ownedFiles: Uri[][] = this._workers.map(() => []);
+        owners.forEach((owner, fileUri) => ownedFiles[owner].push(fileUri));
+
+        // Open files that aren't tracked keep the owner they had, so they
+        // are still checked by exactly one worker.
+        this._openFiles.forEach((_, fileUri) => {
+            if (owners.has(fileUri)) {
+                this._openUntrackedFiles.delete(fileUri);
+            } else {
+                owners.set(fileUri, this._owners.get(fileUri) ?? this._getLeastLoadedWorker(owners));
+                this._openUntrackedFiles.set(fileUri, true);
+            }
+        });
+
+        const previousOwners = this._owners;
+        this._owners = owners;
+        this._workers.forEach((w, index) => w.setTrackedFiles(ownedFiles[index]));
+
+        // The previous and new owners of an open file need to know whether
+        // they check it.
+        this._openFiles.forEach((openFile, fileUri) => {
+            const previousOwner = previousOwners.get(fileUri);
+            const owner = owners.get(fileUri);
+            if (previousOwner === owner) {
+                return;
+            }
+
+            [previousOwner, owner].forEach((workerIndex) => {
+                if (workerIndex !== undefined) {
+                    this._sendOpenFile(workerIndex, fileUri, openFile);
+                }
+            });
+        });
+    }
+
+    setAllowedThirdPartyImports(importNames: string[]) {
+        this._workers.forEach((w) => w.setAllowedThirdPartyImports(importNames));
+    }
+
+    ensurePartialStubPackages(executionRoot: string | undefined) {
+        this._workers.forEach((w) => w.ensurePartialStubPackages(executionRoot));
+    }
+
+    setFileOpened(fileUri: Uri, version: number | null, contents: string, options: OpenFileOptions) {
+        if (!this._owners.has(fileUri)) {
+            this._owners.set(fileUri, this._getLeastLoadedWorker(this._owners));
+            this._openUntrackedFiles.set(fileUri, true);
+        }
+
+        // Every worker gets the contents of open files so that the files they
+        // own are checked against the edited versions of the files they import.
+        // Only the owner checks the open file itself.
+        this._workers.forEach((_, index) => this._sendOpenFile(index, fileUri, { version, contents, options }));
+
+        // The changed range applies only to this update.
+        this._openFiles.set(fileUri, { version, contents, options: { ...options, changedRange: undefined } });
+    }
+
+    updateChainedUri(fileUri: Uri, chainedUri: Uri | undefined) {
+        this._workers.forEach((w) => w.updateChainedUri(fileUri, chainedUri));
+    }
+
+    setActiveFile(fileUri: Uri) {
+        this._workers.forEach((w) => w.setActiveFile(fileUri));
+    }
+
+    setFileClosed(fileUri: Uri) {
+        if (this._openUntrackedFiles.has(fileUri)) {
+            this._openUntrackedFiles.delete(fileUri);
+            this._owners.delete(fileUri);
+        }
+
+        this._openFiles.delete(fileUri);
+        this._workers.forEach((w) => w.setFileClosed(fileUri));
+    }
+
+    addInterimFile(fileUri: Uri) {
+        this._workers.forEach((w) => w.addInterimFile(fileUri));
+    }
+
+    markAllFilesDirty(evenIfContentsAreSame: boolean) {
+        this._workers.forEach((w) => w.markAllFilesDirty(evenIfContentsAreSame));
+    }
+
+    markFilesDirty(fileUris: Uri[], evenIfContentsAreSame: boolean) {
+        this._workers.forEach((w) => w.markFilesDirty(fileUris, evenIfContentsAreSame));
+    }
+
+    startAnalysis(token: CancellationToken) {
+        // A worker disposes of its analysis token once it is done, so every
+        // worker gets its own token that is cancelled along with the given one.
+        const cancellationProvider = this._serviceProvider.cancellationProvider();
+        this._workers.forEach((w) => w.startAnalysis(CancelAfter(cancellationProvider, token).token));
+    }
+
+    analyzeFile(fileUri: Uri, token: CancellationToken): Promise<boolean> {
+        return this._getOwner(fileUri).analyzeFile(fileUri, token);
+    }
+
+    analyzeFileAndGetDiagnostics(fileUri: Uri, token: CancellationToken): Promise<Diagnostic[]> {
+        return this._getOwner(fileUri).analyzeFileAndGetDiagnostics(fileUri, token);
+    }
+
+    getDiagnosticsForRange(fileUri: Uri, range: Range, token: CancellationToken): Promise<Diagnostic[]> {
+        return this._getOwner(fileUri).getDiagnosticsForRange(fileUri, range, token);
+    }
+
+    writeTypeStub(
+        targetImportPath: Uri,
+        targetIsSingleFile: boolean,
+        stubPath: Uri,
+        token: CancellationToken
+    ): Promise<any> {
+        return this._workers[0].writeTypeStub(targetImportPath, targetIsSingleFile, stubPath, token);
+    }
+
+    invalidateAndForceReanalysis(reason: InvalidatedReason, refreshOptions?: RefreshOptions) {
+        this._workers.forEach((w) => w.invalidateAndForceReanalysis(reason, refreshOptions));
+    }
+
+    printFileSystemStats(verbose: boolean) {
+        this._workers.forEach((w) => w.printFileSystemStats(verbose));
+    }
+
+    restart() {
+        this._workers.forEach((w) => w.restart());
+    }
+
+    shutdown() {
+        this._workers.forEach((w) => w.shutdown());
+    }
+
+    private _sendOpenFile(workerIndex: number, fileUri: Uri, openFile: OpenFile) {
+        this._workers[workerIndex].setFileOpened(fileUri, openFile.version, openFile.contents, {
+            ...openFile.options,
+            isCheckedElsewhere: this._owners.get(fileUri) !== workerIndex,
+        });
+    }
+
+    private _getOwner(fileUri: Uri) {
+        return this._workers[this._owners.get(fileUri) ?? 0];
+    }
+
+    private _getLeastLoadedWorker(owners: UriMap<number>) {
+        const loads = this._workers.map(() => 0);
+        owners.forEach((owner) => loads[owner]++);
+        return loads.indexOf(Math.min(...loads));
+    }
+
+    private _onWorkerAnalysisCompletion(workerIndex: number, results: AnalysisResults) {
+        this._requiringAnalysisCounts[workerIndex] = results.requiringAnalysisCount;
+        this._fileCounts[workerIndex] = results.filesInProgram;
+
+        // Workers report cleared diagnostics for files they no longer own.
+        // Only the owner's diagnostics are reported for a file.
+        const diagnostics = results.diagnostics.filter((fileDiagnostics) => {
+            const owner = this._owners.get(fileDiagnostics.fileUri);
+            return owner === undefined || owner === workerIndex;
+        });
+
+        this._onAnalysisCompletion({
+            ...results,
+            diagnostics,
+            requiringAnalysisCount: {
+                files: this._requiringAnalysisCounts.reduce((total, count) => total + count.files, 0),
+                cells: this._requiringAnalysisCounts.reduce((total, count) => total + count.cells, 0),
+            },
+            filesInProgram: Math.max(...this._fileCounts),
+        });
+    }
+}
+
+// Assigns each file to one of the workers. Files that import each other or
+// live in the same directory form a cluster, and clusters are assigned to the
+// least loaded worker, largest first. Clusters that are larger than a fair
+// share of the files are split. Files that already have an owner keep it, and
+// new files join the worker that owns most of their cluster, so changes to the
+// set of files don't move work that was already done to another worker.
+export function assignFileOwners(
+    fileUris: readonly Uri[],
+    workerCount: number,
+    getImportedUris: (fileUri: Uri) => readonly Uri[] | undefined,
+    previousOwners?: UriMap<number>
+): UriMap<number> {
+    const indices = new UriMap<number>();
+    fileUris.forEach((fileUri, index) => indices.set(fileUri, index));
+
+    const parents = fileUris.map((_, index) => index);
+    const find = (index: number) => {
+        while (parents[index] !== index) {
+            parents[index] = parents[parents[index]];
+            index = parents[index];
+        }
+        return index;
+    };
+    const union = (left: number, right: number) => {
+        parents[find(right)] = find(left);
+    };
+
+    const directories = new Map<string, number>();
+    fileUris.forEach((fileUri, index) => {
+        const directoryKey = fileUri.getDirectory().key;
+        const sibling = directories.get(directoryKey);
+        if (sibling === undefined) {
+            directories.set(directoryKey, index);
+        } else {
+            union(sibling, index);
+        }
+
+        getImportedUris(fileUri)?.forEach((importedUri) => {
+            const importedIndex = indices.get(importedUri);
+            if (importedIndex !== undefined) {
+                union(index, importedIndex);
+            }
+        });
+    });
+
+    const clusters = new Map<number, number[]>();
+    fileUris.forEach((_, index) => {
+        const root = find(index);
+        let cluster = clusters.get(root);
+        if (!cluster) {
+            cluster = [];
+            clusters.set(root, cluster);
+        }
+        cluster.push(index);
+    });
+
+    const owners = new UriMap<number>();
+    const loads: number[] = new Array(workerCount).fill(0);
+    const assign = (index: number, owner: number) => {
+        owners.set(fileUris[index], owner);
+        loads[owner]++;
+    };
+
+    const unassignedClusters: number[][] = [];
+    clusters.forEach((cluster) => {
+        const ownerCounts = new Map<number, number>();
+        const newFiles: number[] = [];
+
+        for (const index of cluster) {
+            const owner = previousOwners?.get(fileUris[index]);
+            if (owner !== undefined && owner < workerCount) {
+                assign(index, owner);
+                ownerCounts.set(owner, (ownerCounts.get(owner) ?? 0) + 1);
+            } else {
+                newFiles.push(index);
+            }
+        }
+
+        if (newFiles.length === 0) {
+            return;
+        }
+
+        if (ownerCounts.size === 0) {
+            unassignedClusters.push(newFiles);
+            return;
+        }
+
+        let clusterOwner = 0;
+        let maxCount = 0;
+        ownerCounts.forEach((count, owner) => {
+            if (count > maxCount) {
+                clusterOwner = owner;
+                maxCount = count;
+            }
+        });
+
+        newFiles.forEach((index) => assign(index, clusterOwner));
+    });
+
+    const capacity = Math.max(1, Math.ceil(fileUris.length / workerCount));
+    unassignedClusters.sort((a, b) => b.length - a.length);
+
+    for (const cluster of unassignedClusters) {
+        for (let start = 0; start < cluster.length; start += capacity) {
+            const owner = loads.indexOf(Math.min(...loads));
+            cluster.slice(start, start + capacity).forEach((index) => assign(index, owner));
+        }
+    }
+
+    return owners;
+}
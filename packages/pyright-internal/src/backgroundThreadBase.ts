@@ -18,6 +18,7 @@ import { ConfigOptions } from './common/configOptions';
 import { ConsoleInterface, LogLevel } from './common/console';
 import { isThenable } from './common/core';
 import * as debug from './common/debug';
+import { InstrumentedFileSystem } from './common/instrumentedFileSystem';
 import { createFromRealFileSystem, RealTempFile } from './common/realFileSystem';
 import { ServiceKeys } from './common/serviceKeys';
 import { ServiceProvider } from './common/serviceProvider';
@@ -83,13 +84,18 @@ export class BackgroundThreadBase {
         }
 
         if (!this._serviceProvider.tryGet(ServiceKeys.fs)) {
-            this._serviceProvider.add(
-                ServiceKeys.fs,
-                createFromRealFileSystem(
-                    this._serviceProvider.get(ServiceKeys.caseSensitivityDetector),
-                    this.getConsole()
-                )
+            const fs = createFromRealFileSystem(
+                this._serviceProvider.get(ServiceKeys.caseSensitivityDetector),
+                this.getConsole()
             );
+
+            if (data.collectFileSystemStats) {
+                const instrumentedFs = new InstrumentedFileSystem(fs);
+                this._serviceProvider.add(ServiceKeys.fs, instrumentedFs);
+                this._serviceProvider.add(ServiceKeys.fileSystemStats, instrumentedFs.stats);
+            } else {
+                this._serviceProvider.add(ServiceKeys.fs, fs);
+            }
         }
         if (!this._serviceProvider.tryGet(ServiceKeys.cacheManager)) {
             this._serviceProvider.add(ServiceKeys.cacheManager, new CacheManager());
@@ -273,6 +279,7 @@ export interface InitializationData {
     workerIndex: number;
     cancellationFolderName: string | undefined;
     runner: string | undefined;
+    collectFileSystemStats?: boolean;
 }
 
 export interface RequestResponse {
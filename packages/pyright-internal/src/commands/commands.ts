@@ -18,4 +18,5 @@ export const enum Commands {
     dumpTypes = 'pyright.dumpTypes',
     dumpCachedTypes = 'pyright.dumpCachedTypes',
     dumpCodeFlowGraph = 'pyright.dumpCodeFlowGraph',
+    dumpFileSystemStats = 'pyright.dumpFileSystemStats',
 }
@@ -12,6 +12,7 @@ import { findNodeByOffset } from '../analyzer/parseTreeUtils';
 import { throwIfCancellationRequested } from '../common/cancellationUtils';
 import { dumpSyntaxInfo, dumpTokenInfo, dumpTypeInfo } from '../common/languageInfoUtils';
 import { LanguageServerInterface } from '../common/languageServerInterface';
+import { ServiceKeys } from '../common/serviceKeys';
 import { Uri } from '../common/uri/uri';
 import { Workspace } from '../workspaceFactory';
 import { ServerCommand } from './commandController';
@@ -38,11 +39,6 @@ export class DumpFileDebugInfo {
         return workspace.service.run((p) => {
             const kind = args[1];
 
-            const parseResults = workspace.service.getParseResults(workspace.service.fs.realCasePath(fileUri));
-            if (!parseResults) {
-                return [];
-            }
-
             const output: string[] = [];
             const collectingConsole = {
                 info: (m: string) => {
@@ -59,6 +55,25 @@ export class DumpFileDebugInfo {
                 },
             };
 
+            // The file system stats don't depend on the file.
+            if (kind === 'filesystemstats') {
+                collectingConsole.info(`* Dump file system stats for workspace '${workspace.workspaceName}'`);
+                if (!workspace.service.serviceProvider.tryGet(ServiceKeys.fileSystemStats)) {
+                    collectingConsole.info(
+                        'File system stats are collected only if the server is started with --stats'
+                    );
+                }
+
+                workspace.service.printFileSystemStats(/* verbose */ true, collectingConsole);
+                workspace.service.serviceProvider.console().info(output.join('\n'));
+                return [];
+            }
+
+            const parseResults = workspace.service.getParseResults(workspace.service.fs.realCasePath(fileUri));
+            if (!parseResults) {
+                return [];
+            }
+
             collectingConsole.info(`* Dump debug info for '${fileUri.toUserVisibleString()}'`);
 
             switch (kind) {
@@ -109,6 +124,7 @@ export class DumpFileDebugInfo {
                     }
                     collectingConsole.info(`* CodeFlow Graph`);
                     evaluator.printControlFlowGraph(flowNode, undefined, 'Dump CodeFlowGraph', collectingConsole);
+                    break;
                 }
             }
 
@@ -29,6 +29,7 @@ import { Host } from './host';
 import { PythonVersion, latestStablePythonVersion } from './pythonVersion';
 import { ServiceKeys } from './serviceKeys';
 import { ServiceProvider } from './serviceProvider';
+import { FileSpecMatcher } from './uri/fileSpecMatcher';
 import { Uri } from './uri/uri';
 import { FileSpec, getFileSpec, isDirectory } from './uri/uriUtils';
 
@@ -938,15 +939,109 @@ export function getStrictDiagnosticRuleSet(): DiagnosticRuleSet {
 }
 
 export function matchFileSpecs(configOptions: ConfigOptions, uri: Uri, isFile = true) {
-    for (const includeSpec of configOptions.include) {
-        if (FileSpec.matchIncludeFileSpec(includeSpec.regExp, configOptions.exclude, uri, isFile)) {
-            return true;
+    return (
+        FileSpecMatcher.get(configOptions.include).matches(uri) &&
+        FileSpec.matchesIncludeFileRegex(uri, isFile) &&
+        !FileSpecMatcher.get(configOptions.exclude).matches(uri)
+    );
+}
+
+// Maximum number of files whose environments are remembered by an index.
+// Environments are looked up for library and typeshed files as well, so
+// the number of files isn't bounded by the size of the project.
+const maxEnvIndexForFileEntries = 4096;
+
+interface ExecEnvironmentTrieNode {
+    children: Map<string, ExecEnvironmentTrieNode>;
+
+    // Indices of the execution environments rooted at this node.
+    envIndices: number[];
+}
+
+// Index of the roots of a list of execution environments. The roots are
+// stored in a trie of path components, so the environments whose roots
+// contain a file are found in time proportional to the depth of its path
+// rather than the number of environments.
+class ExecEnvironmentIndex {
+    private readonly _envCount: number;
+    private readonly _roots: Uri[];
+    private readonly _trie = new Map<string, ExecEnvironmentTrieNode>();
+
+    // Index of the environment found for a file, or -1 if there is none.
+    private readonly _envIndexForFile = new Map<string, number>();
+
+    constructor(private readonly _envs: readonly ExecutionEnvironment[], private readonly _projectRoot: Uri) {
+        this._envCount = _envs.length;
+        this._roots = _envs.map((env) => (Uri.is(env.root) ? env.root : _projectRoot.resolvePaths(env.root || '')));
+
+        this._roots.forEach((root, index) => {
+            let node = this._getOrAddNode(this._trie, root.scheme);
+            for (const component of root.getPathComponents()) {
+                node = this._getOrAddNode(node.children, component.toLowerCase());
+            }
+            node.envIndices.push(index);
+        });
+    }
+
+    // Determines whether the index still describes the environments. The
+    // environments are expected to be added or replaced as a whole rather
+    // than changed in place.
+    isValid(envs: readonly ExecutionEnvironment[], projectRoot: Uri) {
+        return envs === this._envs && envs.length === this._envCount && projectRoot === this._projectRoot;
+    }
+
+    find(file: Uri): ExecutionEnvironment | undefined {
+        const fileKey = `${file.scheme}:${file.isCaseSensitive ? '' : 'i:'}${file.key}`;
+        let envIndex = this._envIndexForFile.get(fileKey);
+
+        if (envIndex === undefined) {
+            envIndex = this._findEnvIndex(file);
+
+            if (this._envIndexForFile.size >= maxEnvIndexForFileEntries) {
+                this._envIndexForFile.clear();
+            }
+            this._envIndexForFile.set(fileKey, envIndex);
         }
+
+        return envIndex >= 0 ? this._envs[envIndex] : undefined;
     }
 
-    return false;
+    private _findEnvIndex(file: Uri) {
+        // The trie ignores case, so collect the environments whose roots
+        // may contain the file and confirm them in the order in which the
+        // environments are listed.
+        const candidates: number[] = [];
+        let node = this._trie.get(file.scheme);
+        if (node) {
+            appendArray(candidates, node.envIndices);
+
+            for (const component of file.getPathComponents()) {
+                node = node.children.get(component.toLowerCase());
+                if (!node) {
+                    break;
+                }
+                appendArray(candidates, node.envIndices);
+            }
+        }
+
+        candidates.sort((a, b) => a - b);
+        return candidates.find((index) => file.startsWith(this._roots[index])) ?? -1;
+    }
+
+    private _getOrAddNode(nodes: Map<string, ExecEnvironmentTrieNode>, key: string) {
+        let node = nodes.get(key);
+        if (!node) {
+            node = { children: new Map<string, ExecEnvironmentTrieNode>(), envIndices: [] };
+            nodes.set(key, node);
+        }
+        return node;
+    }
 }
 
+// The indices are kept outside of the config options, so they aren't
+// serialized along with them.
+const execEnvironmentIndices = new WeakMap<ConfigOptions, ExecEnvironmentIndex>();
+
 // Internal configuration options. These are derived from a combination
 // of the command line and from a JSON-based config file.
 export class ConfigOptions {
@@ -1074,6 +1169,11 @@ export class ConfigOptions {
     // Should native library import resolutions be skipped?
     skipNativeLibraries?: boolean;
 
+    // Directory in which directory listings used for import resolution
+    // and the workspace symbol index are persisted across runs.
+    // Persistence is disabled if undefined.
+    importCacheDirectory?: Uri | undefined;
+
     //---------------------------------------------------------------
     // Internal-only switches
 
@@ -1083,6 +1183,10 @@ export class ConfigOptions {
     // Run program in index generation mode.
     indexGenerationMode?: boolean | undefined;
 
+    // Bind untracked library files in declaration-only mode, deferring
+    // the binding of function bodies until they are evaluated.
+    deferLibraryFunctionBinding?: boolean | undefined;
+
     // When a symbol cannot be resolved from an import, should it be
     // treated as Any rather than Unknown?
     evaluateUnknownImportsAsAny?: boolean;
@@ -1135,12 +1239,17 @@ export class ConfigOptions {
     // If no matching execution environment can be found, a default
     // execution environment is used.
     findExecEnvironment(file: Uri): ExecutionEnvironment {
-        return (
-            this.executionEnvironments.find((env) => {
-                const envRoot = Uri.is(env.root) ? env.root : this.projectRoot.resolvePaths(env.root || '');
-                return file.startsWith(envRoot);
-            }) ?? this.getDefaultExecEnvironment()
-        );
+        if (this.executionEnvironments.length === 0) {
+            return this.getDefaultExecEnvironment();
+        }
+
+        let index = execEnvironmentIndices.get(this);
+        if (!index || !index.isValid(this.executionEnvironments, this.projectRoot)) {
+            index = new ExecEnvironmentIndex(this.executionEnvironments, this.projectRoot);
+            execEnvironmentIndices.set(this, index);
+        }
+
+        return index.find(file) ?? this.getDefaultExecEnvironment();
     }
 
     getExecutionEnvironments(): ExecutionEnvironment[] {
@@ -1386,6 +1495,32 @@ export class ConfigOptions {
             }
         }
 
+        // Read the deferLibraryFunctionBinding flag. Like skipNativeLibraries,
+        // this isn't officially documented. It reduces bind time and memory for
+        // large library closures where most function bodies are never evaluated.
+        if (configObj.deferLibraryFunctionBinding !== undefined) {
+            unusedConfigKeys.delete('deferLibraryFunctionBinding');
+            if (typeof configObj.deferLibraryFunctionBinding === 'boolean') {
+                this.deferLibraryFunctionBinding = configObj.deferLibraryFunctionBinding;
+            } else {
+                console.error(`Config "deferLibraryFunctionBinding" field must contain a boolean.`);
+            }
+        }
+
+        // Read the importCacheDirectory setting. This isn't officially documented.
+        // It allows warm runs to skip most of the file system probing performed
+        // during import resolution, which is expensive on network file systems.
+        if (configObj.importCacheDirectory !== undefined) {
+            unusedConfigKeys.delete('importCacheDirectory');
+            if (typeof configObj.importCacheDirectory !== 'string') {
+                console.error(`Config "importCacheDirectory" field must contain a string.`);
+            } else {
+                this.importCacheDirectory = configObj.importCacheDirectory
+                    ? configDirUri.resolvePaths(configObj.importCacheDirectory)
+                    : undefined;
+            }
+        }
+
         // Read the "typeshedPath" setting.
         if (configObj.typeshedPath !== undefined) {
             unusedConfigKeys.delete('typeshedPath');
@@ -0,0 +1,95 @@
+/*
+ * directoryScanner.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Reads directory trees using the asynchronous file system APIs with a
+ * bounded number of reads in flight. Independent roots (source includes,
+ * extra paths, site-packages, typeshed) are read concurrently, which hides
+ * the latency of slow or remote disks. The resulting listings are handed to
+ * the synchronous walkers, which then produce exactly the results they
+ * would have produced by reading the directories themselves.
+ */
+
+import { ReadOnlyFileSystem } from './fileSystem';
+import { Uri } from './uri/uri';
+
+type Dirent = ReturnType<ReadOnlyFileSystem['readdirEntriesSync']>[number];
+
+// Most local disks don't benefit from more outstanding reads than this, and
+// remote file systems are rarely able to service many more in parallel.
+const defaultMaxConcurrentReads = 16;
+
+// Upper bound on the number of directories read by a single scan. This
+// bounds the memory held by listings that haven't been consumed yet.
+const defaultMaxDirectories = 50000;
+
+export interface DirectoryScanOptions {
+    // Maximum number of directory reads in flight at any time.
+    maxConcurrentReads?: number;
+
+    // Maximum number of directories read by the scan.
+    maxDirectories?: number;
+
+    // Returns the subdirectories of a directory that should also be read.
+    // If not provided, only the roots are read.
+    getSubdirectoriesToScan?: (dirUri: Uri, entries: Dirent[]) => Uri[];
+}
+
+// Reads the given directories (and any subdirectories selected by the caller)
+// and returns their entries keyed by directory. Directories that can't be read
+// are omitted so that the caller's synchronous path reports the error as usual.
+export function scanDirectories(
+    fs: ReadOnlyFileSystem,
+    roots: Uri[],
+    options: DirectoryScanOptions = {}
+): Promise<Map<string, Dirent[]>> {
+    const maxConcurrentReads = Math.max(1, options.maxConcurrentReads ?? defaultMaxConcurrentReads);
+    const maxDirectories = options.maxDirectories ?? defaultMaxDirectories;
+
+    const listings = new Map<string, Dirent[]>();
+    const queued = new Set<string>();
+    const queue: Uri[] = [];
+    let activeReads = 0;
+
+    const enqueue = (dirUri: Uri) => {
+        if (queued.size >= maxDirectories || queued.has(dirUri.key)) {
+            return;
+        }
+
+        queued.add(dirUri.key);
+        queue.push(dirUri);
+    };
+
+    roots.forEach((root) => enqueue(root));
+
+    return new Promise<Map<string, Dirent[]>>((resolve) => {
+        const pump = () => {
+            while (activeReads < maxConcurrentReads && queue.length > 0) {
+                const dirUri = queue.shift()!;
+                activeReads++;
+
+                fs.readdirEntries(dirUri)
+                    .then(
+                        (entries) => {
+                            listings.set(dirUri.key, entries);
+                            options.getSubdirectoriesToScan?.(dirUri, entries).forEach((subdir) => enqueue(subdir));
+                        },
+                        () => {
+                            // Leave unreadable directories to the synchronous path.
+                        }
+                    )
+                    .finally(() => {
+                        activeReads--;
+                        pump();
+                    });
+            }
+
+            if (activeReads === 0 && queue.length === 0) {
+                resolve(listings);
+            }
+        };
+
+        pump();
+    });
+}
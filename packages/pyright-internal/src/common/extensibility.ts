@@ -61,6 +61,7 @@ export interface SourceFileInfo {
     readonly hasTypeAnnotations: boolean;
     readonly diagnosticsVersion: number | undefined;
     readonly semanticVersion: number;
+    readonly contentsVersion: number;
     readonly clientVersion: number | undefined;
 
     readonly chainedSourceFile?: SourceFileInfo | undefined;
@@ -96,6 +97,10 @@ export interface ProgramView {
 
     owns(uri: Uri): boolean;
     getSourceFileInfoList(): readonly SourceFileInfo[];
+    getSourceFileInfoListForIdentifiers(
+        names: readonly string[],
+        filter: (sourceFileInfo: SourceFileInfo) => boolean
+    ): readonly SourceFileInfo[];
     getParserOutput(fileUri: Uri): ParserOutput | undefined;
     getParseResults(fileUri: Uri): ParseFileResults | undefined;
     getSourceFileInfo(fileUri: Uri): SourceFileInfo | undefined;
@@ -48,6 +48,7 @@ export interface ReadOnlyFileSystem {
     realpathSync(uri: Uri): Uri;
     getModulePath(): Uri;
     // Async I/O
+    readdirEntries(uri: Uri): Promise<fs.Dirent[]>;
     readFile(uri: Uri): Promise<Buffer>;
     readFileText(uri: Uri, encoding?: BufferEncoding): Promise<string>;
     // Return path in casing on OS.
@@ -72,6 +73,10 @@ export interface FileSystem extends ReadOnlyFileSystem {
     unlinkSync(uri: Uri): void;
     rmdirSync(uri: Uri): void;
 
+    // Replaces the destination if it exists, atomically where the
+    // platform supports it.
+    renameSync(src: Uri, dst: Uri): void;
+
     createFileSystemWatcher(uris: Uri[], listener: FileWatcherEventHandler): FileWatcher;
     createReadStream(uri: Uri): fs.ReadStream;
     createWriteStream(uri: Uri): fs.WriteStream;
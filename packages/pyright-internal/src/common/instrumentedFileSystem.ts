@@ -0,0 +1,379 @@
+/*
+ * instrumentedFileSystem.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * A file system wrapper that counts the calls made to each operation and
+ * records their latencies, both overall and per directory. This is used to
+ * determine which search paths are expensive when startup is slow.
+ */
+
+import type * as fs from 'fs';
+import { Disposable } from 'vscode-jsonrpc';
+
+import { ConsoleInterface } from './console';
+import { FileSystem, MkDirOptions, Stats } from './fileSystem';
+import { FileWatcher, FileWatcherEventHandler } from './fileWatcher';
+import { Uri } from './uri/uri';
+
+// Upper bounds (in milliseconds) of the latency histogram buckets.
+const latencyBucketBounds = [0.01, 0.1, 1, 10, 100, Infinity];
+const latencyBucketLabels = ['<10us', '<100us', '<1ms', '<10ms', '<100ms', '>=100ms'];
+
+// Number of individual directories listed in detailed reports.
+const maxReportedDirectories = 20;
+
+// Number of directories whose statistics are kept individually. Calls in
+// any other directory are only counted in total, so the statistics of a
+// long-running process stay bounded.
+const defaultMaxTrackedDirectories = 10000;
+
+export interface OperationStats {
+    count: number;
+    totalTimeInMs: number;
+    histogram: number[];
+}
+
+interface DirectoryStats {
+    uri: Uri;
+    count: number;
+    totalTimeInMs: number;
+}
+
+export class FileSystemStats {
+    private _operations = new Map<string, OperationStats>();
+    private _directories = new Map<string, DirectoryStats>();
+    private _untrackedDirectories = { count: 0, totalTimeInMs: 0 };
+
+    constructor(private readonly _maxTrackedDirectories = defaultMaxTrackedDirectories) {}
+
+    record(operation: string, directory: Uri, timeInMs: number) {
+        const opStats = this._getOperationStats(operation);
+        opStats.count++;
+        opStats.totalTimeInMs += timeInMs;
+        opStats.histogram[latencyBucketBounds.findIndex((bound) => timeInMs < bound)]++;
+
+        this._recordDirectory(directory, 1, timeInMs);
+    }
+
+    getOperationStats(operation: string): OperationStats | undefined {
+        return this._operations.get(operation);
+    }
+
+    // Adds the statistics collected by another instance, for example by a
+    // worker process.
+    merge(other: FileSystemStats) {
+        other._operations.forEach((otherStats, operation) => {
+            const opStats = this._getOperationStats(operation);
+            opStats.count += otherStats.count;
+            opStats.totalTimeInMs += otherStats.totalTimeInMs;
+            otherStats.histogram.forEach((value, index) => {
+                opStats.histogram[index] += value;
+            });
+        });
+
+        other._directories.forEach((dirStats) => {
+            this._recordDirectory(dirStats.uri, dirStats.count, dirStats.totalTimeInMs);
+        });
+
+        this._untrackedDirectories.count += other._untrackedDirectories.count;
+        this._untrackedDirectories.totalTimeInMs += other._untrackedDirectories.totalTimeInMs;
+    }
+
+    // Aggregates the per-directory statistics by the longest matching prefix.
+    // Directories that don't fall under any prefix are reported under "<other>".
+    getStatsByPrefix(prefixes: Uri[]): Map<string, { count: number; totalTimeInMs: number }> {
+        const sortedPrefixes = [...prefixes].sort((a, b) => b.key.length - a.key.length);
+        const result = new Map<string, { count: number; totalTimeInMs: number }>();
+
+        this._directories.forEach((dirStats) => {
+            const prefix = sortedPrefixes.find((p) => dirStats.uri.equals(p) || dirStats.uri.isChild(p));
+            const name = prefix ? prefix.toUserVisibleString() : '<other>';
+            const entry = result.get(name) ?? { count: 0, totalTimeInMs: 0 };
+            entry.count += dirStats.count;
+            entry.totalTimeInMs += dirStats.totalTimeInMs;
+            result.set(name, entry);
+        });
+
+        if (this._untrackedDirectories.count > 0) {
+            const entry = result.get('<other>') ?? { count: 0, totalTimeInMs: 0 };
+            entry.count += this._untrackedDirectories.count;
+            entry.totalTimeInMs += this._untrackedDirectories.totalTimeInMs;
+            result.set('<other>', entry);
+        }
+
+        return result;
+    }
+
+    reset() {
+        this._operations.clear();
+        this._directories.clear();
+        this._untrackedDirectories = { count: 0, totalTimeInMs: 0 };
+    }
+
+    static fromJsonObj(jsonObj: any): FileSystemStats {
+        const stats = new FileSystemStats();
+        (jsonObj.operations as [string, OperationStats][]).forEach(([operation, opStats]) => {
+            stats._operations.set(operation, opStats);
+        });
+        (jsonObj.directories as [any, number, number][]).forEach(([uri, count, totalTimeInMs]) => {
+            stats._recordDirectory(Uri.fromJsonObj(uri), count, totalTimeInMs);
+        });
+        stats._untrackedDirectories = jsonObj.untrackedDirectories;
+        return stats;
+    }
+
+    toJsonObj(): any {
+        return {
+            operations: Array.from(this._operations.entries()),
+            directories: Array.from(this._directories.values()).map((dirStats) => [
+                dirStats.uri.toJsonObj(),
+                dirStats.count,
+                dirStats.totalTimeInMs,
+            ]),
+            untrackedDirectories: this._untrackedDirectories,
+        };
+    }
+
+    print(console: ConsoleInterface, prefixes: Uri[], verbose: boolean) {
+        console.info('');
+        console.info('File system stats');
+        console.info(formatRow('Operation', 'Count', 'Total', 'Average', latencyBucketLabels));
+
+        const operations = [...this._operations.entries()].sort((a, b) => b[1].totalTimeInMs - a[1].totalTimeInMs);
+        operations.forEach(([operation, stats]) => {
+            console.info(
+                formatRow(
+                    operation,
+                    stats.count.toString(),
+                    formatTime(stats.totalTimeInMs),
+                    formatTime(stats.totalTimeInMs / stats.count),
+                    stats.histogram.map((value) => value.toString())
+                )
+            );
+        });
+
+        console.info('');
+        console.info('File system stats by search path');
+        const byPrefix = [...this.getStatsByPrefix(prefixes).entries()].sort(
+            (a, b) => b[1].totalTimeInMs - a[1].totalTimeInMs
+        );
+        byPrefix.forEach(([name, stats]) => {
+            console.info(formatDirectoryRow(stats.totalTimeInMs, stats.count, name));
+        });
+
+        if (!verbose) {
+            return;
+        }
+
+        console.info('');
+        console.info('Most expensive directories');
+        const directories = [...this._directories.values()]
+            .sort((a, b) => b.totalTimeInMs - a.totalTimeInMs)
+            .slice(0, maxReportedDirectories);
+        directories.forEach((stats) => {
+            console.info(formatDirectoryRow(stats.totalTimeInMs, stats.count, stats.uri.toUserVisibleString()));
+        });
+    }
+
+    private _getOperationStats(operation: string) {
+        let opStats = this._operations.get(operation);
+        if (!opStats) {
+            opStats = { count: 0, totalTimeInMs: 0, histogram: latencyBucketBounds.map(() => 0) };
+            this._operations.set(operation, opStats);
+        }
+
+        return opStats;
+    }
+
+    private _recordDirectory(directory: Uri, count: number, timeInMs: number) {
+        let dirStats = this._directories.get(directory.key);
+        if (!dirStats && this._directories.size < this._maxTrackedDirectories) {
+            dirStats = { uri: directory, count: 0, totalTimeInMs: 0 };
+            this._directories.set(directory.key, dirStats);
+        }
+
+        const entry = dirStats ?? this._untrackedDirectories;
+        entry.count += count;
+        entry.totalTimeInMs += timeInMs;
+    }
+}
+
+export namespace FileSystemStats {
+    export function is(value: any): value is FileSystemStats {
+        return value instanceof FileSystemStats;
+    }
+}
+
+export class InstrumentedFileSystem implements FileSystem {
+    constructor(private readonly _realFS: FileSystem, readonly stats = new FileSystemStats()) {}
+
+    existsSync(uri: Uri): boolean {
+        return this._time('existsSync', uri, () => this._realFS.existsSync(uri));
+    }
+
+    mkdirSync(uri: Uri, options?: MkDirOptions): void {
+        this._time('mkdirSync', uri, () => this._realFS.mkdirSync(uri, options));
+    }
+
+    chdir(uri: Uri): void {
+        this._realFS.chdir(uri);
+    }
+
+    readdirEntriesSync(uri: Uri): fs.Dirent[] {
+        return this._time('readdirEntriesSync', uri, () => this._realFS.readdirEntriesSync(uri), uri);
+    }
+
+    readdirSync(uri: Uri): string[] {
+        return this._time('readdirSync', uri, () => this._realFS.readdirSync(uri), uri);
+    }
+
+    readFileSync(uri: Uri, encoding?: null): Buffer;
+    readFileSync(uri: Uri, encoding: BufferEncoding): string;
+    readFileSync(uri: Uri, encoding?: BufferEncoding | null): string | Buffer {
+        return this._time('readFileSync', uri, () => this._realFS.readFileSync(uri, encoding as BufferEncoding | null));
+    }
+
+    writeFileSync(uri: Uri, data: string | Buffer, encoding: BufferEncoding | null): void {
+        this._time('writeFileSync', uri, () => this._realFS.writeFileSync(uri, data, encoding));
+    }
+
+    statSync(uri: Uri): Stats {
+        return this._time('statSync', uri, () => this._realFS.statSync(uri));
+    }
+
+    rmdirSync(uri: Uri): void {
+        this._time('rmdirSync', uri, () => this._realFS.rmdirSync(uri));
+    }
+
+    unlinkSync(uri: Uri): void {
+        this._time('unlinkSync', uri, () => this._realFS.unlinkSync(uri));
+    }
+
+    renameSync(src: Uri, dst: Uri): void {
+        this._time('renameSync', dst, () => this._realFS.renameSync(src, dst));
+    }
+
+    realpathSync(uri: Uri): Uri {
+        return this._time('realpathSync', uri, () => this._realFS.realpathSync(uri));
+    }
+
+    getModulePath(): Uri {
+        return this._realFS.getModulePath();
+    }
+
+    createFileSystemWatcher(uris: Uri[], listener: FileWatcherEventHandler): FileWatcher {
+        return this._realFS.createFileSystemWatcher(uris, listener);
+    }
+
+    createReadStream(uri: Uri): fs.ReadStream {
+        return this._realFS.createReadStream(uri);
+    }
+
+    createWriteStream(uri: Uri): fs.WriteStream {
+        return this._realFS.createWriteStream(uri);
+    }
+
+    copyFileSync(src: Uri, dst: Uri): void {
+        this._time('copyFileSync', dst, () => this._realFS.copyFileSync(src, dst));
+    }
+
+    readdirEntries(uri: Uri): Promise<fs.Dirent[]> {
+        return this._timeAsync('readdirEntries', uri, () => this._realFS.readdirEntries(uri), uri);
+    }
+
+    readFile(uri: Uri): Promise<Buffer> {
+        return this._timeAsync('readFile', uri, () => this._realFS.readFile(uri));
+    }
+
+    readFileText(uri: Uri, encoding?: BufferEncoding): Promise<string> {
+        return this._timeAsync('readFileText', uri, () => this._realFS.readFileText(uri, encoding));
+    }
+
+    realCasePath(uri: Uri): Uri {
+        return this._time('realCasePath', uri, () => this._realFS.realCasePath(uri));
+    }
+
+    isMappedUri(uri: Uri): boolean {
+        return this._realFS.isMappedUri(uri);
+    }
+
+    getOriginalUri(mappedUri: Uri): Uri {
+        return this._realFS.getOriginalUri(mappedUri);
+    }
+
+    getMappedUri(originalUri: Uri): Uri {
+        return this._realFS.getMappedUri(originalUri);
+    }
+
+    isInZip(uri: Uri): boolean {
+        return this._realFS.isInZip(uri);
+    }
+
+    mapDirectory(mappedUri: Uri, originalUri: Uri, filter?: (originalUri: Uri, fs: FileSystem) => boolean): Disposable {
+        return this._realFS.mapDirectory(mappedUri, originalUri, filter);
+    }
+
+    private _getOperationName(operation: string, uri: Uri) {
+        // Operations within zip and egg files go through a different
+        // implementation, so they are reported separately.
+        return this._realFS.isInZip(uri) ? `${operation} (zip)` : operation;
+    }
+
+    private _time<T>(operation: string, uri: Uri, callback: () => T, directory?: Uri): T {
+        const startTime = performance.now();
+        try {
+            return callback();
+        } finally {
+            this.stats.record(
+                this._getOperationName(operation, uri),
+                directory ?? uri.getDirectory(),
+                performance.now() - startTime
+            );
+        }
+    }
+
+    private async _timeAsync<T>(
+        operation: string,
+        uri: Uri,
+        callback: () => Promise<T>,
+        directory?: Uri
+    ): Promise<T> {
+        const startTime = performance.now();
+        try {
+            return await callback();
+        } finally {
+            this.stats.record(
+                this._getOperationName(operation, uri),
+                directory ?? uri.getDirectory(),
+                performance.now() - startTime
+            );
+        }
+    }
+}
+
+function formatTime(timeInMs: number) {
+    if (timeInMs < 1) {
+        return `${Math.round(timeInMs * 1000)}us`;
+    }
+
+    if (timeInMs < 1000) {
+        return `${Math.round(timeInMs * 100) / 100}ms`;
+    }
+
+    return `${Math.round(timeInMs / 10) / 100}sec`;
+}
+
+function formatRow(operation: string, count: string, total: string, average: string, buckets: string[]) {
+    return (
+        operation.padEnd(28) +
+        count.padStart(9) +
+        total.padStart(11) +
+        average.padStart(10) +
+        buckets.map((value) => value.padStart(9)).join('')
+    );
+}
+
+function formatDirectoryRow(timeInMs: number, count: number, name: string) {
+    return `  ${formatTime(timeInMs).padStart(10)} ${count.toString().padStart(8)}  ${name}`;
+}
@@ -7,6 +7,8 @@
  */
 
 export const typeshedFallback = 'typeshed-fallback';
+export const typeshedBundleFileName = 'typeshed-fallback.bundle';
+export const stdlibVersionsJsonFileName = 'VERSIONS.json';
 export const lib = 'lib';
 export const libAlternate = 'Lib';
 export const lib64 = 'lib64';
@@ -25,6 +25,7 @@ import {
     nullFileWatcherProvider,
 } from './fileWatcher';
 import { combinePaths, getRootLength } from './pathUtils';
+import { TypeshedBundleFileSystem } from './typeshedBundleFileSystem';
 import { FileUri, FileUriSchema } from './uri/fileUri';
 import { Uri } from './uri/uri';
 import { getRootUri, UriEx } from './uri/uriUtils';
@@ -39,10 +40,14 @@ export function createFromRealFileSystem(
     console?: ConsoleInterface,
     fileWatcherProvider?: FileWatcherProvider
 ): FileSystem {
-    return new RealFileSystem(
-        caseSensitiveDetector,
-        console ?? new NullConsole(),
-        fileWatcherProvider ?? nullFileWatcherProvider
+    // The bundled typeshed stubs are served from the packed bundle if one
+    // was shipped. Otherwise they are read from the loose directory.
+    return new TypeshedBundleFileSystem(
+        new RealFileSystem(
+            caseSensitiveDetector,
+            console ?? new NullConsole(),
+            fileWatcherProvider ?? nullFileWatcherProvider
+        )
     );
 }
 
@@ -264,16 +269,13 @@ export class RealFileSystem implements FileSystem {
 
     readdirEntriesSync(uri: Uri): fs.Dirent[] {
         const path = uri.getFilePath();
-        return yarnFS.readdirSync(path, { withFileTypes: true }).map((entry): fs.Dirent => {
-            // Treat zip/egg files as directories.
-            // See: https://github.com/yarnpkg/berry/blob/master/packages/vscode-zipfs/sources/ZipFSProvider.ts
-            if (hasZipExtension(entry.name)) {
-                if (entry.isFile() && yarnFS.isZip(path)) {
-                    return new VirtualDirent(entry.name, /* file */ false, path);
-                }
-            }
-            return entry;
-        });
+        return yarnFS.readdirSync(path, { withFileTypes: true }).map((entry) => this._mapZipEntry(entry, path));
+    }
+
+    async readdirEntries(uri: Uri): Promise<fs.Dirent[]> {
+        const path = uri.getFilePath();
+        const entries = await yarnFS.readdirPromise(path, { withFileTypes: true });
+        return entries.map((entry) => this._mapZipEntry(entry, path));
     }
 
     readFileSync(uri: Uri, encoding?: null): Buffer;
@@ -348,6 +350,10 @@ export class RealFileSystem implements FileSystem {
         yarnFS.unlinkSync(path);
     }
 
+    renameSync(src: Uri, dst: Uri) {
+        yarnFS.renameSync(src.getFilePath(), dst.getFilePath());
+    }
+
     realpathSync(uri: Uri) {
         try {
             const path = uri.getFilePath();
@@ -458,6 +464,17 @@ export class RealFileSystem implements FileSystem {
         const path = uri.getFilePath();
         return zipPathRegEx.test(path) && yarnFS.isZip(path);
     }
+
+    private _mapZipEntry(entry: fs.Dirent, path: string): fs.Dirent {
+        // Treat zip/egg files as directories.
+        // See: https://github.com/yarnpkg/berry/blob/master/packages/vscode-zipfs/sources/ZipFSProvider.ts
+        if (hasZipExtension(entry.name)) {
+            if (entry.isFile() && yarnFS.isZip(path)) {
+                return new VirtualDirent(entry.name, /* file */ false, path);
+            }
+        }
+        return entry;
+    }
 }
 
 interface WorkspaceFileWatcher extends FileWatcher {
@@ -21,6 +21,7 @@ import {
     SymbolUsageProviderFactory,
 } from './extensibility';
 import { FileSystem, TempFile } from './fileSystem';
+import { FileSystemStats } from './instrumentedFileSystem';
 import { CommandService, WindowService } from './languageServerInterface';
 import { GroupServiceKey, ServiceKey } from './serviceProvider';
 
@@ -44,4 +45,5 @@ export namespace ServiceKeys {
     export const cancellationProvider = new ServiceKey<CancellationProvider>('CancellationProvider');
     export const importResolverFileSystem = new ServiceKey<ImportResolverFileSystem>('ImportResolverFileSystem');
     export const typeshedInfoProvider = new ServiceKey<TypeshedInfoProvider>('TypeshedInfoProvider');
+    export const fileSystemStats = new ServiceKey<FileSystemStats>('FileSystemStats');
 }
@@ -14,6 +14,7 @@ import { CaseSensitivityDetector } from './caseSensitivityDetector';
 import { ConsoleInterface, NullConsole } from './console';
 import { DocStringService, PyrightDocStringService } from './docStringService';
 import { FileSystem, TempFile } from './fileSystem';
+import { FileSystemStats } from './instrumentedFileSystem';
 import { CommandService, WindowService } from './languageServerInterface';
 import { LogTracker } from './logTracker';
 import { ServiceKeys } from './serviceKeys';
@@ -71,6 +72,9 @@ export function createServiceProvider(...services: any): ServiceProvider {
         if (CancellationProvider.is(service)) {
             sp.add(ServiceKeys.cancellationProvider, service);
         }
+        if (FileSystemStats.is(service)) {
+            sp.add(ServiceKeys.fileSystemStats, service);
+        }
     });
     return sp;
 }
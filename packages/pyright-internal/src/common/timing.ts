@@ -77,8 +77,14 @@ export class TimingStats {
     resolveImportsTime = new TimingStat();
     cycleDetectionTime = new TimingStat();
     bindTime = new TimingStat();
+    deferredBindTime = new TimingStat();
     typeCheckerTime = new TimingStat();
     typeEvaluationTime = new TimingStat();
+    interfaceFingerprintTime = new TimingStat();
+
+    // Number of function bodies whose binding was deferred in
+    // declaration-only mode.
+    deferredFunctionBindCount = 0;
 
     printSummary(console: ConsoleInterface) {
         console.info(`Completed in ${this.totalDuration.getDurationInSeconds()}sec`);
@@ -93,7 +99,21 @@ export class TimingStats {
         console.info('Parse:                ' + this.parseFileTime.printTime());
         console.info('Resolve Imports:      ' + this.resolveImportsTime.printTime());
         console.info('Bind:                 ' + this.bindTime.printTime());
+        if (this.deferredFunctionBindCount > 0) {
+            console.info(
+                'Bind (Deferred):      ' +
+                    this.deferredBindTime.printTime() +
+                    ` (${this.deferredBindTime.callCount} of ${this.deferredFunctionBindCount} function bodies)`
+            );
+        }
         console.info('Check:                ' + this.typeCheckerTime.printTime());
+        if (this.interfaceFingerprintTime.callCount > 0) {
+            console.info(
+                'Interface Fingerprint: ' +
+                    this.interfaceFingerprintTime.printTime() +
+                    ` (${this.interfaceFingerprintTime.callCount} files)`
+            );
+        }
         console.info('Detect Cycles:        ' + this.cycleDetectionTime.printTime());
     }
 
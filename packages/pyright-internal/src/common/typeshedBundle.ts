@@ -0,0 +1,185 @@
+/*
+ * typeshedBundle.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Reads and writes the packed form of the bundled typeshed stubs. The
+ * bundle is a single file containing an index of relative paths, offsets
+ * and lengths followed by the contents of every file, so it can be loaded
+ * with one bulk read instead of a stat and read per stub file.
+ *
+ * Layout:
+ *   magic (8 bytes) | index length (uint32 LE) | index (JSON) | file data
+ */
+
+import { FileSystem } from './fileSystem';
+import { Uri } from './uri/uri';
+
+const bundleMagic = 'PYTSHED1';
+const headerLength = bundleMagic.length + 4;
+
+// Name of the file within the typeshed directory that records the typeshed
+// commit. The bundle records the same value so a stale bundle is detected.
+export const typeshedCommitFileName = 'commit.txt';
+
+interface BundleIndex {
+    // Contents of commit.txt when the bundle was created.
+    commit: string | undefined;
+
+    // Relative path (using forward slashes), offset within the file data,
+    // and length of each file.
+    files: [string, number, number][];
+}
+
+interface BundleFile {
+    offset: number;
+    length: number;
+}
+
+export class TypeshedBundle {
+    private readonly _files = new Map<string, BundleFile>();
+
+    // Maps each directory's relative path ('' for the root) to its entries,
+    // each indicating whether it is a file.
+    private readonly _directories = new Map<string, Map<string, boolean>>();
+
+    private constructor(
+        private readonly _buffer: Buffer,
+        private readonly _dataOffset: number,
+        readonly commit: string | undefined,
+        files: [string, number, number][]
+    ) {
+        this._directories.set('', new Map<string, boolean>());
+
+        for (const [relativePath, offset, length] of files) {
+            this._files.set(relativePath, { offset, length });
+            this._addEntry(relativePath, /* isFile */ true);
+        }
+    }
+
+    // Parses a bundle. Returns undefined if the buffer isn't a valid bundle.
+    static fromBuffer(buffer: Buffer): TypeshedBundle | undefined {
+        if (buffer.length < headerLength || buffer.toString('latin1', 0, bundleMagic.length) !== bundleMagic) {
+            return undefined;
+        }
+
+        const indexLength = buffer.readUInt32LE(bundleMagic.length);
+        const dataOffset = headerLength + indexLength;
+        if (dataOffset > buffer.length) {
+            return undefined;
+        }
+
+        try {
+            const index = JSON.parse(buffer.toString('utf8', headerLength, dataOffset)) as BundleIndex;
+            if (!Array.isArray(index?.files)) {
+                return undefined;
+            }
+
+            const dataLength = buffer.length - dataOffset;
+            if (index.files.some(([, offset, length]) => offset < 0 || length < 0 || offset + length > dataLength)) {
+                return undefined;
+            }
+
+            return new TypeshedBundle(buffer, dataOffset, index.commit, index.files);
+        } catch {
+            return undefined;
+        }
+    }
+
+    // Packs the given files into a bundle.
+    static pack(files: Map<string, Buffer>, commit: string | undefined): Buffer {
+        const index: BundleIndex = { commit, files: [] };
+        const contents: Buffer[] = [];
+
+        let offset = 0;
+        const sortedPaths = [...files.keys()].sort();
+        for (const relativePath of sortedPaths) {
+            const content = files.get(relativePath)!;
+            index.files.push([relativePath, offset, content.length]);
+            contents.push(content);
+            offset += content.length;
+        }
+
+        const indexBuffer = Buffer.from(JSON.stringify(index), 'utf8');
+        const header = Buffer.alloc(headerLength);
+        header.write(bundleMagic, 0, 'latin1');
+        header.writeUInt32LE(indexBuffer.length, bundleMagic.length);
+
+        return Buffer.concat([header, indexBuffer, ...contents]);
+    }
+
+    get fileCount() {
+        return this._files.size;
+    }
+
+    isFile(relativePath: string) {
+        return this._files.has(relativePath);
+    }
+
+    isDirectory(relativePath: string) {
+        return this._directories.has(relativePath);
+    }
+
+    getFileSize(relativePath: string): number | undefined {
+        return this._files.get(relativePath)?.length;
+    }
+
+    // Returns the names of the entries in the directory and whether each is
+    // a file, or undefined if the directory doesn't exist.
+    readdir(relativePath: string): ReadonlyMap<string, boolean> | undefined {
+        return this._directories.get(relativePath);
+    }
+
+    // Returns the file contents without copying them.
+    readFile(relativePath: string): Buffer | undefined {
+        const file = this._files.get(relativePath);
+        if (!file) {
+            return undefined;
+        }
+
+        const start = this._dataOffset + file.offset;
+        return this._buffer.subarray(start, start + file.length);
+    }
+
+    private _addEntry(relativePath: string, isFile: boolean) {
+        const separatorIndex = relativePath.lastIndexOf('/');
+        const parentPath = separatorIndex >= 0 ? relativePath.substring(0, separatorIndex) : '';
+        const name = relativePath.substring(separatorIndex + 1);
+
+        let parent = this._directories.get(parentPath);
+        if (!parent) {
+            parent = new Map<string, boolean>();
+            this._directories.set(parentPath, parent);
+            this._addEntry(parentPath, /* isFile */ false);
+        }
+
+        parent.set(name, isFile);
+    }
+}
+
+// Reads all of the files under the typeshed directory so they can be packed.
+// Additional generated files (keyed by relative path) can be included.
+export function collectTypeshedFiles(
+    fs: FileSystem,
+    typeshedRoot: Uri,
+    additionalFiles?: Map<string, Buffer>
+): Map<string, Buffer> {
+    const files = new Map<string, Buffer>();
+
+    const visit = (dirUri: Uri, relativeDir: string) => {
+        for (const entry of fs.readdirEntriesSync(dirUri)) {
+            const relativePath = relativeDir ? `${relativeDir}/${entry.name}` : entry.name;
+            const entryUri = dirUri.combinePaths(entry.name);
+            if (entry.isDirectory()) {
+                visit(entryUri, relativePath);
+            } else if (entry.isFile()) {
+                files.set(relativePath, fs.readFileSync(entryUri));
+            }
+        }
+    };
+
+    visit(typeshedRoot, '');
+
+    additionalFiles?.forEach((content, relativePath) => files.set(relativePath, content));
+    return files;
+}
@@ -0,0 +1,348 @@
+/*
+ * typeshedBundleFileSystem.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * A file system wrapper that serves the bundled typeshed directory from a
+ * packed typeshed bundle when one is shipped alongside it. All other paths,
+ * all paths when there is no usable bundle, and typeshed paths whose loose
+ * copy changed after the bundle was built go to the wrapped file system.
+ */
+
+import type * as fs from 'fs';
+import { Disposable } from 'vscode-jsonrpc';
+
+import { FileSystem, MkDirOptions, Stats, VirtualDirent } from './fileSystem';
+import { FileWatcher, FileWatcherEventHandler } from './fileWatcher';
+import { typeshedBundleFileName, typeshedFallback } from './pathConsts';
+import { TypeshedBundle, typeshedCommitFileName } from './typeshedBundle';
+import { Uri } from './uri/uri';
+
+interface BundleLocation {
+    // The typeshed directory that the bundle stands in for.
+    root: Uri;
+    bundleUri: Uri;
+}
+
+interface LoadedBundle {
+    bundle: TypeshedBundle;
+    mtimeMs: number;
+}
+
+export class TypeshedBundleFileSystem implements FileSystem {
+    // Both are undefined until first needed and null if there is no usable
+    // bundle. The bundle contents are only read once a typeshed path is used.
+    private _location: BundleLocation | null | undefined;
+    private _loaded: LoadedBundle | null | undefined;
+
+    constructor(private readonly _realFS: FileSystem) {}
+
+    existsSync(uri: Uri): boolean {
+        const relativePath = this._getRelativePath(uri);
+        if (relativePath !== undefined) {
+            return this._bundle.isFile(relativePath) || this._bundle.isDirectory(relativePath);
+        }
+
+        return this._realFS.existsSync(uri);
+    }
+
+    mkdirSync(uri: Uri, options?: MkDirOptions): void {
+        this._realFS.mkdirSync(uri, options);
+    }
+
+    chdir(uri: Uri): void {
+        this._realFS.chdir(uri);
+    }
+
+    readdirEntriesSync(uri: Uri): fs.Dirent[] {
+        const relativePath = this._getRelativePath(uri);
+        if (relativePath !== undefined) {
+            return this._readBundleDirectory(uri, relativePath);
+        }
+
+        return this._realFS.readdirEntriesSync(uri);
+    }
+
+    readdirEntries(uri: Uri): Promise<fs.Dirent[]> {
+        const relativePath = this._getRelativePath(uri);
+        if (relativePath !== undefined) {
+            try {
+                return Promise.resolve(this._readBundleDirectory(uri, relativePath));
+            } catch (e) {
+                return Promise.reject(e);
+            }
+        }
+
+        return this._realFS.readdirEntries(uri);
+    }
+
+    readdirSync(uri: Uri): string[] {
+        const relativePath = this._getRelativePath(uri);
+        if (relativePath !== undefined) {
+            return this._readBundleDirectory(uri, relativePath).map((entry) => entry.name);
+        }
+
+        return this._realFS.readdirSync(uri);
+    }
+
+    readFileSync(uri: Uri, encoding?: null): Buffer;
+    readFileSync(uri: Uri, encoding: BufferEncoding): string;
+    readFileSync(uri: Uri, encoding?: BufferEncoding | null): string | Buffer {
+        const relativePath = this._getRelativePath(uri);
+        if (relativePath !== undefined) {
+            const buffer = this._readBundleFile(relativePath);
+            return encoding ? buffer.toString(encoding) : buffer;
+        }
+
+        return this._realFS.readFileSync(uri, encoding as BufferEncoding | null);
+    }
+
+    writeFileSync(uri: Uri, data: string | Buffer, encoding: BufferEncoding | null): void {
+        this._realFS.writeFileSync(uri, data, encoding);
+    }
+
+    statSync(uri: Uri): Stats {
+        const relativePath = this._getRelativePath(uri);
+        if (relativePath !== undefined) {
+            const isFile = this._bundle.isFile(relativePath);
+            if (!isFile && !this._bundle.isDirectory(relativePath)) {
+                throw createNotFoundError(uri);
+            }
+
+            const mtimeMs = this._loaded!.mtimeMs;
+            return {
+                size: this._bundle.getFileSize(relativePath) ?? 0,
+                mtimeMs,
+                ctimeMs: mtimeMs,
+                isFile: () => isFile,
+                isDirectory: () => !isFile,
+                isBlockDevice: () => false,
+                isCharacterDevice: () => false,
+                isSymbolicLink: () => false,
+                isFIFO: () => false,
+                isSocket: () => false,
+            };
+        }
+
+        return this._realFS.statSync(uri);
+    }
+
+    rmdirSync(uri: Uri): void {
+        this._realFS.rmdirSync(uri);
+    }
+
+    unlinkSync(uri: Uri): void {
+        this._realFS.unlinkSync(uri);
+    }
+
+    renameSync(src: Uri, dst: Uri): void {
+        this._realFS.renameSync(src, dst);
+    }
+
+    realpathSync(uri: Uri): Uri {
+        if (this._getRelativePath(uri) !== undefined) {
+            return uri;
+        }
+
+        return this._realFS.realpathSync(uri);
+    }
+
+    getModulePath(): Uri {
+        return this._realFS.getModulePath();
+    }
+
+    createFileSystemWatcher(uris: Uri[], listener: FileWatcherEventHandler): FileWatcher {
+        return this._realFS.createFileSystemWatcher(uris, listener);
+    }
+
+    createReadStream(uri: Uri): fs.ReadStream {
+        return this._realFS.createReadStream(uri);
+    }
+
+    createWriteStream(uri: Uri): fs.WriteStream {
+        return this._realFS.createWriteStream(uri);
+    }
+
+    copyFileSync(src: Uri, dst: Uri): void {
+        this._realFS.copyFileSync(src, dst);
+    }
+
+    readFile(uri: Uri): Promise<Buffer> {
+        const relativePath = this._getRelativePath(uri);
+        if (relativePath !== undefined) {
+            try {
+                return Promise.resolve(this._readBundleFile(relativePath));
+            } catch (e) {
+                return Promise.reject(e);
+            }
+        }
+
+        return this._realFS.readFile(uri);
+    }
+
+    readFileText(uri: Uri, encoding?: BufferEncoding): Promise<string> {
+        const relativePath = this._getRelativePath(uri);
+        if (relativePath !== undefined) {
+            try {
+                return Promise.resolve(this._readBundleFile(relativePath).toString(encoding ?? 'utf8'));
+            } catch (e) {
+                return Promise.reject(e);
+            }
+        }
+
+        return this._realFS.readFileText(uri, encoding);
+    }
+
+    realCasePath(uri: Uri): Uri {
+        if (this._getRelativePath(uri) !== undefined) {
+            return uri;
+        }
+
+        return this._realFS.realCasePath(uri);
+    }
+
+    isMappedUri(uri: Uri): boolean {
+        return this._realFS.isMappedUri(uri);
+    }
+
+    getOriginalUri(mappedUri: Uri): Uri {
+        return this._realFS.getOriginalUri(mappedUri);
+    }
+
+    getMappedUri(originalUri: Uri): Uri {
+        return this._realFS.getMappedUri(originalUri);
+    }
+
+    isInZip(uri: Uri): boolean {
+        return this._realFS.isInZip(uri);
+    }
+
+    mapDirectory(mappedUri: Uri, originalUri: Uri, filter?: (originalUri: Uri, fs: FileSystem) => boolean): Disposable {
+        return this._realFS.mapDirectory(mappedUri, originalUri, filter);
+    }
+
+    private get _bundle() {
+        return this._loaded!.bundle;
+    }
+
+    // Returns the path of the uri relative to the typeshed directory if it
+    // should be served from the bundle.
+    private _getRelativePath(uri: Uri): string | undefined {
+        if (this._location === undefined) {
+            this._location = this._findBundle() ?? null;
+        }
+
+        if (!this._location) {
+            return undefined;
+        }
+
+        const root = this._location.root;
+        if (!uri.equals(root) && !uri.isChild(root)) {
+            return undefined;
+        }
+
+        if (this._loaded === undefined) {
+            this._loaded = this._loadBundle(this._location) ?? null;
+        }
+
+        if (!this._loaded) {
+            return undefined;
+        }
+
+        const relativePath = uri.equals(root) ? '' : root.getRelativePathComponents(uri).join('/');
+        return this._isLooseCopyChanged(uri, relativePath) ? undefined : relativePath;
+    }
+
+    // Local edits to the loose typeshed stubs take precedence over the bundle.
+    // A loose entry is considered changed if it was modified after the bundle
+    // was written or doesn't match the bundle's entry. Adding or removing a
+    // file updates the modification time of its directory.
+    private _isLooseCopyChanged(uri: Uri, relativePath: string) {
+        let stats: Stats;
+        try {
+            stats = this._realFS.statSync(uri);
+        } catch {
+            // Generated files, such as the pre-parsed VERSIONS table, only
+            // exist in the bundle.
+            return false;
+        }
+
+        if (stats.mtimeMs > this._loaded!.mtimeMs) {
+            return true;
+        }
+
+        if (stats.isFile()) {
+            return stats.size !== this._bundle.getFileSize(relativePath);
+        }
+
+        return !stats.isDirectory() || !this._bundle.isDirectory(relativePath);
+    }
+
+    private _findBundle(): BundleLocation | undefined {
+        const moduleDirectory = this._realFS.getModulePath();
+        if (!moduleDirectory || moduleDirectory.isEmpty()) {
+            return undefined;
+        }
+
+        // Look in the same places as the loose typeshed directory, including
+        // one level up for the debug version of Pyright.
+        for (const directory of [moduleDirectory, moduleDirectory.getDirectory()]) {
+            const bundleUri = directory.combinePaths(typeshedBundleFileName);
+            if (this._realFS.existsSync(bundleUri)) {
+                return { root: directory.combinePaths(typeshedFallback), bundleUri };
+            }
+        }
+
+        return undefined;
+    }
+
+    private _loadBundle(location: BundleLocation): LoadedBundle | undefined {
+        try {
+            const mtimeMs = this._realFS.statSync(location.bundleUri).mtimeMs;
+            const bundle = TypeshedBundle.fromBuffer(this._realFS.readFileSync(location.bundleUri));
+            if (bundle && !this._isStale(bundle, location.root)) {
+                return { bundle, mtimeMs };
+            }
+        } catch {
+            // Fall back to the loose typeshed directory.
+        }
+
+        return undefined;
+    }
+
+    // A bundle is stale if the loose typeshed directory it ships with was
+    // updated without regenerating the bundle.
+    private _isStale(bundle: TypeshedBundle, root: Uri) {
+        const commitFile = root.combinePaths(typeshedCommitFileName);
+        if (!this._realFS.existsSync(commitFile)) {
+            return false;
+        }
+
+        return this._realFS.readFileSync(commitFile, 'utf8').trim() !== bundle.commit?.trim();
+    }
+
+    private _readBundleDirectory(uri: Uri, relativePath: string): fs.Dirent[] {
+        const entries = this._bundle.readdir(relativePath);
+        if (!entries) {
+            throw createNotFoundError(uri);
+        }
+
+        const parentPath = uri.getFilePath();
+        return [...entries].map(([name, isFile]) => new VirtualDirent(name, isFile, parentPath));
+    }
+
+    private _readBundleFile(relativePath: string): Buffer {
+        const buffer = this._bundle.readFile(relativePath);
+        if (!buffer) {
+            throw new Error(`ENOENT: no such file in typeshed bundle: '${relativePath}'`);
+        }
+
+        return buffer;
+    }
+}
+
+function createNotFoundError(uri: Uri) {
+    const error: NodeJS.ErrnoException = new Error(`ENOENT: no such file or directory, '${uri.toUserVisibleString()}'`);
+    error.code = 'ENOENT';
+    return error;
+}
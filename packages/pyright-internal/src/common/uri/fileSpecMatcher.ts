@@ -0,0 +1,202 @@
+/*
+ * fileSpecMatcher.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Matches paths against a list of file specs (include, exclude, ignore or
+ * strict globs) at once. The specs are stored in a trie keyed by the path
+ * components of their wildcard roots, so only the specs rooted at ancestors
+ * of a path are considered. Specs without wildcards, "<dir>/**" specs and
+ * "**\/<name>" specs are matched by walking the path components alone, and
+ * the regular expressions of the remaining specs at each trie node are
+ * merged into a single one.
+ */
+
+import { getRegexEscapedSeparator } from '../pathUtils';
+import { Uri } from './uri';
+import { FileSpec, getWildcardRegexPattern } from './uriUtils';
+
+interface SpecTrieNode {
+    children: Map<string, SpecTrieNode>;
+
+    // Set if a spec matches this path and everything below it.
+    matchesAll: boolean;
+
+    // Names of "**/<name>" specs rooted here. Any path component below
+    // this node that has one of these names matches.
+    names: Set<string>;
+
+    // Other specs rooted here and their merged regular expression, which
+    // is created on demand.
+    specs: FileSpec[];
+    regExp?: RegExp | undefined;
+}
+
+// Compiled matchers of the spec lists passed to `FileSpecMatcher.get`.
+const matcherCache = new WeakMap<readonly FileSpec[], FileSpecMatcher>();
+
+export class FileSpecMatcher {
+    private readonly _caseSensitiveTrie = createNode();
+    private readonly _ignoreCaseTrie = createNode();
+    private _specCount = 0;
+    private _lastSpec: FileSpec | undefined;
+
+    constructor(specs: readonly FileSpec[] = []) {
+        specs.forEach((spec) => this.add(spec));
+    }
+
+    // Returns the matcher for a list of specs. The matcher is kept for as
+    // long as the list exists, and specs appended to the list are added to
+    // it. Other changes to the list cause it to be compiled again.
+    static get(specs: readonly FileSpec[]): FileSpecMatcher {
+        let matcher = matcherCache.get(specs);
+        if (!matcher || !matcher._isPrefixOf(specs)) {
+            matcher = new FileSpecMatcher();
+            matcherCache.set(specs, matcher);
+        }
+
+        for (let i = matcher._specCount; i < specs.length; i++) {
+            matcher.add(specs[i]);
+        }
+
+        return matcher;
+    }
+
+    add(spec: FileSpec) {
+        this._specCount++;
+        this._lastSpec = spec;
+
+        const ignoreCase = spec.regExp.ignoreCase;
+        const rootComponents = spec.wildcardRoot.getPathComponents();
+
+        let node = ignoreCase ? this._ignoreCaseTrie : this._caseSensitiveTrie;
+        for (const component of rootComponents) {
+            const key = ignoreCase ? component.toLowerCase() : component;
+            let child = node.children.get(key);
+            if (!child) {
+                child = createNode();
+                node.children.set(key, child);
+            }
+            node = child;
+        }
+
+        // Specs that can't be matched by their path components alone are
+        // matched with their regular expressions.
+        const kind = rootComponents.length > 0 ? getSpecKind(spec) : undefined;
+        if (kind === true) {
+            node.matchesAll = true;
+        } else if (kind !== undefined) {
+            node.names.add(ignoreCase ? kind.toLowerCase() : kind);
+        } else {
+            node.specs.push(spec);
+            node.regExp = undefined;
+        }
+    }
+
+    // Determines whether the uri matches any of the specs. This is the same
+    // as `FileSpec.isInPath` for the specs of the matcher.
+    matches(uri: Uri): boolean {
+        if (this._specCount === 0) {
+            return false;
+        }
+
+        const components = uri.getPathComponents();
+        return (
+            this._matchesTrie(this._caseSensitiveTrie, uri, components, /* ignoreCase */ false) ||
+            this._matchesTrie(this._ignoreCaseTrie, uri, components, /* ignoreCase */ true)
+        );
+    }
+
+    private _isPrefixOf(specs: readonly FileSpec[]) {
+        return (
+            specs.length >= this._specCount && (this._specCount === 0 || specs[this._specCount - 1] === this._lastSpec)
+        );
+    }
+
+    private _matchesTrie(trie: SpecTrieNode, uri: Uri, components: readonly string[], ignoreCase: boolean) {
+        if (trie.children.size === 0 && trie.specs.length === 0) {
+            return false;
+        }
+
+        // The walk continues below the last node of the trie as long as
+        // there are names to look for.
+        const nameSets: Set<string>[] = [];
+        let node: SpecTrieNode | undefined = trie;
+
+        for (let i = 0; i <= components.length; i++) {
+            if (node) {
+                if (node.matchesAll || (node.specs.length > 0 && uri.matchesRegex(getRegExp(node, ignoreCase)))) {
+                    return true;
+                }
+
+                if (node.names.size > 0) {
+                    nameSets.push(node.names);
+                }
+            } else if (nameSets.length === 0) {
+                break;
+            }
+
+            if (i === components.length) {
+                break;
+            }
+
+            const key = ignoreCase ? components[i].toLowerCase() : components[i];
+            if (nameSets.some((names) => names.has(key))) {
+                return true;
+            }
+
+            node = node?.children.get(key);
+        }
+
+        return false;
+    }
+}
+
+function createNode(): SpecTrieNode {
+    return { children: new Map<string, SpecTrieNode>(), matchesAll: false, names: new Set<string>(), specs: [] };
+}
+
+function getRegExp(node: SpecTrieNode, ignoreCase: boolean) {
+    if (!node.regExp) {
+        node.regExp =
+            node.specs.length === 1
+                ? node.specs[0].regExp
+                : new RegExp(
+                      node.specs.map((spec) => `(?:${spec.regExp.source})`).join('|'),
+                      ignoreCase ? 'i' : undefined
+                  );
+    }
+
+    return node.regExp;
+}
+
+// Returns true if the spec matches its wildcard root and everything below
+// it, the name if it is a "**/<name>" spec, or undefined otherwise. The
+// kind is determined by creating the regular expression that the spec
+// would have and comparing it with the one it has.
+function getSpecKind(spec: FileSpec): true | string | undefined {
+    const root = spec.wildcardRoot;
+    const source = spec.regExp.source;
+    const flags = spec.regExp.flags;
+    const separator = getRegexEscapedSeparator('/');
+
+    const createSource = (fileSpec: string) =>
+        new RegExp(`^(${getWildcardRegexPattern(root, fileSpec)})($|${separator})`, flags).source;
+
+    if (source === createSource('.') || source === createSource('**')) {
+        return true;
+    }
+
+    const suffix = ')($|\\/)';
+    if (!source.endsWith(suffix)) {
+        return undefined;
+    }
+
+    const pattern = source.slice(0, source.length - suffix.length);
+    const name = pattern.slice(pattern.lastIndexOf('\\/') + 2).replace(/\\(.)/g, '$1');
+    if (!name || /[*?/\\]/.test(name) || source !== createSource(`**/${name}`)) {
+        return undefined;
+    }
+
+    return name;
+}
@@ -14,7 +14,9 @@ const staticCache = new Map<string, any>();
 // resolution across many extraPaths (monorepos can inject 100+ search roots, each
 // descended a few levels). A smaller cache thrashes: every resolution evicts the
 // previous one's stable prefix Uris, forcing constant re-allocation and GC churn.
-const maxStaticCacheEntries = 8192;
+// File uris are looked up for every search root of every resolution, and with
+// 8192 entries the stable prefixes of large monorepos were still evicted.
+const maxStaticCacheEntries = 32768;
 
 // Caches the results of a getter property.
 export function cacheProperty() {
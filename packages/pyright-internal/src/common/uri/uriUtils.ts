@@ -197,12 +197,19 @@ export function getFileSystemEntries(fs: ReadOnlyFileSystem, uri: Uri): FileSyst
     }
 }
 
+// If the directory's entries were already read (e.g. by an asynchronous
+// prefetch), they can be passed in to avoid reading the directory again.
 export function getFileSystemEntriesWithSymlinkedDirectories(
     fs: ReadOnlyFileSystem,
-    uri: Uri
+    uri: Uri,
+    dirEntries?: Dirent[]
 ): FileSystemEntriesWithSymlinkedDirectories {
     try {
-        return getFileSystemEntriesWithSymlinkedDirectoriesFromDirEntries(fs.readdirEntriesSync(uri), fs, uri);
+        return getFileSystemEntriesWithSymlinkedDirectoriesFromDirEntries(
+            dirEntries ?? fs.readdirEntriesSync(uri),
+            fs,
+            uri
+        );
     } catch (e: any) {
         return { files: [], directories: [], symlinkedDirectories: [] };
     }
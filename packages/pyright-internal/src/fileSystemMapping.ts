@@ -15,6 +15,7 @@ import { tryStat } from './common/uri/uriUtils';
 type FileSystemMappingMethodName =
     | 'existsSync'
     | 'readdirEntriesSync'
+    | 'readdirEntries'
     | 'readFileSync'
     | 'statSync'
     | 'realpathSync'
@@ -122,6 +123,19 @@ class FileSystemMappingImpl implements FileSystemMapping {
         return [...entries.values()];
     }
 
+    readdirEntries(uri: Uri): Promise<fs.Dirent[]> {
+        // Without any mappings, the listing comes straight from the real file system.
+        if (this._data.entryMap.size === 0) {
+            return this._realFS.existsSync(uri) ? this._realFS.readdirEntries(uri) : Promise.resolve([]);
+        }
+
+        try {
+            return Promise.resolve(this.readdirEntriesSync(uri));
+        } catch (e) {
+            return Promise.reject(e);
+        }
+    }
+
     readFileSync(uri: Uri, encoding?: null): Buffer;
     readFileSync(uri: Uri, encoding: BufferEncoding): string;
     readFileSync(uri: Uri, encoding?: BufferEncoding | null): string | Buffer {
@@ -138,6 +138,7 @@ import {
     Workspace,
     WorkspaceFactory,
 } from './workspaceFactory';
+import { DiagnosticResultIds } from './languageService/diagnosticResultIds';
 import { PullDiagnosticsDynamicFeature } from './languageService/pullDiagnosticsDynamicFeature';
 
 const UncomputedDiagnosticsVersion = -1;
@@ -182,6 +183,15 @@ export abstract class LanguageServerBase implements LanguageServerInterface, Dis
     private _workspaceDiagnosticsReporter: ResultProgressReporter<WorkspaceDiagnosticReportPartialResult> | undefined;
     private _workspaceDiagnosticsProgressReporter: ProgressReporter | undefined;
     private _workspaceDiagnosticsResolve: ((value: WorkspaceDiagnosticReport) => void) | undefined;
+
+    // Result IDs of the diagnostics the client has for each file, as far as the pending
+    // workspace diagnostics request is concerned.
+    private readonly _workspaceDiagnosticsResultIds = new Map<string, string>();
+
+    // Result IDs of the diagnostics last published for files that aren't open.
+    private readonly _publishedDiagnosticsResultIds = new Map<string, string>();
+
+    private readonly _diagnosticResultIds = new DiagnosticResultIds();
     protected isDisposed = false;
 
     protected client: ClientCapabilities = {
@@ -310,6 +320,7 @@ export abstract class LanguageServerBase implements LanguageServerInterface, Dis
             libraryReanalysisTimeProvider,
             serviceId,
             fileSystem: services?.fs ?? this.serverOptions.serviceProvider.fs(),
+            prefetchSearchPaths: true,
             onInvalidated: (reason) => {
                 // Don't send requests if the server is disposed.
                 if (this.isDisposed) {
@@ -887,12 +898,16 @@ export abstract class LanguageServerBase implements LanguageServerInterface, Dis
     }
 
     protected async onHover(params: HoverParams, token: CancellationToken) {
+        this.recordUserInteractionTime();
+
         const uri = this.convertLspUriStringToUri(params.textDocument.uri);
         const workspace = await this.getWorkspaceForFile(uri);
         if (workspace.disableLanguageServices) {
             return undefined;
         }
 
+        workspace.service.setActiveFile(uri);
+
         return workspace.service.run((program) => {
             return new HoverProvider(program, uri, params.position, this.client.hoverContentFormat, token).getHover();
         }, token);
@@ -914,6 +929,8 @@ export abstract class LanguageServerBase implements LanguageServerInterface, Dis
         params: SignatureHelpParams,
         token: CancellationToken
     ): Promise<SignatureHelp | undefined | null> {
+        this.recordUserInteractionTime();
+
         const uri = this.convertLspUriStringToUri(params.textDocument.uri);
 
         const workspace = await this.getWorkspaceForFile(uri);
@@ -921,6 +938,8 @@ export abstract class LanguageServerBase implements LanguageServerInterface, Dis
             return;
         }
 
+        workspace.service.setActiveFile(uri);
+
         return workspace.service.run((program) => {
             return new SignatureHelpProvider(
                 program,
@@ -957,12 +976,16 @@ export abstract class LanguageServerBase implements LanguageServerInterface, Dis
     }
 
     protected async onCompletion(params: CompletionParams, token: CancellationToken): Promise<CompletionList | null> {
+        this.recordUserInteractionTime();
+
         const uri = this.convertLspUriStringToUri(params.textDocument.uri);
         const workspace = await this.getWorkspaceForFile(uri);
         if (workspace.disableLanguageServices) {
             return null;
         }
 
+        workspace.service.setActiveFile(uri);
+
         return await workspace.service.run(async (program) => {
             const completions = await new CompletionProvider(
                 program,
@@ -1119,6 +1142,7 @@ export abstract class LanguageServerBase implements LanguageServerInterface, Dis
         const workspaces = await this.getContainingWorkspacesForFile(uri);
         workspaces.forEach((w) => {
             w.service.setFileOpened(uri, params.textDocument.version, params.textDocument.text, ipythonMode);
+            w.service.setActiveFile(uri);
         });
     }
 
@@ -1139,6 +1163,7 @@ export abstract class LanguageServerBase implements LanguageServerInterface, Dis
         // Send this change to all the workspaces that might contain this file.
         const workspaces = await this.getContainingWorkspacesForFile(uri);
         workspaces.forEach((w) => {
+            w.service.setActiveFile(uri);
             w.service.updateOpenFileContents(uri, params.textDocument.version, newContents, ipythonMode);
         });
     }
@@ -1149,6 +1174,8 @@ export abstract class LanguageServerBase implements LanguageServerInterface, Dis
         // Stop tracking the document as open before any async work so that a request handled
         // immediately after this close (e.g. a pull-diagnostics re-pull) observes the file as closed.
         this.openFileMap.delete(uri.key);
+        this._diagnosticResultIds.delete(params.textDocument.uri);
+        this._publishedDiagnosticsResultIds.delete(params.textDocument.uri);
 
         // Send this close to all the workspaces that might contain this file.
         const workspaces = await this.getContainingWorkspacesForFile(uri);
@@ -1166,7 +1193,7 @@ export abstract class LanguageServerBase implements LanguageServerInterface, Dis
             : sourceFile?.getDiagnosticVersion() ?? UncomputedDiagnosticsVersion;
         const result: DocumentDiagnosticReport = {
             kind: 'full',
-            resultId: sourceFile?.getDiagnosticVersion()?.toString(),
+            resultId: undefined,
             items: [],
         };
         if (
@@ -1189,8 +1216,14 @@ export abstract class LanguageServerBase implements LanguageServerInterface, Dis
         this.incrementAnalysisProgress();
 
         try {
+            // If the diagnostics reported last time are still current, there's no need to fetch them.
+            const currentResultId =
+                sourceFile && diagnosticsVersion !== UncomputedDiagnosticsVersion
+                    ? this._diagnosticResultIds.getResultIdForSource(sourceFile, diagnosticsVersion)
+                    : undefined;
+
             // Reanalyze the file if it's not up to date.
-            if (params.previousResultId !== diagnosticsVersion.toString() && sourceFile) {
+            if ((currentResultId === undefined || params.previousResultId !== currentResultId) && sourceFile) {
                 let diagnosticsVersionAfter = UncomputedDiagnosticsVersion - 1; // Just has to be different
                 let serverDiagnostics: AnalyzerDiagnostic[] = [];
 
@@ -1216,17 +1249,27 @@ export abstract class LanguageServerBase implements LanguageServerInterface, Dis
                     (d) => d !== undefined
                 ) as Diagnostic[];
 
+                // The result ID only changes if the diagnostics changed, so the client can
+                // be told to keep the ones it has even if the file was re-analyzed.
                 result.resultId =
                     diagnosticsVersionAfter === UncomputedDiagnosticsVersion
                         ? undefined
-                        : diagnosticsVersionAfter.toString();
-                result.items = lspDiagnostics;
-            } else {
-                (result as any).kind = 'unchanged';
-                result.resultId =
-                    diagnosticsVersion === UncomputedDiagnosticsVersion ? undefined : diagnosticsVersion.toString();
-                delete (result as any).items;
+                        : this._diagnosticResultIds.getResultId(
+                              params.textDocument.uri,
+                              lspDiagnostics,
+                              sourceFile,
+                              diagnosticsVersion
+                          );
+
+                if (result.resultId === undefined || result.resultId !== params.previousResultId) {
+                    result.items = lspDiagnostics;
+                    return result;
+                }
             }
+
+            (result as any).kind = 'unchanged';
+            result.resultId ??= currentResultId;
+            delete (result as any).items;
         } finally {
             this.decrementAnalysisProgress();
         }
@@ -1249,6 +1292,13 @@ export abstract class LanguageServerBase implements LanguageServerInterface, Dis
             ? wrapProgressReporter(workDoneProgress)
             : undefined;
         this._workspaceDiagnosticsReporter = resultReporter;
+
+        // Files whose diagnostics match what the client already has aren't reported again.
+        this._workspaceDiagnosticsResultIds.clear();
+        params.previousResultIds.forEach((previous) => {
+            this._workspaceDiagnosticsResultIds.set(previous.uri, previous.value);
+        });
+
         this.workspaceFactory.getNonDefaultWorkspaces().forEach((workspace) => {
             workspace.service.invalidateAndScheduleReanalysis(InvalidatedReason.Reanalyzed);
         });
@@ -1330,6 +1380,7 @@ export abstract class LanguageServerBase implements LanguageServerInterface, Dis
     protected onShutdown(token: CancellationToken) {
         // Shutdown remaining workspaces.
         this._workspaceDiagnosticsResolve?.({ items: [] });
+        WorkspaceSymbolProvider.saveSymbolIndices(this.workspaceFactory.items());
         this.workspaceFactory.clear();
 
         // Stop tracking all open files.
@@ -1427,6 +1478,8 @@ export abstract class LanguageServerBase implements LanguageServerInterface, Dis
     }
 
     protected onWorkspaceRemoved(workspace: Workspace) {
+        WorkspaceSymbolProvider.saveSymbolIndices([workspace]);
+
         const documentsWithDiagnosticsList = [...this.documentsWithDiagnostics];
         const otherWorkspaces = this.workspaceFactory.items().filter((w) => w !== workspace);
 
@@ -1446,6 +1499,24 @@ export abstract class LanguageServerBase implements LanguageServerInterface, Dis
                 ]);
             }
         }
+
+        // Forget the result IDs of files that only the removed workspace tracks.
+        const isTrackedOnlyByWorkspace = (uri: string) => {
+            const fileUri = this.convertLspUriStringToUri(uri);
+            return workspace.service.isTracked(fileUri) && !otherWorkspaces.some((w) => w.service.isTracked(fileUri));
+        };
+
+        for (const uri of [...this._diagnosticResultIds.uris()]) {
+            if (isTrackedOnlyByWorkspace(uri)) {
+                this._diagnosticResultIds.delete(uri);
+            }
+        }
+
+        for (const uri of [...this._publishedDiagnosticsResultIds.keys()]) {
+            if (isTrackedOnlyByWorkspace(uri)) {
+                this._publishedDiagnosticsResultIds.delete(uri);
+            }
+        }
     }
 
     protected createAnalyzerServiceForWorkspace(
@@ -1514,14 +1585,41 @@ export abstract class LanguageServerBase implements LanguageServerInterface, Dis
             } else {
                 this.documentsWithDiagnostics.add(param.uri);
             }
+
+            const resultId = this._diagnosticResultIds.getResultId(param.uri, param.diagnostics);
+
             // If we're waiting for a pending workspace diagnostic, send a partial result.
             if (this._workspaceDiagnosticsReporter) {
-                // Skip storing previous result ids, just send new results every time.
+                // Files whose diagnostics didn't change since they were last reported are skipped.
+                if (this._workspaceDiagnosticsResultIds.get(param.uri) === resultId) {
+                    continue;
+                }
+
+                this._workspaceDiagnosticsResultIds.set(param.uri, resultId);
                 this._workspaceDiagnosticsReporter.report({
-                    items: [{ ...param, kind: 'full', version: param.version || null, items: param.diagnostics }],
+                    items: [
+                        {
+                            uri: param.uri,
+                            kind: 'full',
+                            resultId,
+                            version: param.version || null,
+                            items: param.diagnostics,
+                        },
+                    ],
                 });
             } else {
-                // Otherwise send a publish diagnostic notification.
+                // Otherwise send a publish diagnostic notification. Diagnostics of open files are
+                // always sent since they are associated with a document version.
+                if (param.version === undefined) {
+                    if (this._publishedDiagnosticsResultIds.get(param.uri) === resultId) {
+                        continue;
+                    }
+
+                    this._publishedDiagnosticsResultIds.set(param.uri, resultId);
+                } else {
+                    this._publishedDiagnosticsResultIds.delete(param.uri);
+                }
+
                 this.connection.sendDiagnostics(param);
             }
         }
@@ -0,0 +1,258 @@
+/*
+ * autoImportSymbolIndex.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * An incrementally maintained index of the symbols that can be offered as
+ * auto-imports. A file's symbols are re-collected only when its module
+ * symbol table changes, and completion requests look up the symbols that
+ * can match the typed word instead of enumerating every module.
+ */
+
+import { isUserCode } from '../analyzer/sourceFileInfoUtils';
+import { SymbolTable } from '../analyzer/symbol';
+import { ProgramView, SourceFileInfo } from '../common/extensibility';
+import {
+    AutoImportSymbol,
+    getAutoImportSymbols,
+    isAutoImportModule,
+    ModuleSymbolMap,
+    ModuleSymbolTable,
+} from './autoImporter';
+
+interface IndexedModule {
+    readonly symbolTable: SymbolTable;
+    readonly isUserCode: boolean;
+    readonly moduleSymbolTable: ModuleSymbolTable;
+    readonly symbols: readonly IndexedSymbol[];
+}
+
+interface IndexedSymbol {
+    readonly moduleKey: string;
+    readonly autoImportSymbol: AutoImportSymbol;
+}
+
+// Indices are kept for the lifetime of the program they are requested for.
+const indicesByProgram = new WeakMap<ProgramView, AutoImportSymbolIndex>();
+
+export class AutoImportSymbolIndex {
+    private readonly _modules = new Map<string, IndexedModule>();
+    private readonly _moduleSymbolMap: ModuleSymbolMap = new Map<string, ModuleSymbolTable>();
+
+    // Symbols keyed by their names, used for exact matches.
+    private readonly _symbolsByName = new Map<string, Set<IndexedSymbol>>();
+
+    // Symbols keyed by a pair of lower-cased characters: the character that
+    // the typed word's first character is compared against, followed by any
+    // character of the name. A fuzzy match contains every character of the
+    // typed word, so only the smallest of the buckets for those characters
+    // needs to be searched.
+    private readonly _symbolsByLeadAndChar = new Map<string, Set<IndexedSymbol>>();
+
+    // Symbols with non-ASCII names. Case folding of those can change the
+    // length of the name, so they are always treated as candidates.
+    private readonly _unindexedSymbols = new Set<IndexedSymbol>();
+
+    static getOrCreate(program: ProgramView) {
+        let index = indicesByProgram.get(program);
+        if (!index) {
+            index = new AutoImportSymbolIndex();
+            indicesByProgram.set(program, index);
+        }
+
+        return index;
+    }
+
+    // Modules that can be offered as auto-imports, keyed by their URI key.
+    get moduleSymbolMap(): ReadonlyMap<string, ModuleSymbolTable> {
+        return this._moduleSymbolMap;
+    }
+
+    // Brings the index up to date with the program's files. Only files whose
+    // module symbol tables changed since they were last indexed are re-indexed.
+    update(program: ProgramView) {
+        const fileKeys = new Set<string>();
+
+        for (const sourceFileInfo of program.getSourceFileInfoList()) {
+            const symbolTable = this._getSymbolTable(program, sourceFileInfo);
+            if (!symbolTable) {
+                continue;
+            }
+
+            const key = sourceFileInfo.uri.key;
+            const isUser = isUserCode(sourceFileInfo);
+            fileKeys.add(key);
+
+            const existing = this._modules.get(key);
+            if (existing && existing.symbolTable === symbolTable && existing.isUserCode === isUser) {
+                continue;
+            }
+
+            this._setModule(key, sourceFileInfo, symbolTable, isUser);
+        }
+
+        if (fileKeys.size !== this._modules.size) {
+            for (const key of [...this._modules.keys()]) {
+                if (!fileKeys.has(key)) {
+                    this._removeModule(key);
+                }
+            }
+        }
+    }
+
+    // Returns the symbols that can match the word, grouped by the URI key of
+    // the module that declares them. The matching rules are the same as the
+    // ones the auto importer uses by default. Returns undefined if the index
+    // can't narrow the search for the word.
+    getCandidates(word: string, similarityLimit: number): Map<string, AutoImportSymbol[]> | undefined {
+        const candidates = new Map<string, AutoImportSymbol[]>();
+
+        if (similarityLimit === 1) {
+            this._symbolsByName.get(word)?.forEach((symbol) => addCandidate(candidates, symbol));
+            return candidates;
+        }
+
+        if (word.length === 0) {
+            return candidates;
+        }
+
+        if (!isAscii(word)) {
+            return undefined;
+        }
+
+        const lead = word[0].toLocaleLowerCase();
+        let bucket: Set<IndexedSymbol> | undefined;
+        for (const char of new Set(word.toLocaleLowerCase())) {
+            const charBucket = this._symbolsByLeadAndChar.get(lead + char);
+            if (!charBucket) {
+                bucket = undefined;
+                break;
+            }
+
+            if (!bucket || charBucket.size < bucket.size) {
+                bucket = charBucket;
+            }
+        }
+
+        bucket?.forEach((symbol) => addCandidate(candidates, symbol));
+        this._unindexedSymbols.forEach((symbol) => addCandidate(candidates, symbol));
+        return candidates;
+    }
+
+    private _getSymbolTable(program: ProgramView, sourceFileInfo: SourceFileInfo) {
+        if (!isAutoImportModule(sourceFileInfo)) {
+            return undefined;
+        }
+
+        return program.getModuleSymbolTable(sourceFileInfo.uri);
+    }
+
+    private _setModule(key: string, sourceFileInfo: SourceFileInfo, symbolTable: SymbolTable, isUser: boolean) {
+        this._removeModule(key);
+
+        const autoImportSymbols = [...getAutoImportSymbols(sourceFileInfo, symbolTable)];
+        const symbols = autoImportSymbols.map((autoImportSymbol) => ({ moduleKey: key, autoImportSymbol }));
+        const moduleSymbolTable: ModuleSymbolTable = {
+            uri: sourceFileInfo.uri,
+            *getSymbols() {
+                yield* autoImportSymbols;
+            },
+        };
+
+        this._modules.set(key, { symbolTable, isUserCode: isUser, moduleSymbolTable, symbols });
+        this._moduleSymbolMap.set(key, moduleSymbolTable);
+
+        symbols.forEach((symbol) => {
+            const name = symbol.autoImportSymbol.name;
+            addToBucket(this._symbolsByName, name, symbol);
+
+            if (!isAscii(name)) {
+                this._unindexedSymbols.add(symbol);
+                return;
+            }
+
+            getBucketKeys(name).forEach((bucketKey) => addToBucket(this._symbolsByLeadAndChar, bucketKey, symbol));
+        });
+    }
+
+    private _removeModule(key: string) {
+        const module = this._modules.get(key);
+        if (!module) {
+            return;
+        }
+
+        this._modules.delete(key);
+        this._moduleSymbolMap.delete(key);
+
+        module.symbols.forEach((symbol) => {
+            const name = symbol.autoImportSymbol.name;
+            removeFromBucket(this._symbolsByName, name, symbol);
+
+            if (!isAscii(name)) {
+                this._unindexedSymbols.delete(symbol);
+                return;
+            }
+
+            getBucketKeys(name).forEach((bucketKey) =>
+                removeFromBucket(this._symbolsByLeadAndChar, bucketKey, symbol)
+            );
+        });
+    }
+}
+
+function getBucketKeys(name: string) {
+    const lowerCaseName = name.toLocaleLowerCase();
+
+    // The typed word's first character is compared against the first
+    // character of the name or, if the name is private and the word isn't,
+    // the character after the underscore.
+    const leads = [lowerCaseName[0]];
+    if (name[0] === '_' && name.length > 1) {
+        leads.push(lowerCaseName[1]);
+    }
+
+    const keys: string[] = [];
+    const chars = new Set(lowerCaseName);
+    for (const lead of leads) {
+        chars.forEach((char) => keys.push(lead + char));
+    }
+
+    return keys;
+}
+
+function addToBucket(buckets: Map<string, Set<IndexedSymbol>>, key: string, symbol: IndexedSymbol) {
+    let bucket = buckets.get(key);
+    if (!bucket) {
+        bucket = new Set<IndexedSymbol>();
+        buckets.set(key, bucket);
+    }
+
+    bucket.add(symbol);
+}
+
+function removeFromBucket(buckets: Map<string, Set<IndexedSymbol>>, key: string, symbol: IndexedSymbol) {
+    const bucket = buckets.get(key);
+    bucket?.delete(symbol);
+    if (bucket?.size === 0) {
+        buckets.delete(key);
+    }
+}
+
+function addCandidate(candidates: Map<string, AutoImportSymbol[]>, symbol: IndexedSymbol) {
+    const symbols = candidates.get(symbol.moduleKey);
+    if (symbols) {
+        symbols.push(symbol.autoImportSymbol);
+    } else {
+        candidates.set(symbol.moduleKey, [symbol.autoImportSymbol]);
+    }
+}
+
+function isAscii(value: string) {
+    for (let i = 0; i < value.length; i++) {
+        if (value.charCodeAt(i) > 0x7f) {
+            return false;
+        }
+    }
+
+    return true;
+}
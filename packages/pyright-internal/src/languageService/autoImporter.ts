@@ -25,7 +25,7 @@ import {
     getTopLevelImports,
 } from '../analyzer/importStatementUtils';
 import { isUserCode } from '../analyzer/sourceFileInfoUtils';
-import { Symbol } from '../analyzer/symbol';
+import { Symbol, SymbolTable } from '../analyzer/symbol';
 import * as SymbolNameUtils from '../analyzer/symbolNameUtils';
 import { isVisibleExternally } from '../analyzer/symbolUtils';
 import { throwIfCancellationRequested } from '../common/cancellationUtils';
@@ -33,6 +33,7 @@ import { appendArray } from '../common/collectionUtils';
 import { ExecutionEnvironment } from '../common/configOptions';
 import { TextEditAction } from '../common/editAction';
 import { ProgramView, SourceFileInfo } from '../common/extensibility';
+import { stubsSuffix } from '../common/pathConsts';
 import { stripFileExtension } from '../common/pathUtils';
 import { convertPositionToOffset } from '../common/positionUtils';
 import * as StringUtils from '../common/stringUtils';
@@ -40,6 +41,7 @@ import { Position } from '../common/textRange';
 import { Uri } from '../common/uri/uri';
 import { ParseNodeType } from '../parser/parseNodes';
 import { ParseFileResults } from '../parser/parser';
+import { AutoImportSymbolIndex } from './autoImportSymbolIndex';
 import { CompletionItemData, CompletionMap } from './completionProvider';
 import { IndexAliasData } from './symbolIndexer';
 import { fromLSPAny } from '../common/lspUtils';
@@ -80,6 +82,10 @@ export interface AutoImportResult {
 export interface AutoImportOptions {
     readonly patternMatcher?: (pattern: string, name: string) => boolean;
     readonly lazyEdit?: boolean;
+
+    // Index used to look up the symbols that can match the typed word
+    // instead of enumerating the symbols of every module.
+    readonly symbolIndex?: AutoImportSymbolIndex;
 }
 
 export interface ImportParts {
@@ -123,9 +129,7 @@ export function buildModuleSymbolsMap(program: ProgramView, files: readonly Sour
     const moduleSymbolMap = new Map<string, ModuleSymbolTable>();
 
     files.forEach((file) => {
-        if (file.shadows.length > 0) {
-            // There is corresponding stub file. Don't add
-            // duplicated files in the map.
+        if (!isAutoImportModule(file)) {
             return;
         }
 
@@ -135,52 +139,9 @@ export function buildModuleSymbolsMap(program: ProgramView, files: readonly Sour
             return;
         }
 
-        const fileName = stripFileExtension(uri.fileName);
-
-        // Don't offer imports from files that are named with private
-        // naming semantics like "_ast.py" unless they're in the current userfile list.
-        if (SymbolNameUtils.isPrivateOrProtectedName(fileName) && !isUserCode(file)) {
-            return;
-        }
-
         moduleSymbolMap.set(uri.key, {
             uri,
-            *getSymbols() {
-                for (const [name, symbol] of symbolTable) {
-                    if (!isVisibleExternally(symbol)) {
-                        continue;
-                    }
-
-                    const declarations = symbol.getDeclarations();
-                    if (!declarations || declarations.length === 0) {
-                        continue;
-                    }
-
-                    const declaration = declarations[0];
-                    if (!declaration) {
-                        continue;
-                    }
-
-                    if (declaration.type === DeclarationType.Alias && isUserCode(file)) {
-                        // We don't include import alias in auto import
-                        // for workspace files.
-                        continue;
-                    }
-
-                    const variableKind =
-                        declaration.type === DeclarationType.Variable && !declaration.isConstant && !declaration.isFinal
-                            ? SymbolKind.Variable
-                            : undefined;
-
-                    yield {
-                        name,
-                        symbol,
-                        kind: variableKind,
-                        library: !isUserCode(file),
-                        inDunderAll: symbol.isInDunderAll(),
-                    };
-                }
-            },
+            getSymbols: () => getAutoImportSymbols(file, symbolTable),
         });
         return;
     });
@@ -188,6 +149,61 @@ export function buildModuleSymbolsMap(program: ProgramView, files: readonly Sour
     return moduleSymbolMap;
 }
 
+// Determines whether symbols of the given file can be offered as auto-imports.
+export function isAutoImportModule(file: SourceFileInfo) {
+    if (file.shadows.length > 0) {
+        // There is corresponding stub file. Don't add
+        // duplicated files in the map.
+        return false;
+    }
+
+    // Don't offer imports from files that are named with private
+    // naming semantics like "_ast.py" unless they're in the current userfile list.
+    const fileName = stripFileExtension(file.uri.fileName);
+    if (SymbolNameUtils.isPrivateOrProtectedName(fileName) && !isUserCode(file)) {
+        return false;
+    }
+
+    return true;
+}
+
+export function* getAutoImportSymbols(file: SourceFileInfo, symbolTable: SymbolTable): Generator<AutoImportSymbol> {
+    for (const [name, symbol] of symbolTable) {
+        if (!isVisibleExternally(symbol)) {
+            continue;
+        }
+
+        const declarations = symbol.getDeclarations();
+        if (!declarations || declarations.length === 0) {
+            continue;
+        }
+
+        const declaration = declarations[0];
+        if (!declaration) {
+            continue;
+        }
+
+        if (declaration.type === DeclarationType.Alias && isUserCode(file)) {
+            // We don't include import alias in auto import
+            // for workspace files.
+            continue;
+        }
+
+        const variableKind =
+            declaration.type === DeclarationType.Variable && !declaration.isConstant && !declaration.isFinal
+                ? SymbolKind.Variable
+                : undefined;
+
+        yield {
+            name,
+            symbol,
+            kind: variableKind,
+            library: !isUserCode(file),
+            inDunderAll: symbol.isInDunderAll(),
+        };
+    }
+}
+
 export class AutoImporter {
     private readonly _importStatements: ImportStatements;
 
@@ -251,9 +267,29 @@ export class AutoImporter {
         results: AutoImportResultMap,
         token: CancellationToken
     ) {
+        // The symbol index can only narrow the search for the default matching rules.
+        const candidates = this.options.patternMatcher
+            ? undefined
+            : this.options.symbolIndex?.getCandidates(word, similarityLimit);
+
         this.moduleSymbolMap.forEach((topLevelSymbols, key) => {
             // See if this file should be offered as an implicit import.
             const uriProperties = this.getUriProperties(this.moduleSymbolMap!, topLevelSymbols.uri);
+
+            if (candidates) {
+                const symbols = candidates.get(key);
+                if (!symbols && !this._mayImportModuleAs(topLevelSymbols.uri, word, similarityLimit, uriProperties)) {
+                    return;
+                }
+
+                topLevelSymbols = {
+                    uri: topLevelSymbols.uri,
+                    *getSymbols() {
+                        yield* symbols ?? [];
+                    },
+                };
+            }
+
             this.processModuleSymbolTable(
                 topLevelSymbols,
                 topLevelSymbols.uri,
@@ -607,6 +643,30 @@ export class AutoImporter {
         }
     }
 
+    // Returns false if the module certainly can't be offered as an implicit
+    // import for the word. The name it would be imported as is the last part
+    // of its module name, which is derived from the file or directory name.
+    private _mayImportModuleAs(
+        moduleUri: Uri,
+        word: string,
+        similarityLimit: number,
+        fileProperties: { isStub: boolean; hasInit: boolean; isUserCode: boolean }
+    ) {
+        if (!fileProperties.isStub && !fileProperties.hasInit && !fileProperties.isUserCode) {
+            return false;
+        }
+
+        let name = stripFileExtension(moduleUri.fileName);
+        if (name === '__init__') {
+            name = moduleUri.getDirectory().fileName;
+            if (name.endsWith(stubsSuffix)) {
+                name = name.substring(0, name.length - stubsSuffix.length);
+            }
+        }
+
+        return this._isSimilar(word, name, similarityLimit);
+    }
+
     private _isSimilar(word: string, name: string, similarityLimit: number) {
         if (similarityLimit === 1) {
             return word === name;
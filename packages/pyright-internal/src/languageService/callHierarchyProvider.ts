@@ -21,7 +21,7 @@ import { Declaration, DeclarationType } from '../analyzer/declaration';
 import * as DeclarationUtils from '../analyzer/declarationUtils';
 import * as ParseTreeUtils from '../analyzer/parseTreeUtils';
 import { ParseTreeWalker } from '../analyzer/parseTreeWalker';
-import { isUserCode } from '../analyzer/sourceFileInfoUtils';
+import { isUserCodeOrOpenByClient } from '../analyzer/sourceFileInfoUtils';
 import { TypeEvaluator } from '../analyzer/typeEvaluatorTypes';
 import { MemberAccessFlags, doForEachSubtype, lookUpClassMember, lookUpObjectMember } from '../analyzer/typeUtils';
 import { ClassType, isClassInstance, isFunction, isInstantiableClass } from '../analyzer/types';
@@ -144,23 +144,24 @@ export class CallHierarchyProvider {
         const { targetDecl, symbolName } = this._getTargetDeclaration(referencesResult);
 
         const items: CallHierarchyIncomingCall[] = [];
+
+        // Calls are matched by name, so only files that contain the name
+        // as an identifier need to be searched.
         const sourceFiles =
             targetDecl.type === DeclarationType.Alias
-                ? [this._program.getSourceFileInfo(this._fileUri)!]
-                : this._program.getSourceFileInfoList();
+                ? [this._program.getSourceFileInfo(this._fileUri)!].filter(isUserCodeOrOpenByClient)
+                : this._program.getSourceFileInfoListForIdentifiers([symbolName], isUserCodeOrOpenByClient);
         for (const curSourceFileInfo of sourceFiles) {
-            if (isUserCode(curSourceFileInfo) || curSourceFileInfo.isOpenByClient) {
-                const filePath = curSourceFileInfo.uri;
-                const itemsToAdd = this._getIncomingCallsForDeclaration(filePath, symbolName, targetDecl);
-
-                if (itemsToAdd) {
-                    appendArray(items, itemsToAdd);
-                }
+            const filePath = curSourceFileInfo.uri;
+            const itemsToAdd = this._getIncomingCallsForDeclaration(filePath, symbolName, targetDecl);
 
-                // This operation can consume significant memory, so check
-                // for situations where we need to discard the type cache.
-                this._program.handleMemoryHighUsage();
+            if (itemsToAdd) {
+                appendArray(items, itemsToAdd);
             }
+
+            // This operation can consume significant memory, so check
+            // for situations where we need to discard the type cache.
+            this._program.handleMemoryHighUsage();
         }
 
         if (items.length === 0) {
@@ -126,7 +126,8 @@ import {
     Token,
     TokenType,
 } from '../parser/tokenizerTypes';
-import { AutoImporter, AutoImportResult, buildModuleSymbolsMap } from './autoImporter';
+import { AutoImporter, AutoImportResult } from './autoImporter';
+import { AutoImportSymbolIndex } from './autoImportSymbolIndex';
 import {
     CompletionDetail,
     detectTrailingOverlap,
@@ -137,6 +138,7 @@ import {
 } from './completionProviderUtils';
 import { DocumentSymbolCollector } from './documentSymbolCollector';
 import { getImportFromTarget, getModuleNameCompletionSuggestions } from './importStatementCandidates';
+import { ClassMemberCompletions, MemberCompletionCache, mergeClassMembers } from './memberCompletionCache';
 import { getAutoImportText, getDocumentationPartsForTypeAndDecl } from './tooltipUtils';
 
 namespace Keywords {
@@ -854,13 +856,25 @@ export class CompletionProvider {
         }
 
         if (primaryDecl) {
-            let itemKind = this._convertDeclarationTypeToItemKind(primaryDecl);
+            // Cached information only applies if the symbol came from the class.
+            const classMembers =
+                detail.classMembers?.symbolTable.get(name) === symbol ? detail.classMembers : undefined;
+
+            let itemKind = classMembers?.itemKinds.get(name);
+            if (itemKind === undefined) {
+                itemKind = this._convertDeclarationTypeToItemKind(primaryDecl);
+
+                // Handle enum members specially. Enum members normally look like
+                // variables, but the are declared using assignment expressions
+                // within an enum class.
+                const isEnumMember = classMembers
+                    ? classMembers.enumMemberNames.has(name)
+                    : this.isEnumMember(detail.boundObjectOrClass, name);
+                if (isEnumMember) {
+                    itemKind = CompletionItemKind.EnumMember;
+                }
 
-            // Handle enum members specially. Enum members normally look like
-            // variables, but the are declared using assignment expressions
-            // within an enum class.
-            if (this.isEnumMember(detail.boundObjectOrClass, name)) {
-                itemKind = CompletionItemKind.EnumMember;
+                classMembers?.itemKinds.set(name, itemKind);
             }
 
             this.addNameToCompletions(detail.autoImportAlias ?? name, itemKind, priorWord, completionMap, {
@@ -909,6 +923,7 @@ export class CompletionProvider {
         doForEachSubtype(leftType, (subtype) => {
             subtype = this.evaluator.makeTopLevelTypeVarsConcrete(subtype);
             let resolvedClassSubtype: ClassType | undefined;
+            let classMembers: ClassMemberCompletions | undefined;
 
             if (isClass(subtype)) {
                 if (preserveEnumMembers && ClassType.isEnumClass(subtype) && TypeBase.isInstance(subtype)) {
@@ -919,32 +934,39 @@ export class CompletionProvider {
                 }
 
                 const instance = TypeBase.isInstance(resolvedClassSubtype);
-                getMembersForClass(resolvedClassSubtype, symbolTable, instance);
-
-                if (ClassType.isEnumClass(resolvedClassSubtype) && instance && !preserveEnumMembers) {
+                classMembers = this._getClassMembers(
+                    resolvedClassSubtype,
+                    instance,
                     // Don't show enum member out of another enum member
                     // ex) Enum.Member. <= shouldn't show `Member` again. This pruning stays separate
                     // from the clone above because the clone only changes which members are enumerated.
                     // Note: when preserveEnumMembers=true, the cloneAsInstantiable above already makes
-                    // instance=false, so this block is independently unreachable. The explicit
+                    // instance=false, so this is independently false. The explicit
                     // !preserveEnumMembers guard is defense-in-depth for clarity.
-                    for (const name of symbolTable.keys()) {
-                        if (this.isEnumMember(resolvedClassSubtype, name)) {
-                            symbolTable.delete(name);
-                        }
-                    }
-                }
+                    /* pruneEnumMembers */ instance && !preserveEnumMembers
+                );
+                mergeClassMembers(classMembers.symbolTable, symbolTable);
             } else if (isModule(subtype)) {
                 getMembersForModule(subtype, symbolTable);
             } else if (isFunctionOrOverloaded(subtype)) {
                 const functionClass = this.evaluator.getBuiltInType(leftExprNode, 'function');
                 if (functionClass && isInstantiableClass(functionClass)) {
-                    getMembersForClass(functionClass, symbolTable, /* includeInstanceVars */ true);
+                    const functionMembers = this._getClassMembers(
+                        functionClass,
+                        /* includeInstanceVars */ true,
+                        /* pruneEnumMembers */ false
+                    );
+                    mergeClassMembers(functionMembers.symbolTable, symbolTable);
                 }
             } else if (isNoneInstance(subtype)) {
                 const objectClass = this.evaluator.getBuiltInType(leftExprNode, 'object');
                 if (objectClass && isInstantiableClass(objectClass)) {
-                    getMembersForClass(objectClass, symbolTable, TypeBase.isInstance(subtype));
+                    const objectMembers = this._getClassMembers(
+                        objectClass,
+                        TypeBase.isInstance(subtype),
+                        /* pruneEnumMembers */ false
+                    );
+                    mergeClassMembers(objectMembers.symbolTable, symbolTable);
                 }
             }
 
@@ -955,7 +977,8 @@ export class CompletionProvider {
                 leftExprNode,
                 /* isInImport */ false,
                 resolvedClassSubtype,
-                completionMap
+                completionMap,
+                classMembers
             );
         });
 
@@ -963,11 +986,13 @@ export class CompletionProvider {
     }
 
     protected createAutoImporter(completionMap: CompletionMap, lazyEdit: boolean) {
-        const currentFile = this.program.getSourceFileInfo(this.fileUri);
-        const moduleSymbolMap = buildModuleSymbolsMap(
-            this.program,
-            this.program.getSourceFileInfoList().filter((s) => s !== currentFile)
-        );
+        // The index only re-collects symbols of files whose symbol tables
+        // changed since the last completion request.
+        const symbolIndex = AutoImportSymbolIndex.getOrCreate(this.program);
+        symbolIndex.update(this.program);
+
+        const moduleSymbolMap = new Map(symbolIndex.moduleSymbolMap);
+        moduleSymbolMap.delete(this.fileUri.key);
 
         return new AutoImporter(
             this.program,
@@ -978,6 +1003,7 @@ export class CompletionProvider {
             moduleSymbolMap,
             {
                 lazyEdit,
+                symbolIndex,
             }
         );
     }
@@ -3814,7 +3840,8 @@ export class CompletionProvider {
         node: ParseNode,
         isInImport: boolean,
         boundObjectOrClass: ClassType | undefined,
-        completionMap: CompletionMap
+        completionMap: CompletionMap,
+        classMembers?: ClassMemberCompletions
     ) {
         const insideTypeAnnotation =
             ParseTreeUtils.isWithinAnnotationComment(node) ||
@@ -3843,6 +3870,7 @@ export class CompletionProvider {
                     this.addSymbol(name, symbol, priorWord, completionMap, {
                         boundObjectOrClass,
                         declaredOnBoundObjectOrClass,
+                        classMembers,
                         funcParensDisabled: isInImport || insideTypeAnnotation || skipForClass || skipForDecorator,
                         extraCommitChars: !isInImport && !!priorWord,
                     });
@@ -3851,6 +3879,43 @@ export class CompletionProvider {
         });
     }
 
+    // Returns the members offered for member access on the class. They are
+    // cached across requests unless a completion item is being resolved, in
+    // which case the symbols need to come from the current evaluation.
+    private _getClassMembers(classType: ClassType, includeInstanceVars: boolean, pruneEnumMembers: boolean) {
+        const create = () => {
+            const symbolTable = new Map<string, Symbol>();
+            getMembersForClass(classType, symbolTable, includeInstanceVars);
+
+            const enumMemberNames = new Set<string>();
+            if (ClassType.isEnumClass(classType)) {
+                for (const name of symbolTable.keys()) {
+                    if (this.isEnumMember(classType, name)) {
+                        enumMemberNames.add(name);
+                    }
+                }
+            }
+
+            if (pruneEnumMembers) {
+                enumMemberNames.forEach((name) => symbolTable.delete(name));
+            }
+
+            return { symbolTable, enumMemberNames };
+        };
+
+        if (this.itemToResolve) {
+            return { ...create(), itemKinds: new Map<string, CompletionItemKind>() };
+        }
+
+        return MemberCompletionCache.getOrCreate(this.program).getClassMembers(
+            classType,
+            `${includeInstanceVars}/${pruneEnumMembers}`,
+            /* includeMetaclass */ !includeInstanceVars,
+            this.evaluator,
+            create
+        );
+    }
+
     private _shouldShowAutoParensForClass(symbol: Symbol, node: ParseNode) {
         if (symbol.getDeclarations().every((d) => d.type !== DeclarationType.Class)) {
             // Not actually a class, so yes show parens.
@@ -27,6 +27,7 @@ import { SignatureDisplayType } from '../common/configOptions';
 import { TextEditAction } from '../common/editAction';
 import { ServiceProvider } from '../common/serviceProvider';
 import { Uri } from '../common/uri/uri';
+import { ClassMemberCompletions } from './memberCompletionCache';
 import { getToolTipForType } from './tooltipUtils';
 
 export interface Edits {
@@ -46,6 +47,9 @@ export interface SymbolDetail extends CommonDetail {
     autoImportAlias?: string;
     boundObjectOrClass?: ClassType;
     declaredOnBoundObjectOrClass?: boolean;
+
+    // Cached information about the members of boundObjectOrClass.
+    classMembers?: ClassMemberCompletions;
 }
 
 export interface CompletionDetail extends CommonDetail {
@@ -0,0 +1,136 @@
+/*
+ * diagnosticResultIds.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Assigns result IDs to the diagnostics reported for each file. A file's
+ * result ID changes only when its diagnostics change, so a client that
+ * already has the latest diagnostics can be sent an "unchanged" report
+ * instead of the full list. Diagnostics are compared by fingerprint, so
+ * they aren't serialized each time they are published.
+ */
+
+import { Diagnostic, Range } from 'vscode-languageserver';
+
+import { areStringFingerprintsEqual, StringFingerprint } from '../common/stringUtils';
+
+interface ResultIdEntry {
+    readonly resultId: string;
+
+    // Fingerprint of the diagnostics, used to detect whether they changed.
+    readonly fingerprint: StringFingerprint;
+}
+
+interface SourceVersion {
+    readonly diagnosticVersion: number;
+    readonly resultId: string;
+}
+
+export class DiagnosticResultIds {
+    private readonly _entries = new Map<string, ResultIdEntry>();
+
+    // Result IDs keyed by the source file the diagnostics came from, so they
+    // can be looked up without fetching the diagnostics again. The key is the
+    // source file object because diagnostic versions restart when a file is
+    // re-created.
+    private readonly _sourceVersions = new WeakMap<object, SourceVersion>();
+    private _nextResultId = 1;
+
+    // Returns the result ID for the file's diagnostics. It is the same as
+    // the one previously returned for the file if the diagnostics are the same.
+    getResultId(
+        uri: string,
+        diagnostics: Diagnostic[],
+        sourceFile?: object | undefined,
+        diagnosticVersion?: number | undefined
+    ): string {
+        const fingerprint = getDiagnosticsFingerprint(diagnostics);
+        const existing = this._entries.get(uri);
+
+        let resultId: string;
+        if (existing && areStringFingerprintsEqual(existing.fingerprint, fingerprint)) {
+            resultId = existing.resultId;
+        } else {
+            resultId = (this._nextResultId++).toString();
+            this._entries.set(uri, { resultId, fingerprint });
+        }
+
+        if (sourceFile && diagnosticVersion !== undefined) {
+            this._sourceVersions.set(sourceFile, { diagnosticVersion, resultId });
+        }
+
+        return resultId;
+    }
+
+    // Returns the result ID of the diagnostics that were computed from the
+    // given diagnostic version of the source file, if any.
+    getResultIdForSource(sourceFile: object, diagnosticVersion: number): string | undefined {
+        const sourceVersion = this._sourceVersions.get(sourceFile);
+        return sourceVersion?.diagnosticVersion === diagnosticVersion ? sourceVersion.resultId : undefined;
+    }
+
+    uris(): IterableIterator<string> {
+        return this._entries.keys();
+    }
+
+    delete(uri: string) {
+        this._entries.delete(uri);
+    }
+}
+
+// Computes a fingerprint of the diagnostics without serializing them. It
+// uses the same two hash components as getStringFingerprint.
+function getDiagnosticsFingerprint(diagnostics: Diagnostic[]): StringFingerprint {
+    let primary = 0;
+    let secondary = 0x811c9dc5;
+
+    const addNumber = (value: number) => {
+        primary = ((primary << 5) - primary + value) | 0;
+        secondary = Math.imul(secondary ^ value, 0x01000193);
+    };
+
+    // The length is included so adjacent strings can't run together.
+    const addString = (value: string | undefined) => {
+        if (value === undefined) {
+            addNumber(-1);
+            return;
+        }
+
+        addNumber(value.length);
+        for (let i = 0; i < value.length; i++) {
+            addNumber(value.charCodeAt(i));
+        }
+    };
+
+    const addRange = (range: Range) => {
+        addNumber(range.start.line);
+        addNumber(range.start.character);
+        addNumber(range.end.line);
+        addNumber(range.end.character);
+    };
+
+    addNumber(diagnostics.length);
+    for (const diagnostic of diagnostics) {
+        addRange(diagnostic.range);
+        addNumber(diagnostic.severity ?? 0);
+        addString(diagnostic.code === undefined ? undefined : `${typeof diagnostic.code}:${diagnostic.code}`);
+        addString(diagnostic.codeDescription?.href);
+        addString(diagnostic.source);
+        addString(diagnostic.message);
+
+        addNumber(diagnostic.tags?.length ?? -1);
+        diagnostic.tags?.forEach((tag) => addNumber(tag));
+
+        addNumber(diagnostic.relatedInformation?.length ?? -1);
+        diagnostic.relatedInformation?.forEach((info) => {
+            addString(info.location.uri);
+            addRange(info.location.range);
+            addString(info.message);
+        });
+
+        // The data is opaque, so it's the only part that is serialized.
+        addString(diagnostic.data === undefined ? undefined : JSON.stringify(diagnostic.data));
+    }
+
+    return { primary, secondary };
+}
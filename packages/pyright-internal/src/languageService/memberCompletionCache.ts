@@ -0,0 +1,195 @@
+/*
+ * memberCompletionCache.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Caches the members offered by member access completions for a class.
+ * Collecting them requires walking the class's MRO and evaluating the
+ * declarations of every member, which is expensive for classes with
+ * hundreds of members. An entry is keyed by the class declaration and is
+ * valid only as long as the declarations of every class in the MRO are
+ * the same, so an edit that re-binds any of them invalidates it.
+ *
+ * Only the members that come from declarations are shared across type
+ * evaluators. Item kinds, enum members and synthesized members, such as
+ * the fields of dataclasses and named tuples, depend on evaluation, so
+ * they are kept per evaluator and are dropped along with it.
+ */
+
+import { CompletionItemKind } from 'vscode-languageserver';
+
+import { Declaration } from '../analyzer/declaration';
+import { SymbolTable } from '../analyzer/symbol';
+import { TypeEvaluator } from '../analyzer/typeEvaluatorTypes';
+import { ClassType, isInstantiableClass } from '../analyzer/types';
+import { ProgramView } from '../common/extensibility';
+
+export interface ClassMemberCompletions {
+    // Members of the class, including inherited members.
+    readonly symbolTable: SymbolTable;
+
+    // Names of the members that are members of an enum class.
+    readonly enumMemberNames: ReadonlySet<string>;
+
+    // Completion item kinds of the members, filled in as they are computed.
+    readonly itemKinds: Map<string, CompletionItemKind>;
+}
+
+interface CacheEntry {
+    readonly variant: string;
+    readonly mroDeclarations: readonly Declaration[];
+
+    // Members of the class if they all come from declarations, so they can
+    // be reused by later evaluators.
+    declaredMembers: SymbolTable | undefined;
+
+    // Members for each evaluator that requested them.
+    readonly evaluatedMembers: WeakMap<TypeEvaluator, ClassMemberCompletions>;
+}
+
+// Caches are kept for the lifetime of the program they are requested for.
+const cachesByProgram = new WeakMap<ProgramView, MemberCompletionCache>();
+
+export class MemberCompletionCache {
+    private readonly _entries = new WeakMap<Declaration, CacheEntry[]>();
+
+    static getOrCreate(program: ProgramView) {
+        let cache = cachesByProgram.get(program);
+        if (!cache) {
+            cache = new MemberCompletionCache();
+            cachesByProgram.set(program, cache);
+        }
+
+        return cache;
+    }
+
+    // Returns the cached members of the class, collecting them first if
+    // they aren't cached or the cached ones are out of date. The variant
+    // distinguishes between the different ways the members are collected.
+    getClassMembers(
+        classType: ClassType,
+        variant: string,
+        includeMetaclass: boolean,
+        evaluator: TypeEvaluator,
+        create: () => Omit<ClassMemberCompletions, 'itemKinds'>
+    ): ClassMemberCompletions {
+        const declaration = classType.shared.declaration;
+        const mroDeclarations = getMroDeclarations(classType, includeMetaclass);
+        if (!declaration || !mroDeclarations) {
+            // Classes without declarations, such as synthesized ones, are
+            // re-created on every evaluation, so they aren't cached.
+            return { ...create(), itemKinds: new Map<string, CompletionItemKind>() };
+        }
+
+        const entry = this._getEntry(declaration, variant, mroDeclarations);
+
+        let members = entry.evaluatedMembers.get(evaluator);
+        if (members) {
+            return members;
+        }
+
+        // Enum members are determined by evaluation, so members of enum
+        // classes are never shared across evaluators.
+        const isEnumClass = ClassType.isEnumClass(classType);
+        if (entry.declaredMembers && !isEnumClass) {
+            members = {
+                symbolTable: entry.declaredMembers,
+                enumMemberNames: new Set<string>(),
+                itemKinds: new Map<string, CompletionItemKind>(),
+            };
+        } else {
+            members = { ...create(), itemKinds: new Map<string, CompletionItemKind>() };
+            entry.declaredMembers =
+                !isEnumClass && isDeclarationDerived(members.symbolTable) ? members.symbolTable : undefined;
+        }
+
+        entry.evaluatedMembers.set(evaluator, members);
+        return members;
+    }
+
+    // Returns the entry for the class declaration and variant, replacing it
+    // if the declarations of the classes in the MRO changed.
+    private _getEntry(declaration: Declaration, variant: string, mroDeclarations: readonly Declaration[]) {
+        let entries = this._entries.get(declaration);
+        const existing = entries?.find((e) => e.variant === variant);
+        if (existing && areSameDeclarations(existing.mroDeclarations, mroDeclarations)) {
+            return existing;
+        }
+
+        const entry: CacheEntry = {
+            variant,
+            mroDeclarations,
+            declaredMembers: undefined,
+            evaluatedMembers: new WeakMap<TypeEvaluator, ClassMemberCompletions>(),
+        };
+
+        if (!entries) {
+            entries = [];
+            this._entries.set(declaration, entries);
+        }
+
+        const index = existing ? entries.indexOf(existing) : -1;
+        if (index >= 0) {
+            entries[index] = entry;
+        } else {
+            entries.push(entry);
+        }
+
+        return entry;
+    }
+}
+
+// Adds cached class members to a symbol table using the same rules as
+// getMembersForClass, so members of several classes can be combined.
+export function mergeClassMembers(members: SymbolTable, symbolTable: SymbolTable) {
+    members.forEach((symbol, name) => {
+        const existingSymbol = symbolTable.get(name);
+
+        if (!existingSymbol) {
+            symbolTable.set(name, symbol);
+        } else if (!existingSymbol.hasTypedDeclarations() && symbol.hasTypedDeclarations()) {
+            // If the existing symbol is unannotated but the class has
+            // an annotation for the symbol, use the annotated one instead.
+            symbolTable.set(name, symbol);
+        }
+    });
+}
+
+// Returns the declarations of the classes in the MRO, or undefined if any
+// of them doesn't have a declaration.
+function getMroDeclarations(classType: ClassType, includeMetaclass: boolean): Declaration[] | undefined {
+    const declarations: Declaration[] = [];
+
+    const mro = [...classType.shared.mro];
+    if (includeMetaclass) {
+        const metaclass = classType.shared.effectiveMetaclass;
+        if (metaclass && isInstantiableClass(metaclass)) {
+            mro.push(...metaclass.shared.mro);
+        }
+    }
+
+    for (const mroClass of mro) {
+        if (!isInstantiableClass(mroClass) || !mroClass.shared.declaration) {
+            return undefined;
+        }
+
+        declarations.push(mroClass.shared.declaration);
+    }
+
+    return declarations;
+}
+
+// Returns true if none of the members were synthesized by the evaluator.
+function isDeclarationDerived(symbolTable: SymbolTable) {
+    for (const symbol of symbolTable.values()) {
+        if (symbol.getSynthesizedType()) {
+            return false;
+        }
+    }
+
+    return true;
+}
+
+function areSameDeclarations(left: readonly Declaration[], right: readonly Declaration[]) {
+    return left.length === right.length && left.every((decl, index) => decl === right[index]);
+}
@@ -429,15 +429,17 @@ export class ReferencesProvider {
 
             grew = false;
 
-            for (const curSourceFileInfo of this._program.getSourceFileInfoList()) {
+            // "Find all references" will only include references from user code unless the file
+            // is explicitly opened in the editor or it is invoked from non user files. Of those, only
+            // files that contain one of the symbol names as an identifier can contain a reference.
+            const candidateFiles = this._program.getSourceFileInfoListForIdentifiers(
+                referencesResult.symbolNames,
+                isCandidateFile
+            );
+
+            for (const curSourceFileInfo of candidateFiles) {
                 throwIfCancellationRequested(this._token);
 
-                // "Find all references" will only include references from user code unless the file
-                // is explicitly opened in the editor or it is invoked from non user files.
-                if (!isCandidateFile(curSourceFileInfo)) {
-                    continue;
-                }
-
                 const fileKey = curSourceFileInfo.uri.key;
 
                 // `referencesResult.declarations.length` is a free, monotonically increasing seed version
@@ -461,15 +463,6 @@ export class ReferencesProvider {
                 // its watermark, so no single file can be matched against two different seed versions.
                 lastWalkedSeedVersion?.set(fileKey, seedVersion);
 
-                // See if the reference symbol's string is located somewhere within the file.
-                // If not, we can skip additional processing for the file.
-                const fileContents = curSourceFileInfo.contents;
-                if (fileContents && !referencesResult.symbolNames.some((s) => fileContents.indexOf(s) >= 0)) {
-                    // No possible match at this seed version; re-examine only after the seed (and thus the
-                    // symbol-name set) grows past the watermark recorded above.
-                    continue;
-                }
-
                 // Per-file delta handle: reuse the same set across passes so the collector treats it as the
                 // previous result and returns only this file's seed-growth additions. Absent when the seed
                 // cannot grow (single walk).
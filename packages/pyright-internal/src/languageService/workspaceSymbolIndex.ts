@@ -0,0 +1,524 @@
+/*
+ * workspaceSymbolIndex.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * An incrementally maintained index of the symbols declared in a program's
+ * user files. Workspace symbol queries are answered from the index, so a
+ * file is parsed and bound only when its contents change. The index can be
+ * persisted so a new session doesn't need to re-index unchanged files.
+ */
+
+import { CancellationToken, SymbolKind } from 'vscode-languageserver';
+
+import { getFileInfo, getInfoReader } from '../analyzer/analyzerNodeInfo';
+import { isUserCode } from '../analyzer/sourceFileInfoUtils';
+import { throwIfCancellationRequested } from '../common/cancellationUtils';
+import { ProgramView, SourceFileInfo } from '../common/extensibility';
+import { FileSystem } from '../common/fileSystem';
+import { hashString, isPatternInSymbol } from '../common/stringUtils';
+import { Range } from '../common/textRange';
+import { Uri } from '../common/uri/uri';
+import { tryStat } from '../common/uri/uriUtils';
+import { IndexSymbolData, SymbolIndexer } from './symbolIndexer';
+
+// Bump this when the on-disk format changes.
+const indexFormatVersion = 1;
+
+// Files that were modified very recently are not persisted because a
+// subsequent change within the file system's timestamp granularity would
+// go unnoticed.
+const racyIntervalMs = 2000;
+
+// Upper bound on the number of files written to disk.
+const maxPersistedFiles = 100000;
+
+// A changed index is written to disk once no queries were made for this
+// long, so serializing it doesn't add to the latency of a query.
+const saveDelayMs = 5000;
+
+export interface WorkspaceSymbolEntry {
+    readonly name: string;
+    readonly kind: SymbolKind;
+    readonly containerName: string | undefined;
+    readonly fileUri: Uri;
+    readonly selectionRange: Range;
+}
+
+interface IndexedFile {
+    symbols: WorkspaceSymbolEntry[];
+
+    // File contents version and client version of the source file when it
+    // was indexed.
+    contentsVersion: number;
+    clientVersion: number | undefined;
+
+    // Modification time and size of the file when it was indexed. The
+    // modification time is undefined if the symbols can't be persisted
+    // because they came from an open editor buffer or a recently modified file.
+    mtimeMs: number | undefined;
+    size: number;
+}
+
+// Name, kind, container name and selection range (start line, start
+// character, end line, end character) of a symbol.
+type PersistedSymbol = [string, SymbolKind, string, number, number, number, number];
+
+interface PersistedFile {
+    // Modification time and size of the file when it was indexed.
+    m: number;
+    s: number;
+
+    // Symbols declared in the file.
+    y: PersistedSymbol[];
+}
+
+interface PersistedIndexFile {
+    version: number;
+    files: { [key: string]: PersistedFile };
+}
+
+// Indices are kept for the lifetime of the owner (typically a service) that
+// they are requested for.
+const indicesByOwner = new WeakMap<object, WorkspaceSymbolIndex>();
+
+export class WorkspaceSymbolIndex {
+    private readonly _files = new Map<string, IndexedFile>();
+
+    // Source files whose indexed symbols are known to match their contents.
+    // Other source files with the same uri and contents version, such as
+    // those created when the program is reset, are validated once.
+    private readonly _validatedFiles = new WeakSet<SourceFileInfo>();
+
+    // Symbols keyed by each lower-cased character of their names. A symbol
+    // that matches a query contains every character of the query, so only
+    // the smallest of the buckets for the query's characters is searched.
+    private readonly _symbolsByChar = new Map<string, Set<WorkspaceSymbolEntry>>();
+
+    // Persisted files that haven't been matched to a source file yet.
+    private readonly _persistedFiles = new Map<string, PersistedFile>();
+    private _isDirty = false;
+    private _saveTimer: any;
+
+    constructor(private readonly _fs: FileSystem, private readonly _cacheFileUri?: Uri | undefined) {
+        this._load();
+    }
+
+    static getOrCreate(owner: object, fs: FileSystem, program: ProgramView) {
+        let index = indicesByOwner.get(owner);
+        if (!index) {
+            const cacheDirectory = program.configOptions.importCacheDirectory;
+            index = new WorkspaceSymbolIndex(
+                fs,
+                cacheDirectory
+                    ? WorkspaceSymbolIndex.getCacheFileUri(cacheDirectory, program.configOptions.projectRoot)
+                    : undefined
+            );
+            indicesByOwner.set(owner, index);
+        }
+
+        return index;
+    }
+
+    static get(owner: object): WorkspaceSymbolIndex | undefined {
+        return indicesByOwner.get(owner);
+    }
+
+    static getCacheFileUri(cacheDirectory: Uri, projectRoot: Uri) {
+        const projectHash = (hashString(projectRoot.key) >>> 0).toString(16);
+        return cacheDirectory.combinePaths(`symbolIndex-${projectHash}.json`);
+    }
+
+    get fileCount() {
+        return this._files.size;
+    }
+
+    // Brings the index up to date with the program's user files. Only files
+    // whose contents changed since they were last indexed are re-indexed.
+    update(program: ProgramView, token: CancellationToken) {
+        const userFileKeys = new Set<string>();
+
+        for (const sourceFileInfo of program.getSourceFileInfoList()) {
+            if (!isUserCode(sourceFileInfo)) {
+                continue;
+            }
+
+            const fileUri = sourceFileInfo.uri;
+            userFileKeys.add(fileUri.key);
+
+            if (this._isIndexed(sourceFileInfo)) {
+                continue;
+            }
+
+            throwIfCancellationRequested(token);
+
+            const isOpen = sourceFileInfo.clientVersion !== undefined;
+            if (isOpen || !this._restoreFile(sourceFileInfo)) {
+                this._indexFile(program, sourceFileInfo, token);
+
+                // Indexing can consume significant memory, so check for
+                // situations where we need to discard the type cache.
+                program.handleMemoryHighUsage();
+            }
+
+            this._validatedFiles.add(sourceFileInfo);
+        }
+
+        if (userFileKeys.size !== this._files.size) {
+            for (const key of [...this._files.keys()]) {
+                if (!userFileKeys.has(key)) {
+                    this._removeFile(key);
+                }
+            }
+        }
+    }
+
+    // Returns the symbols whose names match the query. Symbols whose names
+    // start with the query are returned first, followed by fuzzy matches.
+    search(query: string, token: CancellationToken): WorkspaceSymbolEntry[] {
+        const candidates = this._getCandidates(query);
+        if (!candidates) {
+            return [];
+        }
+
+        const lowerCaseQuery = query.toLocaleLowerCase();
+        const prefixMatches: WorkspaceSymbolEntry[] = [];
+        const fuzzyMatches: WorkspaceSymbolEntry[] = [];
+
+        for (const symbol of candidates) {
+            if (!isPatternInSymbol(query, symbol.name)) {
+                continue;
+            }
+
+            if (symbol.name.toLocaleLowerCase().startsWith(lowerCaseQuery)) {
+                prefixMatches.push(symbol);
+            } else {
+                fuzzyMatches.push(symbol);
+            }
+
+            if ((prefixMatches.length + fuzzyMatches.length) % 1000 === 0) {
+                throwIfCancellationRequested(token);
+            }
+        }
+
+        return prefixMatches.concat(fuzzyMatches);
+    }
+
+    // Writes the index to disk after a delay if persistence is enabled and
+    // the index changed. Each call restarts the delay.
+    scheduleSave() {
+        this._cancelScheduledSave();
+
+        if (!this._cacheFileUri || !this._isDirty) {
+            return;
+        }
+
+        this._saveTimer = setTimeout(() => {
+            this._saveTimer = undefined;
+            this.save();
+        }, saveDelayMs);
+    }
+
+    // Writes the index to disk if persistence is enabled and the index
+    // changed. Returns true if it was written.
+    save(): boolean {
+        this._cancelScheduledSave();
+
+        if (!this._cacheFileUri || !this._isDirty) {
+            return false;
+        }
+
+        const indexFile: PersistedIndexFile = { version: indexFormatVersion, files: {} };
+        let fileCount = 0;
+
+        this._files.forEach((file, key) => {
+            if (file.mtimeMs !== undefined && fileCount < maxPersistedFiles) {
+                indexFile.files[key] = {
+                    m: file.mtimeMs,
+                    s: file.size,
+                    y: file.symbols.map((symbol) => [
+                        symbol.name,
+                        symbol.kind,
+                        symbol.containerName ?? '',
+                        symbol.selectionRange.start.line,
+                        symbol.selectionRange.start.character,
+                        symbol.selectionRange.end.line,
+                        symbol.selectionRange.end.character,
+                    ]),
+                };
+                fileCount++;
+            }
+        });
+
+        // Keep persisted files that this session hasn't seen yet. They are
+        // validated against the file's modification time when they are used.
+        this._persistedFiles.forEach((file, key) => {
+            if (fileCount < maxPersistedFiles && !(key in indexFile.files)) {
+                indexFile.files[key] = file;
+                fileCount++;
+            }
+        });
+
+        try {
+            const cacheDirectory = this._cacheFileUri.getDirectory();
+            if (!this._fs.existsSync(cacheDirectory)) {
+                this._fs.mkdirSync(cacheDirectory, { recursive: true });
+            }
+
+            this._fs.writeFileSync(this._cacheFileUri, JSON.stringify(indexFile), 'utf8');
+            this._isDirty = false;
+            return true;
+        } catch {
+            // The index is an optimization only, so ignore write failures.
+            return false;
+        }
+    }
+
+    // Returns true if the indexed symbols for the source file are current.
+    private _isIndexed(sourceFileInfo: SourceFileInfo) {
+        const indexed = this._files.get(sourceFileInfo.uri.key);
+        if (!indexed || indexed.contentsVersion !== sourceFileInfo.contentsVersion) {
+            return false;
+        }
+
+        if (this._validatedFiles.has(sourceFileInfo)) {
+            return true;
+        }
+
+        // The source file was replaced, for example by a program reset. Its
+        // contents version starts over, so also check that the contents
+        // that were indexed are still the ones in use.
+        if (indexed.clientVersion !== undefined || sourceFileInfo.clientVersion !== undefined) {
+            if (indexed.clientVersion !== sourceFileInfo.clientVersion) {
+                return false;
+            }
+        } else {
+            const stat = tryStat(this._fs, sourceFileInfo.uri);
+            if (indexed.mtimeMs === undefined || stat?.mtimeMs !== indexed.mtimeMs || stat.size !== indexed.size) {
+                return false;
+            }
+        }
+
+        this._validatedFiles.add(sourceFileInfo);
+        return true;
+    }
+
+    private _indexFile(program: ProgramView, sourceFileInfo: SourceFileInfo, token: CancellationToken) {
+        const fileUri = sourceFileInfo.uri;
+        const clientVersion = sourceFileInfo.clientVersion;
+
+        // Record the file's modification time before reading its contents
+        // so a concurrent change invalidates the persisted symbols.
+        const stat = clientVersion !== undefined ? undefined : tryStat(this._fs, fileUri);
+        const mtimeMs = stat && Date.now() - stat.mtimeMs >= racyIntervalMs ? stat.mtimeMs : undefined;
+
+        this._setFile(fileUri.key, {
+            symbols: collectWorkspaceSymbols(program, fileUri, token),
+            contentsVersion: sourceFileInfo.contentsVersion,
+            clientVersion,
+            mtimeMs,
+            size: stat?.size ?? 0,
+        });
+
+        if (mtimeMs !== undefined) {
+            this._isDirty = true;
+        }
+    }
+
+    // Restores the file's symbols from the persisted index if the file
+    // hasn't changed since it was indexed. Returns true if it was restored.
+    private _restoreFile(sourceFileInfo: SourceFileInfo): boolean {
+        const fileUri = sourceFileInfo.uri;
+        const persisted = this._persistedFiles.get(fileUri.key);
+        if (!persisted) {
+            return false;
+        }
+
+        this._persistedFiles.delete(fileUri.key);
+
+        const stat = tryStat(this._fs, fileUri);
+        if (!stat || stat.mtimeMs !== persisted.m || stat.size !== persisted.s) {
+            this._isDirty = true;
+            return false;
+        }
+
+        const symbols = persisted.y.map(([name, kind, containerName, startLine, startChar, endLine, endChar]) => ({
+            name,
+            kind,
+            containerName: containerName || undefined,
+            fileUri,
+            selectionRange: {
+                start: { line: startLine, character: startChar },
+                end: { line: endLine, character: endChar },
+            },
+        }));
+
+        this._setFile(fileUri.key, {
+            symbols,
+            contentsVersion: sourceFileInfo.contentsVersion,
+            clientVersion: undefined,
+            mtimeMs: persisted.m,
+            size: persisted.s,
+        });
+        return true;
+    }
+
+    private _setFile(key: string, file: IndexedFile) {
+        this._removeFile(key);
+
+        this._files.set(key, file);
+        file.symbols.forEach((symbol) => {
+            for (const char of new Set(symbol.name.toLocaleLowerCase())) {
+                let bucket = this._symbolsByChar.get(char);
+                if (!bucket) {
+                    bucket = new Set<WorkspaceSymbolEntry>();
+                    this._symbolsByChar.set(char, bucket);
+                }
+
+                bucket.add(symbol);
+            }
+        });
+    }
+
+    private _removeFile(key: string) {
+        const file = this._files.get(key);
+        if (!file) {
+            return;
+        }
+
+        this._files.delete(key);
+        file.symbols.forEach((symbol) => {
+            for (const char of new Set(symbol.name.toLocaleLowerCase())) {
+                const bucket = this._symbolsByChar.get(char);
+                bucket?.delete(symbol);
+                if (bucket?.size === 0) {
+                    this._symbolsByChar.delete(char);
+                }
+            }
+        });
+
+        if (file.mtimeMs !== undefined) {
+            this._isDirty = true;
+        }
+    }
+
+    // Returns the smallest set of symbols that includes every match for the
+    // query, or undefined if nothing can match.
+    private _getCandidates(query: string): Set<WorkspaceSymbolEntry> | undefined {
+        let candidates: Set<WorkspaceSymbolEntry> | undefined;
+
+        for (const char of query.toLocaleLowerCase()) {
+            const bucket = this._symbolsByChar.get(char);
+            if (!bucket) {
+                return undefined;
+            }
+
+            if (!candidates || bucket.size < candidates.size) {
+                candidates = bucket;
+            }
+        }
+
+        return candidates;
+    }
+
+    private _cancelScheduledSave() {
+        if (this._saveTimer) {
+            clearTimeout(this._saveTimer);
+            this._saveTimer = undefined;
+        }
+    }
+
+    private _load() {
+        if (!this._cacheFileUri) {
+            return;
+        }
+
+        try {
+            if (!this._fs.existsSync(this._cacheFileUri)) {
+                return;
+            }
+
+            const indexFile = JSON.parse(this._fs.readFileSync(this._cacheFileUri, 'utf8')) as PersistedIndexFile;
+            if (indexFile?.version !== indexFormatVersion || typeof indexFile.files !== 'object') {
+                return;
+            }
+
+            Object.keys(indexFile.files).forEach((key) => {
+                const value = indexFile.files[key];
+                if (typeof value?.m === 'number' && typeof value.s === 'number' && Array.isArray(value.y)) {
+                    this._persistedFiles.set(key, value);
+                }
+            });
+        } catch {
+            // A corrupt or unreadable index file is treated as empty.
+            this._persistedFiles.clear();
+        }
+    }
+}
+
+// Returns all of the symbols declared in the file, including nested ones.
+export function collectWorkspaceSymbols(
+    program: ProgramView,
+    fileUri: Uri,
+    token: CancellationToken
+): WorkspaceSymbolEntry[] {
+    const symbols: WorkspaceSymbolEntry[] = [];
+
+    const parseResults = program.getParseResults(fileUri);
+    if (!parseResults) {
+        return symbols;
+    }
+
+    const nodeInfo = getInfoReader(program);
+    const fileInfo = getFileInfo(parseResults.parserOutput.parseTree, nodeInfo);
+    if (!fileInfo) {
+        return symbols;
+    }
+
+    const indexSymbolData = SymbolIndexer.indexSymbols(
+        fileInfo,
+        parseResults,
+        { includeAliases: false },
+        nodeInfo,
+        token
+    );
+    appendWorkspaceSymbolsRecursive(indexSymbolData, fileUri, '', symbols, token);
+
+    return symbols;
+}
+
+function appendWorkspaceSymbolsRecursive(
+    indexSymbolData: IndexSymbolData[] | undefined,
+    fileUri: Uri,
+    container: string,
+    symbols: WorkspaceSymbolEntry[],
+    token: CancellationToken
+) {
+    throwIfCancellationRequested(token);
+
+    if (!indexSymbolData) {
+        return;
+    }
+
+    for (const symbolData of indexSymbolData) {
+        if (symbolData.alias) {
+            continue;
+        }
+
+        symbols.push({
+            name: symbolData.name,
+            kind: symbolData.kind,
+            containerName: container.length ? container : undefined,
+            fileUri,
+            selectionRange: symbolData.selectionRange!,
+        });
+
+        appendWorkspaceSymbolsRecursive(
+            symbolData.children,
+            fileUri,
+            container.length > 0 ? `${container}.${symbolData.name}` : symbolData.name,
+            symbols,
+            token
+        );
+    }
+}
@@ -17,6 +17,7 @@ import { Uri } from '../common/uri/uri';
 import { convertUriToLspUriString } from '../common/uri/uriUtils';
 import { Workspace } from '../workspaceFactory';
 import { IndexSymbolData, SymbolIndexer } from './symbolIndexer';
+import { WorkspaceSymbolIndex } from './workspaceSymbolIndex';
 
 type WorkspaceSymbolCallback = (symbols: SymbolInformation[]) => void;
 
@@ -49,13 +50,26 @@ export class WorkspaceSymbolProvider {
             }
 
             workspace.service.run((program) => {
-                this._reportSymbolsForProgram(program);
+                if (this._usesSymbolIndex()) {
+                    const index = WorkspaceSymbolIndex.getOrCreate(workspace.service, workspace.service.fs, program);
+                    this._reportSymbolsForProgram(program, index);
+                } else {
+                    this._reportSymbolsForDocuments(program);
+                }
             }, this._token);
         }
 
         return this._allSymbols;
     }
 
+    // Writes the symbol indices of the given workspaces to disk if they
+    // changed. Called when the server shuts down or workspaces are removed.
+    static saveSymbolIndices(workspaces: Workspace[]) {
+        for (const workspace of workspaces) {
+            WorkspaceSymbolIndex.get(workspace.service)?.save();
+        }
+    }
+
     protected getSymbolsForDocument(program: ProgramView, fileUri: Uri): SymbolInformation[] {
         const symbolList: SymbolInformation[] = [];
 
@@ -129,14 +143,21 @@ export class WorkspaceSymbolProvider {
         }
     }
 
-    private _reportSymbolsForProgram(program: ProgramView) {
-        // Don't do a search if the query is empty. We'll return
-        // too many results in this case.
+    // The symbol index holds the symbols that the default implementations
+    // of the document hooks produce. If a subclass customizes them, every
+    // document is searched through the hooks instead.
+    private _usesSymbolIndex() {
+        return (
+            this.getSymbolsForDocument === WorkspaceSymbolProvider.prototype.getSymbolsForDocument &&
+            this.appendWorkspaceSymbolsRecursive === WorkspaceSymbolProvider.prototype.appendWorkspaceSymbolsRecursive
+        );
+    }
+
+    private _reportSymbolsForDocuments(program: ProgramView) {
         if (!this._query) {
             return;
         }
 
-        // "Workspace symbols" searches symbols only from user code.
         for (const sourceFileInfo of program.getSourceFileInfoList()) {
             if (!isUserCode(sourceFileInfo)) {
                 continue;
@@ -153,6 +174,43 @@ export class WorkspaceSymbolProvider {
         }
     }
 
+    private _reportSymbolsForProgram(program: ProgramView, index: WorkspaceSymbolIndex) {
+        // Don't do a search if the query is empty. We'll return
+        // too many results in this case.
+        if (!this._query) {
+            return;
+        }
+
+        // "Workspace symbols" searches symbols only from user code. Files
+        // are re-indexed only if they changed since the previous query.
+        // The index is written to disk once queries stop.
+        index.update(program, this._token);
+        index.scheduleSave();
+
+        const symbolList = index.search(this._query, this._token).map((entry) => {
+            const location: Location = {
+                uri: convertUriToLspUriString(program.fileSystem, entry.fileUri),
+                range: entry.selectionRange,
+            };
+
+            const symbolInfo: SymbolInformation = {
+                name: entry.name,
+                kind: entry.kind,
+                location,
+            };
+
+            if (entry.containerName) {
+                symbolInfo.containerName = entry.containerName;
+            }
+
+            return symbolInfo;
+        });
+
+        if (symbolList.length > 0) {
+            this._reporter(symbolList);
+        }
+    }
+
     private _getContainerName(container: string, name: string) {
         if (container.length > 0) {
             return `${container}.${name}`;
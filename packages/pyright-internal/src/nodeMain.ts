@@ -6,17 +6,52 @@
  * Provides the main entrypoint to the server when running in Node.
  */
 
+import * as os from 'os';
+
 import { BackgroundAnalysisRunner } from './backgroundAnalysis';
 import { ServiceProvider } from './common/serviceProvider';
 import { run } from './nodeServer';
 import { PyrightServer } from './server';
 
 export async function main(maxWorkers: number) {
+    const backgroundAnalysisCount = getBackgroundAnalysisCount(process.argv);
+
+    // "--stats" makes the server collect file system statistics, which can
+    // be printed with the "Dump file system stats" development command.
+    const collectFileSystemStats = process.argv.includes('--stats');
+
     await run(
-        (conn) => new PyrightServer(conn, maxWorkers),
+        (conn) =>
+            new PyrightServer(
+                conn,
+                maxWorkers,
+                /* realFileSystem */ undefined,
+                backgroundAnalysisCount,
+                collectFileSystemStats
+            ),
         () => {
             const runner = new BackgroundAnalysisRunner(new ServiceProvider());
             runner.start();
         }
     );
 }
+
+// Returns the number of background analysis workers requested with the
+// "--threads [N]" argument. Like the command-line tool, it uses the number
+// of logical CPUs if the count is omitted.
+function getBackgroundAnalysisCount(args: string[]) {
+    const index = args.findIndex((arg) => arg === '--threads' || arg.startsWith('--threads='));
+    if (index < 0) {
+        return 1;
+    }
+
+    const value = args[index].startsWith('--threads=') ? args[index].substring('--threads='.length) : args[index + 1];
+    const count = parseInt(value ?? '', 10);
+    if (!isNaN(count)) {
+        return Math.max(count, 1);
+    }
+
+    // Going below 4 threads usually doesn't help.
+    const cpuCount = os.cpus().length;
+    return cpuCount < 4 ? 1 : cpuCount;
+}
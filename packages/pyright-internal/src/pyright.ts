@@ -19,9 +19,13 @@ import * as os from 'os';
 
 import { ChildProcess, fork } from 'child_process';
 import { AnalysisResults } from './analyzer/analysis';
-import { PackageTypeReport, TypeKnownStatus } from './analyzer/packageTypeReport';
+import { ModuleTypeStub, PackageStubGenerator, TypeStubTarget } from './analyzer/packageStubGenerator';
+import { PackageTypeBaseline, PackageTypeBaselineDiff } from './analyzer/packageTypeBaseline';
+import { ModuleTypeReport, PackageTypeReport, SymbolInfo, TypeKnownStatus } from './analyzer/packageTypeReport';
+import { PackageTypeReportCache } from './analyzer/packageTypeReportCache';
 import { PackageTypeVerifier } from './analyzer/packageTypeVerifier';
 import { AnalyzerService } from './analyzer/service';
+import { TypeStubManifest } from './analyzer/typeStubManifest';
 import { TypeStubWriter } from './analyzer/typeStubWriter';
 import { maxSourceFileSize } from './analyzer/sourceFile';
 import { SourceFileInfo } from './analyzer/sourceFileInfo';
@@ -34,6 +38,7 @@ import { createDeferred } from './common/deferred';
 import { Diagnostic, DiagnosticCategory, compareDiagnostics } from './common/diagnostic';
 import { FileDiagnostics } from './common/diagnosticSink';
 import { FullAccessHost } from './common/fullAccessHost';
+import { FileSystemStats, InstrumentedFileSystem } from './common/instrumentedFileSystem';
 import { combinePaths, normalizePath } from './common/pathUtils';
 import { PythonVersion } from './common/pythonVersion';
 import { RealTempFile, createFromRealFileSystem } from './common/realFileSystem';
@@ -66,6 +71,7 @@ interface PyrightJsonResults {
     generalDiagnostics: PyrightJsonDiagnostic[];
     summary: PyrightJsonSummary;
     typeCompleteness?: PyrightTypeCompletenessReport;
+    typeCompletenessChanges?: PyrightTypeCompletenessChanges;
 }
 
 // The schema for this object is publicly documented. Do not change it.
@@ -93,6 +99,25 @@ interface PyrightTypeCompletenessReport {
     symbols: PyrightPublicSymbolReport[];
 }
 
+// The schema for this object is publicly documented. Do not change it.
+interface PyrightTypeCompletenessChanges {
+    packageName: string;
+    baselineFile: string;
+    newSymbols: PyrightPublicSymbolReport[];
+    fixedSymbols: PyrightFixedSymbolReport[];
+}
+
+// The schema for this object is publicly documented. Do not change it.
+interface PyrightFixedSymbolReport {
+    category: string;
+    name: string;
+    isExported: boolean;
+    wasTypeAmbiguous: boolean;
+    isTypeKnown: boolean;
+    isTypeAmbiguous: boolean;
+    isRemoved: boolean;
+}
+
 // The schema for this object is publicly documented. Do not change it.
 interface PyrightPublicModuleReport {
     name: string;
@@ -149,7 +174,7 @@ const cancellationNone = Object.freeze({
 
 async function processArgs(): Promise<ExitStatus> {
     const optionDefinitions: OptionDefinition[] = [
-        { name: 'createstub', type: String },
+        { name: 'createstub', type: String, lazyMultiple: true },
         { name: 'dependencies', type: Boolean },
         { name: 'files', type: String, multiple: true, defaultOption: true },
         { name: 'help', alias: 'h', type: Boolean },
@@ -169,10 +194,13 @@ async function processArgs(): Promise<ExitStatus> {
         { name: 'venv-path', type: String },
         { name: 'venvpath', alias: 'v', type: String },
         { name: 'verifytypes', type: String },
+        { name: 'verifytypesbaseline', type: String },
+        { name: 'verifytypescache', type: String },
         { name: 'verbose', type: Boolean },
         { name: 'version', type: Boolean },
         { name: 'warnings', type: Boolean },
         { name: 'watch', alias: 'w', type: Boolean },
+        { name: 'writebaseline', type: Boolean },
     ];
 
     let args: CommandLineOptions;
@@ -201,7 +229,7 @@ async function processArgs(): Promise<ExitStatus> {
     }
 
     for (const [arg, value] of Object.entries(args)) {
-        if (value === null && arg !== 'threads') {
+        if ((value === null || (Array.isArray(value) && value.includes(null))) && arg !== 'threads') {
             console.error(`'${arg}' option requires a value`);
             return ExitStatus.ParameterError;
         }
@@ -218,17 +246,22 @@ async function processArgs(): Promise<ExitStatus> {
     }
 
     if (args.verifytypes !== undefined) {
-        const incompatibleArgs = ['watch', 'stats', 'createstub', 'dependencies', 'skipunannotated', 'threads'];
+        const incompatibleArgs = ['watch', 'stats', 'createstub', 'dependencies', 'skipunannotated'];
         for (const arg of incompatibleArgs) {
             if (args[arg] !== undefined) {
                 console.error(`'verifytypes' option cannot be used with '${arg}' option`);
                 return ExitStatus.ParameterError;
             }
         }
+
+        if (args.writebaseline !== undefined && args.verifytypesbaseline === undefined) {
+            console.error(`'writebaseline' option requires the 'verifytypesbaseline' option`);
+            return ExitStatus.ParameterError;
+        }
     }
 
     if (args.createstub) {
-        const incompatibleArgs = ['watch', 'stats', 'verifytypes', 'dependencies', 'skipunannotated', 'threads'];
+        const incompatibleArgs = ['watch', 'stats', 'verifytypes', 'dependencies', 'skipunannotated'];
         for (const arg of incompatibleArgs) {
             if (args[arg] !== undefined) {
                 console.error(`'createstub' option cannot be used with '${arg}' option`);
@@ -354,7 +387,7 @@ async function processArgs(): Promise<ExitStatus> {
     }
 
     if (args.createstub) {
-        options.languageServerSettings.typeStubTargetImportName = args.createstub;
+        options.languageServerSettings.typeStubTargetImportName = args.createstub[0];
     }
 
     if (args.skipunannotated) {
@@ -397,11 +430,29 @@ async function processArgs(): Promise<ExitStatus> {
     // If using outputjson, redirect all console output to stderr so it doesn't mess
     // up the JSON output, which goes to stdout.
     const output = args.outputjson ? new StderrConsole(logLevel) : new StandardConsole(logLevel);
-    const fileSystem = new PyrightFileSystem(
-        createFromRealFileSystem(tempFile, output, new ChokidarFileWatcherProvider(output))
-    );
+    let realFileSystem = createFromRealFileSystem(tempFile, output, new ChokidarFileWatcherProvider(output));
+
+    // When printing stats, count and time the file system calls so we can
+    // see which search paths are expensive.
+    let fileSystemStats: FileSystemStats | undefined;
+    if (args.stats) {
+        const instrumentedFileSystem = new InstrumentedFileSystem(realFileSystem);
+        fileSystemStats = instrumentedFileSystem.stats;
+        realFileSystem = instrumentedFileSystem;
+    }
 
+    const fileSystem = new PyrightFileSystem(realFileSystem);
     const serviceProvider = createServiceProvider(fileSystem, output, tempFile);
+    if (fileSystemStats) {
+        serviceProvider.add(ServiceKeys.fileSystemStats, fileSystemStats);
+    }
+
+    // Generating stubs for several packages or with --threads uses a
+    // different path, even if the thread count resolves to 1.
+    if (args.createstub && (args.createstub.length > 1 || 'threads' in args)) {
+        const threadCount = 'threads' in args ? getThreadCount(args['threads']) : 1;
+        return createTypeStubs(serviceProvider, options, args.createstub, threadCount, output);
+    }
 
     // The package type verification uses a different path.
     if (args['verifytypes'] !== undefined) {
@@ -411,11 +462,21 @@ async function processArgs(): Promise<ExitStatus> {
             options,
             !!args.outputjson,
             minSeverityLevel,
-            args['ignoreexternal']
+            args['ignoreexternal'],
+            'threads' in args ? getThreadCount(args['threads']) : 1,
+            args['verifytypescache'] ? combinePaths(process.cwd(), normalizePath(args['verifytypescache'])) : undefined,
+            args['verifytypesbaseline']
+                ? combinePaths(process.cwd(), normalizePath(args['verifytypesbaseline']))
+                : undefined,
+            !!args['writebaseline']
         );
-    } else if (args['ignoreexternal'] !== undefined) {
-        console.error(`'--ignoreexternal' is valid only when used with '--verifytypes'`);
-        return ExitStatus.ParameterError;
+    }
+
+    for (const arg of ['ignoreexternal', 'verifytypescache', 'verifytypesbaseline', 'writebaseline']) {
+        if (args[arg] !== undefined) {
+            console.error(`'--${arg}' is valid only when used with '--verifytypes'`);
+            return ExitStatus.ParameterError;
+        }
     }
 
     const watch = args.watch !== undefined;
@@ -431,17 +492,7 @@ async function processArgs(): Promise<ExitStatus> {
     });
 
     if ('threads' in args) {
-        let threadCount = args['threads'];
-
-        // If the thread count was unspecified, use the number of
-        // logical CPUs (i.e. hardware threads). We find empirically
-        // that going below 4 threads usually doesn't help.
-        if (threadCount === null) {
-            threadCount = os.cpus().length;
-            if (threadCount < 4) {
-                threadCount = 1;
-            }
-        }
+        const threadCount = getThreadCount(args['threads']);
 
         if (threadCount > 1) {
             return runMultiThreaded(args, options, threadCount, service, minSeverityLevel, output);
@@ -519,7 +570,7 @@ async function runSingleThreaded(
                 } finally {
                     service.dispose();
                 }
-                console.info(`Type stub was created for '${args.createstub}'`);
+                console.info(`Type stub was created for '${args.createstub[0]}'`);
             } catch (err) {
                 let errMessage = '';
                 if (err instanceof Error) {
@@ -544,6 +595,7 @@ async function runSingleThreaded(
                 // Print the stats details.
                 service.printStats();
                 timingStats.printDetails(console);
+                service.printFileSystemStats(!!args.verbose);
 
                 if (args.verbose) {
                     service.printDetailedAnalysisTimes();
@@ -565,6 +617,7 @@ async function runSingleThreaded(
 
     // This will trigger the analyzer.
     service.setOptions(options);
+    await service.prefetchSearchPaths();
     service.enumerateSourceFiles(0);
 
     return await exitStatus.promise;
@@ -578,11 +631,8 @@ async function runMultiThreaded(
     minSeverityLevel: SeverityLevel,
     output: ConsoleInterface
 ) {
-    const workers: ChildProcess[] = [];
-    const workersShutdown = new Set<ChildProcess>();
     const startTime = Date.now();
     const treatWarningsAsErrors = !!args.warnings;
-    const exitStatus = createDeferred<ExitStatus>();
 
     // Specify that only open files should be checked. This will allow us
     // to control which files are checked by which workers.
@@ -590,6 +640,7 @@ async function runMultiThreaded(
 
     // This will trigger discovery of files in the project.
     service.setOptions(options);
+    await service.prefetchSearchPaths();
     service.enumerateSourceFiles(0);
     const program = service.backgroundAnalysisProgram.program;
 
@@ -599,97 +650,177 @@ async function runMultiThreaded(
     // Don't create more workers than there are files.
     const workerCount = Math.min(maxThreadCount, sourceFilesToAnalyze.length);
 
-    // Split the source files into affinity queues, one for each worker. We assume
-    // that files that are next to each other in the directory hierarchy probably
-    // have more common imports, so we want to analyze them with the same worker
-    // if possible to maximize type cache hits.
-    const affinityQueues: SourceFileInfo[][] = new Array<SourceFileInfo[]>(workerCount);
-    const filesPerAffinityQueue = sourceFilesToAnalyze.length / workerCount;
-
-    for (let i = 0; i < sourceFilesToAnalyze.length; i++) {
-        const affinityIndex = Math.floor(i / filesPerAffinityQueue);
-        if (affinityQueues[affinityIndex] === undefined) {
-            affinityQueues[affinityIndex] = [];
+    output.info(`Found ${sourceFilesToAnalyze.length} files to analyze`);
+    output.info(`Using ${workerCount} threads`);
+
+    let fileDiagnostics: FileDiagnostics[] = [];
+    let configParseErrorOccurred = false;
+
+    try {
+        await runWorkerPool(
+            service.serviceProvider,
+            sourceFilesToAnalyze,
+            workerCount,
+            { action: 'setOptions', data: options },
+            (fileInfo) => ({ action: 'analyzeFile', data: fileInfo.uri.toString() }),
+            {
+                analysisResults: (data) => {
+                    const results = data as AnalysisResults;
+
+                    if (results.fatalErrorOccurred) {
+                        throw new Error(`Fatal error from worker`);
+                    }
+
+                    if (results.configParseErrorOccurred) {
+                        configParseErrorOccurred = true;
+                        throw new Error(`Config file parse error in worker`);
+                    }
+
+                    for (const fileDiag of results.diagnostics) {
+                        fileDiagnostics.push(FileDiagnostics.fromJsonObj(fileDiag));
+                    }
+                },
+            },
+            service.serviceProvider.tryGet(ServiceKeys.fileSystemStats)
+        );
+    } catch (err: any) {
+        if (configParseErrorOccurred) {
+            return ExitStatus.ConfigFileParseError;
         }
 
-        affinityQueues[affinityIndex].push(sourceFilesToAnalyze[i]);
+        output.error(err.message);
+        return ExitStatus.FatalError;
     }
 
-    output.info(`Found ${sourceFilesToAnalyze.length} files to analyze`);
-    output.info(`Using ${workerCount} threads`);
+    const elapsedTime = (Date.now() - startTime) / 1000;
+    let errorCount = 0;
 
-    let fileDiagnostics: FileDiagnostics[] = [];
-    let pendingAnalysisCount = 0;
+    // Sort all file diagnostics by the file URI so
+    // we have a deterministic ordering.
+    fileDiagnostics = fileDiagnostics.sort((a, b) => (a.fileUri.toString() < b.fileUri.toString() ? -1 : 1));
 
-    const sendMessageToWorker = (worker: ChildProcess, message: string, data: any) => {
-        worker.send(JSON.stringify({ action: message, data: data }));
-    };
+    if (args.outputjson) {
+        const report = reportDiagnosticsAsJson(
+            fileDiagnostics,
+            minSeverityLevel,
+            sourceFilesToAnalyze.length,
+            elapsedTime
+        );
+        errorCount += report.errorCount;
+        if (treatWarningsAsErrors) {
+            errorCount += report.warningCount;
+        }
+    } else {
+        printVersion(output);
+        const report = reportDiagnosticsAsText(fileDiagnostics, minSeverityLevel);
+        errorCount += report.errorCount;
+        if (treatWarningsAsErrors) {
+            errorCount += report.warningCount;
+        }
 
-    const analyzeNextFile = (workerIndex: number) => {
-        const worker = workers[workerIndex];
-        let nextFileToAnalyze: SourceFileInfo | undefined;
+        // Print the total time.
+        output.info(`Completed in ${elapsedTime}sec`);
 
-        // Determine the next file to analyze for this worker.
-        for (let i = 0; i < affinityQueues.length; i++) {
-            const affinityIndex = (workerIndex + i) % affinityQueues.length;
-            if (affinityQueues[affinityIndex].length > 0) {
-                nextFileToAnalyze = affinityQueues[affinityIndex].shift()!;
-                break;
-            }
+        if (args.stats) {
+            // The stats include the file system calls made by the workers.
+            service.printFileSystemStats(!!args.verbose);
         }
+    }
 
-        if (nextFileToAnalyze) {
-            // Tell the worker to analyze the next file.
-            const fileUri = nextFileToAnalyze.uri.toString();
+    return errorCount > 0 ? ExitStatus.ErrorsReported : ExitStatus.NoErrors;
+}
 
-            sendMessageToWorker(worker, 'analyzeFile', fileUri);
+interface WorkerMessage {
+    action: string;
+    data: any;
+}
 
-            pendingAnalysisCount++;
-        } else {
-            // Kill the worker since there's nothing left to do.
+// Distributes items across worker processes. Each worker is sent the setup
+// message and is then given one item at a time until there are none left,
+// at which point it's shut down. Each message that a worker sends back is
+// passed to the handler for its action and completes the item the worker
+// was given. If a handler throws, the workers are shut down and the
+// returned promise is rejected. If file system stats are provided, the
+// workers collect their own, which are added to them before the workers
+// are shut down.
+async function runWorkerPool<T>(
+    serviceProvider: ServiceProvider,
+    items: T[],
+    maxThreadCount: number,
+    setupMessage: WorkerMessage,
+    getItemMessage: (item: T) => WorkerMessage,
+    handlers: { [action: string]: (data: any) => void },
+    fileSystemStats?: FileSystemStats
+): Promise<void> {
+    if (items.length === 0) {
+        return;
+    }
+
+    const workers: ChildProcess[] = [];
+    const workersShutdown = new Set<ChildProcess>();
+    const workersFinishing = new Set<ChildProcess>();
+    const result = createDeferred<void>();
+
+    // Don't create more workers than there are items.
+    const workerCount = Math.min(maxThreadCount, items.length);
+
+    // Split the items into affinity queues, one for each worker. We assume
+    // that items that are next to each other (files in the same directory or
+    // modules in the same package) probably have more common imports, so we
+    // want to process them with the same worker if possible to maximize type
+    // cache hits.
+    const affinityQueues: T[][] = Array.from({ length: workerCount }, () => []);
+    const itemsPerAffinityQueue = items.length / workerCount;
+
+    items.forEach((item, i) => {
+        affinityQueues[Math.floor(i / itemsPerAffinityQueue)].push(item);
+    });
+
+    let pendingItemCount = 0;
+
+    const sendMessageToWorker = (worker: ChildProcess, message: WorkerMessage) => {
+        worker.send(JSON.stringify(message));
+    };
+
+    const shutDownWorker = (worker: ChildProcess) => {
+        if (!workersShutdown.has(worker)) {
             workersShutdown.add(worker);
             worker.kill();
+        }
+    };
 
-            if (pendingAnalysisCount === 0) {
-                // If there are no more files to analyze and all pending analysis
-                // is complete, report the results and exit.
-                if (!exitStatus.resolved) {
-                    const elapsedTime = (Date.now() - startTime) / 1000;
-                    let errorCount = 0;
-
-                    // Sort all file diagnostics by the file URI so
-                    // we have a deterministic ordering.
-                    fileDiagnostics = fileDiagnostics.sort((a, b) =>
-                        a.fileUri.toString() < b.fileUri.toString() ? -1 : 1
-                    );
+    const reportFailure = (message: string) => {
+        workers.forEach((worker) => shutDownWorker(worker));
+        result.reject(new Error(message));
+    };
 
-                    if (args.outputjson) {
-                        const report = reportDiagnosticsAsJson(
-                            fileDiagnostics,
-                            minSeverityLevel,
-                            sourceFilesToAnalyze.length,
-                            elapsedTime
-                        );
-                        errorCount += report.errorCount;
-                        if (treatWarningsAsErrors) {
-                            errorCount += report.warningCount;
-                        }
-                    } else {
-                        printVersion(output);
-                        const report = reportDiagnosticsAsText(fileDiagnostics, minSeverityLevel);
-                        errorCount += report.errorCount;
-                        if (treatWarningsAsErrors) {
-                            errorCount += report.warningCount;
-                        }
-
-                        // Print the total time.
-                        output.info(`Completed in ${elapsedTime}sec`);
-                    }
+    const processNextItem = (workerIndex: number) => {
+        const worker = workers[workerIndex];
 
-                    exitStatus.resolve(errorCount > 0 ? ExitStatus.ErrorsReported : ExitStatus.NoErrors);
-                }
+        // Determine the next item for this worker.
+        for (let i = 0; i < affinityQueues.length; i++) {
+            const affinityIndex = (workerIndex + i) % affinityQueues.length;
+            if (affinityQueues[affinityIndex].length > 0) {
+                sendMessageToWorker(worker, getItemMessage(affinityQueues[affinityIndex].shift()!));
+                pendingItemCount++;
+                return;
             }
         }
+
+        // Ask the worker for its file system stats before shutting it down.
+        if (fileSystemStats && !workersFinishing.has(worker)) {
+            workersFinishing.add(worker);
+            sendMessageToWorker(worker, { action: 'getFileSystemStats', data: undefined });
+            pendingItemCount++;
+            return;
+        }
+
+        // Shut down the worker since there's nothing left to do.
+        shutDownWorker(worker);
+
+        if (pendingItemCount === 0 && !result.completed) {
+            result.resolve();
+        }
     };
 
     // Launch worker processes.
@@ -701,60 +832,45 @@ async function runMultiThreaded(
         const worker = fork(mainModulePath, [
             'worker',
             i.toString(),
-            service.serviceProvider.get(ServiceKeys.tempFile).tmpdir().getFilePath(),
+            serviceProvider.get(ServiceKeys.tempFile).tmpdir().getFilePath(),
         ]);
 
         worker.on('message', (message) => {
-            let messageObj: any;
+            // If the result has already been settled, another worker
+            // failed, so we shouldn't continue.
+            if (result.completed) {
+                return;
+            }
+
+            let messageObj: WorkerMessage;
 
             try {
                 messageObj = JSON.parse(message as string);
             } catch {
-                output.error(`Invalid message from worker: ${message}`);
-                exitStatus.resolve(ExitStatus.FatalError);
-            }
-
-            // If the exit status has already been resolved, another thread
-            // generated a fatal error, so we shouldn't continue.
-            if (exitStatus.resolved) {
+                reportFailure(`Invalid message from worker: ${message}`);
                 return;
             }
 
-            switch (messageObj.action) {
-                case 'analysisResults': {
-                    pendingAnalysisCount--;
-                    const results = messageObj.data as AnalysisResults;
-
-                    if (results.fatalErrorOccurred) {
-                        output.error(`Fatal error from worker`);
-                        exitStatus.resolve(ExitStatus.FatalError);
-                        return;
-                    }
-
-                    if (results.configParseErrorOccurred) {
-                        exitStatus.resolve(ExitStatus.ConfigFileParseError);
-                        return;
-                    }
-
-                    for (const fileDiag of results.diagnostics) {
-                        fileDiagnostics.push(FileDiagnostics.fromJsonObj(fileDiag));
-                    }
-
-                    analyzeNextFile(i);
-                    break;
-                }
-
-                default: {
-                    output.error(`Unknown message from worker: ${message}`);
-                    exitStatus.resolve(ExitStatus.FatalError);
-                    break;
+            if (fileSystemStats && messageObj.action === 'fileSystemStats') {
+                fileSystemStats.merge(FileSystemStats.fromJsonObj(messageObj.data));
+            } else if (!Object.prototype.hasOwnProperty.call(handlers, messageObj.action)) {
+                reportFailure(`Unknown message from worker: ${message}`);
+                return;
+            } else {
+                try {
+                    handlers[messageObj.action](messageObj.data);
+                } catch (err: any) {
+                    reportFailure(err instanceof Error ? err.message : String(err));
+                    return;
                 }
             }
+
+            pendingItemCount--;
+            processNextItem(i);
         });
 
         worker.on('error', (err) => {
-            output.error(`Failed to start child process: ${err}`);
-            exitStatus.resolve(ExitStatus.FatalError);
+            reportFailure(`Failed to start child process: ${err}`);
         });
 
         worker.on('exit', (code, signal) => {
@@ -762,18 +878,21 @@ async function runMultiThreaded(
                 return;
             }
 
-            output.error(`Worker process exited unexpectedly: exit code=${code}, signal=${signal}`);
-            exitStatus.resolve(ExitStatus.FatalError);
+            reportFailure(`Worker process exited unexpectedly: exit code=${code}, signal=${signal}`);
         });
 
-        sendMessageToWorker(worker, 'setOptions', options);
+        if (fileSystemStats) {
+            sendMessageToWorker(worker, { action: 'collectFileSystemStats', data: undefined });
+        }
+
+        sendMessageToWorker(worker, setupMessage);
         workers.push(worker);
 
-        // Tell the worker to analyze the next file.
-        analyzeNextFile(i);
+        // Give the worker its first item.
+        processNextItem(i);
     }
 
-    return await exitStatus.promise;
+    return await result.promise;
 }
 
 // This is the message loop for a worker process used used for
@@ -783,11 +902,32 @@ function runWorkerMessageLoop(workerNum: number, tempFolderName: string) {
     let service: AnalyzerService | undefined;
     let fileSystem: PyrightFileSystem | undefined;
     let lastOpenFileUri: Uri | undefined;
+    let verifier: PackageTypeVerifier | undefined;
+    let publicSymbols: Set<string> | undefined;
+    let stubGenerator: PackageStubGenerator | undefined;
+    let typeStubTargets: TypeStubTarget[] | undefined;
+    let fileSystemStats: FileSystemStats | undefined;
 
     const sendMessageToParent = (message: string, data: any) => {
         process.send?.(JSON.stringify({ action: message, data: data }));
     };
 
+    const createServices = (output: ConsoleInterface) => {
+        const tempFile = new RealTempFile(tempFolderName);
+        let realFileSystem = createFromRealFileSystem(tempFile, output, new ChokidarFileWatcherProvider(output));
+        if (fileSystemStats) {
+            realFileSystem = new InstrumentedFileSystem(realFileSystem, fileSystemStats);
+        }
+
+        fileSystem = new PyrightFileSystem(realFileSystem);
+        serviceProvider = createServiceProvider(fileSystem, output, tempFile);
+        if (fileSystemStats) {
+            serviceProvider.add(ServiceKeys.fileSystemStats, fileSystemStats);
+        }
+
+        return serviceProvider;
+    };
+
     process.on('message', (message) => {
         let messageObj: any;
 
@@ -799,12 +939,18 @@ function runWorkerMessageLoop(workerNum: number, tempFolderName: string) {
         }
 
         switch (messageObj.action) {
-            case 'setOptions': {
-                const options = new PyrightCommandLineOptions(process.cwd(), false);
+            case 'collectFileSystemStats': {
+                fileSystemStats = new FileSystemStats();
+                break;
+            }
 
-                Object.keys(messageObj.data).forEach((key) => {
-                    (options as any)[key] = messageObj.data[key];
-                });
+            case 'getFileSystemStats': {
+                sendMessageToParent('fileSystemStats', fileSystemStats?.toJsonObj());
+                break;
+            }
+
+            case 'setOptions': {
+                const options = getCommandLineOptionsFromJson(messageObj.data);
 
                 let logLevel = LogLevel.Error;
                 if (options.configSettings.verboseOutput) {
@@ -812,12 +958,7 @@ function runWorkerMessageLoop(workerNum: number, tempFolderName: string) {
                 }
 
                 const output = new StderrConsole(logLevel);
-                const tempFile = new RealTempFile(tempFolderName);
-                fileSystem = new PyrightFileSystem(
-                    createFromRealFileSystem(tempFile, output, new ChokidarFileWatcherProvider(output))
-                );
-
-                serviceProvider = createServiceProvider(fileSystem, output, tempFile);
+                serviceProvider = createServices(output);
                 service = new AnalyzerService('<default>', serviceProvider, {
                     console: output,
                     hostFactory: () => new FullAccessHost(serviceProvider!),
@@ -866,18 +1007,92 @@ function runWorkerMessageLoop(workerNum: number, tempFolderName: string) {
                 }
                 break;
             }
+
+            case 'setVerifyTypesOptions': {
+                const options = getCommandLineOptionsFromJson(messageObj.data.options);
+                const output = new StderrConsole(LogLevel.Error);
+                serviceProvider = createServices(output);
+                verifier = new PackageTypeVerifier(
+                    serviceProvider,
+                    new FullAccessHost(serviceProvider),
+                    options,
+                    messageObj.data.packageName,
+                    messageObj.data.ignoreExternal
+                );
+                publicSymbols = new Set<string>(messageObj.data.publicSymbols);
+                break;
+            }
+
+            case 'verifyModule': {
+                if (verifier && publicSymbols) {
+                    try {
+                        const moduleReport = verifier.verifyModule(messageObj.data as string, publicSymbols);
+                        sendMessageToParent('moduleTypeReport', ModuleTypeReport.toJsonObj(moduleReport));
+                    } catch (e: any) {
+                        sendMessageToParent('verifyModuleError', e.stack?.toString() ?? e.message ?? String(e));
+                    }
+                }
+                break;
+            }
+
+            case 'setCreateStubOptions': {
+                const options = getCommandLineOptionsFromJson(messageObj.data.options);
+                const output = new StderrConsole(LogLevel.Error);
+                serviceProvider = createServices(output);
+                service = createTypeStubService(serviceProvider, output);
+                service.setOptions(options);
+
+                typeStubTargets = (messageObj.data.targets as any[]).map((target) =>
+                    TypeStubTarget.fromJsonObj(target)
+                );
+                stubGenerator = new PackageStubGenerator(
+                    service.backgroundAnalysisProgram.program,
+                    typeStubTargets.map((target) => target.importName)
+                );
+                break;
+            }
+
+            case 'createStub': {
+                if (stubGenerator && typeStubTargets) {
+                    try {
+                        const stub = stubGenerator.writeModuleStub(
+                            typeStubTargets[messageObj.data.targetIndex],
+                            Uri.fromJsonObj(messageObj.data.moduleUri),
+                            cancellationNone
+                        );
+                        sendMessageToParent('typeStubCreated', ModuleTypeStub.toJsonObj(stub));
+                    } catch (e: any) {
+                        sendMessageToParent('createStubError', e.stack?.toString() ?? e.message ?? String(e));
+                    }
+                }
+                break;
+            }
         }
     });
 }
 
-function verifyPackageTypes(
+function getCommandLineOptionsFromJson(data: any) {
+    const options = new PyrightCommandLineOptions(process.cwd(), false);
+
+    Object.keys(data).forEach((key) => {
+        (options as any)[key] = data[key];
+    });
+
+    return options;
+}
+
+async function verifyPackageTypes(
     serviceProvider: ServiceProvider,
     packageName: string,
     options: PyrightCommandLineOptions,
     outputJson: boolean,
     minSeverityLevel: SeverityLevel,
-    ignoreUnknownTypesFromImports: boolean
-): ExitStatus {
+    ignoreUnknownTypesFromImports: boolean,
+    threadCount: number,
+    cacheDirectory: string | undefined,
+    baselineFile: string | undefined,
+    writeBaseline: boolean
+): Promise<ExitStatus> {
     try {
         const host = new FullAccessHost(serviceProvider);
         const verifier = new PackageTypeVerifier(
@@ -887,9 +1102,79 @@ function verifyPackageTypes(
             packageName,
             ignoreUnknownTypesFromImports
         );
-        const report = verifier.verify();
+
+        const baselineUri = baselineFile ? Uri.file(baselineFile, serviceProvider) : undefined;
+        const baseline =
+            baselineUri && !writeBaseline ? PackageTypeBaseline.read(serviceProvider.fs(), baselineUri) : undefined;
+
+        // Baseline runs verify only the modules that changed since the last run
+        // on the same machine. Unless another directory is given, the module
+        // reports are cached next to the baseline file.
+        const cacheDirectoryUri = cacheDirectory
+            ? Uri.file(cacheDirectory, serviceProvider)
+            : baselineUri?.getDirectory();
+        const cache = cacheDirectoryUri
+            ? new PackageTypeReportCache(
+                  serviceProvider.fs(),
+                  PackageTypeReportCache.getCacheFileUri(cacheDirectoryUri, packageName),
+                  getVersionString()
+              )
+            : undefined;
+
+        let report: PackageTypeReport;
+        if (threadCount > 1 || cache) {
+            // Verify the modules separately so they can be distributed
+            // across workers and their reports cached.
+            report = await verifier.verifyByModule(
+                cache,
+                threadCount > 1
+                    ? (moduleNames, publicSymbols) =>
+                          verifyModulesMultiThreaded(
+                              serviceProvider,
+                              packageName,
+                              options,
+                              ignoreUnknownTypesFromImports,
+                              threadCount,
+                              moduleNames,
+                              publicSymbols
+                          )
+                    : undefined
+            );
+        } else {
+            report = verifier.verify();
+        }
+
+        if (baseline) {
+            const changesReport = buildTypeCompletenessChangesReport(
+                packageName,
+                baselineUri!,
+                report,
+                baseline.diff(report),
+                minSeverityLevel
+            );
+
+            if (outputJson) {
+                console.info(JSON.stringify(changesReport, /* replacer */ undefined, 4));
+            } else {
+                printTypeCompletenessChangesText(changesReport);
+            }
+
+            // Errors that aren't about symbols, such as a package that can't be
+            // resolved, mean that the package wasn't verified against the baseline.
+            return changesReport.typeCompletenessChanges!.newSymbols.length > 0 || changesReport.summary.errorCount > 0
+                ? ExitStatus.ErrorsReported
+                : ExitStatus.NoErrors;
+        }
+
         const jsonReport = buildTypeCompletenessReport(packageName, report, minSeverityLevel);
 
+        if (baselineUri) {
+            PackageTypeBaseline.create(report).write(serviceProvider.fs(), baselineUri);
+            if (!outputJson) {
+                console.info(`Wrote baseline to "${baselineUri.toUserVisibleString()}"`);
+            }
+        }
+
         if (outputJson) {
             console.info(JSON.stringify(jsonReport, /* replacer */ undefined, 4));
         } else {
@@ -908,6 +1193,165 @@ function verifyPackageTypes(
     }
 }
 
+// Verifies the public modules of a package in worker processes and returns
+// their reports in the same order as the modules.
+async function verifyModulesMultiThreaded(
+    serviceProvider: ServiceProvider,
+    packageName: string,
+    options: PyrightCommandLineOptions,
+    ignoreUnknownTypesFromImports: boolean,
+    maxThreadCount: number,
+    moduleNames: string[],
+    publicSymbols: string[]
+): Promise<ModuleTypeReport[]> {
+    const moduleReports = new Map<string, ModuleTypeReport>();
+
+    await runWorkerPool(
+        serviceProvider,
+        moduleNames,
+        maxThreadCount,
+        {
+            action: 'setVerifyTypesOptions',
+            data: { options, packageName, ignoreExternal: ignoreUnknownTypesFromImports, publicSymbols },
+        },
+        (moduleName) => ({ action: 'verifyModule', data: moduleName }),
+        {
+            moduleTypeReport: (data) => {
+                const moduleReport = ModuleTypeReport.fromJsonObj(data);
+                moduleReports.set(moduleReport.moduleName, moduleReport);
+            },
+            verifyModuleError: (data) => {
+                throw new Error(data);
+            },
+        }
+    );
+
+    return moduleNames.map((moduleName) => moduleReports.get(moduleName)!);
+}
+
+// Creates a service that only reads the configuration and resolves imports
+// for stub generation. It doesn't enumerate or check any files.
+function createTypeStubService(serviceProvider: ServiceProvider, output: ConsoleInterface) {
+    return new AnalyzerService('<default>', serviceProvider, {
+        console: output,
+        hostFactory: () => new FullAccessHost(serviceProvider),
+        skipScanningUserFiles: true,
+        shouldRunAnalysis: () => false,
+    });
+}
+
+// Generates the stubs for all modules of the given packages, skipping the
+// stubs that are up to date according to the manifest in the stubs directory.
+async function createTypeStubs(
+    serviceProvider: ServiceProvider,
+    options: PyrightCommandLineOptions,
+    importNames: string[],
+    threadCount: number,
+    output: ConsoleInterface
+): Promise<ExitStatus> {
+    options.languageServerSettings.checkOnlyOpenFiles = true;
+    options.languageServerSettings.typeStubTargetImportName = undefined;
+
+    const service = createTypeStubService(serviceProvider, output);
+
+    try {
+        service.setOptions(options);
+
+        const generator = new PackageStubGenerator(service.backgroundAnalysisProgram.program, importNames);
+        const targets = importNames.map((importName) => generator.getTarget(importName));
+        const settingsKey = generator.getSettingsKey();
+        const manifest = new TypeStubManifest(serviceProvider.fs(), targets[0].stubPath, getVersionString());
+
+        // Each module is identified by the index of its target and its uri.
+        const modules: [number, Uri][] = [];
+        targets.forEach((target, targetIndex) => {
+            target.moduleUris.forEach((moduleUri) => {
+                if (!manifest.isUpToDate(generator.getStubUri(target, moduleUri), settingsKey)) {
+                    modules.push([targetIndex, moduleUri]);
+                }
+            });
+        });
+
+        const onStubCreated = (stub: ModuleTypeStub) => {
+            manifest.setStub(stub.stubUri, stub.dependencies, settingsKey);
+        };
+
+        try {
+            if (threadCount > 1 && modules.length > 1) {
+                await createTypeStubsMultiThreaded(
+                    serviceProvider,
+                    options,
+                    targets,
+                    modules,
+                    threadCount,
+                    onStubCreated
+                );
+            } else {
+                modules.forEach(([targetIndex, moduleUri]) => {
+                    onStubCreated(generator.writeModuleStub(targets[targetIndex], moduleUri, cancellationNone));
+                });
+            }
+        } finally {
+            // Keep the entries of the stubs that were written even if
+            // others failed.
+            manifest.save();
+        }
+
+        const stats = manifest.getStats();
+        console.info(
+            `Type stubs were created for ${stats.misses} modules of ` +
+                `${importNames.map((importName) => `'${importName}'`).join(', ')} ` +
+                `(${stats.hits} were up to date)`
+        );
+        return ExitStatus.NoErrors;
+    } catch (err) {
+        let errMessage = '';
+        if (err instanceof Error) {
+            errMessage = err.message;
+        }
+
+        console.error(`Error occurred when creating type stub: ${errMessage}`);
+        return ExitStatus.FatalError;
+    } finally {
+        service.dispose();
+    }
+}
+
+// Creates the stubs of the given modules in worker processes. Each worker
+// keeps a single program for all of the modules it is given, so typeshed
+// and the modules that many others import are parsed and bound once per
+// worker rather than once per module.
+async function createTypeStubsMultiThreaded(
+    serviceProvider: ServiceProvider,
+    options: PyrightCommandLineOptions,
+    targets: TypeStubTarget[],
+    modules: [number, Uri][],
+    maxThreadCount: number,
+    onStubCreated: (stub: ModuleTypeStub) => void
+): Promise<void> {
+    await runWorkerPool(
+        serviceProvider,
+        modules,
+        maxThreadCount,
+        {
+            action: 'setCreateStubOptions',
+            data: { options, targets: targets.map((target) => TypeStubTarget.toJsonObj(target)) },
+        },
+        ([targetIndex, moduleUri]) => ({
+            action: 'createStub',
+            data: { targetIndex, moduleUri: moduleUri.toJsonObj() },
+        }),
+        {
+            typeStubCreated: (data) => {
+                onStubCreated(ModuleTypeStub.fromJsonObj(data));
+            },
+            createStubError: (data) => {
+                throw new Error(data);
+            },
+        }
+    );
+}
+
 function accumulateReportDiagnosticStats(diag: PyrightJsonDiagnostic, report: PyrightJsonResults) {
     if (diag.severity === 'error') {
         report.summary.errorCount++;
@@ -981,32 +1425,7 @@ function buildTypeCompletenessReport(
 
     // Add the symbols.
     completenessReport.symbols.forEach((symbol) => {
-        const diagnostics: PyrightJsonDiagnostic[] = [];
-
-        // Convert and filter the diagnostics.
-        symbol.diagnostics.forEach((diag) => {
-            const jsonDiag = convertDiagnosticToJson(diag.uri.getFilePath(), diag.diagnostic);
-            if (isDiagnosticIncluded(jsonDiag.severity, minSeverityLevel)) {
-                diagnostics.push(jsonDiag);
-            }
-        });
-
-        const jsonSymbol: PyrightPublicSymbolReport = {
-            category: PackageTypeVerifier.getSymbolCategoryString(symbol.category),
-            name: symbol.fullName,
-            referenceCount: symbol.referenceCount,
-            isExported: symbol.isExported,
-            isTypeKnown: symbol.typeKnownStatus === TypeKnownStatus.Known,
-            isTypeAmbiguous: symbol.typeKnownStatus === TypeKnownStatus.Ambiguous,
-            diagnostics,
-        };
-
-        const alternateNames = completenessReport.alternateSymbolNames.get(symbol.fullName);
-        if (alternateNames) {
-            jsonSymbol.alternateNames = alternateNames;
-        }
-
-        report.typeCompleteness!.symbols.push(jsonSymbol);
+        report.typeCompleteness!.symbols.push(convertSymbolToJson(completenessReport, symbol, minSeverityLevel));
 
         // Accumulate counts for report.
         if (symbol.typeKnownStatus === TypeKnownStatus.Known) {
@@ -1042,6 +1461,137 @@ function buildTypeCompletenessReport(
     return report;
 }
 
+function convertSymbolToJson(
+    completenessReport: PackageTypeReport,
+    symbol: SymbolInfo,
+    minSeverityLevel: SeverityLevel
+): PyrightPublicSymbolReport {
+    const diagnostics: PyrightJsonDiagnostic[] = [];
+
+    // Convert and filter the diagnostics.
+    symbol.diagnostics.forEach((diag) => {
+        const jsonDiag = convertDiagnosticToJson(diag.uri.getFilePath(), diag.diagnostic);
+        if (isDiagnosticIncluded(jsonDiag.severity, minSeverityLevel)) {
+            diagnostics.push(jsonDiag);
+        }
+    });
+
+    const jsonSymbol: PyrightPublicSymbolReport = {
+        category: PackageTypeVerifier.getSymbolCategoryString(symbol.category),
+        name: symbol.fullName,
+        referenceCount: symbol.referenceCount,
+        isExported: symbol.isExported,
+        isTypeKnown: symbol.typeKnownStatus === TypeKnownStatus.Known,
+        isTypeAmbiguous: symbol.typeKnownStatus === TypeKnownStatus.Ambiguous,
+        diagnostics,
+    };
+
+    const alternateNames = completenessReport.alternateSymbolNames.get(symbol.fullName);
+    if (alternateNames) {
+        jsonSymbol.alternateNames = alternateNames;
+    }
+
+    return jsonSymbol;
+}
+
+// Builds a report of only the symbols whose type completeness changed
+// since the baseline.
+function buildTypeCompletenessChangesReport(
+    packageName: string,
+    baselineUri: Uri,
+    completenessReport: PackageTypeReport,
+    diff: PackageTypeBaselineDiff,
+    minSeverityLevel: SeverityLevel
+): PyrightJsonResults {
+    const report: PyrightJsonResults = {
+        version: getVersionString(),
+        time: Date.now().toString(),
+        generalDiagnostics: [],
+        summary: {
+            filesAnalyzed: completenessReport.modules.size,
+            errorCount: 0,
+            warningCount: 0,
+            informationCount: 0,
+            timeInSec: timingStats.getTotalDuration(),
+        },
+        typeCompletenessChanges: {
+            packageName,
+            baselineFile: baselineUri.getFilePath(),
+            newSymbols: [],
+            fixedSymbols: [],
+        },
+    };
+
+    // Add the general diagnostics.
+    completenessReport.generalDiagnostics.forEach((diag) => {
+        const jsonDiag = convertDiagnosticToJson('', diag);
+        if (isDiagnosticIncluded(jsonDiag.severity, minSeverityLevel)) {
+            report.generalDiagnostics.push(jsonDiag);
+        }
+        accumulateReportDiagnosticStats(jsonDiag, report);
+    });
+
+    diff.newFindings.forEach((symbol) => {
+        const jsonSymbol = convertSymbolToJson(completenessReport, symbol, minSeverityLevel);
+        jsonSymbol.diagnostics.forEach((diag) => {
+            accumulateReportDiagnosticStats(diag, report);
+        });
+
+        report.typeCompletenessChanges!.newSymbols.push(jsonSymbol);
+    });
+
+    diff.fixedFindings.forEach((finding) => {
+        report.typeCompletenessChanges!.fixedSymbols.push({
+            category: PackageTypeVerifier.getSymbolCategoryString(finding.category),
+            name: finding.fullName,
+            isExported: finding.isExported,
+            wasTypeAmbiguous: finding.baselineStatus === TypeKnownStatus.Ambiguous,
+            isTypeKnown: finding.currentStatus === TypeKnownStatus.Known,
+            isTypeAmbiguous: finding.currentStatus === TypeKnownStatus.Ambiguous,
+            isRemoved: finding.currentStatus === undefined,
+        });
+    });
+
+    return report;
+}
+
+function printTypeCompletenessChangesText(results: PyrightJsonResults) {
+    const changesReport = results.typeCompletenessChanges!;
+
+    console.info(`Module name: "${changesReport.packageName}"`);
+    console.info(`Baseline file: "${changesReport.baselineFile}"`);
+
+    // Print all the general diagnostics.
+    results.generalDiagnostics.forEach((diag) => {
+        logDiagnosticToConsole(diag);
+    });
+
+    console.info('');
+    console.info(`Symbols whose types are less complete than in the baseline: ${changesReport.newSymbols.length}`);
+    changesReport.newSymbols.forEach((symbol) => {
+        console.info(`${symbol.name}`);
+        symbol.diagnostics.forEach((diag) => {
+            logDiagnosticToConsole(diag);
+        });
+    });
+
+    console.info('');
+    console.info(`Symbols whose types are more complete than in the baseline: ${changesReport.fixedSymbols.length}`);
+    changesReport.fixedSymbols.forEach((symbol) => {
+        const status = symbol.isRemoved
+            ? 'no longer referenced'
+            : symbol.isTypeKnown
+            ? 'type is known'
+            : symbol.isTypeAmbiguous
+            ? 'type is ambiguous'
+            : 'type is partially unknown';
+        console.info(`   ${symbol.name} (${status})`);
+    });
+
+    console.info('');
+    console.info(`Completed in ${results.summary.timeInSec}sec`);
+}
+
 function printTypeCompletenessReportText(results: PyrightJsonResults, verboseOutput: boolean) {
     const completenessReport = results.typeCompleteness!;
 
@@ -1169,9 +1719,12 @@ function printUsage() {
             '  -v,--venvpath <DIRECTORY>          Directory that contains virtual environments\n' +
             '  --verbose                          Emit verbose diagnostics\n' +
             '  --verifytypes <PACKAGE>            Verify type completeness of a py.typed package\n' +
+            '  --verifytypesbaseline <FILE>       Report only type completeness changes since this baseline\n' +
+            '  --verifytypescache <DIRECTORY>     Reuse --verifytypes results of unchanged modules\n' +
             '  --version                          Print Pyright version and exit\n' +
             '  --warnings                         Use exit code of 1 if warnings are reported\n' +
             '  -w,--watch                         Continue to run and watch for changes\n' +
+            '  --writebaseline                    Write the --verifytypesbaseline file from the current results\n' +
             '  -                                  Read files from stdin\n'
     );
 }
@@ -1363,6 +1916,18 @@ function logDiagnosticToConsole(diag: PyrightJsonDiagnostic, prefix = '  ') {
     console.info(message);
 }
 
+function getThreadCount(threadsArgValue: number | null): number {
+    // If the thread count was unspecified, use the number of
+    // logical CPUs (i.e. hardware threads). We find empirically
+    // that going below 4 threads usually doesn't help.
+    if (threadsArgValue === null) {
+        const threadCount = os.cpus().length;
+        return threadCount < 4 ? 1 : threadCount;
+    }
+
+    return threadsArgValue;
+}
+
 function parseThreadsArgValue(input: string | null): any {
     if (input === null || input === 'auto') {
         return null;
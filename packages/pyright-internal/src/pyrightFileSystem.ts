@@ -39,6 +39,10 @@ export class PyrightFileSystem extends ReadOnlyAugmentedFileSystem implements IP
         this.realFS.unlinkSync(this.getOriginalUri(uri));
     }
 
+    override renameSync(src: Uri, dst: Uri): void {
+        this.realFS.renameSync(this.getOriginalUri(src), this.getOriginalUri(dst));
+    }
+
     override createWriteStream(uri: Uri): fs.WriteStream {
         return this.realFS.createWriteStream(this.getOriginalUri(uri));
     }
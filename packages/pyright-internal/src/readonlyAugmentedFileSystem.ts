@@ -38,6 +38,10 @@ export class ReadOnlyAugmentedFileSystem implements FileSystem {
         return this._mapping.readdirEntriesSync(uri);
     }
 
+    readdirEntries(uri: Uri): Promise<fs.Dirent[]> {
+        return this._mapping.readdirEntries(uri);
+    }
+
     readdirSync(uri: Uri): string[] {
         return this.readdirEntriesSync(uri).map((p) => p.name);
     }
@@ -67,6 +71,10 @@ export class ReadOnlyAugmentedFileSystem implements FileSystem {
         throw new Error('Operation is not allowed.');
     }
 
+    renameSync(src: Uri, dst: Uri): void {
+        throw new Error('Operation is not allowed.');
+    }
+
     realpathSync(uri: Uri): Uri {
         return this._mapping.realpathSync(uri);
     }
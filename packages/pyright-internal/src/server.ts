@@ -21,6 +21,7 @@ import { ImportResolver } from './analyzer/importResolver';
 import { isPythonBinary } from './analyzer/pythonPathUtils';
 import { BackgroundAnalysis } from './backgroundAnalysis';
 import { IBackgroundAnalysis } from './backgroundAnalysisBase';
+import { BackgroundAnalysisPool } from './backgroundAnalysisPool';
 import { CommandController } from './commands/commandController';
 import { getCancellationFolderName } from './common/cancellationUtils';
 import { ConfigOptions, SignatureDisplayType } from './common/configOptions';
@@ -31,9 +32,11 @@ import { FileBasedCancellationProvider } from './common/fileBasedCancellationUti
 import { FileSystem } from './common/fileSystem';
 import { FullAccessHost } from './common/fullAccessHost';
 import { Host } from './common/host';
+import { FileSystemStats, InstrumentedFileSystem } from './common/instrumentedFileSystem';
 import { ServerSettings } from './common/languageServerInterface';
 import { ProgressReporter } from './common/progressReporter';
 import { RealTempFile, WorkspaceFileWatcherProvider, createFromRealFileSystem } from './common/realFileSystem';
+import { ServiceKeys } from './common/serviceKeys';
 import { ServiceProvider } from './common/serviceProvider';
 import { createServiceProvider } from './common/serviceProviderExtensions';
 import { Uri } from './common/uri/uri';
@@ -48,17 +51,39 @@ const maxAnalysisTimeInForeground = { openFilesTimeInMs: 50, noOpenFilesTimeInMs
 
 export class PyrightServer extends LanguageServerBase {
     private _controller: CommandController;
-
-    constructor(connection: Connection, maxWorkers: number, realFileSystem?: FileSystem) {
+    private _backgroundAnalysisCount: number;
+
+    constructor(
+        connection: Connection,
+        maxWorkers: number,
+        realFileSystem?: FileSystem,
+        backgroundAnalysisCount = 1,
+        collectFileSystemStats = false
+    ) {
         // eslint-disable-next-line @typescript-eslint/no-var-requires
         const version = require('../package.json').version || '';
 
         const tempFile = new RealTempFile();
         const console = new ConsoleWithLogLevel(connection.console);
         const fileWatcherProvider = new WorkspaceFileWatcherProvider();
-        const fileSystem = realFileSystem ?? createFromRealFileSystem(tempFile, console, fileWatcherProvider);
+        let fileSystem = realFileSystem ?? createFromRealFileSystem(tempFile, console, fileWatcherProvider);
+
+        // Count and time the file system calls only when asked to, since the
+        // server is long-running and every call would pay for it.
+        let fileSystemStats: FileSystemStats | undefined;
+        if (collectFileSystemStats) {
+            const instrumentedFileSystem = new InstrumentedFileSystem(fileSystem);
+            fileSystemStats = instrumentedFileSystem.stats;
+            fileSystem = instrumentedFileSystem;
+        }
+
         const pyrightFs = new PyrightFileSystem(fileSystem);
-        const cacheManager = new CacheManager(maxWorkers);
+
+        // All background analysis workers share the heap usage limit, so
+        // every one of them needs a slot in the cache manager's usage buffer.
+        const cacheManager = new CacheManager(
+            backgroundAnalysisCount > 1 ? Math.max(maxWorkers, backgroundAnalysisCount) : maxWorkers
+        );
         const partialStubService = new PartialStubService(pyrightFs);
 
         const serviceProvider = createServiceProvider(
@@ -69,6 +94,9 @@ export class PyrightServer extends LanguageServerBase {
             partialStubService,
             new FileBasedCancellationProvider('bg')
         );
+        if (fileSystemStats) {
+            serviceProvider.add(ServiceKeys.fileSystemStats, fileSystemStats);
+        }
 
         // When executed from CLI command (pyright-langserver), __rootDirectory is
         // already defined. When executed from VSCode extension, rootDirectory should
@@ -90,6 +118,7 @@ export class PyrightServer extends LanguageServerBase {
         );
 
         this._controller = new CommandController(this);
+        this._backgroundAnalysisCount = backgroundAnalysisCount;
     }
 
     async getSettings(workspace: Workspace): Promise<ServerSettings> {
@@ -230,7 +259,16 @@ export class PyrightServer extends LanguageServerBase {
             return undefined;
         }
 
-        return new BackgroundAnalysis(workspaceRoot, this.serverOptions.serviceProvider);
+        const serviceProvider = this.serverOptions.serviceProvider;
+        if (this._backgroundAnalysisCount > 1) {
+            const workers = Array.from(
+                { length: this._backgroundAnalysisCount },
+                () => new BackgroundAnalysis(workspaceRoot, serviceProvider)
+            );
+            return new BackgroundAnalysisPool(workers, serviceProvider);
+        }
+
+        return new BackgroundAnalysis(workspaceRoot, serviceProvider);
     }
 
     protected override createHost(): Host {
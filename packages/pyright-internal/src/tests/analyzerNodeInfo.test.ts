@@ -7,7 +7,12 @@
 import assert from 'assert';
 
 import { AnalyzerFileInfo } from '../analyzer/analyzerFileInfo';
-import { AnalyzerNodeInfoContextImpl, AnalyzerNodeInfoStore } from '../analyzer/analyzerNodeInfo';
+import {
+    AnalyzerNodeInfo,
+    AnalyzerNodeInfoContextImpl,
+    AnalyzerNodeInfoStore,
+    DeferredNodeInfoBinder,
+} from '../analyzer/analyzerNodeInfo';
 import { DiagnosticSink } from '../common/diagnosticSink';
 import { ModuleNode } from '../parser/parseNodes';
 import * as TestUtils from './testUtils';
@@ -80,6 +85,30 @@ test('context getFileInfo fast path handles base-layer register/remove/reregiste
     assert.equal(context.getFileInfo(root), secondFileInfo);
 });
 
+test('store binds deferred node information on first access and then drops the binder', () => {
+    const root = parseModule('value = 1');
+    const store = new AnalyzerNodeInfoStore();
+    let bindCount = 0;
+
+    const binder: DeferredNodeInfoBinder = {
+        hasPendingBindings: () => bindCount === 0,
+        bindNodeIfDeferred: (node, info: AnalyzerNodeInfo | undefined) => {
+            if (bindCount > 0 || info !== undefined) {
+                return false;
+            }
+
+            bindCount++;
+            store.getOrCreate(node).codeFlowComplexity = 5;
+            return true;
+        },
+    };
+
+    store.setDeferredBinder(binder);
+    assert.equal(store.get(root)?.codeFlowComplexity, 5);
+    assert.equal(store.get(root)?.codeFlowComplexity, 5);
+    assert.equal(bindCount, 1);
+});
+
 function parseModule(code: string): ModuleNode {
     return TestUtils.parseText(code, new DiagnosticSink()).parserOutput.parseTree;
 }
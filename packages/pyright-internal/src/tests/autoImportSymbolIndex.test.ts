@@ -0,0 +1,75 @@
+/*
+ * autoImportSymbolIndex.test.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Unit tests for the incrementally maintained auto-import symbol index.
+ */
+
+import assert from 'assert';
+
+import { Uri } from '../common/uri/uri';
+import { AutoImportSymbolIndex } from '../languageService/autoImportSymbolIndex';
+import { parseAndGetTestState } from './harness/fourslash/testState';
+
+const code = `
+// @filename: opened.py
+//// # The first file is opened by the test harness.
+
+// @filename: shapes.py
+//// class Rectangle: ...
+//// def make_rectangle(): ...
+//// def _reset_shapes(): ...
+
+// @filename: colors.py
+//// RED = 1
+//// def get_color(): ...
+`;
+
+function getCandidateNames(index: AutoImportSymbolIndex, word: string, similarityLimit: number) {
+    const names: string[] = [];
+    index.getCandidates(word, similarityLimit)!.forEach((symbols) => symbols.forEach((s) => names.push(s.name)));
+    return names.sort();
+}
+
+test('candidates follow the auto-import matching rules', () => {
+    const state = parseAndGetTestState(code).state;
+    state.program.analyze();
+
+    const index = new AutoImportSymbolIndex();
+    index.update(state.program);
+
+    // The first character must match, the rest is a fuzzy match.
+    assert.deepStrictEqual(getCandidateNames(index, 'rect', 0.25), ['Rectangle']);
+    assert.deepStrictEqual(getCandidateNames(index, 'gcol', 0.25), ['get_color']);
+
+    // The leading underscore of a private name can be omitted.
+    assert.deepStrictEqual(getCandidateNames(index, 'reset', 0.25), ['_reset_shapes']);
+    assert.deepStrictEqual(getCandidateNames(index, 'xyz', 0.25), []);
+
+    // Only exact matches are returned when the similarity limit is 1.
+    assert.deepStrictEqual(getCandidateNames(index, 'RED', 1), ['RED']);
+    assert.deepStrictEqual(getCandidateNames(index, 'RE', 1), []);
+});
+
+test('only modules with changed symbol tables are re-indexed', () => {
+    const state = parseAndGetTestState(code).state;
+    state.program.analyze();
+
+    const index = new AutoImportSymbolIndex();
+    index.update(state.program);
+
+    const shapesUri = Uri.file('/shapes.py', state.serviceProvider);
+    const colorsUri = Uri.file('/colors.py', state.serviceProvider);
+    const shapesTable = index.moduleSymbolMap.get(shapesUri.key);
+    assert(shapesTable);
+
+    state.testFS.writeFileSync(colorsUri, 'BLUE = 2');
+    state.program.markFilesDirty([colorsUri], /* evenIfContentsAreSame */ true);
+    state.program.analyze();
+    index.update(state.program);
+
+    assert.strictEqual(index.moduleSymbolMap.get(shapesUri.key), shapesTable);
+    assert.deepStrictEqual(getCandidateNames(index, 'RED', 1), []);
+    assert.deepStrictEqual(getCandidateNames(index, 'BLUE', 1), ['BLUE']);
+});
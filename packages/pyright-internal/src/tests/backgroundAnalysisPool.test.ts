@@ -0,0 +1,215 @@
+/*
+ * backgroundAnalysisPool.test.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Unit tests for the assignment of files to background analysis workers
+ * and for how the pool shares open files and diagnostics among them.
+ */
+
+import assert from 'assert';
+
+import { AnalysisCompleteCallback, AnalysisResults } from '../analyzer/analysis';
+import { OpenFileOptions } from '../analyzer/program';
+import { IPythonMode } from '../analyzer/sourceFile';
+import { IBackgroundAnalysis } from '../backgroundAnalysisBase';
+import { assignFileOwners, BackgroundAnalysisPool } from '../backgroundAnalysisPool';
+import { ServiceProvider } from '../common/serviceProvider';
+import { Uri } from '../common/uri/uri';
+import { UriMap } from '../common/uri/uriMap';
+import { UriEx } from '../common/uri/uriUtils';
+import { parseAndGetTestState } from './harness/fourslash/testState';
+
+const openFileOptions: OpenFileOptions = { ipythonMode: IPythonMode.None, chainedFileUri: undefined };
+
+// Records the requests the pool sends to a worker.
+class FakeWorker {
+    callback: AnalysisCompleteCallback | undefined;
+    trackedFiles: Uri[] = [];
+
+    // Whether each open file is checked elsewhere, keyed by uri key.
+    readonly openFiles = new Map<string, boolean>();
+
+    setCompletionCallback(callback?: AnalysisCompleteCallback) {
+        this.callback = callback;
+    }
+
+    setTrackedFiles(fileUris: Uri[]) {
+        this.trackedFiles = fileUris;
+    }
+
+    setFileOpened(fileUri: Uri, version: number | null, contents: string, options: OpenFileOptions) {
+        this.openFiles.set(fileUri.key, !!options.isCheckedElsewhere);
+    }
+
+    setFileClosed(fileUri: Uri) {
+        this.openFiles.delete(fileUri.key);
+    }
+
+    reportDiagnostics(fileUris: Uri[]) {
+        const results: AnalysisResults = {
+            diagnostics: fileUris.map((fileUri) => ({ fileUri, version: undefined, diagnostics: [] })),
+            filesInProgram: 0,
+            checkingOnlyOpenFiles: false,
+            requiringAnalysisCount: { files: 0, cells: 0 },
+            fatalErrorOccurred: false,
+            configParseErrorOccurred: false,
+            elapsedTime: 0,
+            reason: 'analysis',
+        };
+        this.callback!(results);
+    }
+}
+
+function createPool(workerCount: number) {
+    const workers = Array.from({ length: workerCount }, () => new FakeWorker());
+    const pool = new BackgroundAnalysisPool(workers as unknown as IBackgroundAnalysis[], new ServiceProvider());
+    return { pool, workers };
+}
+
+function getOwnerIndex(workers: FakeWorker[], fileUri: Uri) {
+    return workers.findIndex((w) => w.trackedFiles.some((trackedUri) => trackedUri.equals(fileUri)));
+}
+
+function getOwnedPaths(owners: UriMap<number>, workerCount: number) {
+    const paths: string[][] = Array.from({ length: workerCount }, () => []);
+    owners.forEach((owner, fileUri) => paths[owner].push(fileUri.getFilePath()));
+    return paths.map((p) => p.sort());
+}
+
+test('files that import each other are owned by the same worker', () => {
+    const fileUris = ['/a/x.py', '/b/y.py', '/c/z.py', '/d/w.py'].map((p) => UriEx.file(p));
+    const imports = new UriMap<Uri[]>();
+    imports.set(fileUris[0], [fileUris[2]]);
+
+    const owners = assignFileOwners(fileUris, 2, (fileUri) => imports.get(fileUri));
+    assert.strictEqual(owners.get(fileUris[0]), owners.get(fileUris[2]));
+    assert.notStrictEqual(owners.get(fileUris[1]), owners.get(fileUris[0]));
+    assert.notStrictEqual(owners.get(fileUris[3]), owners.get(fileUris[0]));
+});
+
+test('clusters larger than a fair share are split', () => {
+    const fileUris = ['/a/1.py', '/a/2.py', '/a/3.py', '/a/4.py'].map((p) => UriEx.file(p));
+
+    const owners = assignFileOwners(fileUris, 2, () => undefined);
+    assert.deepStrictEqual(getOwnedPaths(owners, 2), [
+        ['/a/1.py', '/a/2.py'],
+        ['/a/3.py', '/a/4.py'],
+    ]);
+});
+
+test('files keep their owner when files are added', () => {
+    const fileUris = ['/a/x.py', '/b/y.py'].map((p) => UriEx.file(p));
+    const owners = assignFileOwners(fileUris, 2, () => undefined);
+
+    // Swap the owners so they differ from what a fresh assignment would produce.
+    const previousOwners = new UriMap<number>();
+    owners.forEach((owner, fileUri) => previousOwners.set(fileUri, 1 - owner));
+
+    const newFileUris = [...fileUris, UriEx.file('/a/new.py')];
+    const newOwners = assignFileOwners(newFileUris, 2, () => undefined, previousOwners);
+    assert.strictEqual(newOwners.get(fileUris[0]), previousOwners.get(fileUris[0]));
+    assert.strictEqual(newOwners.get(fileUris[1]), previousOwners.get(fileUris[1]));
+
+    // The new file joins the worker that owns the other file in its directory.
+    assert.strictEqual(newOwners.get(newFileUris[2]), previousOwners.get(fileUris[0]));
+});
+
+test('only the owner checks an open file', () => {
+    const { pool, workers } = createPool(2);
+    const fileUris = ['/a/x.py', '/b/y.py'].map((p) => UriEx.file(p));
+    pool.setTrackedFiles(fileUris);
+
+    const owner = getOwnerIndex(workers, fileUris[0]);
+    pool.setFileOpened(fileUris[0], 1, 'x = 1', openFileOptions);
+
+    // Every worker has the contents, but only the owner checks the file.
+    workers.forEach((w, index) => assert.strictEqual(w.openFiles.get(fileUris[0].key), index !== owner));
+
+    // An untracked open file gets an owner while it is open.
+    const untrackedUri = UriEx.file('/c/z.py');
+    pool.setFileOpened(untrackedUri, 1, 'z = 1', openFileOptions);
+    assert.strictEqual([...workers].filter((w) => w.openFiles.get(untrackedUri.key) === false).length, 1);
+
+    pool.setFileClosed(untrackedUri);
+    workers.forEach((w) => assert(!w.openFiles.has(untrackedUri.key)));
+});
+
+test('only the diagnostics of the owner are reported', () => {
+    const { pool, workers } = createPool(2);
+    const fileUris = ['/a/x.py', '/b/y.py'].map((p) => UriEx.file(p));
+    pool.setTrackedFiles(fileUris);
+
+    const reported: string[] = [];
+    pool.setCompletionCallback((results) => results.diagnostics.forEach((d) => reported.push(d.fileUri.key)));
+
+    const owner = getOwnerIndex(workers, fileUris[0]);
+    workers[1 - owner].reportDiagnostics([fileUris[0]]);
+    assert.deepStrictEqual(reported, []);
+
+    workers[owner].reportDiagnostics([fileUris[0]]);
+    assert.deepStrictEqual(reported, [fileUris[0].key]);
+
+    // Files that aren't owned by any worker are reported as is.
+    const unknownUri = UriEx.file('/c/z.py');
+    workers[1 - owner].reportDiagnostics([unknownUri]);
+    assert.deepStrictEqual(reported, [fileUris[0].key, unknownUri.key]);
+});
+
+test('open files keep a single owner as they become tracked and untracked', () => {
+    const { pool, workers } = createPool(2);
+    const fileUri = UriEx.file('/a/x.py');
+    const otherUri = UriEx.file('/b/y.py');
+
+    const getCheckingWorkers = () =>
+        workers.map((w, index) => (w.openFiles.get(fileUri.key) === false ? index : -1)).filter((i) => i >= 0);
+
+    // The file is opened before it is tracked.
+    pool.setFileOpened(fileUri, 1, 'x = 1', openFileOptions);
+    const [owner] = getCheckingWorkers();
+    assert.deepStrictEqual(getCheckingWorkers(), [owner]);
+
+    // Once tracked, it keeps its owner.
+    pool.setTrackedFiles([otherUri, fileUri]);
+    assert.strictEqual(getOwnerIndex(workers, fileUri), owner);
+    assert.deepStrictEqual(getCheckingWorkers(), [owner]);
+
+    // It is still owned while it's open after it stops being tracked.
+    pool.setTrackedFiles([otherUri]);
+    assert.strictEqual(getOwnerIndex(workers, fileUri), -1);
+    assert.deepStrictEqual(getCheckingWorkers(), [owner]);
+
+    const reported: string[] = [];
+    pool.setCompletionCallback((results) => results.diagnostics.forEach((d) => reported.push(d.fileUri.key)));
+    workers[1 - owner].reportDiagnostics([fileUri]);
+    workers[owner].reportDiagnostics([fileUri]);
+    assert.deepStrictEqual(reported, [fileUri.key]);
+});
+
+test('programs do not check open files that are checked elsewhere', () => {
+    const code = `
+// @filename: main.py
+//// x = 1
+
+// @filename: helper.py
+//// y: int = ""
+    `;
+
+    const state = parseAndGetTestState(code).state;
+    const mainUri = Uri.file('/main.py', state.serviceProvider);
+    const helperUri = Uri.file('/helper.py', state.serviceProvider);
+    state.program.setTrackedFiles([mainUri]);
+
+    state.program.setFileOpened(helperUri, 1, 'y: int = ""', { ...openFileOptions, isCheckedElsewhere: true });
+    state.program.analyze();
+
+    const helper = state.program.getSourceFileInfo(helperUri)!;
+    assert(helper.sourceFile.isCheckingRequired());
+    assert.strictEqual(state.program.getFilesToAnalyzeCount().files, 0);
+
+    state.program.setFileOpened(helperUri, 2, 'y: int = ""', openFileOptions);
+    assert.strictEqual(state.program.getFilesToAnalyzeCount().files, 1);
+
+    state.program.analyze();
+    assert(!helper.sourceFile.isCheckingRequired());
+});
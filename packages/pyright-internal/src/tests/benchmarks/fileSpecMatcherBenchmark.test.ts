@@ -0,0 +1,132 @@
+/*
+ * fileSpecMatcherBenchmark.test.ts
+ * Copyright (c) Microsoft Corporation.
+ *
+ * Benchmark for matching paths against many exclude specs. Compares testing
+ * each spec's regular expression in turn with the compiled matcher, for
+ * growing numbers of literal, "**\/<name>" and wildcard specs.
+ *
+ * Run with:
+ *   cd packages/pyright-internal
+ *   cross-env PYRIGHT_RUN_BENCHMARKS=1 node node_modules\jest\bin\jest fileSpecMatcherBenchmark.test --runInBand --forceExit --testTimeout=600000
+ *
+ * Results are written as JSON to:
+ *   src/tests/benchmarks/.generated/benchmark-results/fileSpecMatcher/
+ */
+
+import * as fs from 'fs';
+import * as path from 'path';
+
+import { FileSpecMatcher } from '../../common/uri/fileSpecMatcher';
+import { Uri } from '../../common/uri/uri';
+import { FileSpec, UriEx, getFileSpec } from '../../common/uri/uriUtils';
+
+// --- Configuration ---
+
+const SPEC_COUNTS = [10, 100, 500, 1000];
+const PATH_COUNT = 20000;
+const BENCHMARK_ITERATIONS = 3;
+
+const BENCHMARK_OUTPUT_DIR = path.join(__dirname, '.generated', 'benchmark-results', 'fileSpecMatcher');
+const RUN_BENCHMARKS_ENV = 'PYRIGHT_RUN_BENCHMARKS';
+
+interface BenchmarkResult {
+    mode: string;
+    specCount: number;
+    matchCount: number;
+    timesMs: number[];
+    medianMs: number;
+}
+
+// --- Helpers ---
+
+function median(times: number[]) {
+    const sorted = [...times].sort((a, b) => a - b);
+    const len = sorted.length;
+    return len % 2 === 0 ? (sorted[len / 2 - 1] + sorted[len / 2]) / 2 : sorted[Math.floor(len / 2)];
+}
+
+// Creates a mix of the kinds of specs found in large configurations:
+// generated directories of services, names excluded at any depth and
+// wildcard patterns.
+function createSpecs(root: Uri, count: number) {
+    return Array.from({ length: count }, (_, i) => {
+        switch (i % 4) {
+            case 0:
+                return getFileSpec(root, `services/service${i}/generated`);
+            case 1:
+                return getFileSpec(root, `**/cache${i}`);
+            case 2:
+                return getFileSpec(root, `services/service${i}/**/*_pb2.py`);
+            default:
+                return getFileSpec(root, `build${i}`);
+        }
+    });
+}
+
+function createPaths(root: Uri) {
+    return Array.from({ length: PATH_COUNT }, (_, i) =>
+        root.resolvePaths(
+            `services/service${i % 1200}`,
+            i % 3 === 0 ? 'generated' : 'src',
+            `pkg${i % 7}`,
+            i % 5 === 0 ? `m${i}_pb2.py` : `m${i}.py`
+        )
+    );
+}
+
+function countMatches(paths: Uri[], isMatch: (uri: Uri) => boolean) {
+    return paths.reduce((count, uri) => (isMatch(uri) ? count + 1 : count), 0);
+}
+
+// --- Tests ---
+
+const benchmarkSuite = process.env[RUN_BENCHMARKS_ENV] === '1' ? describe : describe.skip;
+
+benchmarkSuite('File Spec Matcher Benchmark', () => {
+    const root = UriEx.file('/workspace');
+    const paths = createPaths(root);
+
+    test('regular expressions and compiled matcher', () => {
+        const results: BenchmarkResult[] = [];
+
+        for (const specCount of SPEC_COUNTS) {
+            const specs = createSpecs(root, specCount);
+            let expectedCount: number | undefined;
+
+            for (const mode of ['regex', 'matcher']) {
+                const times: number[] = [];
+                let matchCount = 0;
+
+                for (let i = 0; i < BENCHMARK_ITERATIONS; i++) {
+                    const start = performance.now();
+                    if (mode === 'regex') {
+                        matchCount = countMatches(paths, (uri) => FileSpec.isInPath(uri, specs));
+                    } else {
+                        const matcher = new FileSpecMatcher(specs);
+                        matchCount = countMatches(paths, (uri) => matcher.matches(uri));
+                    }
+                    times.push(performance.now() - start);
+                }
+
+                if (expectedCount === undefined) {
+                    expectedCount = matchCount;
+                }
+                expect(matchCount).toBe(expectedCount);
+
+                results.push({ mode, specCount, matchCount, timesMs: times, medianMs: median(times) });
+                console.log(
+                    `  ${mode} (${specCount} specs): median=${median(times).toFixed(2)}ms, matches=${matchCount}`
+                );
+            }
+        }
+
+        fs.mkdirSync(BENCHMARK_OUTPUT_DIR, { recursive: true });
+        const filename = `file-spec-matcher-benchmark-${new Date().toISOString().replace(/[:.]/g, '-')}.json`;
+        fs.writeFileSync(
+            path.join(BENCHMARK_OUTPUT_DIR, filename),
+            JSON.stringify({ timestamp: new Date().toISOString(), nodeVersion: process.version, results }, undefined, 2),
+            'utf-8'
+        );
+    });
+});
@@ -0,0 +1,129 @@
+/*
+ * sourceEnumerationBenchmark.test.ts
+ * Copyright (c) Microsoft Corporation.
+ *
+ * Benchmark for source file enumeration on a synthetic tree of 100k files
+ * split across many independent include roots. Compares the synchronous
+ * walk with the walk that follows an asynchronous concurrent prefetch.
+ *
+ * Run with:
+ *   cd packages/pyright-internal
+ *   cross-env PYRIGHT_RUN_BENCHMARKS=1 node node_modules\jest\bin\jest sourceEnumerationBenchmark.test --runInBand --forceExit --testTimeout=600000
+ *
+ * Results are written as JSON to:
+ *   src/tests/benchmarks/.generated/benchmark-results/sourceEnumeration/
+ */
+
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+
+import { SourceEnumerator } from '../../analyzer/sourceEnumerator';
+import { NullConsole } from '../../common/console';
+import { RealTempFile, createFromRealFileSystem } from '../../common/realFileSystem';
+import { Uri } from '../../common/uri/uri';
+import { getFileSpec } from '../../common/uri/uriUtils';
+
+// --- Configuration ---
+
+const ROOT_COUNT = 100;
+const DIRECTORIES_PER_ROOT = 50;
+const FILES_PER_DIRECTORY = 20;
+const BENCHMARK_ITERATIONS = 3;
+
+const BENCHMARK_OUTPUT_DIR = path.join(__dirname, '.generated', 'benchmark-results', 'sourceEnumeration');
+const RUN_BENCHMARKS_ENV = 'PYRIGHT_RUN_BENCHMARKS';
+
+interface BenchmarkResult {
+    mode: string;
+    fileCount: number;
+    timesMs: number[];
+    medianMs: number;
+}
+
+// --- Helpers ---
+
+function median(times: number[]) {
+    const sorted = [...times].sort((a, b) => a - b);
+    const len = sorted.length;
+    return len % 2 === 0 ? (sorted[len / 2 - 1] + sorted[len / 2]) / 2 : sorted[Math.floor(len / 2)];
+}
+
+function createSyntheticTree(rootDir: string) {
+    for (let r = 0; r < ROOT_COUNT; r++) {
+        for (let d = 0; d < DIRECTORIES_PER_ROOT; d++) {
+            const dir = path.join(rootDir, `root${r}`, `pkg${d}`);
+            fs.mkdirSync(dir, { recursive: true });
+            for (let f = 0; f < FILES_PER_DIRECTORY; f++) {
+                fs.writeFileSync(path.join(dir, `module${f}.py`), '');
+            }
+        }
+    }
+}
+
+// --- Tests ---
+
+const benchmarkSuite = process.env[RUN_BENCHMARKS_ENV] === '1' ? describe : describe.skip;
+
+benchmarkSuite('Source Enumeration Benchmark', () => {
+    const tempFile = new RealTempFile();
+    const rootDir = fs.mkdtempSync(path.join(os.tmpdir(), 'pyright-enum-bench-'));
+    const fileSystem = createFromRealFileSystem(tempFile);
+    const includes = Array.from({ length: ROOT_COUNT }, (_, r) =>
+        getFileSpec(Uri.file(rootDir, tempFile), `root${r}`)
+    );
+
+    const createEnumerator = () =>
+        new SourceEnumerator(includes, [], /* autoExcludeVenv */ false, fileSystem, new NullConsole());
+
+    beforeAll(() => {
+        createSyntheticTree(rootDir);
+    });
+
+    afterAll(() => {
+        fs.rmSync(rootDir, { recursive: true, force: true });
+        tempFile.dispose();
+    });
+
+    test('synchronous and prefetched enumeration', async () => {
+        const results: BenchmarkResult[] = [];
+        let expectedKeys: string[] | undefined;
+
+        for (const mode of ['sync', 'prefetch']) {
+            const times: number[] = [];
+            let fileCount = 0;
+
+            for (let i = 0; i < BENCHMARK_ITERATIONS; i++) {
+                const enumerator = createEnumerator();
+
+                const start = performance.now();
+                if (mode === 'prefetch') {
+                    await enumerator.prefetch();
+                }
+                const result = enumerator.enumerate(0);
+                times.push(performance.now() - start);
+
+                fileCount = result.matches.size;
+
+                const keys = [...result.matches.keys()].sort();
+                if (!expectedKeys) {
+                    expectedKeys = keys;
+                }
+                expect(keys).toEqual(expectedKeys);
+            }
+
+            results.push({ mode, fileCount, timesMs: times, medianMs: median(times) });
+            console.log(`  ${mode}: median=${median(times).toFixed(2)}ms, files=${fileCount}`);
+        }
+
+        expect(results[0].fileCount).toBe(ROOT_COUNT * DIRECTORIES_PER_ROOT * FILES_PER_DIRECTORY);
+
+        fs.mkdirSync(BENCHMARK_OUTPUT_DIR, { recursive: true });
+        const filename = `source-enumeration-benchmark-${new Date().toISOString().replace(/[:.]/g, '-')}.json`;
+        fs.writeFileSync(
+            path.join(BENCHMARK_OUTPUT_DIR, filename),
+            JSON.stringify({ timestamp: new Date().toISOString(), nodeVersion: process.version, results }, undefined, 2),
+            'utf-8'
+        );
+    });
+});
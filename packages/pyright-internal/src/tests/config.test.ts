@@ -350,6 +350,43 @@ describe(`config test'}`, () => {
         assert.strictEqual(normalizeSlashes(rootFilePath), normalizeSlashes(configOptions.projectRoot.getFilePath()));
     });
 
+    test('FindExecEnv2', () => {
+        const cwd = UriEx.file(normalizePath(process.cwd()));
+        const configOptions = new ConfigOptions(cwd);
+
+        const createExecEnv = (root: string) =>
+            new ExecutionEnvironment(
+                'python',
+                cwd.resolvePaths(root),
+                getStandardDiagnosticRuleSet(),
+                /* defaultPythonVersion */ undefined,
+                /* defaultPythonPlatform */ undefined,
+                /* defaultExtraPaths */ undefined
+            );
+
+        // The first matching environment wins, even if a later one is nested.
+        const execEnv1 = createExecEnv('src');
+        const execEnv2 = createExecEnv('src/foo');
+        const execEnv3 = createExecEnv('lib/foo');
+        configOptions.executionEnvironments.push(execEnv1, execEnv2, execEnv3);
+
+        assert.strictEqual(configOptions.findExecEnvironment(cwd.resolvePaths('src/foo/bar.py')), execEnv1);
+        assert.strictEqual(configOptions.findExecEnvironment(cwd.resolvePaths('lib/foo/bar.py')), execEnv3);
+        assert.strictEqual(configOptions.findExecEnvironment(cwd.resolvePaths('lib/foo')), execEnv3);
+
+        // A root only contains files below it, not files with the same prefix.
+        const file = cwd.resolvePaths('lib/food/bar.py');
+        assert.notStrictEqual(configOptions.findExecEnvironment(file).root, execEnv3.root);
+
+        // Environments that are added later are found as well.
+        const execEnv4 = createExecEnv('lib');
+        configOptions.executionEnvironments.push(execEnv4);
+        assert.strictEqual(configOptions.findExecEnvironment(file), execEnv4);
+
+        configOptions.executionEnvironments = [execEnv2];
+        assert.strictEqual(configOptions.findExecEnvironment(cwd.resolvePaths('src/foo/bar.py')), execEnv2);
+    });
+
     test('PythonPlatform', () => {
         const nullConsole = new NullConsole();
         const service = createAnalyzer(nullConsole);
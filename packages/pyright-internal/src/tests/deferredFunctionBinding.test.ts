@@ -0,0 +1,109 @@
+/*
+ * deferredFunctionBinding.test.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Tests for binding library files in declaration-only mode, where function
+ * bodies are bound when analyzer information within them is first requested.
+ */
+
+import assert from 'assert';
+
+import { Uri } from '../common/uri/uri';
+import { parseAndGetTestState, TestState } from './harness/fourslash/testState';
+
+const code = `
+// @filename: pyrightconfig.json
+//// {
+////   "useLibraryCodeForTypes": true,
+////   "deferLibraryFunctionBinding": true
+//// }
+
+// @filename: test.py
+//// from lib import A, f
+////
+//// [|/*member*/m|] = A().x
+//// [|/*result*/r|] = f()
+
+// @filename: lib/__init__.py
+// @library: true
+//// class A:
+////     def __init__(self):
+////         self.x = str()
+////
+//// def f():
+////     return str()
+////
+//// def g():
+////     [|/*inner*/y|] = str()
+////     return [|/*innerRef*/y|]
+`;
+
+function getLibraryUri(state: TestState): Uri {
+    return state.getRangeByMarkerName('inner')!.fileUri;
+}
+
+function analyzeWithDeferredBinding(state: TestState) {
+    state.openFile(state.getMarkerByName('member').fileName);
+    state.analyze();
+
+    // The library file is bound once, in declaration-only mode.
+    const sourceFile = state.program.getSourceFileInfo(getLibraryUri(state))!.sourceFile;
+    assert(sourceFile.isBoundDeclarationsOnly());
+    return sourceFile;
+}
+
+test('instance variables declared in deferred methods are class members', () => {
+    const state = parseAndGetTestState(code).state;
+    const sourceFile = analyzeWithDeferredBinding(state);
+
+    state.verifyHover('markdown', { member: '```python\n(variable) m: str\n```' });
+    assert(sourceFile.isBoundDeclarationsOnly());
+});
+
+test('return types are inferred from deferred function bodies', () => {
+    const state = parseAndGetTestState(code).state;
+    const sourceFile = analyzeWithDeferredBinding(state);
+
+    state.verifyHover('markdown', { result: '```python\n(variable) r: str\n```' });
+    assert(sourceFile.isBoundDeclarationsOnly());
+});
+
+test('hover within a deferred function body binds the body', () => {
+    const state = parseAndGetTestState(code).state;
+    const sourceFile = analyzeWithDeferredBinding(state);
+
+    state.verifyHover('markdown', {
+        inner: '```python\n(variable) y: str\n```',
+        innerRef: '```python\n(variable) y: str\n```',
+    });
+    assert(sourceFile.isBoundDeclarationsOnly());
+});
+
+test('references within a deferred function body are found', () => {
+    const state = parseAndGetTestState(code).state;
+    analyzeWithDeferredBinding(state);
+
+    const references = state
+        .getRangesByText()
+        .get('y')!
+        .map((r) => ({ uri: r.fileUri, range: state.convertPositionRange(r) }));
+    assert.strictEqual(references.length, 2);
+
+    state.verifyFindAllReferences({
+        inner: { references },
+        innerRef: { references },
+    });
+});
+
+test('library files are fully bound without the setting', () => {
+    const state = parseAndGetTestState(code.replace('"deferLibraryFunctionBinding": true', '"strict": []')).state;
+    state.openFile(state.getMarkerByName('member').fileName);
+    state.analyze();
+
+    assert(!state.program.getSourceFileInfo(getLibraryUri(state))!.sourceFile.isBoundDeclarationsOnly());
+    state.verifyHover('markdown', {
+        member: '```python\n(variable) m: str\n```',
+        result: '```python\n(variable) r: str\n```',
+    });
+});
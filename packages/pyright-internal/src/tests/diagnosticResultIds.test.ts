@@ -0,0 +1,92 @@
+/*
+ * diagnosticResultIds.test.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Unit tests for the result IDs assigned to reported diagnostics.
+ */
+
+import assert from 'assert';
+import { Diagnostic, DiagnosticSeverity } from 'vscode-languageserver';
+
+import { DiagnosticResultIds } from '../languageService/diagnosticResultIds';
+
+function createDiagnostic(message: string): Diagnostic {
+    return {
+        range: { start: { line: 0, character: 0 }, end: { line: 0, character: 1 } },
+        severity: DiagnosticSeverity.Error,
+        message,
+    };
+}
+
+test('result ID changes only when diagnostics change', () => {
+    const resultIds = new DiagnosticResultIds();
+
+    const first = resultIds.getResultId('file:///a.py', [createDiagnostic('error')]);
+    assert.strictEqual(resultIds.getResultId('file:///a.py', [createDiagnostic('error')]), first);
+
+    const second = resultIds.getResultId('file:///a.py', [createDiagnostic('other error')]);
+    assert.notStrictEqual(second, first);
+
+    // Going back to earlier diagnostics still produces a new ID.
+    assert.notStrictEqual(resultIds.getResultId('file:///a.py', [createDiagnostic('error')]), first);
+
+    // Files are tracked independently.
+    assert.notStrictEqual(resultIds.getResultId('file:///b.py', [createDiagnostic('error')]), first);
+});
+
+test('result ID is looked up by source file and diagnostic version', () => {
+    const resultIds = new DiagnosticResultIds();
+    const sourceFile = {};
+
+    const resultId = resultIds.getResultId('file:///a.py', [], sourceFile, /* diagnosticVersion */ 3);
+    assert.strictEqual(resultIds.getResultIdForSource(sourceFile, 3), resultId);
+    assert.strictEqual(resultIds.getResultIdForSource(sourceFile, 4), undefined);
+
+    // A re-created source file starts over with its diagnostic versions.
+    assert.strictEqual(resultIds.getResultIdForSource({}, 3), undefined);
+
+    // Re-analysis that produces the same diagnostics keeps the result ID.
+    assert.strictEqual(resultIds.getResultId('file:///a.py', [], sourceFile, 4), resultId);
+    assert.strictEqual(resultIds.getResultIdForSource(sourceFile, 4), resultId);
+});
+
+test('all parts of a diagnostic are compared', () => {
+    const resultIds = new DiagnosticResultIds();
+    const first = resultIds.getResultId('file:///a.py', [createDiagnostic('error')]);
+
+    const variants: Diagnostic[] = [
+        { ...createDiagnostic('error'), code: 'reportGeneralTypeIssues' },
+        { ...createDiagnostic('error'), code: 1 },
+        { ...createDiagnostic('error'), severity: DiagnosticSeverity.Warning },
+        { ...createDiagnostic('error'), range: { start: { line: 1, character: 0 }, end: { line: 1, character: 1 } } },
+        { ...createDiagnostic('error'), data: { rule: 'x' } },
+        {
+            ...createDiagnostic('error'),
+            relatedInformation: [
+                {
+                    location: { uri: 'file:///b.py', range: createDiagnostic('').range },
+                    message: 'related',
+                },
+            ],
+        },
+    ];
+
+    let previous = first;
+    for (const diagnostic of variants) {
+        const resultId = resultIds.getResultId('file:///a.py', [diagnostic]);
+        assert.notStrictEqual(resultId, previous);
+        assert.strictEqual(resultIds.getResultId('file:///a.py', [{ ...diagnostic }]), resultId);
+        previous = resultId;
+    }
+});
+
+test('deleted files are forgotten', () => {
+    const resultIds = new DiagnosticResultIds();
+    const first = resultIds.getResultId('file:///a.py', []);
+    resultIds.getResultId('file:///b.py', []);
+
+    resultIds.delete('file:///a.py');
+    assert.deepStrictEqual([...resultIds.uris()], ['file:///b.py']);
+    assert.notStrictEqual(resultIds.getResultId('file:///a.py', []), first);
+});
@@ -0,0 +1,106 @@
+/*
+ * directoryScanner.test.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Unit tests for the concurrent directory scanner and the prefetch paths
+ * of source enumeration and the import resolver's directory cache.
+ */
+
+import assert from 'assert';
+
+import { createImportResolverFileSystem } from '../analyzer/importResolverFileSystem';
+import { SourceEnumerator } from '../analyzer/sourceEnumerator';
+import { NullConsole } from '../common/console';
+import { scanDirectories } from '../common/directoryScanner';
+import { Uri } from '../common/uri/uri';
+import { getFileSpec } from '../common/uri/uriUtils';
+import { TestFileSystem } from './harness/vfs/filesystem';
+
+test('scan reads roots and selected subdirectories', async () => {
+    const fs = createFileSystem();
+    const root = Uri.file('/projectRoot', fs);
+
+    const shallow = await scanDirectories(fs, [root]);
+    assert.deepStrictEqual([...shallow.keys()], [root.key]);
+
+    const deep = await scanDirectories(fs, [root, Uri.file('/missing', fs)], {
+        maxConcurrentReads: 2,
+        getSubdirectoriesToScan: (dirUri, entries) =>
+            entries.filter((entry) => entry.isDirectory()).map((entry) => dirUri.combinePaths(entry.name)),
+    });
+    assert.deepStrictEqual(
+        [...deep.keys()].sort(),
+        ['/projectRoot', '/projectRoot/pkgA', '/projectRoot/pkgA/sub', '/projectRoot/pkgB', '/projectRoot/venv']
+            .map((path) => Uri.file(path, fs).key)
+            .sort()
+    );
+});
+
+test('scan honors the directory limit', async () => {
+    const fs = createFileSystem();
+
+    const listings = await scanDirectories(fs, [Uri.file('/projectRoot', fs)], {
+        maxDirectories: 2,
+        getSubdirectoriesToScan: (dirUri, entries) =>
+            entries.filter((entry) => entry.isDirectory()).map((entry) => dirUri.combinePaths(entry.name)),
+    });
+    assert.strictEqual(listings.size, 2);
+});
+
+test('prefetched source enumeration matches synchronous enumeration', async () => {
+    const fs = createFileSystem();
+    const createEnumerator = () =>
+        new SourceEnumerator(
+            [getFileSpec(Uri.file('/', fs), 'projectRoot')],
+            [getFileSpec(Uri.file('/', fs), 'projectRoot/pkgB')],
+            /* autoExcludeVenv */ true,
+            fs,
+            new NullConsole()
+        );
+
+    const expected = createEnumerator().enumerate(0);
+
+    const enumerator = createEnumerator();
+    await enumerator.prefetch();
+    const actual = enumerator.enumerate(0);
+
+    assert.strictEqual(actual.isComplete, true);
+    assert.deepStrictEqual([...actual.matches.keys()].sort(), [...expected.matches.keys()].sort());
+    assert.deepStrictEqual(
+        actual.autoExcludedDirs.map((uri) => uri.key),
+        expected.autoExcludedDirs.map((uri) => uri.key)
+    );
+    assert.strictEqual(actual.matches.size, 3);
+});
+
+test('prefetched directories populate the import resolver cache', async () => {
+    const fs = createFileSystem();
+    const cache = createImportResolverFileSystem(fs);
+    const root = Uri.file('/projectRoot', fs);
+
+    await cache.prefetchDirectories([root]);
+
+    // The listing is consumed from the prefetch, even though the directory
+    // has changed since it was read.
+    fs.writeFileSync(root.combinePaths('added.py'), '');
+    assert(cache.fileExists(root.combinePaths('main.py')));
+    assert(!cache.fileExists(root.combinePaths('added.py')));
+
+    cache.invalidateCache();
+    assert(cache.fileExists(root.combinePaths('added.py')));
+});
+
+function createFileSystem() {
+    const fs = new TestFileSystem(/* ignoreCase */ false, { cwd: '/' });
+    fs.mkdirpSync('/projectRoot/pkgA/sub');
+    fs.mkdirpSync('/projectRoot/pkgB');
+    fs.mkdirpSync('/projectRoot/venv/lib');
+    fs.writeFileSync(Uri.file('/projectRoot/main.py', fs), 'x = 1');
+    fs.writeFileSync(Uri.file('/projectRoot/pkgA/__init__.py', fs), '');
+    fs.writeFileSync(Uri.file('/projectRoot/pkgA/sub/module.py', fs), '');
+    fs.writeFileSync(Uri.file('/projectRoot/pkgB/excluded.py', fs), '');
+    fs.writeFileSync(Uri.file('/projectRoot/venv/pyvenv.cfg', fs), '');
+    fs.writeFileSync(Uri.file('/projectRoot/venv/lib/site.py', fs), '');
+    return fs;
+}
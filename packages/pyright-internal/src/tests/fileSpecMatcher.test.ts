@@ -0,0 +1,80 @@
+/*
+ * fileSpecMatcher.test.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Unit tests for matching paths against many file specs at once.
+ */
+
+import assert from 'assert';
+
+import { FileSpecMatcher } from '../common/uri/fileSpecMatcher';
+import { FileSpec, UriEx, getFileSpec } from '../common/uri/uriUtils';
+
+const specPatterns = [
+    'build',
+    'out/**',
+    '**/node_modules',
+    '**/.*',
+    'src/*.pyi',
+    'src/**/gen',
+    'lib/mod?',
+    'docs/a.b',
+];
+
+const paths = [
+    '/project',
+    '/project/build',
+    '/project/build/a.py',
+    '/project/builder/a.py',
+    '/project/out',
+    '/project/out/x/y.py',
+    '/project/src/node_modules/m.py',
+    '/project/node_modules',
+    '/project/src/.venv/a.py',
+    '/project/src/a.pyi',
+    '/project/src/pkg/a.pyi',
+    '/project/src/pkg/gen/a.py',
+    '/project/src/gen',
+    '/project/lib/mod1/a.py',
+    '/project/lib/mod12/a.py',
+    '/project/docs/a.b',
+    '/project/docs/axb',
+    '/project/Build/a.py',
+    '/other/build/a.py',
+];
+
+function checkMatcher(isCaseSensitive: boolean) {
+    const root = UriEx.file('/project', isCaseSensitive);
+    const specs = specPatterns.map((pattern) => getFileSpec(root, pattern));
+    const matcher = new FileSpecMatcher(specs);
+
+    for (const path of paths) {
+        const uri = UriEx.file(path, isCaseSensitive);
+        assert.strictEqual(matcher.matches(uri), FileSpec.isInPath(uri, specs), path);
+    }
+}
+
+test('matches the same paths as the specs on a case sensitive file system', () => {
+    checkMatcher(/* isCaseSensitive */ true);
+});
+
+test('matches the same paths as the specs on a case insensitive file system', () => {
+    checkMatcher(/* isCaseSensitive */ false);
+});
+
+test('matchers of spec lists follow appended specs', () => {
+    const root = UriEx.file('/project', /* isCaseSensitive */ true);
+    const specs = [getFileSpec(root, 'build')];
+    const uri = UriEx.file('/project/out/a.py', /* isCaseSensitive */ true);
+
+    const matcher = FileSpecMatcher.get(specs);
+    assert(!matcher.matches(uri));
+    assert.strictEqual(FileSpecMatcher.get(specs), matcher);
+
+    specs.push(getFileSpec(root, 'out'));
+    assert(FileSpecMatcher.get(specs).matches(uri));
+
+    specs.splice(0, specs.length, getFileSpec(root, 'src'));
+    assert(!FileSpecMatcher.get(specs).matches(uri));
+});
@@ -0,0 +1,201 @@
+/*
+ * functionCheckCache.test.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Unit tests for reusing the diagnostics of functions that an edit
+ * of an open file doesn't affect.
+ */
+
+import assert from 'assert';
+
+import { Program } from '../analyzer/program';
+import { DiagnosticCategory } from '../common/diagnostic';
+import { Uri } from '../common/uri/uri';
+import { parseAndGetTestState } from './harness/fourslash/testState';
+
+const code = `
+// @filename: main.py
+//// def helper(x: int) -> int:
+////     return x + 1
+////
+//// def infer(x: int):
+////     return x
+////
+//// def caller() -> int:
+////     return infer(1)
+////
+//// def other() -> None:
+////     y: str = 1
+`;
+
+function analyze(program: Program) {
+    while (program.analyze()) {
+        // Continue to call analyze until it completes.
+    }
+}
+
+function setUp(fileCode = code) {
+    const state = parseAndGetTestState(fileCode).state;
+    const mainUri = Uri.file('/main.py', state.serviceProvider);
+    const contents = state.testFS.readFileSync(mainUri, 'utf-8');
+
+    state.program.setFileOpened(mainUri, 1, contents);
+    analyze(state.program);
+
+    const edit = (oldText: string, newText: string) => {
+        const newContents = contents.replace(oldText, newText);
+        state.program.setFileOpened(mainUri, 2, newContents);
+        state.program.markFilesDirty([mainUri], /* evenIfContentsAreSame */ true);
+        analyze(state.program);
+        return newContents;
+    };
+
+    const getLines = (category: DiagnosticCategory) =>
+        state.program
+            .getDiagnosticsForRange(mainUri, {
+                start: { line: 0, character: 0 },
+                end: { line: 100, character: 0 },
+            })
+            .filter((diag) => diag.category === category)
+            .map((diag) => diag.range.start.line)
+            .sort((a, b) => a - b);
+
+    return {
+        sourceFile: state.program.getSourceFile(mainUri)!,
+        contents,
+        edit,
+        getErrorLines: () => getLines(DiagnosticCategory.Error),
+        getUnusedLines: () => getLines(DiagnosticCategory.UnusedCode),
+    };
+}
+
+function getLine(contents: string, text: string) {
+    return contents.substring(0, contents.indexOf(text)).split('\n').length - 1;
+}
+
+test('functions are not checked again after an edit to an annotated function', () => {
+    const { sourceFile, edit, getErrorLines } = setUp();
+
+    const contents = edit('return x + 1', 'return x + 2');
+
+    assert.strictEqual(sourceFile.getReusedFunctionCount(), 3);
+    assert.deepStrictEqual(getErrorLines(), [getLine(contents, 'y: str')]);
+});
+
+test('callers of a function with an inferred return type are checked again', () => {
+    const { sourceFile, edit, getErrorLines } = setUp();
+
+    const contents = edit('    return x\n', '    y = str(x)\n    return y\n');
+
+    assert.strictEqual(sourceFile.getReusedFunctionCount(), 2);
+    assert.deepStrictEqual(getErrorLines(), [getLine(contents, 'infer(1)'), getLine(contents, 'y: str')]);
+});
+
+test('all functions are checked again if an affected function declares a member', () => {
+    const { sourceFile, edit, getErrorLines } = setUp(`
+// @filename: main.py
+//// def make():
+////     return 1
+////
+//// class C:
+////     def setup(self) -> None:
+////         self.x = make()
+////
+////     def read(self) -> int:
+////         return self.x
+`);
+
+    // The inferred type of self.x changes along with the return type of make.
+    const contents = edit('return 1', 'return ""');
+
+    assert.strictEqual(sourceFile.getReusedFunctionCount(), 0);
+    assert.deepStrictEqual(getErrorLines(), [getLine(contents, 'return self.x')]);
+});
+
+test('names used in reused functions are not reported as unaccessed', () => {
+    const { sourceFile, contents, edit, getUnusedLines } = setUp(`
+// @filename: main.py
+//// import os
+//// import sys
+////
+//// def uses_os() -> str:
+////     return os.sep
+////
+//// def annotated(x: int) -> int:
+////     return x + 1
+////
+//// def unused_local() -> None:
+////     z = 1
+`);
+
+    const unusedLines = [getLine(contents, 'import sys'), getLine(contents, 'z = 1')];
+    assert.deepStrictEqual(getUnusedLines(), unusedLines);
+
+    edit('return x + 1', 'return x + 2');
+
+    assert.strictEqual(sourceFile.getReusedFunctionCount(), 2);
+    assert.deepStrictEqual(getUnusedLines(), unusedLines);
+});
+
+const overrideCode = `
+// @filename: main.py
+//// class Base:
+////     def method(self):
+////         return "base"
+////
+////     def annotated(self) -> int:
+////         return 1
+////
+//// class Derived(Base):
+////     def method(self) -> str:
+////         return ""
+////
+////     def annotated(self) -> str:
+////         return ""
+`;
+
+test('override checks are kept for reused methods', () => {
+    const { sourceFile, contents, edit, getErrorLines } = setUp(overrideCode);
+
+    // The override of the annotated method is incompatible regardless of its body.
+    const overrideLines = [getLine(contents, 'def annotated(self) -> str')];
+    assert.deepStrictEqual(getErrorLines(), overrideLines);
+
+    edit('return 1', 'return 2');
+
+    assert.strictEqual(sourceFile.getReusedFunctionCount(), 3);
+    assert.deepStrictEqual(getErrorLines(), overrideLines);
+});
+
+test('overrides of a method with an inferred return type are checked again', () => {
+    const { edit, getErrorLines } = setUp(overrideCode);
+
+    const contents = edit('return "base"', 'return 1');
+
+    assert.deepStrictEqual(getErrorLines(), [
+        getLine(contents, 'def method(self) -> str'),
+        getLine(contents, 'def annotated(self) -> str'),
+    ]);
+});
+
+test('functions that use a decorated function are checked again after an edit to the decorator', () => {
+    const { edit, getErrorLines } = setUp(`
+// @filename: main.py
+//// def deco(fn):
+////     return fn
+////
+//// @deco
+//// def decorated() -> int:
+////     return 1
+////
+//// def use_decorated() -> int:
+////     return decorated()
+`);
+
+    assert.deepStrictEqual(getErrorLines(), []);
+
+    const contents = edit('return fn', 'return 1');
+
+    assert.deepStrictEqual(getErrorLines(), [getLine(contents, 'return decorated()')]);
+});
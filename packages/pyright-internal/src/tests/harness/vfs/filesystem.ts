@@ -714,11 +714,18 @@ export class TestFileSystem implements FileSystem, TempFile, CaseSensitivityDete
      *
      * NOTE: do not rename this method as it is intended to align with the same named export of the "fs" module.
      */
-    renameSync(oldpath: string, newpath: string) {
+    renameSync(oldpath: string | Uri, newpath: string | Uri) {
         if (this.isReadonly) {
             throw createIOError('EROFS');
         }
 
+        if (typeof oldpath !== 'string') {
+            oldpath = oldpath.getFilePath();
+        }
+        if (typeof newpath !== 'string') {
+            newpath = newpath.getFilePath();
+        }
+
         const {
             parent: oldParent,
             links: oldParentLinks,
@@ -887,6 +894,14 @@ export class TestFileSystem implements FileSystem, TempFile, CaseSensitivityDete
         node.ctimeMs = time;
     }
 
+    readdirEntries(path: Uri): Promise<Dirent[]> {
+        try {
+            return Promise.resolve(this.readdirEntriesSync(path));
+        } catch (e) {
+            return Promise.reject(e);
+        }
+    }
+
     readFile(fileUri: Uri): Promise<Buffer> {
         return Promise.resolve(this.readFileSync(fileUri));
     }
@@ -0,0 +1,85 @@
+/*
+ * identifierIndex.test.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Unit tests for the identifier index used to find candidate files
+ * for find-references, rename and call hierarchy.
+ */
+
+import assert from 'assert';
+
+import { collectIdentifierNames, collectIdentifierOffsets, IdentifierIndex } from '../analyzer/identifierIndex';
+import { isUserCodeOrOpenByClient } from '../analyzer/sourceFileInfoUtils';
+import { Tokenizer } from '../parser/tokenizer';
+import { parseAndGetTestState } from './harness/fourslash/testState';
+
+function collect(text: string) {
+    return collectIdentifierOffsets(new Tokenizer().tokenize(text).tokens, text);
+}
+
+function collectNames(text: string) {
+    return collectIdentifierNames(new Tokenizer().tokenize(text).tokens, text);
+}
+
+test('identifiers are collected with their offsets', () => {
+    const offsets = collect('foo = bar\nfoo.baz(foo)\n');
+
+    assert.deepStrictEqual(offsets.get('foo'), [0, 10, 18]);
+    assert.deepStrictEqual(offsets.get('bar'), [6]);
+    assert.deepStrictEqual(offsets.get('baz'), [14]);
+});
+
+test('comments and longer words are not identifiers', () => {
+    const offsets = collect('# foo is mentioned here\nfoobar = 1\n');
+
+    assert(!offsets.has('foo'));
+    assert(offsets.has('foobar'));
+});
+
+test('strings, type comments and soft keywords are collected', () => {
+    const offsets = collect('__all__ = ["foo"]\nx = []  # type: List[Bar]\ndef f(a: "Baz"): ...\nmatch = 1\n');
+
+    assert.deepStrictEqual(offsets.get('foo'), [12]);
+    assert(offsets.has('Bar'));
+    assert(offsets.has('Baz'));
+    assert(offsets.has('match'));
+});
+
+test('index is updated when files change', () => {
+    const index = new IdentifierIndex();
+    index.setFile('a', collectNames('foo = 1'));
+    index.setFile('b', collectNames('bar = foo'));
+
+    assert.deepStrictEqual([...index.getFilesContaining(['foo'])].sort(), ['a', 'b']);
+    assert.deepStrictEqual([...index.getFile('b')!].sort(), ['bar', 'foo']);
+
+    index.setFile('b', collectNames('bar = 2'));
+    assert.deepStrictEqual([...index.getFilesContaining(['foo', 'bar'])].sort(), ['a', 'b']);
+    assert.deepStrictEqual([...index.getFilesContaining(['foo'])], ['a']);
+
+    index.removeFile('a');
+    assert.strictEqual(index.getFilesContaining(['foo']).size, 0);
+    assert.strictEqual(index.fileCount, 1);
+});
+
+test('program returns only files that contain the identifier', () => {
+    const code = `
+// @filename: defines.py
+//// def helper(): ...
+
+// @filename: uses.py
+//// from defines import helper
+//// helper()
+
+// @filename: mentions.py
+//// # helper is only mentioned in a comment
+//// helpers = []
+    `;
+
+    const state = parseAndGetTestState(code).state;
+    state.program.analyze();
+
+    const candidates = state.program.getSourceFileInfoListForIdentifiers(['helper'], isUserCodeOrOpenByClient);
+    assert.deepStrictEqual(candidates.map((info) => info.uri.fileName).sort(), ['defines.py', 'uses.py']);
+});
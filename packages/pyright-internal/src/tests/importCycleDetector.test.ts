@@ -0,0 +1,124 @@
+/*
+ * importCycleDetector.test.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Unit tests for finding import cycles and keeping them up to date
+ * as imports change.
+ */
+
+import assert from 'assert';
+
+import { ImportCycleDetector } from '../analyzer/importCycleDetector';
+
+function createGraph(edges: Record<string, string[]>, excluded: string[] = []) {
+    const imports = new Map<string, string[]>(Object.entries(edges));
+    const detector = new ImportCycleDetector<string>({
+        getImports: (node) => imports.get(node) ?? [],
+        isIncluded: (node) => !excluded.includes(node),
+        getKey: (node) => node,
+    });
+
+    const setImports = (node: string, newImports: string[]) => {
+        const oldImports = imports.get(node) ?? [];
+        imports.set(node, newImports);
+        detector.updateImports(node, oldImports);
+    };
+
+    const getComponent = (node: string) => [...(detector.getComponent(node) ?? [])].sort();
+
+    return { detector, setImports, getComponent };
+}
+
+test('files that import each other form one component', () => {
+    const { detector, getComponent } = createGraph({
+        a: ['b'],
+        b: ['c'],
+        c: ['a', 'd'],
+        d: [],
+    });
+
+    assert.deepStrictEqual(getComponent('b'), ['a', 'b', 'c']);
+    assert.deepStrictEqual(getComponent('d'), []);
+    assert.deepStrictEqual(detector.getCycles('c'), [['a', 'b', 'c']]);
+    assert.strictEqual(detector.getCycles('a'), detector.getCycles('b'));
+});
+
+test('cycles start with the first file and cover the component', () => {
+    const { detector } = createGraph({
+        a: ['b'],
+        b: ['a', 'c'],
+        c: ['b'],
+    });
+
+    assert.deepStrictEqual(detector.getCycles('c'), [
+        ['a', 'b'],
+        ['b', 'c'],
+    ]);
+});
+
+test('self imports and excluded files do not form cycles', () => {
+    const { detector, getComponent } = createGraph(
+        {
+            a: ['a', 'stub'],
+            stub: ['a'],
+        },
+        ['stub']
+    );
+
+    assert.deepStrictEqual(getComponent('a'), []);
+    assert.deepStrictEqual(detector.getCycles('a'), []);
+});
+
+test('components are updated when imports are added and removed', () => {
+    const { setImports, getComponent } = createGraph({
+        a: ['b'],
+        b: ['c'],
+        c: [],
+        d: ['a'],
+    });
+
+    assert.deepStrictEqual(getComponent('a'), []);
+
+    setImports('c', ['d']);
+    assert.deepStrictEqual(getComponent('b'), ['a', 'b', 'c', 'd']);
+
+    setImports('b', []);
+    assert.deepStrictEqual(getComponent('a'), []);
+    assert.deepStrictEqual(getComponent('c'), []);
+
+    setImports('b', ['a']);
+    assert.deepStrictEqual(getComponent('a'), ['a', 'b']);
+});
+
+test('cycles are updated when imports are added within a component', () => {
+    const { detector, setImports } = createGraph({
+        a: ['b'],
+        b: ['c'],
+        c: ['a'],
+    });
+
+    assert.deepStrictEqual(detector.getCycles('a'), [['a', 'b', 'c']]);
+
+    setImports('b', ['c', 'a']);
+    assert.deepStrictEqual(detector.getCycles('a'), [
+        ['a', 'b'],
+        ['a', 'b', 'c'],
+    ]);
+});
+
+test('removed files leave their components', () => {
+    const removed = new Set<string>();
+    const imports: Record<string, string[]> = { a: ['b'], b: ['c'], c: ['a'] };
+    const detector = new ImportCycleDetector<string>({
+        getImports: (node) => imports[node],
+        isIncluded: (node) => !removed.has(node),
+        getKey: (node) => node,
+    });
+
+    assert.strictEqual(detector.getComponent('a')?.length, 3);
+
+    removed.add('c');
+    detector.removeNode('c');
+    assert.strictEqual(detector.getComponent('a'), undefined);
+});
@@ -0,0 +1,96 @@
+/*
+ * importCycles.test.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Tests for the import cycles reported by a program, both as
+ * reportImportCycles diagnostics and in its dependency information.
+ */
+
+import assert from 'assert';
+
+import { ImportResolver } from '../analyzer/importResolver';
+import { Program } from '../analyzer/program';
+import { ConfigOptions } from '../common/configOptions';
+import { NullConsole } from '../common/console';
+import { DiagnosticRule } from '../common/diagnosticRules';
+import { createServiceProvider } from '../common/serviceProviderExtensions';
+import { UriEx } from '../common/uri/uriUtils';
+import { PyrightFileSystem } from '../pyrightFileSystem';
+import { TestAccessHost } from './harness/testAccessHost';
+import { TestFileSystem } from './harness/vfs/filesystem';
+
+class CapturingConsole extends NullConsole {
+    readonly infoMessages: string[] = [];
+
+    override info(message: string) {
+        super.info(message);
+        this.infoMessages.push(message);
+    }
+}
+
+// a and b import each other, and b imports c, which imports a.
+const files: Record<string, string> = {
+    '/a.py': 'import b',
+    '/b.py': 'import a\nimport c',
+    '/c.py': 'import a',
+    '/d.py': 'import a',
+};
+
+function setUp() {
+    const testFS = new TestFileSystem(/* ignoreCase */ false, { cwd: '/' });
+    Object.entries(files).forEach(([path, content]) => testFS.writeFileSync(UriEx.file(path), content));
+
+    const console = new CapturingConsole();
+    const sp = createServiceProvider(testFS, new PyrightFileSystem(testFS), console);
+    const configOptions = new ConfigOptions(UriEx.file('/'));
+    configOptions.diagnosticRuleSet.reportImportCycles = 'error';
+
+    const importResolver = new ImportResolver(sp, configOptions, new TestAccessHost(sp.fs().getModulePath()));
+    const program = new Program(importResolver, configOptions, sp);
+    program.setTrackedFiles(Object.keys(files).map((path) => UriEx.file(path)));
+    while (program.analyze()) {
+        // Continue to call analyze until it completes.
+    }
+
+    const getImportCycles = (path: string) =>
+        (program.getSourceFile(UriEx.file(path))!.getDiagnostics(configOptions) ?? [])
+            .filter((diag) => diag.getRule() === DiagnosticRule.reportImportCycles)
+            .map((diag) => diag.message.split('\n').slice(1));
+
+    return { program, console, getImportCycles };
+}
+
+test('import cycles are reported on their first file', () => {
+    const { program, getImportCycles } = setUp();
+
+    // Shortest cycles that together cover the files that import each other
+    // are reported, each once.
+    assert.deepStrictEqual(getImportCycles('/a.py'), [
+        ['  /a.py', '  /b.py'],
+        ['  /a.py', '  /b.py', '  /c.py'],
+    ]);
+    assert.deepStrictEqual(getImportCycles('/b.py'), []);
+    assert.deepStrictEqual(getImportCycles('/c.py'), []);
+    assert.deepStrictEqual(getImportCycles('/d.py'), []);
+
+    program.dispose();
+});
+
+test('dependency information lists the files in import cycles', () => {
+    const { program, console } = setUp();
+
+    program.printDependencies(UriEx.file('/'), /* verbose */ true);
+
+    const messages = console.infoMessages;
+    const groupIndex = messages.indexOf('1 group of files in import cycles');
+    assert(groupIndex >= 0);
+    assert.strictEqual(messages[groupIndex + 1], ' 3 files');
+    assert.deepStrictEqual(
+        messages.slice(groupIndex + 2, groupIndex + 5).map((message) => message.trim()),
+        ['/a.py', '/b.py', '/c.py'].map((path) => UriEx.file(path).toString())
+    );
+    assert.strictEqual(messages.filter((message) => message.trim().startsWith('Cycle: ')).length, 2);
+
+    program.dispose();
+});
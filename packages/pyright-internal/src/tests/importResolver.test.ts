@@ -1171,6 +1171,10 @@ class CombinedFileSystem implements FileSystem {
         this._testFS.unlinkSync(path);
     }
 
+    renameSync(src: Uri, dst: Uri): void {
+        this._testFS.renameSync(src, dst);
+    }
+
     rmdirSync(path: Uri): void {
         this._testFS.rmdirSync(path);
     }
@@ -1206,6 +1210,13 @@ class CombinedFileSystem implements FileSystem {
         return this._realFS.readdirEntriesSync(path);
     }
 
+    readdirEntries(path: Uri): Promise<Dirent[]> {
+        if (this._testFS.existsSync(path)) {
+            return this._testFS.readdirEntries(path);
+        }
+        return this._realFS.readdirEntries(path);
+    }
+
     readdirSync(path: Uri): string[] {
         if (this._testFS.existsSync(path)) {
             return this._testFS.readdirSync(path);
@@ -0,0 +1,103 @@
+/*
+ * instrumentedFileSystem.test.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Unit tests for the file system wrapper that collects operation statistics.
+ */
+
+import assert from 'assert';
+
+import { FileSystemStats, InstrumentedFileSystem } from '../common/instrumentedFileSystem';
+import { normalizeSlashes } from '../common/pathUtils';
+import { UriEx } from '../common/uri/uriUtils';
+import * as vfs from './harness/vfs/filesystem';
+
+const libRoot = UriEx.file(normalizeSlashes('/lib'));
+const srcRoot = UriEx.file(normalizeSlashes('/src'));
+
+test('operations are counted', () => {
+    const fs = createFileSystem();
+
+    fs.existsSync(libRoot.combinePaths('mod.py'));
+    fs.existsSync(libRoot.combinePaths('missing.py'));
+    fs.readdirEntriesSync(libRoot);
+    fs.readFileSync(srcRoot.combinePaths('main.py'), 'utf8');
+
+    assert.strictEqual(fs.stats.getOperationStats('existsSync')?.count, 2);
+    assert.strictEqual(fs.stats.getOperationStats('readdirEntriesSync')?.count, 1);
+    assert.strictEqual(fs.stats.getOperationStats('readFileSync')?.count, 1);
+    assert.strictEqual(fs.stats.getOperationStats('statSync'), undefined);
+
+    const histogram = fs.stats.getOperationStats('existsSync')!.histogram;
+    assert.strictEqual(histogram.reduce((a, b) => a + b, 0), 2);
+});
+
+test('failed operations are counted', () => {
+    const fs = createFileSystem();
+
+    assert.throws(() => fs.statSync(libRoot.combinePaths('missing.py')));
+    assert.strictEqual(fs.stats.getOperationStats('statSync')?.count, 1);
+});
+
+test('directories are grouped by search path', () => {
+    const fs = createFileSystem();
+
+    fs.existsSync(libRoot.combinePaths('pkg', '__init__.py'));
+    fs.existsSync(libRoot.combinePaths('mod.py'));
+    fs.readdirEntriesSync(libRoot);
+    fs.existsSync(srcRoot.combinePaths('main.py'));
+    fs.existsSync(UriEx.file(normalizeSlashes('/other/file.py')));
+
+    const byPrefix = fs.stats.getStatsByPrefix([libRoot, srcRoot]);
+    assert.strictEqual(byPrefix.get(libRoot.toUserVisibleString())?.count, 3);
+    assert.strictEqual(byPrefix.get(srcRoot.toUserVisibleString())?.count, 1);
+    assert.strictEqual(byPrefix.get('<other>')?.count, 1);
+
+    fs.stats.reset();
+    assert.strictEqual(fs.stats.getStatsByPrefix([libRoot, srcRoot]).size, 0);
+});
+
+test('directories beyond the limit are counted in total', () => {
+    const stats = new FileSystemStats(/* maxTrackedDirectories */ 1);
+
+    stats.record('existsSync', libRoot, 1);
+    stats.record('existsSync', srcRoot, 2);
+    stats.record('existsSync', libRoot, 3);
+
+    const byPrefix = stats.getStatsByPrefix([libRoot, srcRoot]);
+    assert.deepStrictEqual(byPrefix.get(libRoot.toUserVisibleString()), { count: 2, totalTimeInMs: 4 });
+    assert.strictEqual(byPrefix.get(srcRoot.toUserVisibleString()), undefined);
+    assert.deepStrictEqual(byPrefix.get('<other>'), { count: 1, totalTimeInMs: 2 });
+    assert.strictEqual(stats.getOperationStats('existsSync')?.count, 3);
+});
+
+test('stats from other processes are merged', () => {
+    const fs = createFileSystem();
+    fs.existsSync(libRoot.combinePaths('mod.py'));
+    fs.readdirEntriesSync(libRoot);
+
+    const workerFs = createFileSystem();
+    workerFs.existsSync(libRoot.combinePaths('mod.py'));
+    workerFs.existsSync(srcRoot.combinePaths('main.py'));
+
+    fs.stats.merge(FileSystemStats.fromJsonObj(JSON.parse(JSON.stringify(workerFs.stats.toJsonObj()))));
+
+    assert.strictEqual(fs.stats.getOperationStats('existsSync')?.count, 3);
+    assert.strictEqual(fs.stats.getOperationStats('readdirEntriesSync')?.count, 1);
+    assert.strictEqual(fs.stats.getOperationStats('existsSync')!.histogram.reduce((a, b) => a + b, 0), 3);
+
+    const byPrefix = fs.stats.getStatsByPrefix([libRoot, srcRoot]);
+    assert.strictEqual(byPrefix.get(libRoot.toUserVisibleString())?.count, 3);
+    assert.strictEqual(byPrefix.get(srcRoot.toUserVisibleString())?.count, 1);
+});
+
+function createFileSystem() {
+    const fs = new vfs.TestFileSystem(/* ignoreCase */ false, { cwd: normalizeSlashes('/') });
+    fs.mkdirSync(libRoot.combinePaths('pkg'), { recursive: true });
+    fs.writeFileSync(libRoot.combinePaths('pkg', '__init__.py'), '', 'utf8');
+    fs.writeFileSync(libRoot.combinePaths('mod.py'), '', 'utf8');
+    fs.mkdirSync(srcRoot, { recursive: true });
+    fs.writeFileSync(srcRoot.combinePaths('main.py'), '', 'utf8');
+    return new InstrumentedFileSystem(fs);
+}
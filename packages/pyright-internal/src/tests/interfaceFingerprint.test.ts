@@ -0,0 +1,91 @@
+/*
+ * interfaceFingerprint.test.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Unit tests for skipping the re-checking of files whose dependencies
+ * were edited without changing their interfaces.
+ */
+
+import assert from 'assert';
+
+import { Program } from '../analyzer/program';
+import { Uri } from '../common/uri/uri';
+import { parseAndGetTestState } from './harness/fourslash/testState';
+
+const code = `
+// @filename: lib.py
+//// def get_value(x: int) -> int:
+////     return x + 1
+
+// @filename: main.py
+//// from lib import get_value
+//// result: int = get_value(1)
+`;
+
+function analyze(program: Program) {
+    while (program.analyze()) {
+        // Continue to call analyze until it completes.
+    }
+}
+
+function setUp() {
+    const state = parseAndGetTestState(code).state;
+    const libUri = Uri.file('/lib.py', state.serviceProvider);
+    const mainUri = Uri.file('/main.py', state.serviceProvider);
+
+    // The edited file is open, so its interface is fingerprinted when it's checked.
+    state.program.setFileOpened(libUri, 1, state.testFS.readFileSync(libUri, 'utf-8'));
+    state.program.setFileOpened(mainUri, 1, state.testFS.readFileSync(mainUri, 'utf-8'));
+    analyze(state.program);
+
+    let version = 1;
+    const edit = (contents: string) => {
+        state.program.setFileOpened(libUri, ++version, contents);
+        state.program.markFilesDirty([libUri], /* evenIfContentsAreSame */ true);
+        analyze(state.program);
+    };
+
+    const getMainDiagnostics = () =>
+        state.program.getDiagnosticsForRange(mainUri, {
+            start: { line: 0, character: 0 },
+            end: { line: 2, character: 0 },
+        });
+
+    return { program: state.program, mainUri, edit, getMainDiagnostics };
+}
+
+test('dependents are not re-checked after an edit to a function body', () => {
+    const { program, mainUri, edit, getMainDiagnostics } = setUp();
+    const avoidedRecheckCount = program.avoidedRecheckCount;
+
+    edit('def get_value(x: int) -> int:\n    return x + 2');
+
+    assert.strictEqual(program.avoidedRecheckCount, avoidedRecheckCount + 1);
+    assert(!program.getSourceFile(mainUri)!.isCheckingRequired());
+    assert.strictEqual(getMainDiagnostics().length, 0);
+});
+
+test('dependents are re-checked after an edit to a signature', () => {
+    const { program, edit, getMainDiagnostics } = setUp();
+    const avoidedRecheckCount = program.avoidedRecheckCount;
+
+    edit('def get_value(x: int) -> str:\n    return str(x)');
+
+    assert.strictEqual(program.avoidedRecheckCount, avoidedRecheckCount);
+    assert.strictEqual(getMainDiagnostics().length, 1);
+});
+
+test('dependents are re-checked after an edit to a function with call-site return type inference', () => {
+    const { program, edit, getMainDiagnostics } = setUp();
+
+    edit('def get_value(x):\n    return x + 1');
+    assert.strictEqual(getMainDiagnostics().length, 0);
+
+    // The printed signature is unchanged, but the type inferred for the call is now float.
+    const avoidedRecheckCount = program.avoidedRecheckCount;
+    edit('def get_value(x):\n    return x * 2.0');
+
+    assert.strictEqual(program.avoidedRecheckCount, avoidedRecheckCount);
+    assert.strictEqual(getMainDiagnostics().length, 1);
+});
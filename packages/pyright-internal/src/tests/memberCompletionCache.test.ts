@@ -0,0 +1,115 @@
+/*
+ * memberCompletionCache.test.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Unit tests for the cache of class members offered by member access completions.
+ */
+
+import assert from 'assert';
+import { CompletionItemKind } from 'vscode-languageserver';
+
+import { getMembersForClass } from '../analyzer/typeUtils';
+import { ClassType, isInstantiableClass } from '../analyzer/types';
+import { Uri } from '../common/uri/uri';
+import { MemberCompletionCache } from '../languageService/memberCompletionCache';
+import { getNodeAtMarker, parseAndGetTestState, TestState } from './harness/fourslash/testState';
+
+const code = `
+// @filename: test.py
+//// from base import Base
+////
+//// class Derived(Base):
+////     b = 2
+////
+//// /*marker*/Derived
+
+// @filename: base.py
+//// class Base:
+////     a = 1
+
+// @filename: other.py
+//// x = 1
+
+// @filename: data.py
+//// from dataclasses import dataclass
+////
+//// @dataclass
+//// class Data:
+////     a: int
+////
+//// /*data*/Data
+`;
+
+function getDerivedClass(state: TestState, markerName = 'marker') {
+    const type = state.program.evaluator!.getType(getNodeAtMarker(state, markerName));
+    assert(type && isInstantiableClass(type));
+    return type;
+}
+
+function getMembers(state: TestState, cache: MemberCompletionCache, classType: ClassType, counter: { count: number }) {
+    const evaluator = state.program.evaluator!;
+    return cache.getClassMembers(classType, 'test', /* includeMetaclass */ false, evaluator, () => {
+        counter.count++;
+
+        const symbolTable = new Map();
+        getMembersForClass(classType, symbolTable, /* includeInstanceVars */ true);
+        return { symbolTable, enumMemberNames: new Set<string>() };
+    });
+}
+
+function markOtherFileDirty(state: TestState) {
+    state.program.markFilesDirty([Uri.file('/other.py', state.serviceProvider)], /* evenIfContentsAreSame */ true);
+}
+
+test('members are reused while class declarations are unchanged', () => {
+    const state = parseAndGetTestState(code).state;
+    const cache = new MemberCompletionCache();
+    const counter = { count: 0 };
+
+    const members = getMembers(state, cache, getDerivedClass(state), counter);
+    assert(members.symbolTable.has('a'));
+    assert(members.symbolTable.has('b'));
+    assert.strictEqual(getMembers(state, cache, getDerivedClass(state), counter), members);
+    members.itemKinds.set('a', CompletionItemKind.Variable);
+
+    // Edits of unrelated files re-evaluate the class but don't change its
+    // declarations. Only the members are shared with the new evaluator.
+    markOtherFileDirty(state);
+    const newMembers = getMembers(state, cache, getDerivedClass(state), counter);
+    assert.notStrictEqual(newMembers, members);
+    assert.strictEqual(newMembers.symbolTable, members.symbolTable);
+    assert.strictEqual(newMembers.itemKinds.size, 0);
+    assert.strictEqual(counter.count, 1);
+});
+
+test('members are collected again when a base class changes', () => {
+    const state = parseAndGetTestState(code).state;
+    const cache = new MemberCompletionCache();
+    const counter = { count: 0 };
+
+    getMembers(state, cache, getDerivedClass(state), counter);
+
+    const baseUri = Uri.file('/base.py', state.serviceProvider);
+    state.testFS.writeFileSync(baseUri, 'class Base:\n    c = 3');
+    state.program.markFilesDirty([baseUri], /* evenIfContentsAreSame */ true);
+
+    const members = getMembers(state, cache, getDerivedClass(state), counter);
+    assert(!members.symbolTable.has('a'));
+    assert(members.symbolTable.has('c'));
+    assert.strictEqual(counter.count, 2);
+});
+
+test('synthesized members are collected again for each evaluator', () => {
+    const state = parseAndGetTestState(code).state;
+    const cache = new MemberCompletionCache();
+    const counter = { count: 0 };
+
+    const members = getMembers(state, cache, getDerivedClass(state, 'data'), counter);
+    assert(members.symbolTable.get('__init__')?.getSynthesizedType());
+
+    markOtherFileDirty(state);
+    const newMembers = getMembers(state, cache, getDerivedClass(state, 'data'), counter);
+    assert.notStrictEqual(newMembers.symbolTable, members.symbolTable);
+    assert.strictEqual(counter.count, 2);
+});
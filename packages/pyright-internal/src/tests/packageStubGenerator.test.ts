@@ -0,0 +1,94 @@
+/*
+ * packageStubGenerator.test.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Unit tests for generating the stubs of all modules of a package and
+ * skipping stubs that are up to date.
+ */
+
+import assert from 'assert';
+import { CancellationToken } from 'vscode-languageserver';
+
+import { PackageStubGenerator } from '../analyzer/packageStubGenerator';
+import { TypeStubManifest } from '../analyzer/typeStubManifest';
+import { Uri } from '../common/uri/uri';
+import { parseAndGetTestState } from './harness/fourslash/testState';
+
+const code = `
+// @filename: test_pkg/__init__.py
+// @library: true
+//// from .module1 import A as A
+
+// @filename: test_pkg/module1.py
+// @library: true
+//// class A:
+////     def method(self, x: int):
+////         return x
+
+// @filename: test_pkg/sub/module2.py
+// @library: true
+//// def func(a: int):
+////     return a
+
+// @filename: test_pkg/not-a-module.py
+// @library: true
+//// x = 1
+`;
+
+test('all modules of a package are found', () => {
+    const state = parseAndGetTestState(code).state;
+
+    const target = new PackageStubGenerator(state.program, ['test_pkg']).getTarget('test_pkg');
+
+    assert(!target.targetIsSingleFile);
+    assert.deepStrictEqual(
+        target.moduleUris.map((uri) => target.targetImportPath.getRelativePath(uri)),
+        ['./__init__.py', './module1.py', './sub/module2.py']
+    );
+    assert(target.outputPath.equals(target.stubPath.combinePaths('test_pkg')));
+});
+
+test('stubs are generated again only if their inputs change', () => {
+    const state = parseAndGetTestState(code).state;
+    const fs = state.serviceProvider.fs();
+
+    const generator = new PackageStubGenerator(state.program, ['test_pkg']);
+    const target = generator.getTarget('test_pkg');
+    const settingsKey = generator.getSettingsKey();
+    const stubUris = target.moduleUris.map((moduleUri) => generator.getStubUri(target, moduleUri));
+
+    const manifest1 = new TypeStubManifest(fs, target.stubPath, /* toolVersion */ 'test');
+    target.moduleUris.forEach((moduleUri, i) => {
+        assert(!manifest1.isUpToDate(stubUris[i], settingsKey));
+
+        const stub = generator.writeModuleStub(target, moduleUri, CancellationToken.None);
+        assert(stub.stubUri.equals(stubUris[i]));
+        assert(stub.dependencies.some((uri) => uri.equals(moduleUri)));
+
+        manifest1.setStub(stub.stubUri, stub.dependencies, settingsKey);
+    });
+    assert(manifest1.save());
+
+    // The stubs are renamed into place, so no temporary files are left.
+    assert.deepStrictEqual(fs.readdirSync(target.outputPath).sort(), ['__init__.pyi', 'module1.pyi', 'sub']);
+
+    const manifest2 = new TypeStubManifest(fs, target.stubPath, /* toolVersion */ 'test');
+    assert(stubUris.every((stubUri) => manifest2.isUpToDate(stubUri, settingsKey)));
+    assert.deepStrictEqual(manifest2.getStats(), { hits: 3, misses: 0 });
+
+    // Changing a module invalidates its stub and the stubs of the modules
+    // that import it, and editing a stub invalidates it.
+    const module1 = Uri.file('/lib/site-packages/test_pkg/module1.py', state.serviceProvider);
+    fs.writeFileSync(module1, 'class A: ...\n', 'utf8');
+
+    const manifest3 = new TypeStubManifest(fs, target.stubPath, /* toolVersion */ 'test');
+    assert.deepStrictEqual(stubUris.map((stubUri) => manifest3.isUpToDate(stubUri, settingsKey)), [false, false, true]);
+
+    fs.writeFileSync(stubUris[2], 'def func(a: int) -> int: ...\n', 'utf8');
+    assert(!manifest3.isUpToDate(stubUris[2], settingsKey));
+
+    // Stubs generated by another version are stale.
+    const manifest4 = new TypeStubManifest(fs, target.stubPath, /* toolVersion */ 'other');
+    assert(!manifest4.isUpToDate(stubUris[1], settingsKey));
+});
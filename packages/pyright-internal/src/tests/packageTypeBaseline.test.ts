@@ -0,0 +1,127 @@
+/*
+ * packageTypeBaseline.test.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Unit tests for comparing package type verifier reports with a baseline.
+ */
+
+import assert from 'assert';
+
+import { PackageTypeBaseline } from '../analyzer/packageTypeBaseline';
+import { TypeKnownStatus } from '../analyzer/packageTypeReport';
+import { PackageTypeReportCache } from '../analyzer/packageTypeReportCache';
+import { PackageTypeVerifier } from '../analyzer/packageTypeVerifier';
+import { CommandLineOptions } from '../common/commandLineOptions';
+import { Uri } from '../common/uri/uri';
+import { UriEx } from '../common/uri/uriUtils';
+import { parseAndGetTestState, TestState } from './harness/fourslash/testState';
+import { TestAccessHost } from './harness/testAccessHost';
+import { distlibFolder, libFolder } from './harness/vfs/factory';
+import * as vfs from './harness/vfs/filesystem';
+
+const code = `
+// @filename: test_pkg/py.typed
+// @library: true
+////
+
+// @filename: test_pkg/__init__.py
+// @library: true
+//// from .submodule1 import A as A, func1 as func1
+
+// @filename: test_pkg/submodule1.py
+// @library: true
+//// class A:
+////     def method(self, x):
+////         ...
+////
+//// def func1(a: int) -> int:
+////     ...
+
+// @filename: test_pkg/submodule2.py
+// @library: true
+//// def func2(a: int) -> int:
+////     ...
+`;
+
+function createVerifier(state: TestState) {
+    const commandLineOptions = new CommandLineOptions(
+        state.configOptions.projectRoot.getFilePath(),
+        /* fromLanguageServer */ false
+    );
+
+    return new PackageTypeVerifier(
+        state.serviceProvider,
+        new TestAccessHost(UriEx.file(vfs.MODULE_PATH), [libFolder, distlibFolder]),
+        commandLineOptions,
+        'test_pkg'
+    );
+}
+
+function createCache(state: TestState) {
+    return new PackageTypeReportCache(
+        state.serviceProvider.fs(),
+        /* cacheFileUri */ undefined,
+        /* toolVersion */ 'test'
+    );
+}
+
+function writeLibraryFile(state: TestState, fileName: string, contents: string) {
+    const uri = Uri.file(`/lib/site-packages/test_pkg/${fileName}`, state.serviceProvider);
+    state.serviceProvider.fs().writeFileSync(uri, contents, 'utf8');
+}
+
+test('a report equal to the baseline has no findings', async () => {
+    const state = parseAndGetTestState(code).state;
+
+    const report = await createVerifier(state).verifyByModule(createCache(state));
+    const baseline = PackageTypeBaseline.create(report);
+
+    assert(Array.from(report.symbols.values()).some((symbol) => symbol.typeKnownStatus !== TypeKnownStatus.Known));
+    assert.deepStrictEqual(baseline.diff(report), { newFindings: [], fixedFindings: [] });
+});
+
+test('only symbols whose types changed are reported', async () => {
+    const state = parseAndGetTestState(code).state;
+
+    const baseline = PackageTypeBaseline.create(await createVerifier(state).verifyByModule(createCache(state)));
+
+    // Fix the unknown parameter type of A.method and lose the parameter
+    // type of func2.
+    writeLibraryFile(
+        state,
+        'submodule1.py',
+        'class A:\n    def method(self, x: int) -> None: ...\n\ndef func1(a: int) -> int: ...\n'
+    );
+    writeLibraryFile(state, 'submodule2.py', 'def func2(a) -> int:\n    ...\n');
+
+    const diff = baseline.diff(await createVerifier(state).verifyByModule(createCache(state)));
+
+    assert.deepStrictEqual(diff.newFindings.map((symbol) => symbol.fullName), ['test_pkg.submodule2.func2']);
+    assert(diff.fixedFindings.some((finding) => finding.fullName === 'test_pkg.submodule1.A.method'));
+    assert(diff.fixedFindings.every((finding) => finding.currentStatus === TypeKnownStatus.Known));
+});
+
+test('baseline files store symbols without paths', async () => {
+    const state = parseAndGetTestState(code).state;
+    const fs = state.serviceProvider.fs();
+    const baselineUri = Uri.file('/baseline.json', state.serviceProvider);
+
+    const report = await createVerifier(state).verifyByModule(createCache(state));
+    PackageTypeBaseline.create(report).write(fs, baselineUri);
+
+    // The file is committed with the package, so it mustn't depend on where
+    // the package is installed.
+    assert(!fs.readFileSync(baselineUri, 'utf8').includes('site-packages'));
+
+    const baseline = PackageTypeBaseline.read(fs, baselineUri)!;
+    assert.deepStrictEqual(baseline.diff(report), { newFindings: [], fixedFindings: [] });
+
+    writeLibraryFile(state, 'submodule2.py', 'def func2(a) -> int:\n    ...\n');
+
+    const diff = baseline.diff(await createVerifier(state).verifyByModule(createCache(state)));
+    assert.deepStrictEqual(diff.newFindings.map((symbol) => symbol.fullName), ['test_pkg.submodule2.func2']);
+
+    const missingUri = Uri.file('/missing.json', state.serviceProvider);
+    assert.strictEqual(PackageTypeBaseline.read(fs, missingUri), undefined);
+});
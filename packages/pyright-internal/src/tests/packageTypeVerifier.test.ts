@@ -0,0 +1,211 @@
+/*
+ * packageTypeVerifier.test.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Unit tests for verifying packages module by module and caching the
+ * reports of unchanged modules.
+ */
+
+import assert from 'assert';
+
+import { PackageTypeReport, TypeKnownStatus } from '../analyzer/packageTypeReport';
+import { PackageTypeReportCache } from '../analyzer/packageTypeReportCache';
+import { PackageTypeVerifier } from '../analyzer/packageTypeVerifier';
+import { CommandLineOptions } from '../common/commandLineOptions';
+import { Uri } from '../common/uri/uri';
+import { UriEx } from '../common/uri/uriUtils';
+import { parseAndGetTestState, TestState } from './harness/fourslash/testState';
+import { TestAccessHost } from './harness/testAccessHost';
+import { distlibFolder, libFolder } from './harness/vfs/factory';
+import * as vfs from './harness/vfs/filesystem';
+
+const code = `
+// @filename: test_pkg/py.typed
+// @library: true
+////
+
+// @filename: test_pkg/__init__.py
+// @library: true
+//// from .submodule1 import A as A
+//// from ._submodule2 import B as B, func1 as func1
+
+// @filename: test_pkg/submodule1.py
+// @library: true
+//// class A:
+////     def method(self, x):
+////         ...
+
+// @filename: test_pkg/submodule2.py
+// @library: true
+//// from .submodule1 import A
+////
+//// def func2(a: A) -> A:
+////     ...
+
+// @filename: test_pkg/_submodule2.py
+// @library: true
+//// class B:
+////     ...
+////
+//// def func1(a: int = ...) -> None:
+////     ...
+`;
+
+function createVerifier(state: TestState) {
+    const commandLineOptions = new CommandLineOptions(
+        state.configOptions.projectRoot.getFilePath(),
+        /* fromLanguageServer */ false
+    );
+
+    return new PackageTypeVerifier(
+        state.serviceProvider,
+        new TestAccessHost(UriEx.file(vfs.MODULE_PATH), [libFolder, distlibFolder]),
+        commandLineOptions,
+        'test_pkg'
+    );
+}
+
+function createCache(state: TestState) {
+    return new PackageTypeReportCache(
+        state.serviceProvider.fs(),
+        PackageTypeReportCache.getCacheFileUri(Uri.file('/cache', state.serviceProvider), 'test_pkg'),
+        /* toolVersion */ 'test'
+    );
+}
+
+function assertReportsEqual(actual: PackageTypeReport, expected: PackageTypeReport) {
+    assert.strictEqual(actual.generalDiagnostics.length, expected.generalDiagnostics.length);
+    assert.strictEqual(actual.missingClassDocStringCount, expected.missingClassDocStringCount);
+    assert.strictEqual(actual.missingDefaultParamCount, expected.missingDefaultParamCount);
+    assert.strictEqual(actual.missingFunctionDocStringCount, expected.missingFunctionDocStringCount);
+    assert.deepStrictEqual(Array.from(actual.modules.keys()), Array.from(expected.modules.keys()));
+    assert.deepStrictEqual(Array.from(actual.symbols.keys()), Array.from(expected.symbols.keys()));
+
+    expected.symbols.forEach((symbol, fullName) => {
+        const actualSymbol = actual.symbols.get(fullName)!;
+        assert.strictEqual(actualSymbol.typeKnownStatus, symbol.typeKnownStatus, fullName);
+        assert.strictEqual(actualSymbol.referenceCount, symbol.referenceCount, fullName);
+        assert.strictEqual(actualSymbol.isExported, symbol.isExported, fullName);
+        assert.deepStrictEqual(
+            actualSymbol.diagnostics.map((diag) => diag.diagnostic.message),
+            symbol.diagnostics.map((diag) => diag.diagnostic.message),
+            fullName
+        );
+    });
+}
+
+test('verifying by module matches verifying the whole package', async () => {
+    const state = parseAndGetTestState(code).state;
+
+    const expected = createVerifier(state).verify();
+    const actual = await createVerifier(state).verifyByModule();
+
+    assert(expected.symbols.size > 0);
+    assertReportsEqual(actual, expected);
+});
+
+test('module reports are verified by the provided function', async () => {
+    const state = parseAndGetTestState(code).state;
+    const verifiedModules: string[] = [];
+
+    const workerVerifier = createVerifier(state);
+    const actual = await createVerifier(state).verifyByModule(
+        /* cache */ undefined,
+        async (moduleNames, publicSymbols) => {
+            verifiedModules.push(...moduleNames);
+            return moduleNames.map((moduleName) => workerVerifier.verifyModule(moduleName, publicSymbols));
+        }
+    );
+
+    assert.deepStrictEqual(verifiedModules.sort(), ['test_pkg', 'test_pkg.submodule1', 'test_pkg.submodule2']);
+    assertReportsEqual(actual, createVerifier(state).verify());
+});
+
+test('reports of unchanged modules are read from the cache', async () => {
+    const state = parseAndGetTestState(code).state;
+    const expected = createVerifier(state).verify();
+
+    const cache1 = createCache(state);
+    assertReportsEqual(await createVerifier(state).verifyByModule(cache1), expected);
+    assert.deepStrictEqual(cache1.getStats(), { hits: 0, misses: 3 });
+
+    const cache2 = createCache(state);
+    assertReportsEqual(await createVerifier(state).verifyByModule(cache2), expected);
+    assert.deepStrictEqual(cache2.getStats(), { hits: 3, misses: 0 });
+
+    // Changing a module invalidates the reports of the modules that import it.
+    const submodule2 = Uri.file('/lib/site-packages/test_pkg/submodule2.py', state.serviceProvider);
+    state.serviceProvider.fs().writeFileSync(submodule2, 'def func2() -> int: ...\n', 'utf8');
+
+    const cache3 = createCache(state);
+    const report = await createVerifier(state).verifyByModule(cache3);
+    assert.deepStrictEqual(cache3.getStats(), { hits: 2, misses: 1 });
+    assert(report.symbols.has('test_pkg.submodule2.func2'));
+});
+
+test('modules reached through an alias have the known status of their symbols', async () => {
+    const code = `
+// @filename: test_pkg/py.typed
+// @library: true
+////
+
+// @filename: test_pkg/__init__.py
+// @library: true
+////
+
+// @filename: test_pkg/a.py
+// @library: true
+//// class A:
+////     def method(self, x):
+////         ...
+
+// @filename: test_pkg/b.py
+// @library: true
+//// from . import a as a
+`;
+    const state = parseAndGetTestState(code).state;
+
+    // The module is reached through the alias after its symbols were verified.
+    const expected = createVerifier(state).verify();
+    const moduleStatus = expected.symbols.get('test_pkg.a')!.typeKnownStatus;
+    assert.notStrictEqual(moduleStatus, TypeKnownStatus.Known);
+    assert.strictEqual(moduleStatus, expected.symbols.get('test_pkg.a.A')!.typeKnownStatus);
+
+    assertReportsEqual(await createVerifier(state).verifyByModule(), expected);
+});
+
+test('verifying by module matches verifying the whole package when classes reference each other', async () => {
+    const code = `
+// @filename: test_pkg/py.typed
+// @library: true
+////
+
+// @filename: test_pkg/__init__.py
+// @library: true
+////
+
+// @filename: test_pkg/a.py
+// @library: true
+//// class A:
+////     def b(self) -> "B":
+////         ...
+////
+////     def method(self, x):
+////         ...
+////
+//// class B:
+////     def a(self) -> A:
+////         ...
+
+// @filename: test_pkg/b.py
+// @library: true
+//// from .a import B as B
+`;
+    const state = parseAndGetTestState(code).state;
+    const expected = createVerifier(state).verify();
+
+    assertReportsEqual(await createVerifier(state).verifyByModule(), expected);
+    assertReportsEqual(await createVerifier(state).verifyByModule(createCache(state)), expected);
+    assertReportsEqual(await createVerifier(state).verifyByModule(createCache(state)), expected);
+});
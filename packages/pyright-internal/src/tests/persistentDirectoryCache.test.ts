@@ -0,0 +1,105 @@
+/*
+ * persistentDirectoryCache.test.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Unit tests for the on-disk directory listing cache used by import resolution.
+ */
+
+import assert from 'assert';
+
+import { createImportResolverFileSystem } from '../analyzer/importResolverFileSystem';
+import { PersistentDirectoryCache } from '../analyzer/persistentDirectoryCache';
+import { normalizeSlashes } from '../common/pathUtils';
+import { UriEx } from '../common/uri/uriUtils';
+import * as vfs from './harness/vfs/filesystem';
+
+const libRoot = UriEx.file(normalizeSlashes('/lib'));
+const cacheFile = UriEx.file(normalizeSlashes('/cache/importCache.json'));
+
+test('directory listings are reused by a later run', () => {
+    const fs = createFileSystem();
+
+    const firstCache = new PersistentDirectoryCache(fs, cacheFile);
+    const firstFs = createImportResolverFileSystem(fs, firstCache);
+    assert(firstFs.fileExists(libRoot.combinePaths('mod.py')));
+    assert(firstFs.dirExists(libRoot.combinePaths('pkg')));
+
+    // A cold run doesn't stat directories during import resolution, only
+    // when the listings are saved.
+    assert.strictEqual(firstCache.getStats().statCalls, 0);
+    assert(firstCache.save());
+    assert.strictEqual(firstCache.getStats().statCalls, 1);
+    assert.strictEqual(firstCache.getStats().netCallsSaved, -1);
+
+    const secondCache = new PersistentDirectoryCache(fs, cacheFile);
+    const secondFs = createImportResolverFileSystem(fs, secondCache);
+    assert(secondFs.fileExists(libRoot.combinePaths('mod.py')));
+    assert(secondFs.dirExists(libRoot.combinePaths('pkg')));
+    assert(secondFs.getResolvableNamesInDirectory(libRoot).has('mod'));
+
+    // The avoided readdir is offset by the stat that validates the listing.
+    const stats = secondCache.getStats();
+    assert.strictEqual(stats.hits, 1);
+    assert.strictEqual(stats.misses, 0);
+    assert.strictEqual(stats.statCalls, 1);
+    assert.strictEqual(stats.netCallsSaved, 0);
+    assert(!secondCache.save());
+});
+
+test('modified directories are read again', () => {
+    const fs = createFileSystem();
+
+    const firstCache = new PersistentDirectoryCache(fs, cacheFile);
+    assert(createImportResolverFileSystem(fs, firstCache).fileExists(libRoot.combinePaths('mod.py')));
+    firstCache.save();
+
+    fs.time(5000);
+    fs.writeFileSync(libRoot.combinePaths('added.py'), '', 'utf8');
+
+    const secondCache = new PersistentDirectoryCache(fs, cacheFile);
+    assert(createImportResolverFileSystem(fs, secondCache).fileExists(libRoot.combinePaths('added.py')));
+    assert.strictEqual(secondCache.getStats().hits, 0);
+    assert.strictEqual(secondCache.getStats().misses, 1);
+});
+
+test('symbolic links in persisted listings are resolved again', () => {
+    const fs = createFileSystem();
+    const target = UriEx.file(normalizeSlashes('/targets/shim'));
+    fs.mkdirSync(target.getDirectory(), { recursive: true });
+    fs.writeFileSync(target, '', 'utf8');
+    fs.symlinkSync(target.getFilePath(), libRoot.combinePaths('shim.py').getFilePath());
+
+    const firstCache = new PersistentDirectoryCache(fs, cacheFile);
+    assert(createImportResolverFileSystem(fs, firstCache).getResolvableNamesInDirectory(libRoot).has('shim'));
+    firstCache.save();
+
+    // Replacing the target doesn't modify the directory that contains the link.
+    fs.time(5000);
+    fs.unlinkSync(target);
+    fs.mkdirSync(target);
+
+    const secondCache = new PersistentDirectoryCache(fs, cacheFile);
+    const names = createImportResolverFileSystem(fs, secondCache).getResolvableNamesInDirectory(libRoot);
+    assert.strictEqual(secondCache.getStats().hits, 1);
+    assert(!names.has('shim'));
+    assert(names.has('shim.py'));
+});
+
+test('corrupt cache files are ignored', () => {
+    const fs = createFileSystem();
+    fs.mkdirSync(cacheFile.getDirectory(), { recursive: true });
+    fs.writeFileSync(cacheFile, '{ not json', 'utf8');
+
+    const cache = new PersistentDirectoryCache(fs, cacheFile);
+    assert(createImportResolverFileSystem(fs, cache).fileExists(libRoot.combinePaths('mod.py')));
+    assert.strictEqual(cache.getStats().hits, 0);
+});
+
+function createFileSystem() {
+    const fs = new vfs.TestFileSystem(/* ignoreCase */ false, { cwd: normalizeSlashes('/'), time: 1000 });
+    fs.mkdirSync(libRoot.combinePaths('pkg'), { recursive: true });
+    fs.writeFileSync(libRoot.combinePaths('pkg', '__init__.py'), '', 'utf8');
+    fs.writeFileSync(libRoot.combinePaths('mod.py'), '', 'utf8');
+    return fs;
+}
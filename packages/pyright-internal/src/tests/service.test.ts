@@ -7,9 +7,10 @@
 import assert from 'assert';
 
 import { CancellationToken } from 'vscode-jsonrpc';
-import { InvalidatedReason } from '../analyzer/backgroundAnalysisProgram';
+import { BackgroundAnalysisProgram, InvalidatedReason } from '../analyzer/backgroundAnalysisProgram';
 import { SourceEnumerator } from '../analyzer/sourceEnumerator';
 import { IPythonMode } from '../analyzer/sourceFile';
+import { IBackgroundAnalysis } from '../backgroundAnalysisBase';
 import { NullConsole } from '../common/console';
 import { CommandLineOptions } from '../common/commandLineOptions';
 import { combinePaths, getDirectoryPath, normalizeSlashes } from '../common/pathUtils';
@@ -819,6 +820,134 @@ test('file changes cause semantic update', () => {
     assert.strictEqual(openFile.semanticVersion, oldSemanticVersion + 1);
 });
 
+test('library module names of changed paths', () => {
+    const state = parseAndGetTestState('', '/projectRoot').state;
+    const searchPaths = [Uri.file('/lib/site-packages', state.serviceProvider)];
+    const getModuleName = (path: string) =>
+        state.workspace.service.test_getLibraryModuleName(Uri.file(path, state.serviceProvider), searchPaths);
+
+    assert.strictEqual(getModuleName('/lib/site-packages/foo/bar/baz.py'), 'foo');
+    assert.strictEqual(getModuleName('/lib/site-packages/foo.py'), 'foo');
+    assert.strictEqual(getModuleName('/lib/site-packages/foo-stubs/__init__.pyi'), 'foo');
+
+    // Changes that can affect imports of any module aren't attributed to one.
+    assert.strictEqual(getModuleName('/lib/site-packages/foo.pth'), undefined);
+    assert.strictEqual(getModuleName('/lib/site-packages'), undefined);
+    assert.strictEqual(getModuleName('/other/foo.py'), undefined);
+});
+
+test('library changes mark only affected files dirty', () => {
+    const code = `
+// @filename: main.py
+//// import foo
+
+// @filename: foo/__init__.py
+//// x = 1
+
+// @filename: uses_bar.py
+//// import bar
+
+// @filename: other.py
+//// y = 2
+    `;
+
+    const state = parseAndGetTestState(code, '/projectRoot').state;
+    const program = state.program;
+    const getUri = (fileName: string) => Uri.file(combinePaths('/projectRoot', fileName), state.serviceProvider);
+    const isCheckingRequired = (fileName: string) =>
+        program.getSourceFileInfo(getUri(fileName))!.sourceFile.isCheckingRequired();
+
+    ['main.py', 'foo/__init__.py', 'uses_bar.py', 'other.py'].forEach((fileName) => {
+        program.addTrackedFile(getUri(fileName));
+    });
+    while (program.analyze()) {
+        // Continue to analyze until complete.
+    }
+
+    // Files under a changed folder and the files that import them are affected,
+    // as are files that import a module that was added or removed.
+    program.markLibraryFilesDirty([getUri('foo')], ['bar']);
+
+    assert(isCheckingRequired('foo/__init__.py'));
+    assert(isCheckingRequired('main.py'));
+    assert(isCheckingRequired('uses_bar.py'));
+    assert(!isCheckingRequired('other.py'));
+});
+
+test('active file is checked before other open files', () => {
+    const code = `
+// @filename: first.py
+//// a: int = 1
+
+// @filename: second.py
+//// b: int = 2
+
+// @filename: third.py
+//// c: int = 3
+    `;
+
+    const state = parseAndGetTestState(code, '/projectRoot').state;
+    const program = state.program;
+    const getUri = (fileName: string) => Uri.file(combinePaths('/projectRoot', fileName), state.serviceProvider);
+    const isCheckingRequired = (fileName: string) =>
+        program.getSourceFileInfo(getUri(fileName))!.sourceFile.isCheckingRequired();
+
+    ['first.py', 'second.py', 'third.py'].forEach((fileName) => {
+        program.setFileOpened(getUri(fileName), 1, state.testFS.readFileSync(getUri(fileName), 'utf-8'));
+    });
+
+    program.setActiveFile(getUri('second.py'));
+    program.setActiveFile(getUri('third.py'));
+
+    // The active file is checked on its own, so its diagnostics are reported first.
+    const maxTime = { openFilesTimeInMs: 60000, noOpenFilesTimeInMs: 60000 };
+    assert(program.analyze(maxTime));
+    assert(!isCheckingRequired('third.py'));
+    assert(isCheckingRequired('first.py'));
+    assert(isCheckingRequired('second.py'));
+
+    // The other open files follow in the order they were active. A negative
+    // time limit stops the analysis after the first file it checks.
+    program.analyze({ openFilesTimeInMs: -1, noOpenFilesTimeInMs: 60000 });
+    assert(!isCheckingRequired('second.py'));
+    assert(isCheckingRequired('first.py'));
+});
+
+test('background analysis is told about the active file only when it changes', () => {
+    const state = parseAndGetTestState('', '/projectRoot').state;
+    const activeFiles: string[] = [];
+    const backgroundAnalysis = {
+        setProgramView: () => {},
+        setActiveFile: (fileUri: Uri) => activeFiles.push(fileUri.key),
+        setFileClosed: () => {},
+        shutdown: () => {},
+        dispose: () => {},
+    };
+
+    const program = new BackgroundAnalysisProgram(
+        'test',
+        state.serviceProvider,
+        state.configOptions,
+        state.program.importResolver,
+        backgroundAnalysis as unknown as IBackgroundAnalysis
+    );
+    const first = Uri.file('/projectRoot/first.py', state.serviceProvider);
+    const second = Uri.file('/projectRoot/second.py', state.serviceProvider);
+
+    program.setActiveFile(first);
+    program.setActiveFile(first);
+    program.setActiveFile(second);
+    program.setActiveFile(second);
+    assert.deepStrictEqual(activeFiles, [first.key, second.key]);
+
+    // A closed file that is opened again becomes active again.
+    program.setFileClosed(second);
+    program.setActiveFile(second);
+    assert.deepStrictEqual(activeFiles, [first.key, second.key, second.key]);
+
+    program.dispose();
+});
+
 function testSourceFileWatchChange(code: string, expected = true, isFile = true) {
     const state = parseAndGetTestState(code, '/projectRoot').state;
     const marker = state.getMarkerByName('marker');
@@ -0,0 +1,89 @@
+/*
+ * stubGenerator.test.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Tests for the stubs generated for synthesized types by the type server.
+ */
+
+import assert from 'assert';
+
+import { ClassType, isFunction, isInstantiableClass } from '../../analyzer/types';
+import { pythonVersion3_12, pythonVersion3_13 } from '../../common/pythonVersion';
+import { ExpressionNode } from '../../parser/parseNodes';
+import { ISymbolLookup } from '../../typeServer/programTypes';
+import { generateStubFromClassType, generateStubFromFunctionType, StubCache } from '../../typeServer/stubGenerator';
+import { createTypeServerEvaluator } from '../../typeServer/typeServerEvaluator';
+import { getNodeAtMarker, parseAndGetTestState } from '../harness/fourslash/testState';
+
+const code = `
+// @filename: test.py
+//// from dataclasses import dataclass
+////
+//// @dataclass
+//// class [|/*marker*/Data|]:
+////     """Data docstring."""
+////     x: int
+////
+////     def method(self) -> int:
+////         return self.x
+`;
+
+function getClassType() {
+    const state = parseAndGetTestState(code).state;
+    const evaluator = createTypeServerEvaluator(state.program, {} as ISymbolLookup);
+    const type = evaluator.getType(getNodeAtMarker(state, 'marker') as ExpressionNode);
+    assert(type && isInstantiableClass(type));
+
+    return { evaluator, type: type as ClassType };
+}
+
+test('offsets point at the class and method definitions', () => {
+    const { evaluator, type } = getClassType();
+    const options = { pythonVersion: pythonVersion3_12 };
+
+    const classStub = generateStubFromClassType(evaluator, type, options);
+    assert(classStub.stubContent.startsWith('class Data:', classStub.primaryDefinitionOffset));
+
+    // The synthesized dataclass methods are generated with the class.
+    const initStub = generateStubFromClassType(evaluator, type, options, '__init__');
+    assert.strictEqual(initStub.stubContent, classStub.stubContent);
+    assert(initStub.stubContent.startsWith('def __init__(', initStub.primaryDefinitionOffset));
+
+    const methodType = evaluator.getEffectiveTypeOfSymbol(type.shared.fields.get('method')!);
+    assert(isFunction(methodType));
+
+    const methodStub = generateStubFromFunctionType(evaluator, methodType, options);
+    assert.strictEqual(methodStub.stubContent, classStub.stubContent);
+    assert(methodStub.stubContent.startsWith('def method(', methodStub.primaryDefinitionOffset));
+
+    assert.throws(() => generateStubFromClassType(evaluator, type, options, 'missing'));
+});
+
+test('stubs are generated once per cache and Python version', () => {
+    const { evaluator, type } = getClassType();
+    const cache = new StubCache();
+    const options = { pythonVersion: pythonVersion3_12, cache };
+
+    const classStub = generateStubFromClassType(evaluator, type, options);
+    const cachedStub = cache.getClassStub(type, pythonVersion3_12);
+    assert(cachedStub);
+    assert.strictEqual(cachedStub.stubContent, classStub.stubContent);
+    assert.strictEqual(cache.getClassStub(type, pythonVersion3_13), undefined);
+
+    // Later requests are answered from the cache, including those for methods of the class.
+    const fakeStub = { stubContent: 'cached', classOffset: 1, methodOffsets: new Map([['method', 2]]) };
+    cache.setClassStub(type, pythonVersion3_12, fakeStub);
+    assert.deepStrictEqual(generateStubFromClassType(evaluator, type, options), {
+        stubContent: 'cached',
+        primaryDefinitionOffset: 1,
+    });
+    assert.deepStrictEqual(generateStubFromClassType(evaluator, type, options, 'method'), {
+        stubContent: 'cached',
+        primaryDefinitionOffset: 2,
+    });
+
+    cache.clear();
+    assert.strictEqual(cache.getClassStub(type, pythonVersion3_12), undefined);
+    assert.strictEqual(generateStubFromClassType(evaluator, type, options).stubContent, classStub.stubContent);
+});
@@ -0,0 +1,85 @@
+/*
+ * typeHandleTable.test.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Tests for the table of type handles kept by the type server.
+ */
+
+import assert from 'assert';
+
+import { TypeVarType } from '../../analyzer/types';
+import { pythonVersion3_12 } from '../../common/pythonVersion';
+import { IProgram } from '../../typeServer/programTypes';
+import { TypeHandle, TypeHandleTable } from '../../typeServer/typeHandleTable';
+
+function createHandle(name: string): TypeHandle {
+    return {
+        type: TypeVarType.createInstance(name),
+        program: {} as IProgram,
+        source: {} as TypeHandle['source'],
+        pythonVersion: pythonVersion3_12,
+    };
+}
+
+test('a type keeps its id until the table is cleared', () => {
+    const table = new TypeHandleTable();
+    const t1 = createHandle('T1');
+    const t2 = createHandle('T2');
+
+    const id1 = table.getId(t1);
+    const id2 = table.getId(t2);
+    assert.notStrictEqual(id1, id2);
+    assert.strictEqual(table.getId(t1), id1);
+    assert.strictEqual(table.getHandle(id2), t2);
+
+    // Ids that aren't associated with types are never given to types.
+    const referenceId = table.allocateId();
+    assert(![id1, id2].includes(referenceId));
+    assert.strictEqual(table.getHandle(referenceId), undefined);
+
+    table.clear();
+    assert.strictEqual(table.size, 0);
+    assert.strictEqual(table.getHandle(id1), undefined);
+
+    // Ids aren't reused after the table is cleared.
+    const newId1 = table.getId(t1);
+    assert(![id1, id2, referenceId].includes(newId1));
+});
+
+test('the least recently returned types are released when the table is full', () => {
+    const table = new TypeHandleTable(/* maxHandles */ 2);
+    const t1 = createHandle('T1');
+    const t2 = createHandle('T2');
+    const t3 = createHandle('T3');
+
+    const id1 = table.getId(t1);
+    const id2 = table.getId(t2);
+    assert.strictEqual(table.getId(t1), id1);
+
+    const id3 = table.getId(t3);
+    assert.strictEqual(table.size, 2);
+    assert.strictEqual(table.getHandle(id1), t1);
+    assert.strictEqual(table.getHandle(id2), undefined);
+    assert.strictEqual(table.getHandle(id3), t3);
+
+    // A released type gets a new id.
+    const newId2 = table.getId(t2);
+    assert(![id1, id2, id3].includes(newId2));
+    assert.strictEqual(table.getHandle(id1), undefined);
+
+    table.maxHandles = 1;
+    assert.strictEqual(table.size, 1);
+    assert.strictEqual(table.getHandle(id3), undefined);
+    assert.strictEqual(table.getHandle(newId2), t2);
+});
+
+test('no types are retained if the maximum is 0', () => {
+    const table = new TypeHandleTable(/* maxHandles */ 0);
+    const t1 = createHandle('T1');
+
+    const id1 = table.getId(t1);
+    assert.notStrictEqual(table.getId(t1), id1);
+    assert.strictEqual(table.size, 0);
+    assert.strictEqual(table.getHandle(id1), undefined);
+});
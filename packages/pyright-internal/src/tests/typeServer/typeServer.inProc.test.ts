@@ -16,7 +16,10 @@
  */
 
 import assert from 'assert';
+import { DidChangeWorkspaceFoldersNotification } from 'vscode-languageserver/node';
 
+import { UriEx } from '../../common/uri/uriUtils';
+import { TspSupplemental } from '../../typeServer/protocol/tspSupplemental';
 import { TypeServerProtocol } from '../../typeServer/protocol/typeServerProtocol';
 import { initializeDependenciesForInProcTests, withInProcTypeServer } from './inProcTypeServerTestUtils';
 
@@ -245,6 +248,156 @@ describe('TypeServer in-proc protocol', () => {
         });
     });
 
+    test('getDeclaredTypes returns the types of several nodes and sends shared types once', async () => {
+        const code = `
+// @filename: main.py
+//// class C:
+////     pass
+////
+//// [|/*list*/__list__|]: list[C] = []
+//// [|/*str*/__str__|]: str = 'x'
+`;
+
+        await withInProcTypeServer(code, async (context) => {
+            await context.openFileForMarker('list');
+            const listArg = context.getNodeForMarker('list');
+            const strArg = context.getNodeForMarker('str');
+
+            await context.refreshSnapshot();
+            const result = await context.sendRequestWithSnapshot(TspSupplemental.GetDeclaredTypesRequest.type, {
+                args: [listArg, strArg, listArg],
+            });
+
+            assert(result !== undefined);
+            assert.strictEqual(result.nodes, undefined);
+            assert.strictEqual(result.types.length, 3);
+
+            const [firstList, str, secondList] = result.types as TypeServerProtocol.ClassType[];
+            const firstTypeArg = firstList.typeArgs![0];
+            assert.strictEqual(getClassTypeName(firstList), 'list');
+            assert.strictEqual(getClassTypeName(firstTypeArg), 'C');
+            assert.strictEqual(getClassTypeName(str), 'str');
+            assert.strictEqual(new Set(result.types.map((type) => type!.id)).size, 3);
+
+            // The second list, or at least its type argument, refers to the type sent with the first.
+            const reference = (
+                secondList.kind === TypeServerProtocol.TypeKind.Class ? secondList.typeArgs![0] : secondList
+            ) as TypeServerProtocol.TypeReferenceType;
+            assert.strictEqual(reference.kind, TypeServerProtocol.TypeKind.TypeReference);
+            assert([firstList.id, firstTypeArg.id].includes(reference.typeReferenceId));
+        });
+    });
+
+    test('getComputedTypes returns the types of the names in a range', async () => {
+        const code = `
+// @filename: main.py
+//// __a__ = 1
+//// [|/*range*/__b__ = __a__ + 1
+//// __c__ = str(__b__)|]
+`;
+
+        await withInProcTypeServer(code, async (context) => {
+            await context.openFileForMarker('range');
+            const range = context.getNodeForMarker('range');
+
+            await context.refreshSnapshot();
+            const result = await context.sendRequestWithSnapshot(TspSupplemental.GetComputedTypesRequest.type, {
+                range,
+            });
+
+            assert(result !== undefined);
+            assert.deepStrictEqual(
+                result.nodes!.map((node) => node.range.start),
+                [
+                    { line: 1, character: 0 },
+                    { line: 1, character: 8 },
+                    { line: 2, character: 0 },
+                    { line: 2, character: 8 },
+                    { line: 2, character: 12 },
+                ]
+            );
+            assert.strictEqual(result.types.length, 5);
+            assert(result.types.every((type) => type !== null));
+            assert.strictEqual(getClassTypeName(result.types[0]!), 'int');
+            assert.strictEqual(getClassTypeName(result.types[2]!), 'str');
+        });
+    });
+
+    test('getDeclaredTypes resolves each arg in the workspace of its file', async () => {
+        const code = `
+// @filename: main.py
+//// [|/*main*/__x__|]: int = 1
+// @filename: /other/other.py
+//// [|/*other*/__y__|]: str = 'y'
+`;
+
+        await withInProcTypeServer(code, async (context) => {
+            context.sendNotification(DidChangeWorkspaceFoldersNotification.type, {
+                event: { added: [{ uri: UriEx.file('/other').toString(), name: 'other' }], removed: [] },
+            });
+            await context.openFileForMarker('main');
+            await context.openFileForMarker('other');
+            const mainArg = context.getNodeForMarker('main');
+            const otherArg = context.getNodeForMarker('other');
+
+            await context.refreshSnapshot();
+            const result = await context.sendRequestWithSnapshot(TspSupplemental.GetDeclaredTypesRequest.type, {
+                args: [mainArg, otherArg],
+            });
+
+            // Each name is looked up in the program of its own workspace.
+            assert(result !== undefined);
+            assert.deepStrictEqual(result.types.map((type) => getClassTypeName(type ?? undefined)), ['int', 'str']);
+        });
+    });
+
+    test('types keep their ids within a snapshot and can be resolved by id', async () => {
+        const code = `
+// @filename: main.py
+//// class C:
+////     pass
+////
+//// [|/*c*/__c__|]: C = C()
+// @filename: other.py
+//// [|/*other*/|]x = 1
+`;
+
+        await withInProcTypeServer(code, async (context) => {
+            await context.openFileForMarker('c');
+            const arg = context.getNodeForMarker('c');
+
+            await context.refreshSnapshot();
+            const type = await context.sendRequestWithSnapshot(TypeServerProtocol.GetDeclaredTypeRequest.type, {
+                arg,
+            });
+            const typeAgain = await context.sendRequestWithSnapshot(TypeServerProtocol.GetDeclaredTypeRequest.type, {
+                arg,
+            });
+
+            assert(type !== undefined && typeAgain !== undefined);
+            assert.strictEqual(getClassTypeName(type), 'C');
+            assert.strictEqual(typeAgain.id, type.id);
+
+            const resolved = await context.sendRequestWithSnapshot(TspSupplemental.ResolveTypeHandlesRequest.type, {
+                ids: [type.id, -1],
+            });
+            assert.strictEqual(resolved.types.length, 2);
+            assert.strictEqual(resolved.types[0]?.id, type.id);
+            assert.strictEqual(getClassTypeName(resolved.types[0]!), 'C');
+            assert.strictEqual(resolved.types[1], null);
+
+            // The handles are released when the snapshot changes.
+            const snapshotChanged = context.waitForSnapshotChanged();
+            await context.openFileForMarker('other');
+            await snapshotChanged;
+
+            const released = await context.sendRequestWithSnapshot(TspSupplemental.ResolveTypeHandlesRequest.type, {
+                ids: [type.id],
+            });
+            assert.deepStrictEqual(released.types, [null]);
+        });
+    });
+
     test('snapshotChanged notification is delivered', async () => {
         const code = `
 // @filename: main.py
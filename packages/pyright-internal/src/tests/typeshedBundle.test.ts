@@ -0,0 +1,127 @@
+/*
+ * typeshedBundle.test.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Unit tests for the packed typeshed bundle and the file system that
+ * serves the bundled typeshed directory from it.
+ */
+
+import assert from 'assert';
+
+import { createImportResolverFileSystem } from '../analyzer/importResolverFileSystem';
+import { buildTypeshedBundle } from '../analyzer/typeshedBundleBuilder';
+import { createDefaultTypeshedInfoProvider } from '../analyzer/typeshedInfoProvider';
+import { typeshedBundleFileName, typeshedFallback } from '../common/pathConsts';
+import { normalizeSlashes } from '../common/pathUtils';
+import { PythonVersion, pythonVersion3_0, pythonVersion3_9 } from '../common/pythonVersion';
+import { TypeshedBundle } from '../common/typeshedBundle';
+import { TypeshedBundleFileSystem } from '../common/typeshedBundleFileSystem';
+import { UriEx } from '../common/uri/uriUtils';
+import * as vfs from './harness/vfs/filesystem';
+
+const typeshedRoot = UriEx.file(normalizeSlashes(`/${typeshedFallback}`));
+const bundleFile = UriEx.file(normalizeSlashes(`/${typeshedBundleFileName}`));
+const osStub = typeshedRoot.combinePaths('stdlib', 'os', '__init__.pyi');
+
+test('bundle round trip', () => {
+    const fs = createFileSystem();
+    const bundle = TypeshedBundle.fromBuffer(buildTypeshedBundle(fs, typeshedRoot))!;
+
+    assert.strictEqual(bundle.commit, 'abc123');
+    assert(bundle.isDirectory(''));
+    assert(bundle.isDirectory('stdlib/os'));
+    assert(bundle.isFile('stdlib/os/__init__.pyi'));
+    assert(bundle.isFile('stdlib/VERSIONS.json'));
+    assert.strictEqual(bundle.readFile('stdlib/os/__init__.pyi')?.toString('utf8'), 'def getcwd() -> str: ...');
+    assert.deepStrictEqual([...bundle.readdir('stdlib')!.entries()].sort(), [
+        ['VERSIONS', true],
+        ['VERSIONS.json', true],
+        ['os', false],
+        ['zoneinfo.pyi', true],
+    ]);
+});
+
+test('invalid bundles are rejected', () => {
+    assert.strictEqual(TypeshedBundle.fromBuffer(Buffer.from('not a bundle')), undefined);
+
+    const truncated = TypeshedBundle.pack(new Map([['a.pyi', Buffer.from('x = 1')]]), undefined).subarray(0, 20);
+    assert.strictEqual(TypeshedBundle.fromBuffer(truncated), undefined);
+});
+
+test('typeshed files are served from the bundle', () => {
+    const fs = createFileSystem();
+    fs.writeFileSync(bundleFile, buildTypeshedBundle(fs, typeshedRoot), null);
+
+    // Remove the loose copy so it's clear which one is read.
+    fs.unlinkSync(osStub);
+
+    const bundleFs = new TypeshedBundleFileSystem(fs);
+    assert.strictEqual(bundleFs.readFileSync(osStub, 'utf8'), 'def getcwd() -> str: ...');
+    assert(bundleFs.existsSync(typeshedRoot.combinePaths('stdlib', 'VERSIONS.json')));
+    assert(bundleFs.statSync(typeshedRoot.combinePaths('stdlib', 'os')).isDirectory());
+    assert.throws(() => bundleFs.statSync(typeshedRoot.combinePaths('stdlib', 'missing.pyi')));
+
+    // Paths outside of the typeshed directory are unaffected.
+    assert.strictEqual(bundleFs.readFileSync(UriEx.file(normalizeSlashes('/src/main.py')), 'utf8'), 'import os');
+});
+
+test('pre-parsed VERSIONS table is used', () => {
+    const fs = createFileSystem();
+    fs.writeFileSync(bundleFile, buildTypeshedBundle(fs, typeshedRoot), null);
+
+    const importResolverFs = createImportResolverFileSystem(new TypeshedBundleFileSystem(fs));
+    const provider = createDefaultTypeshedInfoProvider(importResolverFs);
+    const versions = provider.getStdLibModuleVersionInfo(/* customTypeshedPath */ undefined);
+
+    assert(PythonVersion.isEqualTo(versions.get('os')!.min, pythonVersion3_0));
+    assert(PythonVersion.isEqualTo(versions.get('zoneinfo')!.min, pythonVersion3_9));
+    assert.deepStrictEqual(versions.get('zoneinfo')?.unsupportedPlatforms, ['win32']);
+});
+
+test('loose stubs changed after the bundle was built are used', () => {
+    const fs = createFileSystem();
+    fs.writeFileSync(bundleFile, buildTypeshedBundle(fs, typeshedRoot), null);
+
+    const zoneinfoStub = typeshedRoot.combinePaths('stdlib', 'zoneinfo.pyi');
+    const newStub = typeshedRoot.combinePaths('stdlib', 'os', 'path.pyi');
+
+    // Edits are detected by size and by modification time.
+    fs.writeFileSync(osStub, 'changed', 'utf8');
+    fs.time(2000);
+    fs.writeFileSync(zoneinfoStub, ' ', 'utf8');
+    fs.writeFileSync(newStub, 'def join(a: str) -> str: ...', 'utf8');
+
+    const bundleFs = new TypeshedBundleFileSystem(fs);
+    assert.strictEqual(bundleFs.readFileSync(osStub, 'utf8'), 'changed');
+    assert.strictEqual(bundleFs.readFileSync(zoneinfoStub, 'utf8'), ' ');
+    assert(bundleFs.existsSync(newStub));
+    assert.deepStrictEqual(bundleFs.readdirSync(osStub.getDirectory()).sort(), ['__init__.pyi', 'path.pyi']);
+
+    // Unchanged files are still served from the bundle.
+    assert(bundleFs.existsSync(typeshedRoot.combinePaths('stdlib', 'VERSIONS.json')));
+});
+
+test('stale bundles fall back to the loose directory', () => {
+    const fs = createFileSystem();
+    fs.writeFileSync(bundleFile, buildTypeshedBundle(fs, typeshedRoot), null);
+
+    fs.writeFileSync(osStub, 'changed', 'utf8');
+    fs.writeFileSync(typeshedRoot.combinePaths('commit.txt'), 'def456', 'utf8');
+
+    const bundleFs = new TypeshedBundleFileSystem(fs);
+    assert.strictEqual(bundleFs.readFileSync(osStub, 'utf8'), 'changed');
+    assert(!bundleFs.existsSync(typeshedRoot.combinePaths('stdlib', 'VERSIONS.json')));
+});
+
+function createFileSystem() {
+    const fs = new vfs.TestFileSystem(/* ignoreCase */ false, { cwd: normalizeSlashes('/'), time: 1000 });
+    fs.mkdirSync(osStub.getDirectory(), { recursive: true });
+    fs.mkdirSync(UriEx.file(normalizeSlashes('/src')), { recursive: true });
+    fs.writeFileSync(typeshedRoot.combinePaths('commit.txt'), 'abc123\n', 'utf8');
+    fs.writeFileSync(typeshedRoot.combinePaths('stdlib', 'VERSIONS'), 'os: 3.0-\nzoneinfo: 3.9- ; platforms=!win32\n');
+    fs.writeFileSync(osStub, 'def getcwd() -> str: ...', 'utf8');
+    fs.writeFileSync(typeshedRoot.combinePaths('stdlib', 'zoneinfo.pyi'), '', 'utf8');
+    fs.writeFileSync(UriEx.file(normalizeSlashes('/src/main.py')), 'import os', 'utf8');
+    return fs;
+}
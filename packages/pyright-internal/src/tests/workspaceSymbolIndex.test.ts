@@ -0,0 +1,138 @@
+/*
+ * workspaceSymbolIndex.test.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * Unit tests for the incrementally maintained workspace symbol index.
+ */
+
+import assert from 'assert';
+import { CancellationToken, SymbolInformation } from 'vscode-languageserver';
+
+import { ProgramView } from '../common/extensibility';
+import { Uri } from '../common/uri/uri';
+import { WorkspaceSymbolIndex } from '../languageService/workspaceSymbolIndex';
+import { WorkspaceSymbolProvider } from '../languageService/workspaceSymbolProvider';
+import { parseAndGetTestState } from './harness/fourslash/testState';
+
+const code = `
+// @filename: opened.py
+//// # The first file is opened by the test harness.
+
+// @filename: shapes.py
+//// class Rectangle:
+////     def get_area(self): ...
+////
+//// def make_rectangle(): ...
+
+// @filename: colors.py
+//// RED = 1
+//// def get_color(): ...
+`;
+
+test('prefix matches are returned before fuzzy matches', () => {
+    const state = parseAndGetTestState(code).state;
+    const index = new WorkspaceSymbolIndex(state.testFS);
+    index.update(state.program, CancellationToken.None);
+
+    assert.strictEqual(index.fileCount, 3);
+    assert.deepStrictEqual(
+        index.search('rect', CancellationToken.None).map((entry) => entry.name),
+        ['Rectangle', 'make_rectangle']
+    );
+
+    const [getArea] = index.search('getarea', CancellationToken.None);
+    assert.strictEqual(getArea.name, 'get_area');
+    assert.strictEqual(getArea.containerName, 'Rectangle');
+    assert.strictEqual(index.search('xyz', CancellationToken.None).length, 0);
+});
+
+test('changed files are re-indexed', () => {
+    const state = parseAndGetTestState(code).state;
+    const index = new WorkspaceSymbolIndex(state.testFS);
+    index.update(state.program, CancellationToken.None);
+
+    const colorsUri = Uri.file('/colors.py', state.serviceProvider);
+    state.testFS.writeFileSync(colorsUri, 'BLUE = 2');
+    state.program.markFilesDirty([colorsUri], /* evenIfContentsAreSame */ true);
+    index.update(state.program, CancellationToken.None);
+
+    assert.strictEqual(index.search('red', CancellationToken.None).length, 0);
+    assert.deepStrictEqual(
+        index.search('blue', CancellationToken.None).map((entry) => entry.fileUri.key),
+        [colorsUri.key]
+    );
+});
+
+test('persisted symbols are reused by a later session', () => {
+    const state = parseAndGetTestState(code).state;
+    const cacheFile = Uri.file('/cache/symbolIndex.json', state.serviceProvider);
+
+    // Recently modified files aren't persisted.
+    const past = new Date(1000);
+    state.testFS.utimesSync('/shapes.py', past, past);
+    state.testFS.utimesSync('/colors.py', past, past);
+
+    const firstIndex = new WorkspaceSymbolIndex(state.testFS, cacheFile);
+    firstIndex.update(state.program, CancellationToken.None);
+    assert(firstIndex.save());
+
+    // Restored files don't need to be written again.
+    const secondIndex = new WorkspaceSymbolIndex(state.testFS, cacheFile);
+    secondIndex.update(state.program, CancellationToken.None);
+    assert(!secondIndex.save());
+
+    const [rectangle] = secondIndex.search('Rectangle', CancellationToken.None);
+    assert.strictEqual(rectangle.fileUri.key, Uri.file('/shapes.py', state.serviceProvider).key);
+    assert.deepStrictEqual(rectangle.selectionRange, {
+        start: { line: 0, character: 6 },
+        end: { line: 0, character: 15 },
+    });
+});
+
+test('symbols are kept for source files that are replaced without changes', () => {
+    const state = parseAndGetTestState(code).state;
+    const shapesUri = Uri.file('/shapes.py', state.serviceProvider);
+    const colorsUri = Uri.file('/colors.py', state.serviceProvider);
+
+    const past = new Date(1000);
+    state.testFS.utimesSync('/shapes.py', past, past);
+    state.testFS.utimesSync('/colors.py', past, past);
+
+    const index = new WorkspaceSymbolIndex(state.testFS);
+    index.update(state.program, CancellationToken.None);
+    const [rectangle] = index.search('Rectangle', CancellationToken.None);
+
+    // Removing and re-adding the files creates new source files, as a
+    // program reset does. Only the file that changed is re-indexed.
+    const trackedFiles = state.program
+        .getSourceFileInfoList()
+        .filter((info) => info.isTracked)
+        .map((info) => info.uri);
+    state.program.setTrackedFiles(trackedFiles.filter((uri) => !uri.equals(shapesUri) && !uri.equals(colorsUri)));
+    state.testFS.writeFileSync(colorsUri, 'BLUE = 2');
+    state.program.setTrackedFiles(trackedFiles);
+    index.update(state.program, CancellationToken.None);
+
+    assert.strictEqual(index.search('Rectangle', CancellationToken.None)[0], rectangle);
+    assert.strictEqual(index.search('red', CancellationToken.None).length, 0);
+    assert.strictEqual(index.search('blue', CancellationToken.None).length, 1);
+});
+
+test('subclasses that customize document symbols are used for queries', () => {
+    const state = parseAndGetTestState(code).state;
+    state.workspace.isInitialized.resolve();
+
+    class CustomProvider extends WorkspaceSymbolProvider {
+        protected override getSymbolsForDocument(program: ProgramView, fileUri: Uri): SymbolInformation[] {
+            return super.getSymbolsForDocument(program, fileUri).map((symbol) => ({ ...symbol, name: 'custom' }));
+        }
+    }
+
+    const symbols = new CustomProvider([state.workspace], undefined, 'rect', CancellationToken.None).reportSymbols();
+    assert.deepStrictEqual(
+        symbols.map((symbol) => symbol.name),
+        ['custom', 'custom']
+    );
+    assert.strictEqual(WorkspaceSymbolIndex.get(state.workspace.service), undefined);
+});
@@ -93,6 +93,7 @@ import { ITypeCache, TypeCache } from './typeCache';
 export class ProgramWrapper implements IProgram {
     private _cachedSearchPaths: Uri[] | undefined;
     private _declTypeCache: WeakMap<ParseNode, Type> = new WeakMap();
+    private _massagedTypeCache: WeakMap<Type, Type> = new WeakMap();
     private _protocolDeclCache: Map<string, Declaration> = new Map();
     private _disableSnapshotIncrement = false;
     private _addedStubs = new UriMap<boolean>();
@@ -668,6 +669,19 @@ export class ProgramWrapper implements IProgram {
     }
 
     private _massageTypeResult(result: Type | undefined): Type | undefined {
+        if (!result) {
+            return undefined;
+        }
+
+        // Return the same copy each time the type is massaged, so the type
+        // keeps its handle across the requests of a snapshot.
+        const massaged = this._massagedTypeCache.get(result);
+        if (massaged) {
+            return massaged;
+        }
+
+        const original = result;
+
         // For function types, make sure we inferred the return type if not
         // already.
         if (result && isFunctionOrOverloaded(result)) {
@@ -685,6 +699,10 @@ export class ProgramWrapper implements IProgram {
             result = { ...result, cached: undefined };
         }
 
+        if (result !== original) {
+            this._massagedTypeCache.set(original, result);
+        }
+
         return result;
     }
 
@@ -5,14 +5,17 @@
  *
  * Pyright-specific supplemental extensions to the Type Server Protocol (TSP).
  *
- * These notifications are NOT part of the base TSP (defined in typeServerProtocol.ts),
+ * These requests and notifications are NOT part of the base TSP (defined in typeServerProtocol.ts),
  * which is shared by all TSP implementers (e.g., ty-tsp). This file defines
- * Pyright-only extensions that require Pyright-specific knowledge (e.g., the
- * virtual-file overlay in PylanceFileSystem).
+ * Pyright-only extensions, such as ones that require Pyright-specific knowledge
+ * (e.g., the virtual-file overlay in PylanceFileSystem) and batched forms of
+ * base TSP requests.
  *
  * All the types in this file should be JSON serializable, as they are sent over the wire.
  */
-import { MessageDirection, ProtocolNotificationType } from 'vscode-languageserver-protocol';
+import { MessageDirection, ProtocolNotificationType, ProtocolRequestType } from 'vscode-languageserver-protocol';
+
+import { TypeServerProtocol } from './typeServerProtocol';
 
 export namespace TspSupplemental {
     /**
@@ -58,4 +61,109 @@ export namespace TspSupplemental {
         export const messageDirection = MessageDirection.clientToServer;
         export const type = new ProtocolNotificationType<RemoveVirtualFileRedirectParams, void>(method);
     }
+
+    /**
+     * Parameters for the batched type requests.
+     */
+    export interface GetTypesParams {
+        /**
+         * The declarations or nodes to get the types of. The type server uses the workspace of the
+         * first one for all of them.
+         */
+        args?: (TypeServerProtocol.Declaration | TypeServerProtocol.Node)[];
+        /**
+         * A range in a file, used if `args` is not set. The types of all the names within the range
+         * are returned.
+         */
+        range?: TypeServerProtocol.Node;
+        /** The snapshot that all of the types are requested for. */
+        snapshot: number;
+    }
+
+    /**
+     * Result of the batched type requests.
+     */
+    export interface GetTypesResult {
+        /** The names found within `range`, in the order of `types`. Not set if `args` was given. */
+        nodes?: TypeServerProtocol.Node[];
+        /**
+         * The type of each arg or node, or null if it has none. Type ids are unique across the whole
+         * result, and a type that occurs in more than one entry is sent only once: later occurrences
+         * are `TypeReference` types that refer to it by id, possibly in an earlier entry.
+         */
+        types: (TypeServerProtocol.Type | null)[];
+    }
+
+    /**
+     * Batched form of `typeServer/getComputedType`. Returns the computed types of many declarations
+     * or nodes of a single snapshot in one response, so a client that shows the types of a whole
+     * file doesn't pay for a round trip and a snapshot check per node. Cancelling the request
+     * cancels the whole batch.
+     */
+    export namespace GetComputedTypesRequest {
+        export const method = 'pyright/getComputedTypes' as const;
+        export const messageDirection = MessageDirection.clientToServer;
+        export const type = new ProtocolRequestType<GetTypesParams, GetTypesResult | undefined, never, void, void>(
+            method
+        );
+    }
+
+    /**
+     * Batched form of `typeServer/getDeclaredType`. See `GetComputedTypesRequest`.
+     */
+    export namespace GetDeclaredTypesRequest {
+        export const method = 'pyright/getDeclaredTypes' as const;
+        export const messageDirection = MessageDirection.clientToServer;
+        export const type = new ProtocolRequestType<GetTypesParams, GetTypesResult | undefined, never, void, void>(
+            method
+        );
+    }
+
+    /**
+     * Batched form of `typeServer/getExpectedType`. See `GetComputedTypesRequest`.
+     */
+    export namespace GetExpectedTypesRequest {
+        export const method = 'pyright/getExpectedTypes' as const;
+        export const messageDirection = MessageDirection.clientToServer;
+        export const type = new ProtocolRequestType<GetTypesParams, GetTypesResult | undefined, never, void, void>(
+            method
+        );
+    }
+
+    /**
+     * Type server specific options that the client can pass in the `initializationOptions` of the
+     * initialize request.
+     */
+    export interface InitializationOptions {
+        /**
+         * The maximum number of types that the type server keeps handles for. When there are more,
+         * the least recently returned types are released. Defaults to 50000; 0 disables handles.
+         */
+        maxTypeHandles?: number;
+    }
+
+    /**
+     * Parameters for the resolveTypeHandles request.
+     */
+    export interface ResolveTypeHandlesParams {
+        /** Ids of types that the type server returned earlier in the same snapshot. */
+        ids: number[];
+        /** The snapshot that the ids were returned in. */
+        snapshot: number;
+    }
+
+    /**
+     * Request for the types with the given ids. Within a snapshot, the type server gives a type the
+     * same id every time it returns it, so a client can cache types by id, or keep only their ids and
+     * get the types later with this request. A result is a `TypeReference` if the type occurred in an
+     * earlier result, and null if the id is unknown or its type was released. All types are released
+     * when the snapshot changes.
+     */
+    export namespace ResolveTypeHandlesRequest {
+        export const method = 'pyright/resolveTypeHandles' as const;
+        export const messageDirection = MessageDirection.clientToServer;
+        export const type = new ProtocolRequestType<ResolveTypeHandlesParams, GetTypesResult, never, void, void>(
+            method
+        );
+    }
 }
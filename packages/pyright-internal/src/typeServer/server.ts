@@ -43,6 +43,7 @@ import { isPythonBinary } from '../analyzer/pythonPathUtils';
 import { IPythonMode } from '../analyzer/sourceFile';
 import { Type } from '../analyzer/types';
 import { IBackgroundAnalysis } from '../backgroundAnalysisBase';
+import { throwIfCancellationRequested } from '../common/cancellationUtils';
 import { ConfigOptions } from '../common/configOptions';
 import { convertLogLevel, LogLevel } from '../common/console';
 import { isDefined, isString } from '../common/core';
@@ -65,17 +66,24 @@ import { convertFromPyrightDiagnostic } from './diagnosticUtils';
 import { AnyNotebookDocumentSelector } from './notebookCellChain';
 import { NotebookDocumentHandler } from './notebookDocumentHandler';
 import { INotebookUriMapper, NotebookUriMapper } from './notebookUriMapper';
+import { IProgram } from './programTypes';
 import { makeProgram, ProgramWrapper } from './programWrapper';
 import { TspSupplemental } from './protocol/tspSupplemental';
 import { TypeServerProtocol } from './protocol/typeServerProtocol';
 import { convertLspUriStringToUri } from './serverUtils';
-import { fromProtocolDecl, fromProtocolNode } from './typeServerConversionTypes';
+import { fromProtocolDecl, fromProtocolNode, fromProtocolRange, toProtocolNode } from './typeServerConversionTypes';
 import { ProtocolTypeFactory } from './typeServerConversionUtils';
 import { isDeclaration } from './typeEvalUtils';
 import { ITypeCache, TypeCache } from './typeCache';
 import { TypeServerVirtualFileRedirects } from './typeServerFileSystem';
 import { TypeServerServiceKeys } from './typeServerServiceKeys';
 
+type TypeFetcher = (
+    program: ProgramWrapper,
+    input: ParseNode | Declaration,
+    token: CancellationToken
+) => Type | undefined;
+
 export class TypeServer extends LanguageServerBase {
     private readonly _handleToUriMap = new Map<number, Uri>();
     private _initializedComplete = false;
@@ -339,21 +347,25 @@ export class TypeServer extends LanguageServerBase {
     protected override setupConnection(supportedCommands: string[], supportedCodeActions: string[]): void {
         super.setupConnection(supportedCommands, supportedCodeActions);
 
+        const getComputedType: TypeFetcher = (program, input, token) => program.getComputedType(input, token);
+        const getExpectedType: TypeFetcher = (program, input, token) => {
+            const result = program.getExpectedType(input, token);
+            return result?.type;
+        };
+        const getDeclaredType: TypeFetcher = (program, input, token) => program.getDeclaredType(input, token);
+
         // Register for all of the other requests that we support.
         this.connection.onRequest(
             TypeServerProtocol.GetComputedTypeRequest.type,
-            this._onGetType.bind(this, (program, input, token) => program.getComputedType(input, token))
+            this._onGetType.bind(this, getComputedType)
         );
         this.connection.onRequest(
             TypeServerProtocol.GetExpectedTypeRequest.type,
-            this._onGetType.bind(this, (program, input, token) => {
-                const result = program.getExpectedType(input, token);
-                return result?.type;
-            })
+            this._onGetType.bind(this, getExpectedType)
         );
         this.connection.onRequest(
             TypeServerProtocol.GetDeclaredTypeRequest.type,
-            this._onGetType.bind(this, (program, input, token) => program.getDeclaredType(input, token))
+            this._onGetType.bind(this, getDeclaredType)
         );
         this.connection.onRequest(TypeServerProtocol.GetSnapshotRequest.type, this._onGetSnapshot.bind(this));
         this.connection.onRequest(
@@ -377,6 +389,24 @@ export class TypeServer extends LanguageServerBase {
             this._onRemoveVirtualFileRedirect(params)
         );
 
+        // Register the batched forms of the type requests (Pyright-specific TSP supplemental).
+        this.connection.onRequest(
+            TspSupplemental.GetComputedTypesRequest.type,
+            this._onGetTypes.bind(this, getComputedType)
+        );
+        this.connection.onRequest(
+            TspSupplemental.GetExpectedTypesRequest.type,
+            this._onGetTypes.bind(this, getExpectedType)
+        );
+        this.connection.onRequest(
+            TspSupplemental.GetDeclaredTypesRequest.type,
+            this._onGetTypes.bind(this, getDeclaredType)
+        );
+        this.connection.onRequest(
+            TspSupplemental.ResolveTypeHandlesRequest.type,
+            this._onResolveTypeHandles.bind(this)
+        );
+
         // Register raw notification handlers for notebook documents. These are registered here
         // (before connection.listen()) so they're ready when the connection starts processing
         // messages. `notebookManager` is created in `initialize()` (not here) because SWC's
@@ -407,6 +437,11 @@ export class TypeServer extends LanguageServerBase {
             this.notebookManager = this.createNotebookManager(this._uriMapper);
         }
 
+        const initializationOptions = params.initializationOptions as TspSupplemental.InitializationOptions | undefined;
+        if (typeof initializationOptions?.maxTypeHandles === 'number') {
+            this._globalTypeCache.typeHandles.maxHandles = initializationOptions.maxTypeHandles;
+        }
+
         const result = await super.initialize(params, supportedCommands, supportedCodeActions);
 
         // Advertise notebook support so the client sends notebookDocument/* notifications.
@@ -623,11 +658,7 @@ export class TypeServer extends LanguageServerBase {
     }
 
     private async _onGetType(
-        typeFetcher: (
-            program: ProgramWrapper,
-            input: ParseNode | Declaration,
-            token: CancellationToken
-        ) => Type | undefined,
+        typeFetcher: TypeFetcher,
         params: {
             arg: TypeServerProtocol.Declaration | TypeServerProtocol.Node;
             snapshot: number;
@@ -635,13 +666,7 @@ export class TypeServer extends LanguageServerBase {
         token: CancellationToken
     ): Promise<TypeServerProtocol.Type | undefined> {
         const arg = params.arg;
-        const uri = isProtocolDeclaration(arg)
-            ? arg.kind === TypeServerProtocol.DeclarationKind.Regular
-                ? arg.node.uri
-                : arg.uri
-            : arg.uri;
-
-        const fileUri = this.convertLspUriStringToUri(uri);
+        const fileUri = this.convertLspUriStringToUri(getProtocolArgUri(arg));
         const program = await this._getProgram(fileUri);
         if (!program) {
             return undefined;
@@ -652,9 +677,7 @@ export class TypeServer extends LanguageServerBase {
             throw new ServerCanceledException();
         }
 
-        const input = isProtocolDeclaration(arg)
-            ? fromProtocolDecl(arg, program, program.symbolLookup)
-            : fromProtocolNode<ParseNode>(arg, program);
+        const input = fromProtocolArg(program, arg);
         if (!input) {
             return undefined;
         }
@@ -664,19 +687,135 @@ export class TypeServer extends LanguageServerBase {
             return undefined;
         }
 
-        let pythonVersion = program.configOptions.getDefaultExecEnvironment().pythonVersion;
-        const node = isDeclaration(input) ? input.node : input;
-        if (node) {
-            const fileInfo = program.symbolLookup.getFileInfo(node);
-            pythonVersion = fileInfo.executionEnvironment.pythonVersion;
-        }
-
+        const pythonVersion = getPythonVersion(program, input);
         return program.run((p) => {
-            const factory = new ProtocolTypeFactory(p, pythonVersion, input);
+            const factory = new ProtocolTypeFactory(
+                p,
+                pythonVersion,
+                input,
+                this._globalTypeCache.typeHandles,
+                this._globalTypeCache.stubs
+            );
             return factory.getType(type);
         }, token);
     }
 
+    private async _onGetTypes(
+        typeFetcher: TypeFetcher,
+        params: TspSupplemental.GetTypesParams,
+        token: CancellationToken
+    ): Promise<TspSupplemental.GetTypesResult | undefined> {
+        const { args, range } = params;
+        const uris = args ? args.map((arg) => getProtocolArgUri(arg)) : range ? [range.uri] : [];
+        if (uris.length === 0) {
+            return { types: [] };
+        }
+
+        // The args can come from files in different workspaces, so find the
+        // program of each file before the rest of the batch runs.
+        const programsByUri = new Map<string, ProgramWrapper>();
+        for (const uri of new Set(uris)) {
+            const program = await this._getProgram(this.convertLspUriStringToUri(uri));
+            if (!program) {
+                return undefined;
+            }
+            programsByUri.set(uri, program);
+        }
+
+        // Make sure this is the current snapshot. The rest of the batch runs
+        // synchronously, so the snapshot can't change before it completes.
+        for (const program of new Set(programsByUri.values())) {
+            if (program.getSnapshot(token) !== params.snapshot) {
+                throw new ServerCanceledException();
+            }
+        }
+
+        const programs = uris.map((uri) => programsByUri.get(uri)!);
+        let inputs: (ParseNode | Declaration | undefined)[] = [];
+        let nodes: TypeServerProtocol.Node[] | undefined;
+        if (args) {
+            inputs = args.map((arg, index) => fromProtocolArg(programs[index], arg));
+        } else if (range) {
+            const names = fromProtocolRange(range, programs[0]);
+            inputs = names;
+            nodes = names.map((name) => toProtocolNode(name, programs[0]));
+        }
+
+        // Convert all of the types from a program with one factory, so a type
+        // that is shared by several results is sent only once.
+        const factories = new Map<IProgram, ProtocolTypeFactory>();
+        const types = inputs.map((input, index) => {
+            // Cancellation fails the whole batch rather than returning partial results.
+            throwIfCancellationRequested(token);
+
+            const program = args ? programs[index] : programs[0];
+            const type = input ? typeFetcher(program, input, token) : undefined;
+            if (!input || !type) {
+                return null;
+            }
+
+            const pythonVersion = getPythonVersion(program, input);
+            return program.run((p) => {
+                let factory = factories.get(program);
+                if (factory) {
+                    factory.setSource(pythonVersion, input);
+                } else {
+                    factory = new ProtocolTypeFactory(
+                        p,
+                        pythonVersion,
+                        input,
+                        this._globalTypeCache.typeHandles,
+                        this._globalTypeCache.stubs
+                    );
+                    factories.set(program, factory);
+                }
+                return factory.getType(type);
+            }, token);
+        });
+
+        return { nodes, types };
+    }
+
+    private async _onResolveTypeHandles(
+        params: TspSupplemental.ResolveTypeHandlesParams,
+        token: CancellationToken
+    ): Promise<TspSupplemental.GetTypesResult> {
+        // Make sure this is the current snapshot. Handles are released when it changes.
+        if (this._globalTypeCache.snapshot !== params.snapshot) {
+            throw new ServerCanceledException();
+        }
+
+        const typeHandles = this._globalTypeCache.typeHandles;
+        const factories = new Map<IProgram, ProtocolTypeFactory>();
+        const types = params.ids.map((id) => {
+            throwIfCancellationRequested(token);
+
+            const handle = typeHandles.getHandle(id);
+            if (!handle) {
+                return null;
+            }
+
+            return handle.program.run((p) => {
+                let factory = factories.get(handle.program);
+                if (factory) {
+                    factory.setSource(handle.pythonVersion, handle.source);
+                } else {
+                    factory = new ProtocolTypeFactory(
+                        p,
+                        handle.pythonVersion,
+                        handle.source,
+                        typeHandles,
+                        this._globalTypeCache.stubs
+                    );
+                    factories.set(handle.program, factory);
+                }
+                return factory.getType(handle.type);
+            }, token);
+        });
+
+        return { types };
+    }
+
     private async _onResolveImport(params: TypeServerProtocol.ResolveImportParams, token: CancellationToken) {
         const sourceUri = this.convertLspUriStringToUri(params.sourceUri);
         const program = await this._getProgram(sourceUri);
@@ -819,3 +958,28 @@ function isProtocolDeclaration(
 ): arg is TypeServerProtocol.Declaration {
     return (arg as TypeServerProtocol.Declaration).kind !== undefined;
 }
+
+function getProtocolArgUri(arg: TypeServerProtocol.Declaration | TypeServerProtocol.Node) {
+    return isProtocolDeclaration(arg)
+        ? arg.kind === TypeServerProtocol.DeclarationKind.Regular
+            ? arg.node.uri
+            : arg.uri
+        : arg.uri;
+}
+
+function fromProtocolArg(program: ProgramWrapper, arg: TypeServerProtocol.Declaration | TypeServerProtocol.Node) {
+    return isProtocolDeclaration(arg)
+        ? fromProtocolDecl(arg, program, program.symbolLookup)
+        : fromProtocolNode<ParseNode>(arg, program);
+}
+
+function getPythonVersion(program: ProgramWrapper, input: ParseNode | Declaration) {
+    let pythonVersion = program.configOptions.getDefaultExecEnvironment().pythonVersion;
+    const node = isDeclaration(input) ? input.node : input;
+    if (node) {
+        const fileInfo = program.symbolLookup.getFileInfo(node);
+        pythonVersion = fileInfo.executionEnvironment.pythonVersion;
+    }
+
+    return pythonVersion;
+}
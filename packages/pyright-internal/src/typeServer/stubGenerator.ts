@@ -31,15 +31,25 @@ interface StubGenerationContext {
     pythonVersion: PythonVersion;
     moduleImports: Map<string, Set<string>>; // module -> set of imported names
     methodClass?: PyrightTypes.ClassType; // Class type if generating stub for a method
-    targetMethodName?: string; // If provided, adds marker to this specific method instead of the class
     selfTypeVarName?: string; // If set, replace 'Self' with this TypeVar name
 }
 
+/**
+ * Lines of generated stub content, along with the lines that hold definitions, so the
+ * offset of a definition is known without searching the generated text.
+ */
+interface StubLines {
+    lines: string[];
+    classLine?: number; // Index of the line with the class definition, for class stubs
+    methodLines: Map<string, number>; // Index of the first line that defines each function or method name
+}
+
 /**
  * Options for stub generation.
  */
 export interface StubGenerationOptions {
     pythonVersion: PythonVersion; // Python version from executionEnvironment
+    cache?: StubCache; // Cache of the stubs generated in the current snapshot
 }
 
 /**
@@ -50,6 +60,61 @@ export interface StubGenerationResult {
     primaryDefinitionOffset: number; // Character offset to the primary definition in stubContent
 }
 
+/**
+ * The stub generated for a class, with the offsets of the class and of each of its methods.
+ */
+export interface ClassStub {
+    stubContent: string;
+    classOffset: number;
+    methodOffsets: Map<string, number>;
+}
+
+/**
+ * Stubs generated for classes and functions, keyed by the identity of their types and the
+ * Python version. The type server keeps one per snapshot, so asking again about the same
+ * synthesized type (or another method of the same class) doesn't generate the stub again.
+ */
+export class StubCache {
+    private _classStubs = new WeakMap<PyrightTypes.ClassType, Map<string, ClassStub>>();
+    private _functionStubs = new WeakMap<PyrightTypes.FunctionType, Map<string, StubGenerationResult>>();
+
+    getClassStub(type: PyrightTypes.ClassType, pythonVersion: PythonVersion): ClassStub | undefined {
+        return this._classStubs.get(type)?.get(PythonVersion.toString(pythonVersion));
+    }
+
+    setClassStub(type: PyrightTypes.ClassType, pythonVersion: PythonVersion, stub: ClassStub) {
+        setCachedStub(this._classStubs, type, pythonVersion, stub);
+    }
+
+    getFunctionStub(type: PyrightTypes.FunctionType, pythonVersion: PythonVersion): StubGenerationResult | undefined {
+        return this._functionStubs.get(type)?.get(PythonVersion.toString(pythonVersion));
+    }
+
+    setFunctionStub(type: PyrightTypes.FunctionType, pythonVersion: PythonVersion, stub: StubGenerationResult) {
+        setCachedStub(this._functionStubs, type, pythonVersion, stub);
+    }
+
+    clear() {
+        this._classStubs = new WeakMap();
+        this._functionStubs = new WeakMap();
+    }
+}
+
+function setCachedStub<K extends object, V>(
+    stubs: WeakMap<K, Map<string, V>>,
+    type: K,
+    pythonVersion: PythonVersion,
+    stub: V
+) {
+    let stubsByVersion = stubs.get(type);
+    if (!stubsByVersion) {
+        stubsByVersion = new Map();
+        stubs.set(type, stubsByVersion);
+    }
+
+    stubsByVersion.set(PythonVersion.toString(pythonVersion), stub);
+}
+
 export function generateStubFromTypeVar(
     typeVar: PyrightTypes.TypeVarType,
     options: StubGenerationOptions
@@ -102,15 +167,13 @@ export function generateStubFromTypeVar(
         lines.push(...importLines);
         lines.push('');
     }
+    const declarationLineIndex = lines.length;
     lines.push(declarationLine);
     lines.push('');
 
-    const stubContent = lines.join('\n');
-    const primaryDefinitionOffset = Math.max(0, stubContent.indexOf(declarationLine));
-
     return {
-        stubContent,
-        primaryDefinitionOffset,
+        stubContent: lines.join('\n'),
+        primaryDefinitionOffset: getDefinitionOffsets(lines)[declarationLineIndex],
     };
 }
 
@@ -134,6 +197,11 @@ export function generateStubFromFunctionType(
         return generateStubFromClassType(evaluator, methodClass, options, type.shared.name);
     }
 
+    const cachedStub = options.cache?.getFunctionStub(type, options.pythonVersion);
+    if (cachedStub) {
+        return cachedStub;
+    }
+
     const context: StubGenerationContext = {
         imports: { imports: new Map() },
         pythonVersion: options.pythonVersion,
@@ -189,7 +257,7 @@ export function generateStubFromFunctionType(
 
     // Generate the function stub with docstring and deprecated decorator
     const functionStub = generateFunctionStub(type, context, type.shared.docString, type.shared.deprecatedMessage);
-    lines.push(functionStub);
+    lines.push(...functionStub.lines);
 
     // Generate imports (will be inserted at top after we know what's needed)
     const importLines = generateImportStatements(context);
@@ -202,18 +270,17 @@ export function generateStubFromFunctionType(
     }
     result.push(...lines);
 
-    // Calculate offset to the function definition
     // The function stub is always at the end of the result content
-    const stubContent = result.join('\n') + '\n';
-    const functionStubIndex = stubContent.lastIndexOf(functionStub);
-    if (functionStubIndex < 0) {
-        throw new Error(`Failed to find function stub in generated content`);
-    }
+    const functionStubStart = result.length - functionStub.lines.length;
+    result.push('');
 
-    return {
-        stubContent,
-        primaryDefinitionOffset: functionStubIndex,
+    const stubResult: StubGenerationResult = {
+        stubContent: result.join('\n'),
+        primaryDefinitionOffset: getDefinitionOffsets(result)[functionStubStart],
     };
+
+    options.cache?.setFunctionStub(type, options.pythonVersion, stubResult);
+    return stubResult;
 }
 
 /**
@@ -223,14 +290,14 @@ export function generateStubFromFunctionType(
  * @param context Generation context
  * @param docString Optional docstring to include
  * @param deprecatedMessage Optional deprecation message
- * @returns Function stub string (e.g., "def foo(x: int, y: str) -> bool: ...")
+ * @returns Function stub lines (e.g., "def foo(x: int, y: str) -> bool: ...")
  */
 function generateFunctionStub(
     type: PyrightTypes.FunctionType,
     context: StubGenerationContext,
     docString?: string,
     deprecatedMessage?: string
-): string {
+): StubLines {
     const lines: string[] = [];
 
     // Add @deprecated decorator if deprecated
@@ -302,6 +369,7 @@ function generateFunctionStub(
     parts.push(returnType);
     parts.push(':');
 
+    const defLine = lines.length;
     lines.push(parts.join(''));
 
     // Add docstring if present
@@ -318,7 +386,40 @@ function generateFunctionStub(
         lines[lines.length - 1] += ' ...';
     }
 
-    return lines.join('\n');
+    return { lines, methodLines: new Map([[functionName, defLine]]) };
+}
+
+/**
+ * Appends generated stub lines to a stub, indented if requested, and keeps the first line
+ * that defines each function or method name.
+ */
+function appendStubLines(stub: StubLines, added: StubLines, indent = ''): void {
+    const start = stub.lines.length;
+    for (const line of added.lines) {
+        // A line can contain line breaks (e.g. in a deprecation message), so indent each of them.
+        stub.lines.push(indent ? indent + line.split('\n').join(`\n${indent}`) : line);
+    }
+
+    added.methodLines.forEach((line, name) => {
+        if (!stub.methodLines.has(name)) {
+            stub.methodLines.set(name, start + line);
+        }
+    });
+}
+
+/**
+ * Returns the offset of the first character that isn't indentation in each of the lines,
+ * once they are joined with line breaks.
+ */
+function getDefinitionOffsets(lines: string[]): number[] {
+    const offsets: number[] = [];
+    let lineStart = 0;
+    for (const line of lines) {
+        offsets.push(lineStart + line.length - line.trimStart().length);
+        lineStart += line.length + 1;
+    }
+
+    return offsets;
 }
 
 /**
@@ -513,27 +614,64 @@ export function generateStubFromClassType(
     options: StubGenerationOptions,
     targetMethodName?: string
 ): StubGenerationResult {
+    const classStub = getClassStub(evaluator, type, options);
+
+    // NewType classes are generated as an assignment, which is also the definition of their methods.
+    if (!targetMethodName || PyrightTypes.ClassType.isNewTypeClass(type)) {
+        return { stubContent: classStub.stubContent, primaryDefinitionOffset: classStub.classOffset };
+    }
+
+    const methodOffset = classStub.methodOffsets.get(targetMethodName);
+    if (methodOffset === undefined) {
+        throw new Error(`Failed to find method '${targetMethodName}' in generated class stub`);
+    }
+
+    return { stubContent: classStub.stubContent, primaryDefinitionOffset: methodOffset };
+}
+
+/**
+ * Returns the stub of a class from the cache, or generates it.
+ */
+function getClassStub(
+    evaluator: ITypeServerEvaluator,
+    type: PyrightTypes.ClassType,
+    options: StubGenerationOptions
+): ClassStub {
+    const cachedStub = options.cache?.getClassStub(type, options.pythonVersion);
+    if (cachedStub) {
+        return cachedStub;
+    }
+
     const context: StubGenerationContext = {
         imports: { imports: new Map() },
         pythonVersion: options.pythonVersion,
         moduleImports: new Map(),
-        targetMethodName,
     };
 
+    // Special handling for NewType classes - generate as NewType call instead of class definition
+    const classStub = PyrightTypes.ClassType.isNewTypeClass(type)
+        ? generateNewTypeStub(type, context)
+        : generateClassStubFile(evaluator, type, context);
+
+    options.cache?.setClassStub(type, options.pythonVersion, classStub);
+    return classStub;
+}
+
+/**
+ * Generates the stub file of a class, with the offsets of the class and its methods.
+ */
+function generateClassStubFile(
+    evaluator: ITypeServerEvaluator,
+    type: PyrightTypes.ClassType,
+    context: StubGenerationContext
+): ClassStub {
     const lines: string[] = [];
 
     // Generate header comment
     lines.push('# This stub file was generated from Pyright type information');
     lines.push('');
 
-    // Special handling for NewType classes - generate as NewType call instead of class definition
-    if (PyrightTypes.ClassType.isNewTypeClass(type)) {
-        return generateNewTypeStub(type, context, options);
-    }
-
-    // Generate the class stub (will include marker for main class)
     const classStub = generateClassStub(evaluator, type, context, true);
-    lines.push(classStub);
 
     // Generate imports (will be inserted at top after we know what's needed)
     const importLines = generateImportStatements(context);
@@ -546,45 +684,27 @@ export function generateStubFromClassType(
     }
     result.push(...lines);
 
-    // Calculate offset to the primary definition
-    const stubContent = result.join('\n') + '\n';
-    let primaryDefinitionOffset: number;
-
-    if (targetMethodName) {
-        // Find the target method within the class stub
-        // Look for "def <methodName>(" pattern
-        const methodPattern = new RegExp(`\\bdef ${targetMethodName.replace(/[.*+?^${}()|[\]\\]/g, '\\$&')}\\(`, 'm');
-        const match = stubContent.match(methodPattern);
-        if (!match || match.index === undefined) {
-            throw new Error(`Failed to find method '${targetMethodName}' in generated class stub`);
-        }
-        primaryDefinitionOffset = match.index;
-    } else {
-        // Find the class definition - look for "class <ClassName>"
-        const classPattern = new RegExp(`\\bclass ${type.shared.name.replace(/[.*+?^${}()|[\]\\]/g, '\\$&')}\\b`, 'm');
-        const match = stubContent.match(classPattern);
-        if (!match || match.index === undefined) {
-            throw new Error(`Failed to find class '${type.shared.name}' in generated stub`);
-        }
-        primaryDefinitionOffset = match.index;
-    }
+    const classStubStart = result.length;
+    result.push(...classStub.lines);
+    result.push('');
+
+    const offsets = getDefinitionOffsets(result);
+    const methodOffsets = new Map<string, number>();
+    classStub.methodLines.forEach((line, name) => {
+        methodOffsets.set(name, offsets[classStubStart + line]);
+    });
 
     return {
-        stubContent,
-        primaryDefinitionOffset,
+        stubContent: result.join('\n'),
+        classOffset: offsets[classStubStart + classStub.classLine!],
+        methodOffsets,
     };
 }
 
 /**
  * Generates a stub for a NewType class using NewType call syntax.
  */
-function generateNewTypeStub(
-    type: PyrightTypes.ClassType,
-    context: StubGenerationContext,
-    options: StubGenerationOptions
-): StubGenerationResult {
-    const lines: string[] = [];
-
+function generateNewTypeStub(type: PyrightTypes.ClassType, context: StubGenerationContext): ClassStub {
     // Add typing import for NewType
     addImport(context, 'typing', 'NewType');
 
@@ -598,9 +718,6 @@ function generateNewTypeStub(
         baseTypeStr = typeWrapperMatch[1];
     }
 
-    // Generate: TypeName = NewType('TypeName', BaseType)
-    lines.push(`${type.shared.name} = NewType('${type.shared.name}', ${baseTypeStr})`);
-
     // Generate imports
     const importLines = generateImportStatements(context);
     const result: string[] = [];
@@ -610,19 +727,16 @@ function generateNewTypeStub(
         result.push(...importLines);
         result.push('');
     }
-    result.push(...lines);
 
-    // Calculate offset to the NewType assignment
-    const stubContent = result.join('\n') + '\n';
-    const assignmentPattern = new RegExp(`\\b${type.shared.name.replace(/[.*+?^${}()|[\]\\]/g, '\\$&')}\\s*=`, 'm');
-    const match = stubContent.match(assignmentPattern);
-    if (!match || match.index === undefined) {
-        throw new Error(`Failed to find NewType assignment for '${type.shared.name}' in generated stub`);
-    }
+    // Generate: TypeName = NewType('TypeName', BaseType)
+    const assignmentLine = result.length;
+    result.push(`${type.shared.name} = NewType('${type.shared.name}', ${baseTypeStr})`);
+    result.push('');
 
     return {
-        stubContent,
-        primaryDefinitionOffset: match.index,
+        stubContent: result.join('\n'),
+        classOffset: getDefinitionOffsets(result)[assignmentLine],
+        methodOffsets: new Map(),
     };
 }
 
@@ -637,17 +751,18 @@ function generateClassStub(
     type: PyrightTypes.ClassType,
     context: StubGenerationContext,
     isTopLevel: boolean = false
-): string {
-    const lines: string[] = [];
-
+): StubLines {
     // Check for special TypedDict or NamedTuple
     if (type.shared.typedDictEntries) {
-        return generateTypedDictStub(type, context);
+        return { lines: generateTypedDictStub(type, context), classLine: 0, methodLines: new Map() };
     }
     if (type.shared.namedTupleEntries) {
-        return generateNamedTupleStub(evaluator, type, context);
+        return { lines: generateNamedTupleStub(evaluator, type, context), classLine: 0, methodLines: new Map() };
     }
 
+    const stub: StubLines = { lines: [], methodLines: new Map() };
+    const lines: string[] = [];
+
     // Add @deprecated decorator if deprecated
     if (type.shared.deprecatedMessage) {
         context.imports.imports.set('warnings', new Set(['deprecated']));
@@ -678,7 +793,6 @@ function generateClassStub(
     // We need to do this check before generating the base class list so we know which ones
     // to reference with simple names vs fully qualified names
     const synthesizedBaseClasses = new Set<string>();
-    const baseClassStubs: string[] = [];
     if (type.shared.baseClasses && type.shared.baseClasses.length > 0) {
         for (const bc of type.shared.baseClasses) {
             if (PyrightTypes.isClass(bc) && !bc.shared.declaration && bc.shared.name !== 'object') {
@@ -692,9 +806,9 @@ function generateClassStub(
                 if (typeWrapperMatch) {
                     bcStr = typeWrapperMatch[1];
                 }
-                baseClassStubs.push(`# ↓ Base class: ${bcStr}`);
-                baseClassStubs.push(baseStub);
-                baseClassStubs.push('');
+                stub.lines.push(`# ↓ Base class: ${bcStr}`);
+                appendStubLines(stub, baseStub);
+                stub.lines.push('');
             }
         }
     }
@@ -724,6 +838,9 @@ function generateClassStub(
     }
 
     parts.push(':');
+
+    // The base class stubs come first, followed by the decorator and the class definition.
+    stub.classLine = stub.lines.length + lines.length;
     lines.push(parts.join(''));
 
     // Add docstring if present
@@ -736,25 +853,17 @@ function generateClassStub(
         lines.push('    """');
     }
 
+    stub.lines.push(...lines);
+
     // Generate class body
-    const bodyLines = generateClassBody(evaluator, type, context);
-    if (bodyLines.length === 0) {
-        lines.push('    ...');
+    const body = generateClassBody(evaluator, type, context);
+    if (body.lines.length === 0) {
+        stub.lines.push('    ...');
     } else {
-        lines.push(...bodyLines);
+        appendStubLines(stub, body);
     }
 
-    const classStub = lines.join('\n');
-
-    // Combine base class stubs with main class stub
-    if (baseClassStubs.length > 0) {
-        const result: string[] = [];
-        result.push(...baseClassStubs);
-        result.push(classStub);
-        return result.join('\n');
-    }
-
-    return classStub;
+    return stub;
 }
 
 /**
@@ -764,8 +873,8 @@ function generateClassBody(
     evaluator: ITypeServerEvaluator,
     type: PyrightTypes.ClassType,
     context: StubGenerationContext
-): string[] {
-    const lines: string[] = [];
+): StubLines {
+    const body: StubLines = { lines: [], methodLines: new Map() };
 
     // Get all fields from the symbol table, excluding private members
     const fields: Array<{ name: string; type: PyrightTypes.Type; isMethod: boolean; isClassVar: boolean }> = [];
@@ -823,11 +932,7 @@ function generateClassBody(
                     field.type.shared.deprecatedMessage
                 );
                 // Indent the method
-                const indentedStub = methodStub
-                    .split('\n')
-                    .map((line) => `    ${line}`)
-                    .join('\n');
-                lines.push(indentedStub);
+                appendStubLines(body, methodStub, '    ');
             } else if (PyrightTypes.isOverloaded(field.type)) {
                 // Handle overloaded methods - just use first overload for stub
                 const overloads = PyrightTypes.OverloadedType.getOverloads(field.type);
@@ -839,35 +944,27 @@ function generateClassBody(
                         overloads[0].shared.docString,
                         overloads[0].shared.deprecatedMessage
                     );
-                    const indentedStub = methodStub
-                        .split('\n')
-                        .map((line) => `    ${line}`)
-                        .join('\n');
-                    lines.push(indentedStub);
+                    appendStubLines(body, methodStub, '    ');
                 }
             }
         } else if (PyrightTypes.isClass(field.type) && !field.type.shared.declaration) {
             // Nested synthesized class - generate its stub recursively
             const nestedStub = generateClassStub(evaluator, field.type, context);
-            const indentedStub = nestedStub
-                .split('\n')
-                .map((line) => `    ${line}`)
-                .join('\n');
-            lines.push(indentedStub);
+            appendStubLines(body, nestedStub, '    ');
         } else {
             // Regular field with type annotation
             const typeStr = pyrightTypeToString(field.type, context);
-            lines.push(`    ${field.name}: ${typeStr}`);
+            body.lines.push(`    ${field.name}: ${typeStr}`);
         }
     }
 
-    return lines;
+    return body;
 }
 
 /**
  * Generates a TypedDict stub using special syntax.
  */
-function generateTypedDictStub(type: PyrightTypes.ClassType, context: StubGenerationContext): string {
+function generateTypedDictStub(type: PyrightTypes.ClassType, context: StubGenerationContext): string[] {
     const lines: string[] = [];
 
     // TypedDict class definition
@@ -901,7 +998,7 @@ function generateTypedDictStub(type: PyrightTypes.ClassType, context: StubGenera
     // Add TypedDict to imports
     addImport(context, 'typing', 'TypedDict');
 
-    return lines.join('\n');
+    return lines;
 }
 
 /**
@@ -911,7 +1008,7 @@ function generateNamedTupleStub(
     evaluator: ITypeServerEvaluator,
     type: PyrightTypes.ClassType,
     context: StubGenerationContext
-): string {
+): string[] {
     const lines: string[] = [];
 
     // NamedTuple class definition
@@ -952,7 +1049,7 @@ function generateNamedTupleStub(
     // Add NamedTuple to imports
     addImport(context, 'typing', 'NamedTuple');
 
-    return lines.join('\n');
+    return lines;
 }
 
 /**
@@ -10,6 +10,8 @@ import { ParserOutput } from '../parser/parser';
 
 import { Event, EventEmitter } from './eventEmitter';
 import { INotebookUriMapper } from './notebookUriMapper';
+import { StubCache } from './stubGenerator';
+import { TypeHandleTable } from './typeHandleTable';
 import { TypeServerServiceKeys } from './typeServerServiceKeys';
 
 export interface ITypeCache {
@@ -21,6 +23,8 @@ export interface ITypeCache {
     ): Uri;
     isCaseSensitive(uri: string): boolean;
     snapshotChanged: Event<number>;
+    readonly typeHandles: TypeHandleTable;
+    readonly stubs: StubCache;
     incrementSnapshot(): number;
 }
 
@@ -28,6 +32,8 @@ export class TypeCache implements ITypeCache {
     private _snapshot: number = 0; // Make sure to start out as a valid snapshot.
     private _snapshotEmitter = EventEmitter.create<number>();
     private _parseTreeUris = new WeakMap<ParseTreeKey, Uri>();
+    private readonly _typeHandles = new TypeHandleTable();
+    private readonly _stubs = new StubCache();
 
     constructor(
         private readonly _serviceProvider: ServiceProvider,
@@ -41,6 +47,12 @@ export class TypeCache implements ITypeCache {
     get snapshotChanged(): Event<number> {
         return this._snapshotEmitter.event;
     }
+    get typeHandles(): TypeHandleTable {
+        return this._typeHandles;
+    }
+    get stubs(): StubCache {
+        return this._stubs;
+    }
     get fs(): FileSystem {
         return this._serviceProvider.fs();
     }
@@ -93,6 +105,8 @@ export class TypeCache implements ITypeCache {
     incrementSnapshot(): number {
         // Increment the snapshot and clear the caches. Type and decl caches are not valid across snapshots.
         this._snapshot++;
+        this._typeHandles.clear();
+        this._stubs.clear();
         this._snapshotEmitter.fire(this._snapshot);
         return this._snapshot;
     }
@@ -0,0 +1,104 @@
+/*
+ * typeHandleTable.ts
+ * Copyright (c) Microsoft Corporation.
+ * Licensed under the MIT license.
+ *
+ * A table of the types returned to clients during one snapshot. Each type is
+ * assigned an id the first time it is returned, and later requests of the same
+ * snapshot return the same id for it, so clients can cache types by id and
+ * refer to them in later requests. The table is cleared when the snapshot
+ * advances, and the number of types it retains is capped.
+ */
+
+import { Declaration } from '../analyzer/declaration';
+import { Type } from '../analyzer/types';
+import { PythonVersion } from '../common/pythonVersion';
+import { ParseNode } from '../parser/parseNodes';
+
+import { IProgram } from './programTypes';
+
+export const defaultMaxTypeHandles = 50000;
+
+export interface TypeHandle {
+    type: Type;
+
+    // The program, declaration or node and Python version that the type was
+    // first returned for, which are needed to convert it again.
+    program: IProgram;
+    source: Declaration | ParseNode;
+    pythonVersion: PythonVersion;
+}
+
+export class TypeHandleTable {
+    // Ids are never reused, even across snapshots, so an id from an earlier
+    // snapshot can't be mistaken for a type of the current one.
+    private _nextId = 0;
+    private readonly _ids = new Map<Type, number>();
+
+    // Kept in least recently used order, so the oldest handles are released
+    // first when the table is full.
+    private readonly _handles = new Map<number, TypeHandle>();
+
+    constructor(private _maxHandles = defaultMaxTypeHandles) {}
+
+    get size() {
+        return this._handles.size;
+    }
+
+    get maxHandles() {
+        return this._maxHandles;
+    }
+
+    set maxHandles(value: number) {
+        this._maxHandles = Math.max(0, value);
+        this._trim();
+    }
+
+    // Returns an id that isn't associated with a type, such as the id of a
+    // type reference.
+    allocateId(): number {
+        return this._nextId++;
+    }
+
+    // Returns the id of a type, assigning one if the type wasn't returned
+    // before in this snapshot or its handle was released.
+    getId(handle: TypeHandle): number {
+        let id = this._ids.get(handle.type);
+        if (id !== undefined) {
+            const existing = this._handles.get(id)!;
+            this._handles.delete(id);
+            this._handles.set(id, existing);
+            return id;
+        }
+
+        id = this.allocateId();
+        if (this._maxHandles > 0) {
+            this._ids.set(handle.type, id);
+            this._handles.set(id, handle);
+            this._trim();
+        }
+
+        return id;
+    }
+
+    getHandle(id: number): TypeHandle | undefined {
+        return this._handles.get(id);
+    }
+
+    // Releases all handles. Called when the snapshot advances.
+    clear() {
+        this._ids.clear();
+        this._handles.clear();
+    }
+
+    private _trim() {
+        for (const [id, handle] of this._handles) {
+            if (this._handles.size <= this._maxHandles) {
+                break;
+            }
+
+            this._handles.delete(id);
+            this._ids.delete(handle.type);
+        }
+    }
+}
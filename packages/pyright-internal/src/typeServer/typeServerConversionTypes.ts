@@ -154,6 +154,47 @@ export function fromProtocolNode<T extends PyrightNodes.ParseNodeBase<PyrightNod
     return bestMatch as T;
 }
 
+// Finds the name nodes that lie within the range of a protocol node, in the
+// order they appear in the file.
+export function fromProtocolRange(
+    node: TypeServerProtocol.Node,
+    resultsProvider: IParserOutputProvider
+): PyrightNodes.NameNode[] {
+    const uri = convertLspUriStringToUri(node.uri, resultsProvider, resultsProvider.uriMapper);
+    const mappedUri = resultsProvider.fs.getMappedUri(uri);
+    const parserOutput = resultsProvider.getParserOutput(mappedUri);
+    const rootNode = parserOutput?.parseTree;
+    if (!rootNode) {
+        throw new Error(`Unable to find parse results for ${node.uri}`);
+    }
+    const start = convertPositionToOffset(node.range.start, parserOutput.lines);
+    const end = convertPositionToOffset(node.range.end, parserOutput.lines);
+    if (start === undefined || end === undefined) {
+        throw new Error(`Invalid range for node: ${JSON.stringify(node)}`);
+    }
+
+    const range = TextRange.fromBounds(start, end);
+    const names: PyrightNodes.NameNode[] = [];
+
+    class NameWalker extends ParseTreeWalker {
+        override walk(node: PyrightNodes.ParseNode): void {
+            if (TextRange.overlapsRange(range, node)) {
+                super.walk(node);
+            }
+        }
+
+        override visitName(node: PyrightNodes.NameNode): boolean {
+            if (TextRange.containsRange(range, node)) {
+                names.push(node);
+            }
+            return false;
+        }
+    }
+
+    new NameWalker().walk(rootNode);
+    return names.sort((a, b) => a.start - b.start);
+}
+
 export function toProtocolDeclCategory(decl: PyrightDecl.Declaration) {
     switch (decl.type) {
         case PyrightDecl.DeclarationType.Intrinsic:
@@ -27,10 +27,12 @@ import {
     generateStubFromClassType,
     generateStubFromFunctionType,
     generateStubFromTypeVar,
+    StubCache,
     StubGenerationOptions,
     StubGenerationResult,
 } from './stubGenerator';
 import { toProtocolDecl, toProtocolNode, toProtocolTypeFlags, toProtocolVariance } from './typeServerConversionTypes';
+import { TypeHandleTable } from './typeHandleTable';
 
 export function toProtocolModuleName(moduleName: string): TypeServerProtocol.ModuleName {
     if (moduleName.length === 0) {
@@ -56,29 +58,52 @@ export function toProtocolModuleName(moduleName: string): TypeServerProtocol.Mod
 export class ProtocolTypeFactory {
     private _id = 0;
     private readonly _cycleMap = new Map<PyrightTypes.Type, number>();
-    private readonly _sourceUri: Uri;
+    private _sourceUri: Uri;
     private readonly _evaluator: ITypeServerEvaluator;
 
+    // If a handle table is given, types get the ids that they were given
+    // earlier in the snapshot, and the ids are recorded for later requests.
+    // If a stub cache is given, the stubs of synthesized types are generated
+    // once per snapshot.
     constructor(
         readonly view: IProgram,
-        readonly pythonVersion: PythonVersion,
-        declarationOrNode: Declaration | PyrightNodes.ParseNode
+        private _pythonVersion: PythonVersion,
+        private _source: Declaration | PyrightNodes.ParseNode,
+        private readonly _handles?: TypeHandleTable,
+        private readonly _stubs?: StubCache
     ) {
         this._evaluator = view.createEvaluator();
         // Extract source URI from declaration or node
-        this._sourceUri = this._extractSourceUri(declarationOrNode);
+        this._sourceUri = this._extractSourceUri(_source);
     }
 
     get sourceUri() {
         return this._sourceUri;
     }
 
+    get pythonVersion() {
+        return this._pythonVersion;
+    }
+
+    get stubCache() {
+        return this._stubs;
+    }
+
+    // Switches to the declaration or node whose type is converted next, so one
+    // factory can convert the types of a batch. Ids stay unique across the batch
+    // and types that were already converted become references to them.
+    setSource(pythonVersion: PythonVersion, declarationOrNode: Declaration | PyrightNodes.ParseNode) {
+        this._pythonVersion = pythonVersion;
+        this._source = declarationOrNode;
+        this._sourceUri = this._extractSourceUri(declarationOrNode);
+    }
+
     get evaluator() {
         return this._evaluator;
     }
 
     getNextId() {
-        return this._id++;
+        return this._handles ? this._handles.allocateId() : this._id++;
     }
 
     getModule(type: PyrightTypes.FunctionType | PyrightTypes.ClassType): PyrightTypes.ModuleType {
@@ -94,18 +119,27 @@ export class ProtocolTypeFactory {
     }
 
     getType(type: PyrightTypes.Type): TypeServerProtocol.Type {
-        const newId = this.getNextId();
-
         const existingTypeId = this._cycleMap.get(type);
         if (existingTypeId !== undefined) {
             return {
-                id: newId,
+                id: this.getNextId(),
                 kind: TypeServerProtocol.TypeKind.TypeReference,
                 flags: TypeServerProtocol.TypeFlags.None,
                 typeReferenceId: existingTypeId,
             };
         }
 
+        // Each result still contains the whole type the first time it occurs,
+        // so clients that don't cache types by id can ignore the handles.
+        const newId = this._handles
+            ? this._handles.getId({
+                  type,
+                  program: this.view,
+                  source: this._source,
+                  pythonVersion: this._pythonVersion,
+              })
+            : this.getNextId();
+
         this._set(type, newId);
         return toProtocolType(newId, type, this);
     }
@@ -340,7 +374,7 @@ function createSynthesizedType(
     type: PyrightTypes.FunctionType | PyrightTypes.ClassType | PyrightTypes.TypeVarType,
     factory: ProtocolTypeFactory
 ): TypeServerProtocol.SynthesizedType {
-    const options = { pythonVersion: factory.pythonVersion } satisfies StubGenerationOptions;
+    const options = { pythonVersion: factory.pythonVersion, cache: factory.stubCache } satisfies StubGenerationOptions;
     let moduleHandle: TypeServerProtocol.ModuleType;
     let stubResult: StubGenerationResult;
 
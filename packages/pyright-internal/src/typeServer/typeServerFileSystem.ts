@@ -73,6 +73,10 @@ export class TypeServerFileSystem implements IPyrightFileSystem, TypeServerVirtu
         return this._fs.unlinkSync(uri);
     }
 
+    renameSync(src: Uri, dst: Uri): void {
+        return this._fs.renameSync(src, dst);
+    }
+
     rmdirSync(uri: Uri): void {
         return this._fs.rmdirSync(uri);
     }
@@ -105,6 +109,10 @@ export class TypeServerFileSystem implements IPyrightFileSystem, TypeServerVirtu
         return this._fs.readdirEntriesSync(uri);
     }
 
+    readdirEntries(uri: Uri): Promise<Dirent[]> {
+        return this._fs.readdirEntries(uri);
+    }
+
     readdirSync(uri: Uri): string[] {
         return this._fs.readdirSync(uri);
     }
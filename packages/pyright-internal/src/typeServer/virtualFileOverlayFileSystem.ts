@@ -33,7 +33,7 @@ import { UriMap } from '../common/uri/uriMap';
  *
  * Non-redirected operations (always use real path):
  * - existsSync — the real file must exist for the redirect to be meaningful
- * - readdirEntriesSync, readdirSync — directory listings are unchanged
+ * - readdirEntriesSync, readdirEntries, readdirSync — directory listings are unchanged
  * - realpathSync, realCasePath — canonical paths use the workspace path
  * - isMappedUri, getOriginalUri, getMappedUri — LSP intercept handles mapping
  * - All write operations — writes go to the real FS
@@ -121,6 +121,10 @@ export class VirtualFileOverlayFileSystem implements FileSystem {
         return this._realFS.readdirEntriesSync(uri);
     }
 
+    readdirEntries(uri: Uri): Promise<Dirent[]> {
+        return this._realFS.readdirEntries(uri);
+    }
+
     readdirSync(uri: Uri): string[] {
         return this._realFS.readdirSync(uri);
     }
@@ -188,6 +192,10 @@ export class VirtualFileOverlayFileSystem implements FileSystem {
         return this._realFS.unlinkSync(uri);
     }
 
+    renameSync(src: Uri, dst: Uri): void {
+        return this._realFS.renameSync(src, dst);
+    }
+
     rmdirSync(uri: Uri): void {
         return this._realFS.rmdirSync(uri);
     }
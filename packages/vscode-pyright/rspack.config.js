@@ -5,6 +5,7 @@ const { monorepoResourceNameMapper, tsconfigResolveAliases } = require('../../bu
 const rspack = createRequire(__filename)('@rspack/core');
 const outPath = path.resolve(__dirname, 'dist');
 const typeshedFallback = path.resolve(__dirname, '..', 'pyright-internal', 'typeshed-fallback');
+const typeshedBundle = path.resolve(__dirname, '..', 'pyright-internal', 'typeshed-fallback.bundle');
 
 /** @type {(env: any, argv: { mode: 'production' | 'development' | 'none' }) => any} */
 module.exports = (_, { mode }) => {
@@ -53,6 +54,13 @@ module.exports = (_, { mode }) => {
                 },
             ],
         },
-        plugins: [new rspack.CopyRspackPlugin({ patterns: [{ from: typeshedFallback, to: 'typeshed-fallback' }] })],
+        plugins: [
+            new rspack.CopyRspackPlugin({
+                patterns: [
+                    { from: typeshedFallback, to: 'typeshed-fallback' },
+                    { from: typeshedBundle, to: 'typeshed-fallback.bundle', noErrorOnMissing: true },
+                ],
+            }),
+        ],
     };
 };
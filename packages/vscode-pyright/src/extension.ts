@@ -299,6 +299,17 @@ export async function activate(context: ExtensionContext) {
                 }
             })
         );
+        context.subscriptions.push(
+            commands.registerCommand(Commands.dumpFileSystemStats, () => {
+                const uri = window.activeTextEditor?.document.uri.toString();
+                if (uri) {
+                    client.sendRequest('workspace/executeCommand', {
+                        command: Commands.dumpFileDebugInfo,
+                        arguments: [uri, 'filesystemstats'],
+                    });
+                }
+            })
+        );
     }
 
     await client.start();